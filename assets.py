@@ -0,0 +1,345 @@
+"""
+Static Asset Pipeline for Gaurav Motors
+Bundles and minifies CSS/JS, fingerprints every static file with its content
+hash, writes gzip/brotli siblings and a manifest used by asset_url()
+"""
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Bundle name -> source files (relative to the static folder), concatenated
+# in order.  Templates reference the bundle name through asset_url().
+BUNDLES: Dict[str, Tuple[str, ...]] = {
+    'css/site.css': ('css/clean.css', 'css/layout.css', 'css/loader.css'),
+    'css/widgets.css': ('css/chatbot.css', 'css/whatsapp.css'),
+    'js/site.js': ('js/chatbot.js', 'js/dynamic-ui-light.js'),
+    'js/checkout.js': ('js/razorpay-checkout.js',),
+}
+
+DIST_DIR = 'dist'
+MANIFEST_FILE = 'manifest.json'
+SKIP_PATHS = ('dist/', 'images/derived/')
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.ico'}
+MIN_COMPRESS_SIZE = 256
+HASH_LENGTH = 10
+
+# (Content-Encoding, file suffix), in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Strings and comments are copied verbatim (strings) or dropped (comments)
+_CSS_TOKEN_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+_CSS_URL_RE = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+_JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORD_RE = re.compile(r'(?:^|[^\w$])(?:return|typeof|case|do|else|in|of|void)$')
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    """'css/site.css' -> 'css/site.3fa9c1e2b0.css'"""
+    stem, ext = posixpath.splitext(name)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}'
+
+
+def minify_css(source: str) -> str:
+    """Drop comments and redundant whitespace, leaving strings untouched"""
+    out: List[str] = []
+    code: List[str] = []
+    pos = 0
+    for match in _CSS_TOKEN_RE.finditer(source):
+        code.append(source[pos:match.start()])
+        if match.group(1):
+            out.append(_squeeze_css(''.join(code)))
+            out.append(match.group(1))
+            code = []
+        pos = match.end()
+    code.append(source[pos:])
+    out.append(_squeeze_css(''.join(code)))
+    return ''.join(out).strip()
+
+
+def _squeeze_css(code: str) -> str:
+    code = re.sub(r'\s+', ' ', code)
+    code = re.sub(r' ?([{};,>~]) ?', r'\1', code)
+    code = re.sub(r': ', ':', code)
+    return code.replace(';}', '}')
+
+
+def minify_js(source: str) -> str:
+    """Drop comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion still applies;
+    strings, template literals and regex literals are copied verbatim.
+    """
+    segments: List[Tuple[bool, str]] = []  # (is_code, text)
+    code: List[str] = []
+    i, n = 0, len(source)
+
+    def flush():
+        if code:
+            segments.append((True, ''.join(code)))
+            code.clear()
+
+    while i < n:
+        c = source[i]
+        if c in '\'"`':
+            j = _skip_quoted(source, i, c)
+            flush()
+            segments.append((False, source[i:j]))
+            i = j
+        elif source.startswith('//', i):
+            j = source.find('\n', i)
+            i = n if j < 0 else j
+        elif source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            code.append('\n' if '\n' in source[i:j] else ' ')
+            i = n if j < 0 else j + 2
+        elif c == '/' and _regex_allowed(segments, code):
+            j = _skip_quoted(source, i, '/')
+            flush()
+            segments.append((False, source[i:j]))
+            i = j
+        else:
+            code.append(c)
+            i += 1
+    flush()
+
+    out = []
+    for is_code, text in segments:
+        if is_code:
+            text = re.sub(r'[ \t\r\f\v]+', ' ', text)
+            text = re.sub(r' ?\n[\s]*', '\n', text)
+        out.append(text)
+    return ''.join(out).strip() + '\n'
+
+
+def _skip_quoted(source: str, start: int, quote: str) -> int:
+    """Index just past the literal starting at `start`"""
+    i, n = start + 1, len(source)
+    in_class = False
+    while i < n:
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if quote == '/':
+            if c == '\n':
+                return i
+            if c == '[':
+                in_class = True
+            elif c == ']':
+                in_class = False
+            elif c == '/' and not in_class:
+                i += 1
+                while i < n and source[i].isalpha():  # flags
+                    i += 1
+                return i
+        elif c == quote:
+            return i + 1
+        elif c == '\n' and quote != '`':
+            return i
+        i += 1
+    return n
+
+
+def _regex_allowed(segments, code) -> bool:
+    """Whether a '/' here starts a regex literal rather than a division"""
+    tail = ''.join(code).rstrip()
+    if not tail:
+        if segments and not segments[-1][0]:
+            return False  # follows a string or regex literal
+        tail = segments[-1][1].rstrip() if segments else ''
+    if not tail:
+        return True
+    return tail[-1] in _JS_REGEX_PREFIX or bool(_JS_REGEX_KEYWORD_RE.search(tail))
+
+
+def bundle_source(static_folder: str, name: str, sources: Iterable[str],
+                  static_url_path: str = '/static') -> bytes:
+    """Concatenate bundle sources; relative CSS url()s are made absolute"""
+    parts = []
+    for source in sources:
+        with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+            text = f.read()
+        if name.endswith('.css'):
+            base = posixpath.dirname(source)
+
+            def absolute(match, base=base):
+                url = match.group(2).strip()
+                if re.match(r'^(?:[a-z]+:|/|#)', url, re.I):
+                    return match.group(0)
+                path = posixpath.normpath(posixpath.join(base, url))
+                return f'url("{static_url_path.rstrip("/")}/{path}")'
+
+            text = _CSS_URL_RE.sub(absolute, text)
+        parts.append(text)
+    return '\n'.join(parts).encode('utf-8')
+
+
+def compress_variants(data: bytes) -> Dict[str, bytes]:
+    """Precompressed copies keyed by file suffix"""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+def _minify(name: str, data: bytes) -> bytes:
+    if name.endswith('.min.css') or name.endswith('.min.js'):
+        return data
+    if name.endswith('.css'):
+        return minify_css(data.decode('utf-8')).encode('utf-8')
+    if name.endswith('.js'):
+        return minify_js(data.decode('utf-8')).encode('utf-8')
+    return data
+
+
+def _write(path: str, data: bytes) -> None:
+    if os.path.exists(path):
+        return  # content-addressed: same name, same bytes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_assets(static_folder: str, bundles: Dict[str, Tuple[str, ...]] = BUNDLES,
+                 static_url_path: str = '/static') -> Dict[str, str]:
+    """Write fingerprinted (and precompressed) static files to static/dist.
+
+    Returns the manifest mapping logical names ('css/site.css') to
+    fingerprinted names ('css/site.3fa9c1e2b0.css'), which is also written
+    to static/dist/manifest.json.  Files from previous builds that the new
+    manifest no longer references are removed.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    outputs: Dict[str, bytes] = {}
+    for name, sources in bundles.items():
+        outputs[name] = _minify(name, bundle_source(static_folder, name, sources, static_url_path))
+    for root, _dirs, files in os.walk(static_folder):
+        for filename in files:
+            rel = os.path.relpath(os.path.join(root, filename), static_folder).replace(os.sep, '/')
+            if (rel.startswith(SKIP_PATHS) or filename.startswith('.') or rel in outputs
+                    or filename.endswith(('.gz', '.br'))):
+                continue
+            with open(os.path.join(root, filename), 'rb') as f:
+                outputs[rel] = _minify(rel, f.read())
+
+    manifest: Dict[str, str] = {}
+    keep = {MANIFEST_FILE}
+    for name in sorted(outputs):
+        data = outputs[name]
+        hashed = fingerprint(name, data)
+        manifest[name] = hashed
+        _write(os.path.join(dist, hashed), data)
+        keep.add(hashed)
+        if posixpath.splitext(name)[1] in COMPRESSIBLE and len(data) >= MIN_COMPRESS_SIZE:
+            for suffix, compressed in compress_variants(data).items():
+                if len(compressed) < len(data):
+                    _write(os.path.join(dist, hashed + suffix), compressed)
+                    keep.add(hashed + suffix)
+
+    tmp_manifest = os.path.join(dist, f'{MANIFEST_FILE}.{os.getpid()}.tmp')
+    with open(tmp_manifest, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_manifest, os.path.join(dist, MANIFEST_FILE))
+
+    for root, _dirs, files in os.walk(dist):
+        for filename in files:
+            rel = os.path.relpath(os.path.join(root, filename), dist).replace(os.sep, '/')
+            if rel not in keep:
+                os.unlink(os.path.join(root, filename))
+    return manifest
+
+
+def precompress_static(static_folder: str) -> int:
+    """Write .gz/.br siblings next to text files under the static folder.
+
+    These serve un-fingerprinted url_for('static') references; the
+    compression middleware picks the sibling the client accepts.  Returns the
+    number of files (re)compressed.
+    """
+    count = 0
+    for root, _dirs, files in os.walk(static_folder):
+        for filename in files:
+            path = os.path.join(root, filename)
+            rel = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            if (rel.startswith(SKIP_PATHS) or posixpath.splitext(filename)[1] not in COMPRESSIBLE
+                    or os.path.getsize(path) < MIN_COMPRESS_SIZE):
+                continue
+            mtime = os.path.getmtime(path)
+            stale = [suffix for _encoding, suffix in ENCODINGS
+                     if not os.path.exists(path + suffix) or os.path.getmtime(path + suffix) < mtime]
+            if not stale:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            for suffix, compressed in compress_variants(data).items():
+                if len(compressed) < len(data):
+                    tmp_path = f'{path}{suffix}.{os.getpid()}.tmp'
+                    with open(tmp_path, 'wb') as out:
+                        out.write(compressed)
+                    os.replace(tmp_path, path + suffix)
+            count += 1
+    return count
+
+
+def encoded_variant(dist_dir: str, filename: str, accept_encodings) -> Tuple[str, Optional[str]]:
+    """Pick the best precompressed sibling the client accepts.
+
+    Returns (filename to send, Content-Encoding or None).
+    """
+    for encoding, suffix in ENCODINGS:
+        if accept_encodings[encoding] and os.path.isfile(os.path.join(dist_dir, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
+
+
+class AssetManifest:
+    """Lazily loaded static/dist/manifest.json.
+
+    With auto_reload (debug mode) the file is re-read when a new build
+    replaces it; otherwise it is read once per process.
+    """
+
+    def __init__(self, static_folder: str, auto_reload: bool = False):
+        self.path = os.path.join(static_folder, DIST_DIR, MANIFEST_FILE)
+        self.auto_reload = auto_reload
+        self._entries: Optional[Dict[str, str]] = None
+        self._mtime = 0.0
+        self._checked_at = 0.0
+
+    def refresh(self) -> None:
+        self._entries = None
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            self._mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+        return self._entries
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Fingerprinted name for a logical asset name, or None if not built"""
+        entries = self._entries
+        if entries is None:
+            entries = self._load()
+        elif self.auto_reload and time.monotonic() - self._checked_at > 1:
+            self._checked_at = time.monotonic()
+            try:
+                if os.path.getmtime(self.path) != self._mtime:
+                    entries = self._load()
+            except OSError:
+                pass
+        return entries.get(name)
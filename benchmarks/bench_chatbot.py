@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Chatbot Micro-benchmark
+Measures get_chatbot_response() throughput (messages/second on one worker)
+Run with: python benchmarks/bench_chatbot.py [--seconds 2]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chat_corpus.json')
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        return [case['message'].lower().strip() for case in json.load(f)]
+
+
+def run(seconds):
+    from app import app, get_chatbot_response
+
+    messages = load_corpus()
+    with app.app_context():
+        # Warm the catalogue cache so the loop measures the steady state
+        for message in messages:
+            get_chatbot_response(message)
+
+        count = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            for message in messages:
+                get_chatbot_response(message)
+            count += len(messages)
+        elapsed = time.perf_counter() - start
+
+    return {
+        'benchmark': 'chatbot',
+        'messages': count,
+        'seconds': round(elapsed, 3),
+        'messages_per_second': round(count / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.seconds), indent=2))
+
+
+if __name__ == '__main__':
+    main()
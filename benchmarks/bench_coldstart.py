@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Cold Start Benchmark
+Starts a fresh interpreter per run, as a new serverless instance would, and
+times loading api/index.py plus the first request, with `-X importtime`
+attributing the import cost to modules. Compare cold_start_ms (load plus
+first request) between versions: the first request also checks the schema
+Run with: python benchmarks/bench_coldstart.py [--runs 5] [--path /healthz]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {api!r})
+start = time.perf_counter()
+import index
+loaded = time.perf_counter()
+from werkzeug.test import Client
+response = Client(index.app).get({path!r})
+done = time.perf_counter()
+print(json.dumps({{'status': response.status_code, 'load_ms': (loaded - start) * 1000,
+                  'first_request_ms': (done - loaded) * 1000, 'total_ms': (done - start) * 1000}}))
+'''
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def run_once(path):
+    env = {k: v for k, v in os.environ.items() if k not in ('DATABASE_URL', 'SNAPSHOTS')}
+    env['VERCEL'] = '1'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD.format(api=os.path.join(ROOT, 'api'), path=path)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/healthz')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once(args.path) for _ in range(args.runs)]
+    median = lambda key: round(statistics.median(timings[key] for timings, _ in runs), 1)
+    modules = runs[-1][1]
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    print(json.dumps({
+        'benchmark': 'coldstart',
+        'runs': args.runs,
+        'path': args.path,
+        'status': runs[-1][0]['status'],
+        'handler_load_ms': median('load_ms'),
+        'first_request_ms': median('first_request_ms'),
+        'cold_start_ms': median('total_ms'),
+        'app_import_ms': round(modules.get('app', (0, 0))[1] / 1000, 1),
+        'slowest_modules_self_ms': {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
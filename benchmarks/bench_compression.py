@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Response Compression Benchmark
+Reports bytes on the wire and CPU time per request for each encoding, for
+rendered pages and for a streamed CSV export
+Run with: python benchmarks/bench_compression.py [--requests 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGES = ['/', '/services', '/about', '/faq', '/spare-parts']
+ENCODINGS = ['identity', 'gzip', 'br', 'zstd']
+CSV_ROWS = 20000
+
+
+def measure(client, path, encoding, requests):
+    size = 0
+    start = time.process_time()
+    for _ in range(requests):
+        response = client.get(path, headers={'Accept-Encoding': encoding})
+        size = len(response.data)
+    cpu = time.process_time() - start
+    return size, cpu / requests * 1000
+
+
+def csv_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/csv')])
+    for i in range(CSV_ROWS):
+        yield f'{i},Customer {i},customer{i}@example.com,98765{i % 100000:05d},3,2024-01-01,10:00,Completed,{1500 + i % 700}.0\n'.encode()
+
+
+def run(requests):
+    from werkzeug.test import Client
+    from app import app, db
+    from compression import CODECS, CompressionMiddleware
+
+    encodings = [name for name in ENCODINGS if name == 'identity' or name in CODECS]
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    for path in PAGES:
+        client.get(path)  # warm template and query caches
+
+    pages = {}
+    for encoding in encodings:
+        sizes, cpu = 0, 0.0
+        for path in PAGES:
+            size, ms = measure(client, path, encoding, requests)
+            sizes += size
+            cpu += ms
+        pages[encoding] = {
+            'bytes_per_request': round(sizes / len(PAGES)),
+            'cpu_ms_per_request': round(cpu / len(PAGES), 3),
+        }
+    for encoding in encodings:
+        pages[encoding]['cpu_ms_over_identity'] = round(
+            pages[encoding]['cpu_ms_per_request'] - pages['identity']['cpu_ms_per_request'], 3)
+
+    middleware = CompressionMiddleware(csv_app, level=app.config['COMPRESS_LEVEL'],
+                                       encodings=[e for e in encodings if e != 'identity'])
+    csv_client = Client(middleware)
+    csv = {}
+    for encoding in encodings:
+        start = time.process_time()
+        response = csv_client.get('/', headers={'Accept-Encoding': encoding})
+        size = sum(len(chunk) for chunk in response.iter_encoded())
+        csv[encoding] = {'bytes': size, 'cpu_ms': round((time.process_time() - start) * 1000, 3)}
+
+    return {
+        'benchmark': 'compression',
+        'level': app.config['COMPRESS_LEVEL'],
+        'requests_per_page': requests,
+        'pages': pages,
+        'csv_export': csv,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Login Throughput Benchmark
+Posts /login from concurrent clients against a temporary SQLite database and
+reports logins/second and latency for each hashing method, verifying on the
+request thread and on the PASSWORD_HASH_WORKERS pool
+Run with: python benchmarks/bench_login.py [--clients 8] [--seconds 3] [--method scrypt:32768:8:1 ...]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+USERS = 50
+PASSWORD = 'Bench@12345'
+DEFAULT_METHODS = ['pbkdf2:sha256:600000', 'scrypt:16384:8:1', 'scrypt:32768:8:1']
+
+
+def make_app(path):
+    # config reads DATABASE_URL when it is first imported
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from factory import create_app
+    from extensions import db
+
+    app = create_app('development')
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def reset_users(app, method):
+    """USERS customers hashed with `method` (the table is emptied first)"""
+    from credentials import Credentials
+    from extensions import db
+    from models import User
+
+    stored = Credentials(method).hash(PASSWORD)
+    with app.app_context():
+        User.query.delete()
+        db.session.add_all(User(username=f'user{n}', email=f'user{n}@bench.local', role='customer',
+                                password_hash=stored) for n in range(USERS))
+        db.session.commit()
+
+
+def drive(app, seconds, latencies, statuses, index):
+    rng = random.Random(index)
+    client = app.test_client()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        response = client.post('/login', data={'username': f'user{rng.randrange(USERS)}', 'password': PASSWORD})
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status_code)
+        client.get('/logout')
+
+
+def percentile(values, fraction):
+    return round(values[min(int(len(values) * fraction), len(values) - 1)] * 1000, 1) if values else None
+
+
+def run_variant(app, method, workers, queue, clients, seconds):
+    from credentials import init_credentials
+
+    app.config.update(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_QUEUE=queue)
+    credentials = init_credentials(app)
+    reset_users(app, method)
+    latencies, statuses = [], []
+    threads = [threading.Thread(target=drive, args=(app, seconds, latencies, statuses, n)) for n in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    credentials.shutdown()
+
+    latencies.sort()
+    ok = statuses.count(302)
+    return {
+        'method': credentials.method,
+        'workers': workers,
+        'logins': ok,
+        'shed': statuses.count(503),
+        'failed': len(statuses) - ok - statuses.count(503),
+        'logins_per_second': round(ok / elapsed, 1),
+        'p50_ms': percentile(latencies, 0.5),
+        'p95_ms': percentile(latencies, 0.95),
+    }
+
+
+def run(methods, clients, seconds, workers, queue):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'login.db'))
+        results = [run_variant(app, method, pool, queue, clients, seconds)
+                   for method in methods for pool in (0, workers)]
+    return {
+        'benchmark': 'login',
+        'clients': clients,
+        'seconds': seconds,
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='PASSWORD_HASH_WORKERS for the pooled runs')
+    parser.add_argument('--queue', type=int, default=16, help='PASSWORD_HASH_QUEUE for the pooled runs')
+    parser.add_argument('--method', action='append', dest='methods',
+                        help=f'hashing method to compare (repeatable, default {" ".join(DEFAULT_METHODS)})')
+    args = parser.parse_args()
+    print(json.dumps(run(args.methods or DEFAULT_METHODS, args.clients, args.seconds, args.workers, args.queue),
+                     indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Page Snapshot Benchmark
+Requests per second for the public marketing pages rendered by Flask versus
+served from snapshots by SnapshotMiddleware, called as a WSGI app in-process
+Run with: python benchmarks/bench_snapshots.py [--requests 500]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ENVIRON = {
+    'REQUEST_METHOD': 'GET', 'SCRIPT_NAME': '', 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+    'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'HTTP_ACCEPT_ENCODING': 'br, gzip',
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+}
+
+
+def start_response(status, headers, exc_info=None):
+    return lambda data: None
+
+
+def requests_per_second(wsgi_app, path, requests):
+    environ = dict(ENVIRON, PATH_INFO=path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        body = wsgi_app(dict(environ), start_response)
+        for _chunk in body:
+            pass
+        close = getattr(body, 'close', None)
+        if close is not None:
+            close()
+    return requests / (time.perf_counter() - start)
+
+
+def run(requests):
+    from app import app, db
+    from snapshots import SNAPSHOT_ROUTES, SnapshotMiddleware, SnapshotStore, render_snapshots
+
+    with app.app_context():
+        db.create_all()
+    with tempfile.TemporaryDirectory() as folder:
+        store = SnapshotStore(folder)
+        render_snapshots(app, store, ['http://localhost'])
+        snapshot_app = SnapshotMiddleware(app.wsgi_app, store)
+        pages = {}
+        for path in SNAPSHOT_ROUTES:
+            requests_per_second(app.wsgi_app, path, 5)  # warm template caches
+            flask_rps = requests_per_second(app.wsgi_app, path, requests)
+            snapshot_rps = requests_per_second(snapshot_app, path, requests * 20)
+            pages[path] = {
+                'flask_rps': round(flask_rps),
+                'snapshot_rps': round(snapshot_rps),
+                'speedup': round(snapshot_rps / flask_rps, 1),
+            }
+    return {
+        'benchmark': 'snapshots',
+        'requests_per_page': requests,
+        'pages': pages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+SQLite Concurrency Benchmark
+Concurrent readers and writers against a copy of hms.db, with SQLite's
+defaults (rollback journal, synchronous=FULL) and with engine_config's
+WAL pragmas
+Run with: python benchmarks/bench_sqlite.py [--readers 8] [--writers 2] [--seconds 5]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+READ_SQL = ('SELECT id, title, is_read FROM notification WHERE user_id = :user_id '
+            'ORDER BY created_at DESC LIMIT 20')
+WRITE_SQL = ('INSERT INTO notification (user_id, title, message, notification_type, is_read, created_at) '
+             'VALUES (:user_id, :title, :message, :kind, 0, :created_at)')
+
+
+def worker(engine, sql_text, write, deadline, counts, errors, index):
+    from sqlalchemy.exc import OperationalError
+    done = 0
+    while time.monotonic() < deadline:
+        try:
+            with engine.begin() as conn:
+                if write:
+                    conn.execute(sql_text, {'user_id': 1 + done % 3, 'title': f'Bench {index}-{done}',
+                                            'message': 'Booking confirmed', 'kind': 'booking',
+                                            'created_at': datetime.utcnow()})
+                else:
+                    conn.execute(sql_text, {'user_id': 1 + done % 3}).fetchall()
+            done += 1
+        except OperationalError:
+            errors.append(index)  # database is locked
+    counts[index] = done
+
+
+def run_mode(mode, source, args):
+    from sqlalchemy import create_engine, text
+    from engine_config import configure_engine, engine_options
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, 'hms.db')
+        shutil.copyfile(source, path)
+        uri = f'sqlite:///{path}'
+        if mode == 'tuned':
+            engine = create_engine(uri, pool_size=args.readers + args.writers, **engine_options(uri))
+            configure_engine(engine)
+        else:
+            engine = create_engine(uri, pool_size=args.readers + args.writers)
+        with engine.connect() as conn:
+            journal_mode = conn.exec_driver_sql('PRAGMA journal_mode').scalar()
+
+        deadline = time.monotonic() + args.seconds
+        counts = {}
+        errors = []
+        threads = []
+        for i in range(args.readers + args.writers):
+            write = i >= args.readers
+            threads.append(threading.Thread(target=worker, args=(
+                engine, text(WRITE_SQL if write else READ_SQL), write, deadline, counts, errors, i)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+        reads = sum(n for i, n in counts.items() if i < args.readers)
+        writes = sum(n for i, n in counts.items() if i >= args.readers)
+        return {
+            'journal_mode': journal_mode,
+            'reads_per_second': round(reads / args.seconds),
+            'writes_per_second': round(writes / args.seconds),
+            'locked_errors': len(errors),
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database', default=os.path.join(ROOT, 'hms.db'), help='copied, never modified')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    print(json.dumps({
+        'benchmark': 'sqlite',
+        'readers': args.readers,
+        'writers': args.writers,
+        'modes': {mode: run_mode(mode, args.database, args) for mode in ('default', 'tuned')},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
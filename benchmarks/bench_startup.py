@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Times building the app in a fresh interpreter for each profile: the full site
+(app.py), an API-only worker, and a models-only app as used by the CLI scripts
+Run with: python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'full': 'from app import app',
+    'api_only': "from factory import create_app; app = create_app(blueprints=['api'])",
+    'models_only': 'from factory import create_app; app = create_app(blueprints=())',
+}
+
+CHILD = r'''
+import json, sys, time
+start, start_cpu = time.perf_counter(), time.process_time()
+{statement}
+built, built_cpu = time.perf_counter(), time.process_time()
+print(json.dumps({{'startup_ms': (built - start) * 1000, 'cpu_ms': (built_cpu - start_cpu) * 1000,
+                  'routes': len(list(app.url_map.iter_rules())), 'modules': len(sys.modules)}}))
+'''
+
+
+def run_once(statement):
+    env = {k: v for k, v in os.environ.items()
+           if k not in ('VERCEL', 'RENDER', 'RAILWAY_ENVIRONMENT', 'SNAPSHOTS', 'APP_BLUEPRINTS')}
+    env['DATABASE_URL'] = 'sqlite://'
+    result = subprocess.run([sys.executable, '-c', CHILD.format(statement=statement)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    report = {'benchmark': 'startup', 'runs': args.runs}
+    for name, statement in PROFILES.items():
+        runs = [run_once(statement) for _ in range(args.runs)]
+        report[name] = {
+            'startup_ms': round(statistics.median(run['startup_ms'] for run in runs), 1),
+            # Less sensitive than wall time to other load on the machine
+            'cpu_ms': round(statistics.median(run['cpu_ms'] for run in runs), 1),
+            'routes': runs[-1]['routes'],
+            'modules': runs[-1]['modules'],
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
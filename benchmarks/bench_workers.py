@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Gunicorn Worker Class Load Test
+Starts gunicorn with gunicorn.conf.py once per worker class and drives it
+with keep-alive clients; one request in five waits like a slow SMTP call
+Run with: python benchmarks/bench_workers.py [--clients 32] [--seconds 10]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGES = ['/', '/services', '/faq', '/healthz']
+SLOW_PATH = '/bench/slow'
+SLOW_EVERY = 5
+
+
+def make_app(delay_ms=200):
+    """The site plus SLOW_PATH, which blocks for delay_ms (loaded by gunicorn)"""
+    from app import app
+
+    def slow_app(environ, start_response):
+        if environ.get('PATH_INFO') == SLOW_PATH:
+            time.sleep(delay_ms / 1000)
+            start_response('200 OK', [('Content-Type', 'text/plain'), ('Content-Length', '2')])
+            return [b'ok']
+        return app(environ, start_response)
+
+    return slow_app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/healthz')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('gunicorn did not become ready')
+
+
+def drive(port, seconds, latencies, errors, index):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    deadline = time.monotonic() + seconds
+    count = index
+    while time.monotonic() < deadline:
+        count += 1
+        path = SLOW_PATH if count % SLOW_EVERY == 0 else PAGES[count % len(PAGES)]
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors.append('connection')
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def percentile(values, fraction):
+    return round(values[min(int(len(values) * fraction), len(values) - 1)] * 1000, 1) if values else None
+
+
+def run_class(worker_class, args):
+    port = free_port()
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=worker_class, GUNICORN_BIND=f'127.0.0.1:{port}',
+               WEB_CONCURRENCY=str(args.workers), GUNICORN_ACCESS_LOG='/dev/null',
+               GUNICORN_LOG_LEVEL='warning', DATABASE_URL=os.environ.get('DATABASE_URL', 'sqlite://'))
+    if args.threads:
+        env['GUNICORN_THREADS'] = str(args.threads)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+         '--pythonpath', f'{ROOT},{os.path.join(ROOT, "benchmarks")}',
+         f'bench_workers:make_app({args.delay_ms})'],
+        cwd=ROOT, env=env)
+    try:
+        wait_ready(port, process)
+        latencies, errors = [], []
+        clients = [threading.Thread(target=drive, args=(port, args.seconds, latencies, errors, i))
+                   for i in range(args.clients)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    latencies.sort()
+    return {
+        'requests_per_second': round(len(latencies) / args.seconds, 1),
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classes', default='sync,gthread,gevent')
+    parser.add_argument('--workers', type=int, default=2, help='same worker count for every class')
+    parser.add_argument('--threads', type=int, default=0, help='gthread threads (default: profile)')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--delay-ms', type=int, default=200)
+    args = parser.parse_args()
+
+    results = {}
+    for worker_class in args.classes.split(','):
+        if worker_class == 'gevent':
+            try:
+                import gevent  # noqa: F401
+            except ImportError:
+                results[worker_class] = {'skipped': 'gevent is not installed'}
+                continue
+        results[worker_class] = run_class(worker_class, args)
+    print(json.dumps({
+        'benchmark': 'workers',
+        'workers': args.workers,
+        'clients': args.clients,
+        'slow_request_ms': args.delay_ms,
+        'slow_every': SLOW_EVERY,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
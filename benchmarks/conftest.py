@@ -0,0 +1,41 @@
+"""
+Benchmark Suite Fixtures
+The generated dataset (BENCH_SCALE, BENCH_SEED, or an existing database in
+BENCH_DATABASE_URL) and an app bound to it, for the pytest-benchmark tests
+Run with: python -m pytest benchmarks [--benchmark-json out.json]
+"""
+import os
+import sys
+
+import pytest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import datagen  # noqa: E402
+
+SCALE = float(os.environ.get('BENCH_SCALE', 0.1))
+SEED = int(os.environ.get('BENCH_SEED', datagen.DEFAULT_SEED))
+# config reads DATABASE_URL when it is first imported, so point it at the dataset now
+os.environ['DATABASE_URL'] = os.environ.get('BENCH_DATABASE_URL') or datagen.default_database(SCALE, SEED)
+
+
+@pytest.fixture(scope='session')
+def dataset():
+    """Row counts of the dataset under test (generated on first use)"""
+    datagen.open_dataset(os.environ['DATABASE_URL'], SCALE, SEED).dispose()
+    return datagen.Plan(SCALE)
+
+
+@pytest.fixture(scope='session')
+def bench_app(dataset):
+    from factory import create_app
+    return create_app('production', blueprints=())
+
+
+@pytest.fixture
+def app_context(bench_app):
+    with bench_app.app_context():
+        yield
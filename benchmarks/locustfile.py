@@ -0,0 +1,161 @@
+"""
+Load Test Scenarios for Gaurav Motors
+Browse, search, cart and checkout, booking and admin flows against a site
+serving a dataset from benchmarks/datagen.py (BENCH_SCALE and BENCH_SEED
+must match the ones it was generated with)
+Install with: pip install -r requirements-bench.txt
+Run with: locust -f benchmarks/locustfile.py --host http://127.0.0.1:5000
+     or: python benchmarks/report.py --load (headless, into the JSON report)
+"""
+import itertools
+import os
+import random
+import sys
+from datetime import timedelta
+
+from locust import HttpUser, between, task
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import datagen  # noqa: E402
+
+SCALE = float(os.environ.get('BENCH_SCALE', 0.1))
+SEED = int(os.environ.get('BENCH_SEED', datagen.DEFAULT_SEED))
+PLAN = datagen.Plan(SCALE)
+SEARCH_TERMS = ['brake', 'filter', 'bosch', 'ac service', 'clutch', 'battery', 'swift', 'detailing']
+CHAT_MESSAGES = ['what are your timings', 'price of general service', 'where are you located',
+                 'book a service', 'do you sell spare parts']
+_users = itertools.count(1)
+
+
+class SiteUser(HttpUser):
+    """Base for the scenarios: a per-user RNG so a run replays the same requests"""
+    abstract = True
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        self.number = next(_users)
+        self.rng = random.Random(f'{SEED}-{type(self).__name__}-{self.number}')
+
+    def login(self, username):
+        self.client.post('/login', data={'username': username, 'password': datagen.PASSWORD},
+                         allow_redirects=False, name='/login')
+
+    def part_id(self):
+        return self.rng.randrange(PLAN.parts) + 1
+
+    def booking_date(self):
+        return (datagen.DEFAULT_ANCHOR + timedelta(days=self.rng.randrange(1, 30))).isoformat()
+
+
+class Visitor(SiteUser):
+    """Anonymous browsing and search"""
+    weight = 6
+
+    @task(4)
+    def home(self):
+        self.client.get('/')
+
+    @task(2)
+    def services(self):
+        self.client.get('/services')
+
+    @task(3)
+    def spare_parts(self):
+        self.client.get('/spare-parts')
+
+    @task(3)
+    def part_detail(self):
+        self.client.get(f'/part/{self.part_id()}', name='/part/[id]')
+
+    @task(1)
+    def accessories(self):
+        self.client.get('/accessories')
+
+    @task(3)
+    def search(self):
+        self.client.get('/search', params={'q': self.rng.choice(SEARCH_TERMS)}, name='/search?q=[term]')
+
+    @task(2)
+    def api_services(self):
+        self.client.get('/api/services')
+
+    @task(1)
+    def chat(self):
+        self.client.post('/api/chat', json={'message': self.rng.choice(CHAT_MESSAGES)})
+
+
+class Shopper(SiteUser):
+    """A signed-in customer filling a cart and checking out"""
+    weight = 2
+
+    def on_start(self):
+        super().on_start()
+        self.login(f'customer{self.rng.randrange(PLAN.customers) + 1}')
+
+    @task(3)
+    def add_to_cart(self):
+        self.client.post(f'/cart/add/{self.part_id()}', data={'quantity': 1}, allow_redirects=False,
+                         name='/cart/add/[id]')
+        self.client.get('/cart')
+
+    @task(1)
+    def checkout(self):
+        self.client.post(f'/cart/add/{self.part_id()}', data={'quantity': 1}, allow_redirects=False,
+                         name='/cart/add/[id]')
+        self.client.get('/checkout')
+        self.client.post('/checkout', allow_redirects=False, data={
+            'customer_name': f'Customer {self.number}', 'customer_phone': '9876543210',
+            'customer_email': f'customer{self.number}@bench.local', 'delivery_address': 'Dehradun',
+            'car_brand': self.rng.choice(datagen.BRANDS), 'car_model': self.rng.choice(datagen.MODELS)})
+        self.client.get('/my-orders')
+
+
+class Booker(SiteUser):
+    """Checking slots and booking a service through the API"""
+    weight = 2
+
+    @task
+    def book(self):
+        day = self.booking_date()
+        slots = self.client.get(f'/api/timeslots/{day}', name='/api/timeslots/[date]').json().get('slots') or []
+        if not slots:
+            return
+        self.client.post('/api/booking/create', json={
+            'customer_name': f'Booker {self.number}', 'customer_phone': '9876543210',
+            'customer_email': f'booker{self.number}@bench.local', 'vehicle_brand': self.rng.choice(datagen.BRANDS),
+            'vehicle_model': self.rng.choice(datagen.MODELS), 'service_id': self.rng.randrange(PLAN.services) + 1,
+            'booking_date': day, 'booking_time': self.rng.choice(slots)['time']})
+
+
+class Admin(SiteUser):
+    """The workshop admin's dashboard, lists and exports"""
+    weight = 1
+
+    def on_start(self):
+        super().on_start()
+        self.login('admin')
+
+    @task(3)
+    def dashboard(self):
+        self.client.get('/admin')
+
+    @task(2)
+    def part_orders(self):
+        self.client.get('/admin/part-orders')
+
+    @task(1)
+    def parts(self):
+        self.client.get('/admin/parts')
+
+    @task(1)
+    def customers(self):
+        self.client.get('/admin/customers')
+
+    @task(2)
+    def service_bookings(self):
+        self.client.get('/admin/service-bookings')
+
+    @task(2)
+    def analytics(self):
+        self.client.get('/api/analytics/dashboard')
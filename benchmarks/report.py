@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark Report
+Runs the helper micro-benchmarks (pytest-benchmark) and, with --load, the
+Locust scenarios against gunicorn, all on one generated dataset, and writes a
+JSON report stamped with the commit; --compare checks it against an earlier
+report and exits non-zero when a median/p95 regressed by more than --threshold
+Install with: pip install -r requirements-bench.txt
+Run with: python benchmarks/report.py [--scale 0.1] [--load] [--output report.json] [--compare base.json]
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import datagen  # noqa: E402
+
+MICRO_TESTS = os.path.join(BENCH_DIR, 'test_helpers_benchmark.py')
+LOCUSTFILE = os.path.join(BENCH_DIR, 'locustfile.py')
+
+
+def git(*args):
+    result = subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def bench_env(args, database):
+    env = {k: v for k, v in os.environ.items()
+           if k not in ('VERCEL', 'RENDER', 'RAILWAY_ENVIRONMENT', 'SNAPSHOTS', 'APP_BLUEPRINTS', 'FLASK_ENV')}
+    env.update(BENCH_SCALE=str(args.scale), BENCH_SEED=str(args.seed), BENCH_DATABASE_URL=database,
+               DATABASE_URL=database)
+    return env
+
+
+def run_micro(args, database):
+    """{benchmark: timing stats in ms} from pytest-benchmark's JSON output"""
+    if importlib.util.find_spec('pytest_benchmark') is None:
+        return {'skipped': 'pytest-benchmark is not installed'}
+    with tempfile.TemporaryDirectory() as folder:
+        output = os.path.join(folder, 'micro.json')
+        subprocess.run([sys.executable, '-m', 'pytest', MICRO_TESTS, '-q', '-p', 'no:cacheprovider',
+                        f'--benchmark-json={output}', f'--benchmark-min-rounds={args.rounds}'],
+                       cwd=ROOT, env=bench_env(args, database), check=True)
+        with open(output, encoding='utf-8') as f:
+            results = json.load(f)['benchmarks']
+    return {
+        result['name']: {
+            'median_ms': round(result['stats']['median'] * 1000, 4),
+            'mean_ms': round(result['stats']['mean'] * 1000, 4),
+            'stddev_ms': round(result['stats']['stddev'] * 1000, 4),
+            'min_ms': round(result['stats']['min'] * 1000, 4),
+            'ops': round(result['stats']['ops'], 1),
+            'rounds': result['stats']['rounds'],
+        }
+        for result in results
+    }
+
+
+def read_locust_stats(path):
+    endpoints = {}
+    aggregated = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            stats = {
+                'requests': int(row['Request Count']),
+                'failures': int(row['Failure Count']),
+                'requests_per_second': round(float(row['Requests/s']), 2),
+                'p50_ms': float(row['50%']),
+                'p95_ms': float(row['95%']),
+                'p99_ms': float(row['99%']),
+            }
+            if row['Name'] == 'Aggregated':
+                aggregated = stats
+            else:
+                endpoints[f"{row['Type']} {row['Name']}"] = stats
+    return aggregated, endpoints
+
+
+def run_load(args, database):
+    """Per-endpoint throughput and latency percentiles from a headless Locust run"""
+    if importlib.util.find_spec('locust') is None:
+        return {'skipped': 'locust is not installed'}
+    from bench_workers import free_port, wait_ready
+
+    folder = tempfile.mkdtemp()
+    try:
+        if database.startswith('sqlite:///'):
+            # the flows write bookings and orders: load a copy so the dataset stays as generated
+            copy = os.path.join(folder, 'load.db')
+            shutil.copyfile(database[len('sqlite:///'):], copy)
+            database = f'sqlite:///{copy}'
+        env = bench_env(args, database)
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'), 'app:app'],
+            cwd=ROOT, env=dict(env, GUNICORN_BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY=str(args.workers),
+                               GUNICORN_ACCESS_LOG='/dev/null', GUNICORN_LOG_LEVEL='warning'))
+        try:
+            wait_ready(port, server)
+            prefix = os.path.join(folder, 'locust')
+            subprocess.run([sys.executable, '-m', 'locust', '-f', LOCUSTFILE, '--headless', '--only-summary',
+                            '-u', str(args.users), '-r', str(args.users), '-t', f'{args.seconds}s',
+                            '--host', f'http://127.0.0.1:{port}', '--csv', prefix],
+                           cwd=ROOT, env=env, check=False, stdout=subprocess.DEVNULL)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        aggregated, endpoints = read_locust_stats(f'{prefix}_stats.csv')
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return {'users': args.users, 'seconds': args.seconds, 'workers': args.workers,
+            'total': aggregated, 'endpoints': endpoints}
+
+
+def compare(report, baseline, threshold):
+    """{metric: {baseline, current, change_pct, regressed}} for metrics in both reports"""
+    rows = {}
+
+    def check(name, before, after):
+        if before and after is not None:
+            change = (after - before) / before * 100
+            rows[name] = {'baseline': before, 'current': after, 'change_pct': round(change, 1),
+                          'regressed': change > threshold}
+
+    for name, stats in report.get('micro', {}).items():
+        if isinstance(stats, dict):
+            check(f'micro {name} median_ms', baseline.get('micro', {}).get(name, {}).get('median_ms'),
+                  stats['median_ms'])
+    for name, stats in report.get('load', {}).get('endpoints', {}).items():
+        previous = baseline.get('load', {}).get('endpoints', {}).get(name, {})
+        check(f'load {name} p95_ms', previous.get('p95_ms'), stats['p95_ms'])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=0.1, help='dataset size as a fraction of datagen.VOLUMES')
+    parser.add_argument('--seed', type=int, default=datagen.DEFAULT_SEED)
+    parser.add_argument('--database', help='a database generated with the same --scale/--seed '
+                                           '(default: the cached SQLite file under benchmarks/data)')
+    parser.add_argument('--rounds', type=int, default=20, help='minimum rounds per micro-benchmark')
+    parser.add_argument('--load', action='store_true', help='also run the Locust scenarios')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--seconds', type=int, default=60)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--output', help='write the report here as well as to stdout')
+    parser.add_argument('--compare', help='an earlier report to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    args = parser.parse_args()
+
+    database = args.database or datagen.default_database(args.scale, args.seed)
+    datagen.open_dataset(database, args.scale, args.seed).dispose()
+    report = {
+        'benchmark': 'suite',
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'dataset': {'scale': args.scale, 'seed': args.seed, 'anchor': datagen.DEFAULT_ANCHOR.isoformat(),
+                    'rows': datagen.Plan(args.scale).counts()},
+        'micro': run_micro(args, database),
+    }
+    if args.load:
+        report['load'] = run_load(args, database)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('dataset', {}).get('scale') != args.scale:
+            print(f'warning: {args.compare} used a different dataset scale', file=sys.stderr)
+        report['comparison'] = {'baseline_commit': baseline.get('commit'),
+                                'metrics': compare(report, baseline, args.threshold)}
+        if any(row['regressed'] for row in report['comparison']['metrics'].values()):
+            exit_code = 1
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
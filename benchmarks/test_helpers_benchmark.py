@@ -0,0 +1,35 @@
+"""
+Helper Micro-benchmarks
+get_dashboard_stats(), get_chatbot_response() and calculate_technician_rating()
+timed with pytest-benchmark against the generated dataset
+Install with: pip install -r requirements-bench.txt (skipped without pytest-benchmark)
+Run with: python -m pytest benchmarks/test_helpers_benchmark.py [--benchmark-json out.json]
+"""
+import itertools
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+
+def test_dashboard_stats(benchmark, app_context, dataset):
+    from helpers import get_dashboard_stats
+    stats = benchmark(get_dashboard_stats)
+    assert stats['total_bookings'] == dataset.bookings
+    assert stats['spare_parts_orders'] == dataset.part_orders
+
+
+def test_chatbot_response(benchmark, app_context):
+    from bench_chatbot import load_corpus
+    from helpers import get_chatbot_response
+    messages = itertools.cycle(load_corpus())
+    get_chatbot_response(next(messages))  # load the catalogue outside the timing
+    response = benchmark(lambda: get_chatbot_response(next(messages)))
+    assert response
+
+
+def test_technician_rating(benchmark, app_context, dataset):
+    from helpers import calculate_technician_rating
+    technicians = itertools.cycle(range(1, dataset.technicians + 1))
+    rating = benchmark(lambda: calculate_technician_rating(next(technicians)))
+    assert 0 <= rating <= 5
@@ -0,0 +1,40 @@
+"""
+Blueprint Registry for Gaurav Motors
+Route modules are imported only when their blueprint is registered, so an app
+built with a subset (an API worker, a CLI) never loads the others
+"""
+import importlib
+from typing import Iterable, Optional
+
+# Registration order; every blueprint is mounted at the site root
+BLUEPRINTS = {
+    'public': 'blueprints.public',
+    'admin': 'blueprints.admin',
+    'customer': 'blueprints.customer',
+    'technician': 'blueprints.technician',
+    'parts': 'blueprints.parts',
+    'payments': 'blueprints.payments',
+    'api': 'blueprints.api',
+    'seo': 'blueprints.seo',
+}
+
+
+def select_blueprints(names: Optional[Iterable[str]]):
+    """Validated blueprint names in registration order; None selects all"""
+    if names is None:
+        return list(BLUEPRINTS)
+    names = {name.strip() for name in names if name.strip()}
+    unknown = names - set(BLUEPRINTS)
+    if unknown:
+        raise ValueError(f'Unknown blueprints: {", ".join(sorted(unknown))} '
+                         f'(choose from {", ".join(BLUEPRINTS)})')
+    return [name for name in BLUEPRINTS if name in names]
+
+
+def register_blueprints(app, names: Optional[Iterable[str]] = None):
+    """Import and register the selected blueprints; returns their names"""
+    selected = select_blueprints(names)
+    for name in selected:
+        module = importlib.import_module(BLUEPRINTS[name])
+        app.register_blueprint(module.bp)
+    return selected
@@ -0,0 +1,320 @@
+"""
+Admin Blueprint for Gaurav Motors
+Dashboard, customer/technician management, parts administration and exports
+"""
+from datetime import datetime
+
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import login_required
+
+from db_routing import read_replica
+from extensions import db
+from helpers import csv_response, is_admin
+from models import (User, TechnicianProfile, CustomerProfile, SparePartCategory, SparePart, PartOrder,
+                    ServiceBooking, Payment)
+
+bp = Blueprint('admin', __name__)
+
+# Admin
+@bp.route('/admin')
+@login_required
+def admin_dashboard():
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    num_technicians = TechnicianProfile.query.count()
+    num_customers = CustomerProfile.query.count()
+    num_service_bookings = ServiceBooking.query.count()
+    technicians = TechnicianProfile.query.all()
+    return render_template('hms/admin_dashboard.html', technicians=technicians, num_technicians=num_technicians, num_customers=num_customers, num_service_bookings=num_service_bookings)
+
+
+@bp.route('/admin/customers')
+@login_required
+def admin_customers():
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    q = request.args.get('q')
+    if q:
+        customers = CustomerProfile.with_profile('admin_list').filter(CustomerProfile.name.contains(q)).all()
+    else:
+        customers = CustomerProfile.with_profile('admin_list').all()
+    return render_template('hms/admin_customers.html', customers=customers)
+
+
+@bp.route('/admin/service-bookings')
+@login_required
+def admin_service_bookings():
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    service_bookings = ServiceBooking.query.order_by(ServiceBooking.booking_date.desc(), ServiceBooking.booking_time.desc()).all()
+    
+    # Get booking statistics
+    stats = {
+        'scheduled': ServiceBooking.query.filter_by(status='Scheduled').count(),
+        'in_progress': ServiceBooking.query.filter_by(status='In-Progress').count(),
+        'completed': ServiceBooking.query.filter_by(status='Completed').count(),
+        'cancelled': ServiceBooking.query.filter_by(status='Cancelled').count()
+    }
+    
+    return render_template('hms/admin_service_bookings.html', service_bookings=service_bookings, stats=stats)
+
+
+@bp.route('/admin/analytics')
+@login_required
+@read_replica
+def admin_analytics():
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    # Use the enhanced analytics dashboard with real-time data
+    return render_template('hms/admin_analytics_enhanced.html')
+
+
+@bp.route('/admin/add_customer', methods=['GET','POST'])
+@login_required
+def admin_add_customer():
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    if request.method == 'POST':
+        username = request.form['username']
+        email = request.form['email']
+        password = request.form['password']
+        name = request.form['name']
+        contact = request.form.get('contact')
+        if User.query.filter((User.username==username)|(User.email==email)).first():
+            flash('User exists', 'danger')
+            return redirect(url_for('admin.admin_add_customer'))
+        user = User(username=username, email=email, role='customer')
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        c = CustomerProfile(user_id=user.id, name=name, contact=contact)
+        db.session.add(c)
+        db.session.commit()
+        flash('Customer added', 'success')
+        return redirect(url_for('admin.admin_customers'))
+    return render_template('hms/admin_add_customer.html')
+
+
+@bp.route('/admin/edit_customer/<int:customer_id>', methods=['GET','POST'])
+@login_required
+def admin_edit_customer(customer_id):
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    customer = CustomerProfile.query.get_or_404(customer_id)
+    if request.method == 'POST':
+        customer.name = request.form['name']
+        customer.contact = request.form.get('contact')
+        db.session.commit()
+        flash('Customer updated', 'success')
+        return redirect(url_for('admin.admin_customers'))
+    return render_template('hms/admin_edit_customer.html', customer=customer)
+
+
+@bp.route('/admin/delete_customer/<int:customer_id>', methods=['POST'])
+@login_required
+def admin_delete_customer(customer_id):
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    customer = CustomerProfile.query.get_or_404(customer_id)
+    # check if customer has service bookings
+    if ServiceBooking.query.filter_by(customer_email=customer.user.email).first():
+        flash('Cannot delete customer with existing service bookings', 'danger')
+        return redirect(url_for('admin.admin_customers'))
+    db.session.delete(customer.user)
+    db.session.delete(customer)
+    db.session.commit()
+    flash('Customer deleted', 'success')
+    return redirect(url_for('admin.admin_customers'))
+
+@bp.route('/admin/add_technician', methods=['GET','POST'])
+@login_required
+def admin_add_technician():
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    if request.method == 'POST':
+        username = request.form['username']
+        email = request.form['email']
+        password = request.form['password']
+        name = request.form['name']
+        specialization = request.form['specialization']
+        if User.query.filter((User.username==username)|(User.email==email)).first():
+            flash('User exists', 'danger')
+            return redirect(url_for('admin.admin_add_technician'))
+        user = User(username=username, email=email, role='technician')
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        tech = TechnicianProfile(user_id=user.id, name=name, specialization=specialization)
+        db.session.add(tech)
+        db.session.commit()
+        flash('Technician added', 'success')
+        return redirect(url_for('admin.admin_dashboard'))
+    return render_template('hms/admin_add_technician.html')
+
+
+@bp.route('/admin/edit_technician/<int:technician_id>', methods=['GET','POST'])
+@login_required
+def admin_edit_technician(technician_id):
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    technician = TechnicianProfile.query.get_or_404(technician_id)
+    if request.method == 'POST':
+        technician.name = request.form['name']
+        technician.specialization = request.form['specialization']
+        db.session.commit()
+        flash('Technician updated', 'success')
+        return redirect(url_for('admin.admin_dashboard'))
+    return render_template('hms/admin_edit_technician.html', technician=technician)
+
+
+@bp.route('/admin/delete_technician/<int:technician_id>', methods=['POST'])
+@login_required
+def admin_delete_technician(technician_id):
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    technician = TechnicianProfile.query.get_or_404(technician_id)
+    # check if technician has service bookings
+    if ServiceBooking.query.filter_by(technician_id=technician.id).first():
+        flash('Cannot delete technician with existing service bookings', 'danger')
+        return redirect(url_for('admin.admin_dashboard'))
+    db.session.delete(technician.user)
+    db.session.delete(technician)
+    db.session.commit()
+    flash('Technician deleted', 'success')
+    return redirect(url_for('admin.admin_dashboard'))
+
+@bp.route('/admin/parts', methods=['GET', 'POST'])
+@login_required
+def admin_parts():
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    
+    if request.method == 'POST':
+        action = request.form.get('action')
+        
+        if action == 'add_part':
+            part = SparePart(
+                name=request.form.get('name'),
+                category_id=int(request.form.get('category_id')),
+                part_number=request.form.get('part_number'),
+                brand=request.form.get('brand'),
+                price=float(request.form.get('price')),
+                stock_quantity=int(request.form.get('stock_quantity', 0)),
+                image_url=request.form.get('image_url'),
+                description=request.form.get('description'),
+                compatible_brands=request.form.get('compatible_brands'),
+                warranty_months=int(request.form.get('warranty_months', 6)),
+                is_oem=request.form.get('is_oem') == 'on'
+            )
+            db.session.add(part)
+            db.session.commit()
+            flash('Part added successfully!', 'success')
+    
+    categories = SparePartCategory.query.all()
+    parts = SparePart.query.order_by(SparePart.created_at.desc()).all()
+    orders = PartOrder.with_profile('admin_list').order_by(PartOrder.order_date.desc()).limit(50).all()
+    
+    return render_template('hms/admin_parts.html', categories=categories, parts=parts, orders=orders)
+
+@bp.route('/admin/export/service-bookings')
+@login_required
+@read_replica
+def export_service_bookings():
+    """Export service bookings to CSV"""
+    if not is_admin():
+        flash('Access denied', 'danger')
+        return redirect(url_for('public.index'))
+    
+    bookings = ServiceBooking.query.order_by(ServiceBooking.booking_date.desc())
+    
+    def generate():
+        # Stream rows in batches instead of building the whole file in memory
+        yield 'ID,Customer Name,Email,Phone,Service ID,Date,Time,Status,Amount,Created At\n'
+        for booking in bookings.yield_per(500):
+            yield f'{booking.id},{booking.customer_name},{booking.customer_email},{booking.customer_phone},{booking.service_id},{booking.booking_date},{booking.booking_time},{booking.status},{booking.total_amount},{booking.created_at}\n'
+    
+    return csv_response(generate(), f'bookings_{datetime.now().strftime("%Y%m%d")}.csv')
+
+@bp.route('/admin/export/revenue')
+@login_required
+@read_replica
+def export_revenue():
+    """Export revenue data to CSV"""
+    if not is_admin():
+        flash('Access denied', 'danger')
+        return redirect(url_for('public.index'))
+    
+    payments = Payment.query.filter_by(status='Success').order_by(Payment.transaction_date.desc())
+    
+    def generate():
+        yield 'ID,Payment ID,Amount,Currency,Method,Date,Type\n'
+        for payment in payments.yield_per(500):
+            payment_type = 'Service' if payment.service_booking_id else 'Part Order' if payment.part_order_id else 'Other'
+            yield f'{payment.id},{payment.payment_id},{payment.amount},{payment.currency},{payment.payment_method},{payment.transaction_date},{payment_type}\n'
+    
+    return csv_response(generate(), f'revenue_{datetime.now().strftime("%Y%m%d")}.csv')
+
+@bp.route('/admin/part-orders')
+@login_required
+def admin_part_orders():
+    """Admin view of all part orders"""
+    if not is_admin():
+        flash('Admin access required', 'danger')
+        return redirect(url_for('public.index'))
+    
+    status_filter = request.args.get('status', 'all')
+    
+    query = PartOrder.with_profile('admin_list')
+    if status_filter != 'all':
+        query = query.filter_by(order_status=status_filter)
+    
+    orders = query.order_by(PartOrder.order_date.desc()).all()
+    
+    # Statistics
+    stats = {
+        'total': PartOrder.query.count(),
+        'pending': PartOrder.query.filter_by(order_status='Pending').count(),
+        'confirmed': PartOrder.query.filter_by(order_status='Confirmed').count(),
+        'processing': PartOrder.query.filter_by(order_status='Processing').count(),
+        'shipped': PartOrder.query.filter_by(order_status='Shipped').count(),
+        'delivered': PartOrder.query.filter_by(order_status='Delivered').count(),
+        'total_revenue': db.session.query(db.func.sum(PartOrder.advance_amount)).filter(
+            PartOrder.payment_status.in_(['Advance Paid', 'Fully Paid'])
+        ).scalar() or 0
+    }
+    
+    return render_template('hms/admin_part_orders.html', orders=orders, stats=stats, status_filter=status_filter)
+
+@bp.route('/admin/part-order/<int:order_id>/update', methods=['POST'])
+@login_required
+def update_part_order_status(order_id):
+    """Update order status"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    order = PartOrder.query.get_or_404(order_id)
+    new_status = request.form.get('status')
+    admin_notes = request.form.get('admin_notes')
+    
+    order.order_status = new_status
+    if admin_notes:
+        order.admin_notes = admin_notes
+    
+    if new_status == 'Delivered':
+        order.delivery_date = datetime.now()
+    
+    db.session.commit()
+    
+    flash(f'Order {order.order_number} updated to {new_status}', 'success')
+    return redirect(url_for('admin.admin_part_orders'))
@@ -0,0 +1,360 @@
+"""
+JSON API Blueprint for Gaurav Motors
+Service booking, chatbot, notification and analytics endpoints
+"""
+from flask import Blueprint, jsonify, request
+from flask_login import current_user, login_required
+
+from db_routing import read_replica
+from extensions import db
+from helpers import calculate_technician_rating, get_chatbot_response, get_dashboard_stats, is_admin, is_customer
+from models import TechnicianProfile, CarService, ServiceBooking, TechnicianReview, Payment, Notification
+from outbox import publish
+
+bp = Blueprint('api', __name__)
+
+# ============================================
+# CAR SERVICE BOOKING API ENDPOINTS
+# ============================================
+
+@bp.route('/api/services', methods=['GET'])
+@read_replica
+def get_services():
+    """Get all available car services"""
+    try:
+        services = CarService.with_profile('api_list').filter_by(is_active=True).all()
+        services_data = []
+        for service in services:
+            services_data.append({
+                'id': service.id,
+                'name': service.name,
+                'description': service.description,
+                'price': service.price,
+                'duration': service.duration_minutes,
+                'icon': service.icon,
+                'includes': service.includes,
+                'is_popular': service.is_popular,
+                'category': service.category.name if service.category else None
+            })
+        return jsonify({'success': True, 'services': services_data})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/services/<int:service_id>', methods=['GET'])
+@read_replica
+def get_service_detail(service_id):
+    """Get specific service details"""
+    try:
+        service = CarService.query.get_or_404(service_id)
+        return jsonify({
+            'success': True,
+            'service': {
+                'id': service.id,
+                'name': service.name,
+                'description': service.description,
+                'price': service.price,
+                'duration': service.duration_minutes,
+                'icon': service.icon,
+                'includes': service.includes,
+                'is_popular': service.is_popular,
+                'category': service.category.name if service.category else None
+            }
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+
+@bp.route('/api/booking/create', methods=['POST'])
+def create_booking():
+    """Create a new service booking"""
+    try:
+        data = request.get_json()
+        
+        # Validate required fields
+        required_fields = ['customer_name', 'customer_phone', 'vehicle_model', 
+                          'service_id', 'booking_date', 'booking_time']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
+        
+        # Get service
+        service = CarService.query.get(data['service_id'])
+        if not service:
+            return jsonify({'success': False, 'error': 'Service not found'}), 404
+        
+        # Generate unique booking ID
+        import random
+        booking_id = f"GM{random.randint(100000, 999999)}"
+        while ServiceBooking.query.filter_by(booking_id=booking_id).first():
+            booking_id = f"GM{random.randint(100000, 999999)}"
+        
+        # Parse date and time
+        from datetime import datetime as dt
+        booking_date = dt.strptime(data['booking_date'], '%Y-%m-%d').date()
+        booking_time = dt.strptime(data['booking_time'], '%H:%M').time()
+        
+        # Create booking
+        booking = ServiceBooking(
+            booking_id=booking_id,
+            customer_name=data['customer_name'],
+            customer_phone=data['customer_phone'],
+            customer_email=data.get('customer_email', ''),
+            user_id=current_user.id if is_customer() else None,
+            vehicle_brand=data.get('vehicle_brand', ''),
+            vehicle_model=data['vehicle_model'],
+            vehicle_year=data.get('vehicle_year'),
+            vehicle_registration=data.get('vehicle_registration', ''),
+            service_id=service.id,
+            booking_date=booking_date,
+            booking_time=booking_time,
+            total_amount=service.price,
+            notes=data.get('notes', ''),
+            status='Confirmed'
+        )
+        
+        db.session.add(booking)
+        publish('booking.created', booking_id=booking_id)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'booking_id': booking_id,
+            'message': 'Booking created successfully',
+            'booking': {
+                'id': booking.id,
+                'booking_id': booking.booking_id,
+                'customer_name': booking.customer_name,
+                'service_name': service.name,
+                'booking_date': booking.booking_date.strftime('%Y-%m-%d'),
+                'booking_time': booking.booking_time.strftime('%H:%M'),
+                'total_amount': booking.total_amount,
+                'status': booking.status
+            }
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/booking/<booking_id>', methods=['GET'])
+def get_booking(booking_id):
+    """Get booking details"""
+    try:
+        booking = ServiceBooking.query.filter_by(booking_id=booking_id).first_or_404()
+        return jsonify({
+            'success': True,
+            'booking': {
+                'booking_id': booking.booking_id,
+                'customer_name': booking.customer_name,
+                'customer_phone': booking.customer_phone,
+                'vehicle_model': booking.vehicle_model,
+                'service_name': booking.service.name,
+                'booking_date': booking.booking_date.strftime('%Y-%m-%d'),
+                'booking_time': booking.booking_time.strftime('%H:%M'),
+                'total_amount': booking.total_amount,
+                'status': booking.status
+            }
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+
+@bp.route('/api/timeslots/<date>', methods=['GET'])
+def get_available_timeslots(date):
+    """Get available time slots for a specific date"""
+    try:
+        from datetime import datetime as dt
+        target_date = dt.strptime(date, '%Y-%m-%d').date()
+        
+        # Define available time slots
+        time_slots = [
+            '09:00', '09:30', '10:00', '10:30', '11:00', '11:30',
+            '12:00', '12:30', '14:00', '14:30', '15:00', '15:30',
+            '16:00', '16:30', '17:00', '17:30'
+        ]
+        
+        # Get existing bookings for this date
+        bookings = ServiceBooking.query.filter_by(booking_date=target_date).all()
+        booked_times = [b.booking_time.strftime('%H:%M') for b in bookings]
+        
+        available_slots = []
+        for slot in time_slots:
+            # Count bookings at this time (allow up to 3 bookings per slot)
+            count = booked_times.count(slot)
+            if count < 3:
+                available_slots.append({
+                    'time': slot,
+                    'available': True,
+                    'remaining': 3 - count
+                })
+        
+        return jsonify({'success': True, 'date': date, 'slots': available_slots})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/booking/validate', methods=['POST'])
+def validate_booking():
+    """Validate booking data before creating"""
+    try:
+        data = request.get_json()
+        errors = []
+
+        # Validate phone number
+        phone = data.get('customer_phone', '')
+        if not phone or len(phone) < 10:
+            errors.append('Valid phone number required')
+
+        # Validate service
+        service_id = data.get('service_id')
+        if not service_id or not CarService.query.get(service_id):
+            errors.append('Valid service selection required')
+
+        # Validate date (must be future date)
+        from datetime import datetime as dt
+        try:
+            booking_date = dt.strptime(data.get('booking_date', ''), '%Y-%m-%d').date()
+            if booking_date < dt.now().date():
+                errors.append('Booking date must be in the future')
+        except:
+            errors.append('Invalid date format')
+
+        if errors:
+            return jsonify({'success': False, 'errors': errors}), 400
+
+        return jsonify({'success': True, 'message': 'Validation passed'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/chat', methods=['POST'])
+def chat():
+    """Handle chatbot requests"""
+    try:
+        data = request.get_json()
+        user_message = data.get('message', '').lower().strip()
+
+        if not user_message:
+            return jsonify({'success': False, 'error': 'No message provided'}), 400
+
+        # Intent-matched chatbot response (see chatbot.py)
+        response = get_chatbot_response(user_message)
+
+        return jsonify({
+            'success': True,
+            'response': response
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Notifications Routes
+@bp.route('/api/notifications')
+@login_required
+def get_notifications():
+    """Get user notifications"""
+    notifications = Notification.query.filter_by(user_id=current_user.id).order_by(Notification.created_at.desc()).limit(20).all()
+    unread_count = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
+    
+    return jsonify({
+        'notifications': [{
+            'id': n.id,
+            'title': n.title,
+            'message': n.message,
+            'type': n.notification_type,
+            'is_read': n.is_read,
+            'created_at': n.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        } for n in notifications],
+        'unread_count': unread_count
+    })
+
+@bp.route('/api/notifications/<int:notification_id>/read', methods=['POST'])
+@login_required
+def mark_notification_read(notification_id):
+    """Mark notification as read"""
+    notification = Notification.query.get_or_404(notification_id)
+    if notification.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    notification.is_read = True
+    db.session.commit()
+    return jsonify({'success': True})
+
+@bp.route('/api/notifications/mark-all-read', methods=['POST'])
+@login_required
+def mark_all_notifications_read():
+    """Mark all notifications as read"""
+    Notification.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
+    db.session.commit()
+    return jsonify({'success': True})
+
+# API Routes for Analytics
+@bp.route('/api/analytics/dashboard')
+@login_required
+@read_replica
+def analytics_dashboard():
+    """Get comprehensive dashboard analytics"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    stats = get_dashboard_stats()
+    return jsonify(stats)
+
+@bp.route('/api/analytics/bookings-by-month')
+@login_required
+@read_replica
+def bookings_by_month():
+    """Get service bookings grouped by month for charts"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # Get last 12 months data
+    monthly_data = db.session.query(
+        db.func.strftime('%Y-%m', ServiceBooking.booking_date).label('month'),
+        db.func.count(ServiceBooking.id).label('count')
+    ).group_by('month').order_by('month').limit(12).all()
+    
+    return jsonify({
+        'labels': [item.month for item in monthly_data],
+        'data': [item.count for item in monthly_data]
+    })
+
+@bp.route('/api/analytics/revenue-by-month')
+@login_required
+@read_replica
+def revenue_by_month():
+    """Get revenue grouped by month for charts"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    monthly_revenue = db.session.query(
+        db.func.strftime('%Y-%m', Payment.transaction_date).label('month'),
+        db.func.sum(Payment.amount).label('total')
+    ).filter(Payment.status == 'Success').group_by('month').order_by('month').limit(12).all()
+    
+    return jsonify({
+        'labels': [item.month for item in monthly_revenue],
+        'data': [float(item.total) for item in monthly_revenue]
+    })
+
+@bp.route('/api/analytics/top-technicians')
+@login_required
+@read_replica
+def top_technicians():
+    """Get top-rated technicians"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    technicians = TechnicianProfile.query.all()
+    technician_ratings = []
+    
+    for technician in technicians:
+        avg_rating = calculate_technician_rating(technician.id)
+        review_count = TechnicianReview.query.filter_by(technician_id=technician.id).count()
+        technician_ratings.append({
+            'name': technician.name,
+            'specialization': technician.specialization,
+            'rating': avg_rating,
+            'reviews': review_count
+        })
+    
+    # Sort by rating
+    technician_ratings.sort(key=lambda x: x['rating'], reverse=True)
+    
+    return jsonify(technician_ratings[:10])
@@ -0,0 +1,446 @@
+"""
+Customer Blueprint for Gaurav Motors
+Customer dashboard, bookings, vehicle records and reviews
+"""
+import mimetypes
+import os
+from datetime import datetime, timedelta
+
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, send_file, url_for
+from flask_login import current_user, login_required
+from werkzeug.utils import secure_filename
+
+from extensions import db
+from helpers import allowed_file, is_admin, is_customer, is_technician
+from images import derivative_name, is_image
+from models import (TechnicianProfile, Availability, CarService, ServiceBooking, VehicleRecord,
+                    VehicleHistory, TechnicianReview)
+from outbox import publish
+from storage import StorageError
+
+bp = Blueprint('customer', __name__)
+
+# Customer Dashboard
+@bp.route('/customer')
+@login_required
+def customer_dashboard():
+    if not is_customer():
+        flash('Customer access required', 'danger')
+        return redirect(url_for('public.index'))
+    
+    customer = current_user.customer_profile
+    
+    if not customer:
+        flash('Customer profile not found', 'danger')
+        return redirect(url_for('public.index'))
+    
+    upcoming = ServiceBooking.query.filter_by(customer_email=current_user.email).filter(ServiceBooking.status.in_(['Pending', 'Confirmed', 'In Progress'])).order_by(ServiceBooking.booking_date.desc()).all()
+    return render_template('hms/customer_dashboard.html', customer=customer, upcoming=upcoming)
+
+
+@bp.route('/customer/edit', methods=['GET','POST'])
+@login_required
+def customer_edit():
+    if not is_customer():
+        flash('Customer access required', 'danger')
+        return redirect(url_for('public.index'))
+    
+    customer = current_user.customer_profile
+    
+    if not customer:
+        flash('Customer profile not found', 'danger')
+        return redirect(url_for('public.index'))
+    
+    if request.method == 'POST':
+        customer.name = request.form.get('name')
+        customer.contact = request.form.get('contact')
+        db.session.commit()
+        flash('Profile updated', 'success')
+        return redirect(url_for('customer.customer_dashboard'))
+    return render_template('hms/customer_edit.html', customer=customer)
+
+# Old spare-parts route removed - using Coming Soon page instead
+
+@bp.route('/book/<int:technician_id>', methods=['GET','POST'])
+@login_required
+def book(technician_id):
+    if not is_customer():
+        flash('Only customers can book services', 'danger')
+        return redirect(url_for('public.index'))
+    technician = TechnicianProfile.query.get_or_404(technician_id)
+    # Show available slots for selected technician
+    today = datetime.now().date()
+    if request.method == 'POST':
+        slot_id = int(request.form.get('slot_id'))
+        slot = Availability.query.get_or_404(slot_id)
+        if not slot.is_available:
+            flash('Slot no longer available', 'danger')
+            return redirect(url_for('customer.book', technician_id=technician_id))
+        # double-check no booking exists
+        existing = ServiceBooking.query.filter_by(technician_id=technician.id, booking_date=slot.date, booking_time=slot.time, status='Scheduled').first()
+        if existing:
+            slot.is_available = False
+            db.session.commit()
+            flash('Selected slot not available', 'danger')
+            return redirect(url_for('customer.book', technician_id=technician_id))
+        
+        customer_profile = current_user.customer_profile
+        
+        if not customer_profile:
+            flash('Customer profile not found', 'danger')
+            return redirect(url_for('public.index'))
+        
+        # Create service booking
+        import random, string
+        booking_id_str = 'GM' + ''.join(random.choices(string.digits, k=6))
+        # Get first available service or default
+        first_service = CarService.query.first()
+        if not first_service:
+            flash('No services available for booking at the moment', 'danger')
+            return redirect(url_for('customer.customer_dashboard'))
+        service_id = first_service.id
+        service_amount = first_service.price
+        booking = ServiceBooking(
+            booking_id=booking_id_str,
+            customer_name=customer_profile.name,
+            customer_email=current_user.email,
+            user_id=current_user.id,
+            customer_phone=customer_profile.contact or '',
+            vehicle_brand='', vehicle_model='', vehicle_year=None, vehicle_registration='',
+            service_id=service_id,
+            technician_id=technician.id,
+            booking_date=slot.date,
+            booking_time=slot.time,
+            status='Scheduled',
+            total_amount=service_amount,
+            notes=f'Booked with technician: {technician.name}'
+        )
+        slot.is_available = False
+        db.session.add(booking)
+        db.session.commit()
+        flash('Service booked successfully!', 'success')
+        return redirect(url_for('customer.customer_dashboard'))
+
+    days = [today + timedelta(days=i) for i in range(7)]
+    # pull availability slots for next 7 days
+    slots = Availability.query.filter_by(technician_id=technician.id, is_available=True).filter(Availability.date >= today).order_by(Availability.date, Availability.time).all()
+    return render_template('hms/book.html', technician=technician, days=days, slots=slots)
+
+@bp.route('/cancel/<int:booking_id>', methods=['POST'])
+@login_required
+def cancel(booking_id):
+    booking = ServiceBooking.query.get_or_404(booking_id)
+    if current_user.role == 'customer' and booking.customer_email != current_user.email:
+        flash('Not authorized', 'danger')
+        return redirect(url_for('public.index'))
+    booking.status = 'Cancelled'
+    # free the availability slot if it exists
+    slot = Availability.query.filter_by(technician_id=booking.technician_id, date=booking.booking_date, time=booking.booking_time).first()
+    if slot:
+        slot.is_available = True
+    db.session.commit()
+    flash('Service booking cancelled', 'info')
+    return redirect(request.referrer or url_for('public.index'))
+
+
+@bp.route('/reschedule/<int:booking_id>', methods=['GET','POST'])
+@login_required
+def reschedule(booking_id):
+    booking = ServiceBooking.query.get_or_404(booking_id)
+    if current_user.role == 'customer' and booking.customer_email != current_user.email:
+        flash('Not authorized', 'danger')
+        return redirect(url_for('public.index'))
+    if booking.status not in ['Scheduled', 'Confirmed']:
+        flash('Can only reschedule scheduled bookings', 'danger')
+        return redirect(url_for('customer.customer_dashboard'))
+    
+    if request.method == 'POST':
+        slot_id = request.form.get('slot_id')
+        if not slot_id:
+            flash('Please select a time slot', 'danger')
+            return redirect(url_for('customer.reschedule', booking_id=booking_id))
+        
+        slot_id = int(slot_id)
+        new_slot = Availability.query.get_or_404(slot_id)
+        if not new_slot.is_available or new_slot.technician_id != booking.technician_id:
+            flash('Slot not available', 'danger')
+            return redirect(url_for('customer.reschedule', booking_id=booking_id))
+        
+        # free old slot
+        old_slot = Availability.query.filter_by(technician_id=booking.technician_id, date=booking.booking_date, time=booking.booking_time).first()
+        if old_slot:
+            old_slot.is_available = True
+        
+        # take new slot
+        booking.booking_date = new_slot.date
+        booking.booking_time = new_slot.time
+        new_slot.is_available = False
+        db.session.commit()
+        flash('Service booking rescheduled', 'success')
+        return redirect(url_for('customer.customer_dashboard'))
+    
+    # show available slots for same technician
+    today = datetime.now().date()
+    slots = Availability.query.filter_by(technician_id=booking.technician_id, is_available=True).filter(Availability.date >= today).order_by(Availability.date, Availability.time).all()
+    return render_template('hms/reschedule.html', booking=booking, slots=slots)
+
+# Vehicle Records Routes
+@bp.route('/customer/vehicle-records')
+@login_required
+def customer_vehicle_records():
+    """View customer's vehicle records"""
+    if not is_customer():
+        flash('Access denied', 'danger')
+        return redirect(url_for('public.index'))
+    
+    customer = current_user.customer_profile
+    
+    if not customer:
+        flash('Customer profile not found', 'danger')
+        return redirect(url_for('public.index'))
+    
+    records = VehicleRecord.query.filter_by(customer_id=customer.id).order_by(VehicleRecord.upload_date.desc()).all()
+    history = VehicleHistory.query.filter_by(customer_id=customer.id).first()
+    
+    return render_template('hms/vehicle_records.html', records=records, history=history)
+
+@bp.route('/customer/vehicle-history', methods=['GET', 'POST'])
+@login_required
+def update_vehicle_history():
+    """Update customer vehicle history"""
+    if not is_customer():
+        flash('Access denied', 'danger')
+        return redirect(url_for('public.index'))
+    
+    customer = current_user.customer_profile
+    
+    if not customer:
+        flash('Customer profile not found', 'danger')
+        return redirect(url_for('public.index'))
+    
+    history = VehicleHistory.query.filter_by(customer_id=customer.id).first()
+    
+    if request.method == 'POST':
+        if not history:
+            history = VehicleHistory(customer_id=customer.id)
+        
+        history.make = request.form.get('make')
+        history.model = request.form.get('model')
+        history.year = int(request.form.get('year')) if request.form.get('year') else None
+        history.vin = request.form.get('vin')
+        history.license_plate = request.form.get('license_plate')
+        history.mileage = int(request.form.get('mileage')) if request.form.get('mileage') else None
+        history.fuel_type = request.form.get('fuel_type')
+        history.transmission = request.form.get('transmission')
+        history.engine_size = request.form.get('engine_size')
+        history.color = request.form.get('color')
+        history.insurance_company = request.form.get('insurance_company')
+        history.insurance_policy = request.form.get('insurance_policy')
+        
+        db.session.add(history)
+        db.session.commit()
+        flash('Vehicle history updated successfully', 'success')
+        return redirect(url_for('customer.customer_vehicle_records'))
+    
+    return render_template('hms/vehicle_history_form.html', history=history)
+
+@bp.route('/upload-vehicle-record', methods=['POST'])
+@login_required
+def upload_vehicle_record():
+    """Upload vehicle record file"""
+    if not is_customer():
+        flash('Access denied', 'danger')
+        return redirect(url_for('public.index'))
+    
+    if 'file' not in request.files:
+        flash('No file provided', 'danger')
+        return redirect(request.referrer or url_for('customer.customer_vehicle_records'))
+    
+    file = request.files['file']
+    if file.filename == '':
+        flash('No file selected', 'danger')
+        return redirect(request.referrer or url_for('customer.customer_vehicle_records'))
+    
+    if file and allowed_file(file.filename):
+        filename = secure_filename(file.filename)
+        # From the checked original name: secure_filename() drops non-ASCII, so 'दस्तावेज़.pdf' becomes 'pdf'
+        extension = file.filename.rsplit('.', 1)[1].lower()
+        
+        customer = current_user.customer_profile
+        
+        if not customer:
+            flash('Customer profile not found', 'danger')
+            return redirect(url_for('public.index'))
+        
+        # Streamed to storage in chunks; identical files share one object
+        storage = current_app.extensions['storage']
+        try:
+            stored = storage.save(file.stream, extension)
+        except StorageError as e:
+            current_app.logger.error(f'Upload failed: {e}')
+            flash('Could not store the file, please try again', 'danger')
+            return redirect(url_for('customer.customer_vehicle_records'))
+        
+        # Thumbnails are generated in the background next to the original
+        source_path = storage.local_path(stored.key)
+        if is_image(file.filename) and source_path and not stored.deduplicated:
+            current_app.extensions['image_pipeline'].submit(source_path, os.path.dirname(source_path), stored.sha256)
+        
+        record = VehicleRecord(
+            customer_id=customer.id,
+            record_type=request.form.get('record_type', 'Service Report'),
+            title=request.form.get('title') or filename,
+            description=request.form.get('description'),
+            file_path=stored.key,
+            file_size=stored.size,
+            file_hash=stored.sha256,
+            uploaded_by=current_user.id
+        )
+        db.session.add(record)
+        db.session.commit()
+        
+        flash('Vehicle record uploaded successfully', 'success')
+    else:
+        flash('Invalid file type', 'danger')
+    
+    return redirect(url_for('customer.customer_vehicle_records'))
+
+@bp.route('/vehicle-records/<int:record_id>/download')
+@login_required
+def download_vehicle_record(record_id):
+    """Download a vehicle record file (supports Range and ETag revalidation)"""
+    record = VehicleRecord.query.get_or_404(record_id)
+    if is_customer():
+        customer = current_user.customer_profile
+        if not customer or record.customer_id != customer.id:
+            abort(403)
+    elif not (is_admin() or is_technician()):
+        abort(403)
+    if not record.file_path:
+        abort(404)
+    
+    extension = record.file_path.rsplit('.', 1)[-1] if '.' in record.file_path else ''
+    download_name = secure_filename(record.title or 'record') or 'record'
+    if extension and not download_name.lower().endswith('.' + extension.lower()):
+        download_name += '.' + extension
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    as_attachment = request.args.get('download') == '1'
+    disposition = f'{"attachment" if as_attachment else "inline"}; filename="{download_name}"'
+    etag = record.file_hash
+    key = record.file_path
+    
+    storage = current_app.extensions['storage']
+    path = storage.local_path(key)
+    width = request.args.get('w', type=int)
+    if width and record.file_hash and path is not None:
+        # Resized WebP copy made by the image pipeline, if it exists yet
+        derived_key = f'{record.file_hash[:2]}/{derivative_name(record.file_hash, width, "webp")}'
+        if storage.exists(derived_key):
+            key, path = derived_key, storage.local_path(derived_key)
+            mimetype, etag = 'image/webp', f'{record.file_hash}-{width}w'
+            download_name = download_name.rsplit('.', 1)[0] + '.webp'
+            disposition = f'inline; filename="{download_name}"'
+    if path is not None:
+        if not os.path.isfile(path):
+            abort(404)
+        accel_prefix = current_app.config.get('STORAGE_ACCEL_REDIRECT')
+        if accel_prefix:
+            # nginx serves the bytes (and handles Range) from an internal location
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + key
+            response.headers['Content-Disposition'] = disposition
+            if etag:
+                response.set_etag(etag)
+            return response
+        # send_file handles Range, If-None-Match/If-Range and USE_X_SENDFILE
+        return send_file(path, mimetype=mimetype, as_attachment=as_attachment,
+                         download_name=download_name, etag=etag or True, conditional=True)
+    
+    # Remote backend: answer conditionals ourselves and forward byte ranges
+    try:
+        size = record.file_size if record.file_size is not None else storage.size(record.file_path)
+    except StorageError:
+        abort(404)
+    response = current_app.response_class(mimetype=mimetype, direct_passthrough=True)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Disposition'] = disposition
+    if etag:
+        response.set_etag(etag)
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            return response
+    
+    byte_range = request.range
+    if byte_range is not None and request.if_range.etag not in (None, etag):
+        byte_range = None
+    span = byte_range.range_for_length(size) if byte_range is not None else None
+    if byte_range is not None and span is None:
+        response.status_code = 416
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+    start, stop = span or (0, size)
+    response.response = storage.open(record.file_path, start, stop if span else None)
+    response.content_length = stop - start
+    if span:
+        response.status_code = 206
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+    return response
+
+@bp.route('/booking/<int:booking_id>/review', methods=['GET', 'POST'])
+@login_required
+def submit_review(booking_id):
+    """Submit review for completed service booking"""
+    if not is_customer():
+        flash('Only customers can submit reviews', 'danger')
+        return redirect(url_for('public.index'))
+    
+    booking = ServiceBooking.query.get_or_404(booking_id)
+    
+    if booking.status != 'Completed':
+        flash('Can only review completed service bookings', 'warning')
+        return redirect(url_for('customer.customer_dashboard'))
+    
+    # Check if already reviewed
+    existing_review = TechnicianReview.query.filter_by(service_booking_id=booking_id).first()
+    if existing_review:
+        flash('You have already reviewed this service', 'info')
+        return redirect(url_for('customer.customer_dashboard'))
+    
+    if request.method == 'POST':
+        rating = int(request.form.get('rating', 0))
+        comment = request.form.get('comment')
+        
+        if rating < 1 or rating > 5:
+            flash('Rating must be between 1 and 5', 'danger')
+            return redirect(request.referrer)
+        
+        customer = current_user.customer_profile
+        
+        if not customer:
+            flash('Customer profile not found', 'danger')
+            return redirect(url_for('public.index'))
+        
+        # Get technician_id from booking if it exists
+        technician_id = None
+        if hasattr(booking, 'technician_id'):
+            technician_id = booking.technician_id
+        
+        if not technician_id:
+            flash('Cannot submit review: no technician assigned to this booking', 'warning')
+            return redirect(url_for('customer.customer_dashboard'))
+        
+        review = TechnicianReview(
+            technician_id=technician_id,
+            customer_id=customer.id,
+            service_booking_id=booking_id,
+            rating=rating,
+            comment=comment
+        )
+        db.session.add(review)
+        publish('review.submitted', booking_id=booking_id, technician_id=technician_id, rating=rating)
+        db.session.commit()
+        
+        flash('Thank you for your review!', 'success')
+        return redirect(url_for('customer.customer_dashboard'))
+    
+    return render_template('hms/submit_review.html', booking=booking)
@@ -0,0 +1,431 @@
+"""
+Spare Parts Blueprint for Gaurav Motors
+Parts and accessories catalogue, cart, checkout and part orders
+"""
+import secrets
+from datetime import datetime
+
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, session, url_for
+from flask_login import current_user
+
+from extensions import db
+from helpers import quote_engine
+from outbox import publish
+from models import SparePart, PartOrder, CartItem, CarAccessory
+
+bp = Blueprint('parts', __name__)
+
+# Spare Parts Routes
+@bp.route('/part/<int:part_id>')
+def part_detail(part_id):
+    part = SparePart.query.get_or_404(part_id)
+    related_parts = SparePart.query.filter_by(category_id=part.category_id).filter(SparePart.id != part_id).limit(4).all()
+    return render_template('hms/part_detail.html', part=part, related_parts=related_parts)
+
+@bp.route('/order-part/<int:part_id>', methods=['GET', 'POST'])
+def order_part(part_id):
+    part = SparePart.query.get_or_404(part_id)
+    
+    if request.method == 'POST':
+        customer_name = request.form.get('customer_name')
+        customer_phone = request.form.get('customer_phone')
+        customer_email = request.form.get('customer_email')
+        quantity = int(request.form.get('quantity', 1))
+        car_brand = request.form.get('car_brand')
+        car_model = request.form.get('car_model')
+        car_year = request.form.get('car_year')
+        installation = request.form.get('installation') == 'yes'
+        notes = request.form.get('notes')
+        
+        # Check stock
+        if part.stock_quantity < quantity:
+            flash(f'Sorry, only {part.stock_quantity} units available in stock', 'warning')
+            return redirect(url_for('parts.order_part', part_id=part_id))
+        
+        # Calculate pricing
+        quote = quote_engine.part_quote(part.id, quantity, installation=installation)
+        unit_price = quote.unit_price
+        subtotal = quote.subtotal
+        installation_charges = quote.addon('installation')
+        total_price_final = quote.total
+        advance_amount = quote.advance
+        remaining_amount = quote.remaining
+        
+        # Generate order number
+        import random, string
+        order_number = 'GM-PART-' + ''.join(random.choices(string.digits, k=5))
+        
+        # Create order
+        order = PartOrder(
+            order_number=order_number,
+            customer_name=customer_name,
+            customer_phone=customer_phone,
+            customer_email=customer_email,
+            part_id=part.id,
+            quantity=quantity,
+            unit_price=unit_price,
+            subtotal=subtotal,
+            advance_amount=advance_amount,
+            remaining_amount=remaining_amount,
+            total_price=total_price_final,
+            installation_charges=installation_charges,
+            car_brand=car_brand,
+            car_model=car_model,
+            car_year=int(car_year) if car_year else None,
+            installation_required=installation,
+            notes=notes
+        )
+        
+        # Update stock
+        part.stock_quantity -= quantity
+        
+        db.session.add(order)
+        db.session.commit()
+        
+        flash(f'Order placed successfully! Order #{order.order_number}. We will contact you at {customer_phone}', 'success')
+        return redirect(url_for('parts.spare_parts_browse'))
+    
+    return render_template('hms/order_part.html', part=part)
+
+# ===== SPARE PARTS ORDERING SYSTEM (Complete with Advance Payment) =====
+
+@bp.route('/spare-parts')
+def spare_parts_browse():
+    """Spare Parts Catalog"""
+    return render_template('hms/spare_parts_new.html')
+
+@bp.route('/spare-parts/<int:part_id>')
+def spare_part_detail(part_id):
+    """Spare Part Detail - Coming Soon"""
+    return render_template('hms/spare_part_detail.html')
+
+@bp.route('/cart')
+def view_cart():
+    """Cart - Coming Soon"""
+    return render_template('hms/cart.html')
+
+@bp.route('/cart/add/<int:part_id>', methods=['POST'])
+def add_to_cart(part_id):
+    """Add item to cart"""
+    part = SparePart.query.get_or_404(part_id)
+    quantity = int(request.form.get('quantity', 1))
+    
+    if quantity > part.stock_quantity:
+        flash('Not enough stock available', 'danger')
+        return redirect(request.referrer or url_for('parts.spare_parts_browse'))
+    
+    session_id = session.get('cart_session_id')
+    if not session_id:
+        session_id = secrets.token_urlsafe(16)
+        session['cart_session_id'] = session_id
+    
+    # Check if item already in cart
+    if current_user.is_authenticated:
+        cart_item = CartItem.query.filter_by(user_id=current_user.id, part_id=part_id).first()
+    else:
+        cart_item = CartItem.query.filter_by(session_id=session_id, part_id=part_id).first()
+    
+    if cart_item:
+        cart_item.quantity += quantity
+    else:
+        cart_item = CartItem(
+            session_id=session_id,
+            user_id=current_user.id if current_user.is_authenticated else None,
+            part_id=part_id,
+            quantity=quantity
+        )
+        db.session.add(cart_item)
+    
+    db.session.commit()
+    flash(f'{part.name} added to cart!', 'success')
+    return redirect(request.referrer or url_for('parts.spare_parts_browse'))
+
+@bp.route('/cart/update/<int:item_id>', methods=['POST'])
+def update_cart_item(item_id):
+    """Update cart item quantity"""
+    cart_item = CartItem.query.get_or_404(item_id)
+    quantity = int(request.form.get('quantity', 1))
+    
+    # Check stock based on whether it's a part or accessory
+    if cart_item.part:
+        max_stock = cart_item.part.stock_quantity
+    elif cart_item.accessory:
+        max_stock = cart_item.accessory.stock
+    else:
+        max_stock = 0
+    
+    if quantity > max_stock:
+        flash('Not enough stock available', 'danger')
+    elif quantity < 1:
+        db.session.delete(cart_item)
+        db.session.commit()
+        flash('Item removed from cart', 'info')
+    else:
+        cart_item.quantity = quantity
+        db.session.commit()
+        flash('Cart updated', 'success')
+    
+    return redirect(url_for('parts.view_cart'))
+
+@bp.route('/cart/remove/<int:item_id>', methods=['POST'])
+def remove_cart_item(item_id):
+    """Remove item from cart"""
+    cart_item = CartItem.query.get_or_404(item_id)
+    db.session.delete(cart_item)
+    db.session.commit()
+    flash('Item removed from cart', 'success')
+    return redirect(url_for('parts.view_cart'))
+
+@bp.route('/checkout', methods=['GET', 'POST'])
+def checkout_parts():
+    """Checkout and place order"""
+    session_id = session.get('cart_session_id')
+    
+    if current_user.is_authenticated:
+        cart_items = CartItem.with_profile('checkout').filter_by(user_id=current_user.id).all()
+    else:
+        if not session_id:
+            flash('Your cart is empty', 'warning')
+            return redirect(url_for('parts.spare_parts_browse'))
+        cart_items = CartItem.with_profile('checkout').filter_by(session_id=session_id).all()
+    
+    if not cart_items:
+        flash('Your cart is empty', 'warning')
+        return redirect(url_for('parts.spare_parts_browse'))
+    
+    if request.method == 'POST':
+        # Create orders for each item
+        customer_name = request.form.get('customer_name')
+        customer_phone = request.form.get('customer_phone')
+        customer_email = request.form.get('customer_email')
+        delivery_address = request.form.get('delivery_address')
+        car_brand = request.form.get('car_brand')
+        car_model = request.form.get('car_model')
+        installation = request.form.get('installation') == 'on'
+        
+        total_amount = 0
+        orders = []
+        # Number the orders from one lookup rather than one per cart item
+        last_order = PartOrder.query.order_by(PartOrder.id.desc()).first()
+        next_number = (last_order.id + 1) if last_order else 1
+        
+        for item in cart_items:
+            part = item.part
+            accessory = item.accessory
+            
+            # Determine product details
+            if part:
+                product_name = part.name
+                product_stock = part.stock_quantity
+                quote = quote_engine.part_quote(part.id, item.quantity, installation=installation)
+            elif accessory:
+                product_name = accessory.name
+                product_stock = accessory.stock
+                quote = quote_engine.part_quote(accessory.id, item.quantity, installation=installation,
+                                                kind='accessory')
+            else:
+                continue
+            
+            # Check stock
+            if item.quantity > product_stock:
+                flash(f'Not enough stock for {product_name}', 'danger')
+                return redirect(url_for('parts.view_cart'))
+            
+            # Calculate pricing
+            product_price = quote.unit_price
+            subtotal = quote.subtotal
+            installation_charges = quote.addon('installation')
+            total = quote.total
+            advance = quote.advance
+            remaining = quote.remaining
+            
+            # Generate order number
+            order_num = f"GM-PART-{str(next_number).zfill(5)}"
+            next_number += 1
+            
+            order = PartOrder(
+                order_number=order_num,
+                customer_name=customer_name,
+                customer_phone=customer_phone,
+                customer_email=customer_email,
+                part_id=part.id if part else None,
+                quantity=item.quantity,
+                unit_price=product_price,
+                subtotal=subtotal,
+                installation_charges=installation_charges,
+                total_price=total,
+                advance_amount=advance,
+                remaining_amount=remaining,
+                car_brand=car_brand,
+                car_model=car_model,
+                installation_required=installation,
+                delivery_address=delivery_address
+            )
+            
+            # Update stock
+            if part:
+                part.stock_quantity -= item.quantity
+            elif accessory:
+                accessory.stock -= item.quantity
+            
+            db.session.add(order)
+            orders.append(order)
+            total_amount += advance
+        
+        # Clear cart
+        for item in cart_items:
+            db.session.delete(item)
+        
+        # Flush for the ids before commit expires the orders
+        db.session.flush()
+        orders_created = [order.id for order in orders]
+        db.session.commit()
+        
+        # Store order IDs in session for payment
+        session['pending_part_orders'] = orders_created
+        session['total_advance'] = total_amount
+        
+        return redirect(url_for('parts.part_orders_payment'))
+    
+    subtotal = 0
+    for item in cart_items:
+        if item.part_id:
+            subtotal += quote_engine.part_quote(item.part_id, item.quantity).subtotal
+        elif item.accessory_id:
+            subtotal += quote_engine.part_quote(item.accessory_id, item.quantity, kind='accessory').subtotal
+    
+    return render_template('hms/checkout_parts.html', cart_items=cart_items, subtotal=subtotal)
+
+@bp.route('/orders/payment')
+def part_orders_payment():
+    """Payment page for part orders"""
+    order_ids = session.get('pending_part_orders', [])
+    total_advance = session.get('total_advance', 0)
+    
+    if not order_ids:
+        flash('No pending orders', 'warning')
+        return redirect(url_for('parts.spare_parts_browse'))
+    
+    orders = PartOrder.query.filter(PartOrder.id.in_(order_ids)).all()
+    
+    return render_template('hms/part_payment.html', 
+                         orders=orders, 
+                         total_advance=total_advance)
+
+@bp.route('/orders/confirm-payment', methods=['POST'])
+def confirm_part_payment():
+    """Confirm payment and complete order"""
+    order_ids = session.get('pending_part_orders', [])
+    payment_method = request.form.get('payment_method', 'Cash on Delivery')
+    
+    if not order_ids:
+        return jsonify({'success': False, 'error': 'No pending orders'}), 400
+    
+    if payment_method == 'Online Payment':
+        # Razorpay Checkout; the orders are confirmed once the payment is verified
+        return redirect(url_for('payments.pay_online'))
+    
+    # A repeated submit finds nothing left pending and confirms nothing twice
+    orders = PartOrder.query.filter(PartOrder.id.in_(order_ids), PartOrder.payment_status == 'Pending').all()
+    
+    for order in orders:
+        order.payment_status = 'Advance Paid'
+        order.order_status = 'Confirmed'
+        order.confirmed_date = datetime.now()
+    
+    # Notifications and confirmation messages follow from the outbox once this commits
+    if orders:
+        publish('part_orders.confirmed', order_ids=[order.id for order in orders],
+                user_id=current_user.id if current_user.is_authenticated else None)
+    db.session.commit()
+    
+    # Clear session
+    session.pop('pending_part_orders', None)
+    session.pop('total_advance', None)
+    
+    flash(f'{len(orders)} order(s) confirmed successfully! Check your email for details.', 'success')
+    return redirect(url_for('parts.my_part_orders'))
+
+@bp.route('/my-orders')
+def my_part_orders():
+    """View customer's part orders"""
+    phone = request.args.get('phone', '')
+    
+    if current_user.is_authenticated and hasattr(current_user, 'customer_profile'):
+        customer = current_user.customer_profile
+        if customer and customer.contact:
+            phone = customer.contact
+    
+    if request.method == 'GET' and not phone:
+        return render_template('hms/my_orders_search.html')
+    
+    if phone:
+        orders = PartOrder.query.filter_by(customer_phone=phone).order_by(PartOrder.order_date.desc()).all()
+        return render_template('hms/my_orders.html', orders=orders, phone=phone)
+    
+    return render_template('hms/my_orders_search.html')
+
+@bp.route('/order/<int:order_id>')
+def view_part_order(order_id):
+    """View specific order details"""
+    order = PartOrder.query.get_or_404(order_id)
+    return render_template('hms/order_detail.html', order=order)
+
+@bp.route('/order/<int:order_id>/cancel', methods=['GET', 'POST'])
+def cancel_part_order(order_id):
+    """Cancel a part order"""
+    order = PartOrder.query.get_or_404(order_id)
+    
+    if order.order_status in ['Delivered', 'Cancelled']:
+        flash('This order cannot be cancelled', 'danger')
+        return redirect(url_for('parts.view_part_order', order_id=order_id))
+    
+    order.order_status = 'Cancelled'
+    db.session.commit()
+    
+    flash(f'Order {order.order_number} has been cancelled', 'info')
+    return redirect(url_for('parts.my_part_orders'))
+
+# Car Accessories Routes
+@bp.route('/accessories')
+def car_accessories():
+    """Car Accessories - Coming Soon"""
+    return render_template('hms/accessories.html')
+
+@bp.route('/accessories/<int:accessory_id>')
+def accessory_detail(accessory_id):
+    """Accessory Detail - Coming Soon"""
+    return render_template('hms/accessories.html')
+
+@bp.route('/add-accessory-to-cart/<int:accessory_id>', methods=['POST'])
+def add_accessory_to_cart(accessory_id):
+    """Add accessory to cart"""
+    accessory = CarAccessory.query.get_or_404(accessory_id)
+    quantity = int(request.form.get('quantity', 1))
+    
+    if accessory.stock < quantity:
+        flash('Insufficient stock available', 'danger')
+        return redirect(url_for('parts.accessory_detail', accessory_id=accessory_id))
+    
+    if current_user.is_authenticated:
+        # Check if already in cart
+        cart_item = CartItem.query.filter_by(user_id=current_user.id, accessory_id=accessory_id).first()
+        
+        if cart_item:
+            cart_item.quantity += quantity
+        else:
+            cart_item = CartItem(
+                user_id=current_user.id,
+                accessory_id=accessory_id,
+                quantity=quantity,
+                session_id=session.get('session_id', secrets.token_hex(16))
+            )
+            db.session.add(cart_item)
+        
+        db.session.commit()
+        flash(f'{accessory.name} added to cart!', 'success')
+    else:
+        flash('Please login to add items to cart', 'warning')
+        return redirect(url_for('public.login'))
+    
+    return redirect(url_for('parts.car_accessories'))
@@ -0,0 +1,65 @@
+"""
+Payments Blueprint for Gaurav Motors
+Razorpay Checkout for part-order advances, its signed callback and the
+payment webhook
+"""
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, session, url_for
+from flask_login import current_user
+
+from models import PartOrder, PaymentOrder
+from payments import PaymentError, SignatureError, handle_webhook, open_part_payment, record_payment
+
+bp = Blueprint('payments', __name__)
+
+
+@bp.route('/orders/pay-online')
+def pay_online():
+    """Razorpay Checkout for the advance on the orders in the session"""
+    order_ids = session.get('pending_part_orders', [])
+    orders = PartOrder.query.filter(PartOrder.id.in_(order_ids)).all() if order_ids else []
+    if not orders:
+        flash('No pending orders', 'warning')
+        return redirect(url_for('parts.spare_parts_browse'))
+    gateway = current_app.extensions['payments']
+    try:
+        payment_order = open_part_payment(gateway, orders, current_user.id if current_user.is_authenticated else None)
+    except PaymentError as e:
+        current_app.logger.warning(f'Online payment unavailable: {e}')
+        flash('Online payment is unavailable right now, please try again or choose another method', 'danger')
+        return redirect(url_for('parts.part_orders_payment'))
+    if payment_order.status == 'Paid':
+        return redirect(url_for('parts.my_part_orders'))
+    return render_template('hms/razorpay_checkout.html', orders=orders, payment_order=payment_order,
+                           key_id=gateway.key_id)
+
+
+@bp.route('/payments/razorpay/callback', methods=['POST'])
+def razorpay_callback():
+    """Razorpay Checkout posts here once the customer has paid"""
+    gateway_order_id = request.form.get('razorpay_order_id', '')
+    payment_id = request.form.get('razorpay_payment_id', '')
+    payment_order = PaymentOrder.query.filter_by(gateway_order_id=gateway_order_id).first()
+    gateway = current_app.extensions['payments']
+    if payment_order is None or not gateway.verify_checkout(gateway_order_id, payment_id,
+                                                            request.form.get('razorpay_signature')):
+        flash('We could not verify that payment. If you were charged it will be matched automatically.', 'danger')
+        return redirect(url_for('parts.part_orders_payment'))
+    record_payment(payment_order, payment_id, payment_order.amount_paise)
+    session.pop('pending_part_orders', None)
+    session.pop('total_advance', None)
+    flash(f'Payment received! {len(payment_order.part_orders)} order(s) confirmed.', 'success')
+    return redirect(url_for('parts.my_part_orders'))
+
+
+@bp.route('/payments/razorpay/webhook', methods=['POST'])
+def razorpay_webhook():
+    """payment.captured / order.paid / payment.failed deliveries from Razorpay (retried until they get a 2xx)"""
+    try:
+        payment, created = handle_webhook(request.get_data(), request.headers.get('X-Razorpay-Signature'),
+                                          current_app.config['RAZORPAY_WEBHOOK_SECRET'])
+    except SignatureError:
+        return jsonify({'status': 'invalid signature'}), 400
+    except PaymentError as e:
+        current_app.logger.error(f'Rejected Razorpay webhook: {e}')
+        return jsonify({'status': 'rejected'}), 400
+    return jsonify({'status': 'ok', 'duplicate': payment is not None and not created})
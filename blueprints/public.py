@@ -0,0 +1,234 @@
+"""
+Public Pages for Gaurav Motors
+Marketing pages, the service booking form, search and sign-in
+"""
+from datetime import datetime
+from urllib.parse import quote
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import login_required, login_user, logout_user
+
+from credentials import CredentialsBusy
+from db_routing import read_replica
+from extensions import db
+from helpers import quote_engine
+from messaging import queue_message, render_message
+from models import User, TechnicianProfile, CustomerProfile, SparePart, CarService
+from quotes import ADVANCE_RATE, WASH_CHARGE
+
+bp = Blueprint('public', __name__)
+
+@bp.route('/')
+def index():
+    return render_template('hms/index_premium.html')
+
+@bp.route('/about')
+def about():
+    return render_template('hms/about_premium.html')
+
+@bp.route('/services')
+def services():
+    """Premium services page with modern design"""
+    return render_template('hms/services_new.html')
+
+@bp.route('/book-car-service')
+def book_car_service():
+    """Redirect to WhatsApp for quick service booking"""
+    phone = "919997612579"  # Gaurav Motors WhatsApp number
+    message = render_message('service_enquiry')
+    
+    whatsapp_url = f"https://wa.me/{phone}?text={quote(message)}"
+    return redirect(whatsapp_url)
+
+@bp.route('/book-service')
+@read_replica
+def book_service():
+    """Service booking form; every card shows the quote the booking will be charged"""
+    services = {service.id: service for service in CarService.query.filter_by(is_active=True)}
+    options = [(services[entry.id], quote_engine.service_quote(entry.id))
+               for entry in quote_engine.price_list() if entry.id in services]
+    return render_template('hms/book_service.html', options=options,
+                           wash_charge=WASH_CHARGE, advance_rate=ADVANCE_RATE)
+
+@bp.route('/book-service', methods=['POST'])
+def confirm_car_service():
+    """Process car service booking with 50% advance payment"""
+    try:
+        # Get form data
+        service_id = request.form.get('service_id', type=int)
+        customer_name = request.form.get('customer_name')
+        customer_phone = request.form.get('customer_phone')
+        customer_email = request.form.get('customer_email')
+        preferred_date = request.form.get('preferred_date')
+        car_make = request.form.get('car_make')
+        car_model = request.form.get('car_model')
+        registration_number = request.form.get('registration_number')
+        manufacture_year = request.form.get('manufacture_year')
+        mileage = request.form.get('mileage')
+        fuel_type = request.form.get('fuel_type')
+        pickup_service = 'pickup_service' in request.form
+        wash_service = 'wash_service' in request.form
+        additional_notes = request.form.get('additional_notes', '')
+        payment_method = request.form.get('payment_method', 'COD')
+        
+        # Price from the catalogue, never from the submitted form
+        quote = quote_engine.service_quote(service_id, wash=wash_service, pickup=pickup_service)
+        service_price = quote.total
+        advance_amount = quote.advance
+        remaining_amount = quote.remaining
+        
+        # Generate booking number
+        import random
+        booking_number = f'SRV-{datetime.now().year}-{random.randint(1000, 9999)}'
+        
+        # Create vehicle details string
+        vehicle_details = f"{car_make} {car_model} ({registration_number})"
+        if manufacture_year:
+            vehicle_details += f" - {manufacture_year}"
+        if fuel_type:
+            vehicle_details += f" - {fuel_type}"
+        if mileage:
+            vehicle_details += f" - {mileage} km"
+        
+        # Create service booking notes
+        booking_notes = f"Service: {quote.label}\n"
+        booking_notes += f"Preferred Date: {preferred_date}\n"
+        booking_notes += f"Vehicle: {vehicle_details}\n"
+        if pickup_service:
+            booking_notes += "Pickup Service: Yes\n"
+        if wash_service:
+            booking_notes += f"Car Wash: Yes (+₹{quote.addon('wash'):.0f})\n"
+        if additional_notes:
+            booking_notes += f"Notes: {additional_notes}\n"
+        
+        # In a real application, save this to database
+        # For now, we'll just show success message
+        
+        # Queue the confirmation email if an address was given
+        if customer_email:
+            queue_message('email', customer_email, 'car_service_booking',
+                          customer_name=customer_name, customer_phone=customer_phone,
+                          booking_number=booking_number, service_name=quote.label,
+                          preferred_date=preferred_date, vehicle=vehicle_details,
+                          service_price=service_price, advance_amount=advance_amount,
+                          remaining_amount=remaining_amount, payment_method=payment_method,
+                          pickup_service=pickup_service, wash_service=wash_service)
+            db.session.commit()
+        
+        flash(f'🎉 Service Booking Confirmed! Booking ID: {booking_number}. We will contact you shortly at {customer_phone}.', 'success')
+        return redirect(url_for('public.services'))
+        
+    except Exception as e:
+        flash(f'Error processing booking: {str(e)}', 'danger')
+        return redirect(url_for('public.services'))
+
+@bp.route('/contact', methods=['GET', 'POST'])
+def contact():
+    if request.method == 'POST':
+        name = request.form.get('name')
+        email = request.form.get('email')
+        subject = request.form.get('subject')
+        message = request.form.get('message')
+        # In a real app, you would save this to database or send email
+        flash('Thank you for contacting us! We will get back to you soon. 🌿', 'success')
+        return redirect(url_for('public.contact'))
+    return render_template('hms/contact_premium.html')
+
+@bp.route('/faq')
+def faq():
+    return render_template('hms/faq.html')
+
+# Auth
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        username = request.form['username']
+        email = request.form['email']
+        password = request.form['password']
+        name = request.form.get('name')
+        contact = request.form.get('contact')
+        if User.query.filter((User.username==username)|(User.email==email)).first():
+            flash('Username or email already exists', 'danger')
+            return redirect(url_for('public.register'))
+        user = User(username=username, email=email, role='customer')
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        customer = CustomerProfile(user_id=user.id, name=name or username, contact=contact)
+        db.session.add(customer)
+        db.session.commit()
+        flash('Registration successful. Please login.', 'success')
+        return redirect(url_for('public.login'))
+    return render_template('hms/register.html')
+
+@bp.route('/login', methods=['GET','POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        user = User.query.filter_by(username=username).first()
+        try:
+            valid = bool(user) and user.check_password(password)
+        except CredentialsBusy:
+            flash('Too many sign-ins right now, please try again in a moment', 'warning')
+            return render_template('hms/login.html'), 503, {'Retry-After': '2'}
+        if valid:
+            if db.session.is_modified(user):
+                db.session.commit()  # password hash upgraded to the current settings
+            login_user(user)
+            flash('Logged in successfully', 'success')
+            if user.role == 'admin':
+                return redirect(url_for('admin.admin_dashboard'))
+            elif user.role == 'technician':
+                return redirect(url_for('technician.technician_dashboard'))
+            else:
+                return redirect(url_for('customer.customer_dashboard'))
+        flash('Invalid credentials', 'danger')
+    return render_template('hms/login.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Logged out', 'info')
+    return redirect(url_for('public.index'))
+
+# Advanced Search Routes
+@bp.route('/search')
+@read_replica
+def search():
+    """Universal search across technicians, services, and parts"""
+    query = request.args.get('q', '').strip()
+    category = request.args.get('category', 'all')
+    
+    results = {
+        'technicians': [],
+        'services': [],
+        'parts': []
+    }
+    
+    if query:
+        if category in ['all', 'technicians']:
+            technicians = TechnicianProfile.query.filter(
+                (TechnicianProfile.name.ilike(f'%{query}%')) |
+                (TechnicianProfile.specialization.ilike(f'%{query}%'))
+            ).all()
+            results['technicians'] = technicians
+        
+        if category in ['all', 'services']:
+            services = CarService.query.filter(
+                CarService.is_active == True,
+                (CarService.name.ilike(f'%{query}%')) |
+                (CarService.description.ilike(f'%{query}%'))
+            ).all()
+            results['services'] = services
+        
+        if category in ['all', 'parts']:
+            parts = SparePart.query.filter(
+                (SparePart.name.ilike(f'%{query}%')) |
+                (SparePart.description.ilike(f'%{query}%')) |
+                (SparePart.brand.ilike(f'%{query}%'))
+            ).all()
+            results['parts'] = parts
+    
+    return render_template('hms/search_results.html', query=query, results=results, category=category)
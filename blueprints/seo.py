@@ -0,0 +1,161 @@
+"""
+SEO Blueprint for Gaurav Motors
+robots.txt, sitemap.xml and JSON-LD structured data for templates
+"""
+from flask import Blueprint, current_app, request
+
+from db_routing import read_replica
+from models import TechnicianProfile, SparePart, CarService
+
+bp = Blueprint('seo', __name__)
+
+# ===== SEO OPTIMIZATION ROUTES =====
+
+@bp.route('/robots.txt')
+def robots():
+    """Robots.txt for search engine crawling"""
+    robots_txt = """User-agent: *
+Allow: /
+Disallow: /admin
+Disallow: /customer
+Disallow: /technician
+Disallow: /login
+Disallow: /register
+Disallow: /api
+
+Sitemap: https://gauravmotors.com/sitemap.xml
+
+# Performance
+Request-rate: 10/1s
+"""
+    return robots_txt, 200, {'Content-Type': 'text/plain'}
+
+@bp.route('/sitemap.xml')
+@read_replica
+def sitemap():
+    """XML sitemap for SEO"""
+    base_url = request.url_root.rstrip('/')
+    urls = [
+        {'url': base_url, 'priority': '1.0', 'changefreq': 'daily'},
+        {'url': f'{base_url}/about', 'priority': '0.8', 'changefreq': 'monthly'},
+        {'url': f'{base_url}/services', 'priority': '0.9', 'changefreq': 'weekly'},
+        {'url': f'{base_url}/spare-parts', 'priority': '0.9', 'changefreq': 'weekly'},
+        {'url': f'{base_url}/contact', 'priority': '0.7', 'changefreq': 'monthly'},
+        {'url': f'{base_url}/faq', 'priority': '0.7', 'changefreq': 'monthly'},
+        {'url': f'{base_url}/login', 'priority': '0.6', 'changefreq': 'monthly'},
+        {'url': f'{base_url}/register', 'priority': '0.6', 'changefreq': 'monthly'},
+    ]
+    
+    # Add service pages
+    for service in CarService.query.filter_by(is_active=True).all():
+        urls.append({
+            'url': f'{base_url}/service/{service.id}',
+            'priority': '0.7',
+            'changefreq': 'weekly'
+        })
+    
+    # Add spare parts pages
+    for part in SparePart.query.limit(100).all():
+        urls.append({
+            'url': f'{base_url}/spare-parts/{part.id}',
+            'priority': '0.6',
+            'changefreq': 'weekly'
+        })
+    
+    # Add technician pages
+    for technician in TechnicianProfile.query.limit(50).all():
+        urls.append({
+            'url': f'{base_url}/technician/{technician.id}/reviews',
+            'priority': '0.5',
+            'changefreq': 'weekly'
+        })
+    
+    sitemap_xml = '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    
+    for url_data in urls:
+        sitemap_xml += f"""
+    <url>
+        <loc>{url_data['url']}</loc>
+        <changefreq>{url_data['changefreq']}</changefreq>
+        <priority>{url_data['priority']}</priority>
+    </url>"""
+    
+    sitemap_xml += '\n</urlset>'
+    return sitemap_xml, 200, {'Content-Type': 'application/xml'}
+
+# ===== STRUCTURED DATA (JSON-LD) FOR SEO =====
+
+def _organization_schema(url_root):
+    return {
+        '@context': 'https://schema.org',
+        '@type': 'LocalBusiness',
+        'name': 'Gaurav Motors Lohaghat',
+        'description': 'Best car service and repair workshop in Uttarakhand',
+        'image': url_root + '/static/images/logo.png',
+        'url': url_root,
+        'telephone': '+919997612579',
+        'address': {
+            '@type': 'PostalAddress',
+            'streetAddress': 'Main Road',
+            'addressLocality': 'Lohaghat',
+            'addressRegion': 'Uttarakhand',
+            'postalCode': '262524',
+            'addressCountry': 'IN'
+        },
+        'openingHoursSpecification': {
+            '@type': 'OpeningHoursSpecification',
+            'dayOfWeek': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+            'opens': '09:00',
+            'closes': '19:00'
+        },
+        'sameAs': [
+            'https://www.facebook.com',
+            'https://www.instagram.com',
+            'https://www.whatsapp.com'
+        ],
+        'aggregateRating': {
+            '@type': 'AggregateRating',
+            'ratingValue': '4.8',
+            'reviewCount': '1500'
+        }
+    }
+
+def _service_schema(service):
+    return {
+        '@context': 'https://schema.org',
+        '@type': 'Service',
+        'name': service.name,
+        'description': service.description,
+        'provider': {
+            '@type': 'LocalBusiness',
+            'name': 'Gaurav Motors'
+        },
+        'priceRange': str(service.price),
+        'areaServed': {
+            '@type': 'City',
+            'name': 'Lohaghat, Uttarakhand'
+        }
+    }
+
+def get_organization_schema():
+    """LocalBusiness JSON-LD, built once per site root"""
+    url_root = request.url_root.rstrip('/')
+    return current_app.extensions['fragment_cache'].get_or_set(
+        ('schema', 'organization', url_root), lambda: _organization_schema(url_root), tags=('schema',))
+
+def get_service_schema(service):
+    """Service JSON-LD, rebuilt when the CarService catalogue changes"""
+    if not service:
+        return {}
+    return current_app.extensions['fragment_cache'].get_or_set(
+        ('schema', 'service', service.id), lambda: _service_schema(service), tags=('services',))
+
+_structured_data_helpers = dict(
+    get_organization_schema=get_organization_schema,
+    get_service_schema=get_service_schema
+)
+
+@bp.app_context_processor
+def inject_structured_data():
+    """Inject JSON-LD structured data helpers into templates"""
+    return _structured_data_helpers
@@ -0,0 +1,103 @@
+"""
+Technician Blueprint for Gaurav Motors
+Technician dashboard, availability, booking work and public reviews
+"""
+from datetime import datetime, timedelta
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from extensions import db
+from helpers import calculate_technician_rating, is_technician
+from models import TechnicianProfile, ServiceWork, ServiceBooking, TechnicianReview
+from outbox import publish
+
+bp = Blueprint('technician', __name__)
+
+# Technician Dashboard
+@bp.route('/technician')
+@login_required
+def technician_dashboard():
+    if not is_technician():
+        flash('Technician access required', 'danger')
+        return redirect(url_for('public.index'))
+    
+    technician = current_user.technician_profile
+    
+    if not technician:
+        flash('Technician profile not found', 'danger')
+        return redirect(url_for('public.index'))
+    
+    today = datetime.now().date()
+    upcoming = ServiceBooking.query.filter_by(technician_id=technician.id).filter(ServiceBooking.status.in_(['Pending', 'Confirmed', 'In Progress'])).order_by(ServiceBooking.booking_date.desc()).all()
+    return render_template('hms/technician_dashboard.html', technician=technician, upcoming=upcoming)
+
+@bp.route('/technician/availability', methods=['GET','POST'])
+@login_required
+def technician_availability():
+    if not is_technician():
+        flash('Technician access required', 'danger')
+        return redirect(url_for('public.index'))
+    
+    technician = current_user.technician_profile
+    
+    if not technician:
+        flash('Technician profile not found', 'danger')
+        return redirect(url_for('public.index'))
+    
+    today = datetime.now().date()
+    days = [today + timedelta(days=i) for i in range(7)]
+    if request.method == 'POST':
+        pass  # TODO: Handle POST request
+    
+    return render_template('hms/technician_availability.html', technician=technician, days=days)
+
+@bp.route('/booking/<int:booking_id>', methods=['GET','POST'])
+@login_required
+def booking_detail(booking_id):
+    booking = ServiceBooking.query.get_or_404(booking_id)
+    if current_user.role == 'technician' and hasattr(booking, 'technician_id') and booking.technician_id:
+        tech_profile = current_user.technician_profile
+        if tech_profile and booking.technician_id != tech_profile.id:
+            flash('Not authorized', 'danger')
+            return redirect(url_for('public.index'))
+    
+    if request.method == 'POST':
+        # technician marks completed and records work
+        status = request.form.get('status')
+        assessment = request.form.get('assessment')
+        work_performed = request.form.get('work_performed')
+        parts_used = request.form.get('parts_used')
+        recommendations = request.form.get('recommendations')
+        
+        if status == 'Completed':
+            booking.status = 'Completed'
+            work = ServiceWork(
+                service_booking_id=booking.id,
+                assessment=assessment,
+                work_performed=work_performed,
+                parts_used=parts_used,
+                recommendations=recommendations
+            )
+            db.session.add(work)
+            publish('booking.completed', booking_id=booking.booking_id, user_id=booking.user_id)
+            db.session.commit()
+            flash('Service booking completed and work saved', 'success')
+            return redirect(url_for('technician.technician_dashboard'))
+        elif status == 'Cancelled':
+            booking.status = 'Cancelled'
+            db.session.commit()
+            flash('Service booking cancelled', 'info')
+            return redirect(url_for('technician.technician_dashboard'))
+    
+    return render_template('hms/booking_detail.html', booking=booking)
+
+# Technician Reviews Routes
+@bp.route('/technician/<int:technician_id>/reviews')
+def technician_reviews(technician_id):
+    """View technician reviews"""
+    technician = TechnicianProfile.query.get_or_404(technician_id)
+    reviews = TechnicianReview.query.filter_by(technician_id=technician_id).order_by(TechnicianReview.created_at.desc()).all()
+    avg_rating = calculate_technician_rating(technician_id)
+    
+    return render_template('hms/technician_reviews.html', technician=technician, reviews=reviews, avg_rating=avg_rating)
@@ -0,0 +1,140 @@
+"""
+Chatbot Intent Engine for Gaurav Motors
+Word-boundary intent matching via a precompiled token index, with cached
+catalogue snippets for the answers that need database data
+"""
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Ordered intent table: earlier entries win when a message matches several
+# intents (e.g. "hi, what does a service cost" is answered as a greeting).
+# Each entry is (intent name, trigger words/phrases, response).  A response is
+# either a static string or the name of a catalogue snippet (prefixed '@').
+INTENTS: List[Tuple[str, Tuple[str, ...], str]] = [
+    ('greeting',
+     ('hello', 'hi', 'hey', 'namaste', 'good morning', 'good afternoon', 'good evening'),
+     "👋 Hello! Welcome to Gaurav Motors!\n\nI'm your AI assistant. I can help you with:\n\n✓ Book car services\n✓ Find spare parts\n✓ Check prices\n✓ Get contact info\n✓ Learn about accessories\n✓ Emergency support\n\nWhat can I help you with today? 😊"),
+    ('services',
+     ('service', 'services', 'repair', 'repairs', 'maintenance', 'fix'),
+     '@services'),
+    ('parts',
+     ('part', 'parts', 'spare', 'spares', 'component', 'components'),
+     '@parts'),
+    ('contact',
+     ('contact', 'phone', 'address', 'location'),
+     "You can reach us at:\n📞 Phone: +91 9997612579\n📱 WhatsApp: +91 9997612579\n📍 Location: Lohaghat, Champawat, Uttarakhand\n⏰ Hours: Open 7 Days, 9 AM - 7 PM\n\nVisit our contact page for more details and map!"),
+    ('about',
+     ('about', 'company', 'who', 'gaurav'),
+     "🏆 Gaurav Motors - Uttarakhand's #1 Auto Workshop!\n\n✓ Established 2010\n✓ ISO Certified\n✓ 5000+ Happy Customers\n✓ Expert Technicians\n✓ Genuine Parts\n✓ Lifetime Warranty\n\nWe provide complete automotive solutions - from services to spare parts to accessories!"),
+    ('booking',
+     ('appointment', 'appointments', 'schedule', 'time', 'slot', 'slots', 'booking', 'bookings', 'book', 'reserve'),
+     "📅 Book Your Service:\n\n1. Click 'Book Service Now' button\n2. Choose your service\n3. Fill in your vehicle details\n4. Select preferred date/time\n5. Pay 50% advance\n\n✅ Quick & Easy!\n📞 Or call: +91 9997612579"),
+    ('price',
+     ('price', 'prices', 'pricing', 'cost', 'costs', 'fee', 'fees', 'charge', 'charges', 'rate', 'rates'),
+     '@price'),
+    ('emergency',
+     ('emergency', 'urgent', 'breakdown', 'tow', 'towing', 'help'),
+     "🚨 EMERGENCY SERVICES:\n\n📞 Call NOW: +91 9997612579\n💬 WhatsApp: +91 9997612579\n\n24/7 Emergency Support Available!\nRoadside Assistance • Towing • Quick Repairs\n\nWe're here to help! 🚗"),
+    ('accessories',
+     ('accessory', 'accessories', 'upgrade', 'upgrades', 'interior', 'exterior'),
+     "🚗 Premium Car Accessories:\n\n✓ Interior: Seat covers, floor mats, steering covers\n✓ Electronics: Dashcams, GPS, Bluetooth devices\n✓ Exterior: LED lights, chrome parts, body covers\n✓ Safety: Alarms, TPMS, fire extinguishers\n✓ Performance: Air filters, exhausts\n✓ Care: Polish, wax, vacuum cleaners\n\n🛒 Shop Now! Free installation available!"),
+]
+
+DEFAULT_RESPONSE = "I'm here to help with information about our car services, spare parts, appointments, and more. You can ask me about:\n• Available services and pricing\n• Spare parts availability\n• Booking appointments\n• Contact information\n• Emergency services"
+
+
+class CatalogueCache:
+    """Per-process cache of rendered catalogue snippets.
+
+    Snippets are built lazily by their loader and kept until `invalidate()`
+    is called (wired to model change events) or `ttl` seconds pass, which
+    bounds staleness for changes made by other worker processes.
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._loaders: Dict[str, Callable[[], str]] = {}
+        self._values: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], str]) -> None:
+        self._loaders[name] = loader
+        self._values.pop(name, None)
+
+    def get(self, name: str) -> str:
+        entry = self._values.get(name)
+        now = time.monotonic()
+        if entry is not None and now - entry[0] < self.ttl:
+            return entry[1]
+        with self._lock:
+            value = self._loaders[name]()
+            self._values[name] = (now, value)
+        return value
+
+    def invalidate(self, *names: str) -> None:
+        if not names:
+            self._values.clear()
+        for name in names:
+            self._values.pop(name, None)
+
+
+class IntentEngine:
+    """Match chat messages to intents with whole-word lookups.
+
+    The intent table is compiled once into an inverted index mapping each
+    trigger token (or multi-word phrase) to the priority of its intent, so a
+    message costs one tokenizer pass plus a dict lookup per n-gram.
+    """
+
+    def __init__(self, intents=None, default_response: str = DEFAULT_RESPONSE,
+                 catalogue: Optional[CatalogueCache] = None):
+        self.intents = list(INTENTS if intents is None else intents)
+        self.default_response = default_response
+        self.catalogue = catalogue or CatalogueCache()
+        self._index: Dict[str, int] = {}
+        self._max_ngram = 1
+        for priority, (_name, triggers, _response) in enumerate(self.intents):
+            for trigger in triggers:
+                key = ' '.join(_TOKEN_RE.findall(trigger.lower()))
+                self._max_ngram = max(self._max_ngram, key.count(' ') + 1)
+                # Keep the highest-priority intent if a trigger is reused
+                self._index.setdefault(key, priority)
+
+    def match(self, message: str) -> Optional[str]:
+        """Return the name of the best matching intent, or None"""
+        priority = self._match_priority(message)
+        return None if priority is None else self.intents[priority][0]
+
+    def respond(self, message: str) -> str:
+        """Return the chatbot reply for a message"""
+        priority = self._match_priority(message)
+        if priority is None:
+            return self.default_response
+        response = self.intents[priority][2]
+        if response.startswith('@'):
+            return self.catalogue.get(response[1:])
+        return response
+
+    def _match_priority(self, message: str) -> Optional[int]:
+        tokens = _TOKEN_RE.findall(message.lower())
+        index = self._index
+        best = None
+        for i, token in enumerate(tokens):
+            priority = index.get(token)
+            if priority is None and len(token) > 3 and token.endswith('s'):
+                priority = index.get(token[:-1])
+            if priority is not None and (best is None or priority < best):
+                best = priority
+                if best == 0:
+                    return best
+            for n in range(2, self._max_ngram + 1):
+                if i + n > len(tokens):
+                    break
+                priority = index.get(' '.join(tokens[i:i + n]))
+                if priority is not None and (best is None or priority < best):
+                    best = priority
+        return best
@@ -0,0 +1,303 @@
+"""
+Response Compression for Gaurav Motors
+WSGI middleware negotiating zstd/brotli/gzip from Accept-Encoding, with
+streaming compression for chunked responses and precompressed static files
+"""
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+# Text formats worth compressing; everything else (images, video, archives,
+# fonts, PDFs...) is already compressed or not worth the CPU
+COMPRESSIBLE_TYPES = {
+    'application/javascript', 'application/json', 'application/ld+json',
+    'application/manifest+json', 'application/rss+xml', 'application/xml',
+    'application/xhtml+xml', 'image/svg+xml',
+}
+SKIP_TYPES = {'text/event-stream'}
+
+# Known-length bodies up to this size are compressed in one piece
+MAX_BUFFER = 1024 * 1024
+
+# Precompressed sibling suffixes for static files, in order of preference
+STATIC_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(min(max(level, 1), 9), zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=min(max(level, 0), 11))
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=min(max(level, 1), 22)).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+CODECS = {'gzip': _Gzip}
+if brotli is not None:
+    CODECS['br'] = _Brotli
+if zstandard is not None:
+    CODECS['zstd'] = _Zstd
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """{'gzip': 1.0, 'br': 0.8} from an Accept-Encoding header"""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate(header: str, preference: Iterable[str]) -> Optional[str]:
+    """Pick the client's highest-quality encoding, breaking ties by preference"""
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in preference:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    mimetype = (content_type or '').split(';', 1)[0].strip().lower()
+    if mimetype in SKIP_TYPES:
+        return False
+    return (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+            or mimetype.endswith('+json') or mimetype.endswith('+xml'))
+
+
+class CompressionMiddleware:
+    """Compress responses for clients that accept it.
+
+    Bodies with a Content-Length up to MAX_BUFFER (rendered pages, JSON)
+    are compressed in one piece and keep a Content-Length; streamed and
+    larger bodies (CSV exports, big files) are compressed chunk by chunk.
+    Bodies smaller than `min_size`, ranges, HEAD requests, non-text media
+    and responses that already carry a Content-Encoding are passed through.  Requests for static files are rewritten to a `.br` or
+    `.gz` sibling when one exists next to the file.
+    """
+
+    def __init__(self, app, level: int = 6, min_size: int = 500,
+                 encodings: Iterable[str] = ('zstd', 'br', 'gzip'),
+                 static_folder: Optional[str] = None, static_url_path: str = '/static'):
+        self.app = app
+        self.level = level
+        self.min_size = min_size
+        self.encodings = tuple(name for name in encodings if name in CODECS)
+        self.static_folder = static_folder
+        self.static_prefix = static_url_path.rstrip('/') + '/'
+
+    def __call__(self, environ, start_response):
+        accept = environ.get('HTTP_ACCEPT_ENCODING', '')
+        if environ.get('REQUEST_METHOD') in ('GET', 'HEAD') and self.static_folder:
+            path = environ.get('PATH_INFO', '')
+            if path.startswith(self.static_prefix):
+                variant = self._static_variant(path, accept)
+                if variant is not None:
+                    return self._static(environ, start_response, variant)
+
+        encoding = negotiate(accept, self.encodings) if self.encodings else None
+        captured: List = []
+        buffered: List[bytes] = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return buffered.append
+
+        body = self.app(environ, capture)
+        if not captured:
+            # Generator apps call start_response when first iterated
+            body = _Primed(body)
+        status, headers, exc_info = captured
+        if not self._should_compress(environ, status, headers):
+            if self._varies(headers):
+                headers = _add_vary(headers)
+            start_response(status, headers, exc_info)
+            return _chain(buffered, body)
+
+        headers = _add_vary(headers)
+        if encoding is None:
+            start_response(status, headers, exc_info)
+            return _chain(buffered, body)
+        length = _header(headers, 'content-length')
+        headers = [(k, _weak_etag(v) if k.lower() == 'etag' else v)
+                   for k, v in headers if k.lower() != 'content-length']
+        headers.append(('Content-Encoding', encoding))
+
+        if length is not None and int(length) <= MAX_BUFFER:
+            # Small known-size bodies (rendered pages, JSON) keep a Content-Length
+            try:
+                data = b''.join(_chain(buffered, body))
+            finally:
+                _close(body)
+            codec = CODECS[encoding](self.level)
+            data = codec.compress(data) + codec.finish()
+            start_response(status, headers + [('Content-Length', str(len(data)))], exc_info)
+            return [data]
+
+        start_response(status, headers, exc_info)
+        return self._stream(CODECS[encoding](self.level), _chain(buffered, body))
+
+    def _should_compress(self, environ, status: str, headers) -> bool:
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return False
+        code = int(status.split(' ', 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        values = {k.lower(): v for k, v in headers}
+        if 'content-encoding' in values or 'content-range' in values:
+            return False
+        if 'no-transform' in values.get('cache-control', ''):
+            return False
+        if not is_compressible(values.get('content-type', '')):
+            return False
+        length = values.get('content-length')
+        return length is None or int(length) >= self.min_size
+
+    def _varies(self, headers) -> bool:
+        values = {k.lower(): v for k, v in headers}
+        return 'content-encoding' not in values and is_compressible(values.get('content-type', ''))
+
+    @staticmethod
+    def _stream(codec, chunks):
+        try:
+            for chunk in chunks:
+                data = codec.compress(chunk)
+                if data:
+                    yield data
+            yield codec.finish()
+        finally:
+            _close(chunks)
+
+    def _static_variant(self, path: str, accept: str) -> Optional[str]:
+        """Path of a precompressed sibling the client accepts, or None"""
+        relative = path[len(self.static_prefix):]
+        source = os.path.normpath(os.path.join(self.static_folder, relative))
+        if not source.startswith(os.path.normpath(self.static_folder) + os.sep):
+            return None
+        available = [name for name, suffix in STATIC_VARIANTS if os.path.isfile(source + suffix)]
+        if not available:
+            return None
+        encoding = negotiate(accept, available)
+        return path + dict(STATIC_VARIANTS)[encoding] if encoding else None
+
+    def _static(self, environ, start_response, variant: str):
+        """Serve a precompressed sibling of a static file"""
+        environ = dict(environ, PATH_INFO=variant)
+
+        def vary_start_response(status, headers, exc_info=None):
+            return start_response(status, _add_vary(headers), exc_info)
+
+        return self.app(environ, vary_start_response)
+
+
+def _add_vary(headers) -> List[Tuple[str, str]]:
+    headers = list(headers)
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == 'vary':
+            if 'accept-encoding' not in value.lower():
+                headers[i] = (name, f'{value}, Accept-Encoding')
+            return headers
+    headers.append(('Vary', 'Accept-Encoding'))
+    return headers
+
+
+def _header(headers, name: str) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _weak_etag(value: str) -> str:
+    return value if value.startswith('W/') else f'W/{value}'
+
+
+def _chain(first, body):
+    if not first:
+        return body
+    return _ClosingChain(first, body)
+
+
+class _ClosingChain:
+    """Data written through start_response's write() followed by the body"""
+
+    def __init__(self, first, body):
+        self.first = first
+        self.body = body
+
+    def __iter__(self):
+        yield from self.first
+        yield from self.body
+
+    def close(self):
+        _close(self.body)
+
+
+class _Primed:
+    """Body iterator advanced by one chunk, so start_response has run"""
+
+    def __init__(self, body):
+        self.body = body
+        self.iterator = iter(body)
+        self.first = next(self.iterator, None)
+
+    def __iter__(self):
+        if self.first is not None:
+            yield self.first
+        yield from self.iterator
+
+    def close(self):
+        _close(self.body)
+
+
+def _close(body):
+    close = getattr(body, 'close', None)
+    if close is not None:
+        close()
@@ -5,26 +5,115 @@ Provides secure, environment-based configuration management
 import os
 from datetime import timedelta
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IS_VERCEL = bool(os.environ.get('VERCEL'))
+IS_RENDER = bool(os.environ.get('RENDER'))
+# Any hosted deployment (Vercel, Railway, Render, etc.)
+IS_PRODUCTION = bool(os.environ.get('RAILWAY_ENVIRONMENT') or IS_RENDER or IS_VERCEL)
+
+
+def database_uri():
+    """DATABASE_URL (PostgreSQL in production), else SQLite"""
+    url = os.environ.get('DATABASE_URL')
+    if url:
+        if url.startswith('postgres://'):
+            url = url.replace('postgres://', 'postgresql://', 1)
+        return url
+    if IS_VERCEL or IS_RENDER:
+        # In-memory SQLite lets the app start without a database configured
+        return 'sqlite:///:memory:'
+    return f"sqlite:///{os.path.join(BASE_DIR, 'hms.db').replace(os.sep, '/')}"
+
+
+def _list(name, default=''):
+    return [item.strip() for item in os.environ.get(name, default).split(',') if item.strip()]
+
+
 class Config:
     """Base configuration"""
     # Security
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production-2024'
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'hmsdevsecret-change-in-production'
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = None  # No time limit
-    SESSION_COOKIE_SECURE = True  # HTTPS only
+    SESSION_COOKIE_SECURE = False  # Allow HTTP; production overrides
     SESSION_COOKIE_HTTPONLY = True  # No JavaScript access
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
-    
+
+    # Blueprints to register (APP_BLUEPRINTS=api,seo for a worker serving only those);
+    # None registers all of them
+    BLUEPRINTS = _list('APP_BLUEPRINTS') or None
+
     # Database
+    SQLALCHEMY_DATABASE_URI = database_uri()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
-    
+    # Optional read replicas (comma-separated URLs) for @read_replica views; a client
+    # reads from the primary for DATABASE_REPLICA_STICKY_SECONDS after it writes
+    DATABASE_REPLICA_URLS = _list('DATABASE_REPLICA_URLS')
+    DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', 10))
+
+    # Compression
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    # Preferred order when the client accepts several equally (unavailable codecs are skipped)
+    COMPRESS_ALGORITHMS = os.environ.get('COMPRESS_ALGORITHMS', 'zstd,br,gzip').split(',')
+
+    # Template fragment cache ({% cache %} blocks); 'null' renders every fragment
+    FRAGMENT_CACHE = os.environ.get('FRAGMENT_CACHE', 'memory')
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 3600))
+
+    # Pre-rendered public pages served ahead of Flask to anonymous visitors
+    SNAPSHOTS = os.environ.get('SNAPSHOTS') == '1'
+    SNAPSHOT_FOLDER = os.environ.get('SNAPSHOT_FOLDER', os.path.join(BASE_DIR, 'snapshots'))
+    # Site roots `flask build-snapshots` renders for; other hosts are rendered on first visit
+    SNAPSHOT_BASE_URLS = os.environ.get('SNAPSHOT_BASE_URLS', 'http://localhost').split(',')
+
+    # Instrumentation: Server-Timing header, slow query log, N+1 warnings and /metrics
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1'
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))  # 0 disables the slow query log
+    # Identical statements per request at which an N+1 pattern is reported (0 disables)
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))
+    # Fail the request instead (RepeatedQueryError), so tests catch queries that grow with row counts
+    N_PLUS_ONE_RAISE = os.environ.get('N_PLUS_ONE_RAISE') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # bearer token required by /metrics when set
+    METRICS_REQUIRE_TOKEN = False  # when True, /metrics is only registered if METRICS_TOKEN is set
+
+    # Password hashing: a werkzeug method ('scrypt:N:r:p' or 'pbkdf2:sha256:iterations').
+    # Stored hashes made with other settings are upgraded at the user's next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # Threads per worker process verifying passwords (0 = on the request thread), and how
+    # many more logins may wait for them before /login answers 503
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))
+    # Seconds a worker reuses a signed-in user and profile without querying (0 = off);
+    # edits are seen at once in the worker that made them, elsewhere within this time
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 30))
+
+    # Static files: unhashed /static URLs are revalidated (no-cache + ETag) so an
+    # edited logo or script reaches browsers; only fingerprinted /assets are immutable
+    SEND_FILE_MAX_AGE_DEFAULT = None
+
     # File Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
-    UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
+    UPLOAD_FOLDER = '/tmp/uploads' if IS_VERCEL else os.path.join(BASE_DIR, 'uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'doc', 'docx'}
-    
+
+    # Upload storage: 'local' (UPLOAD_FOLDER) or 's3' (any S3-compatible store;
+    # use it on Vercel where /tmp is wiped between invocations)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+    STORAGE_S3_ENDPOINT = os.environ.get('STORAGE_S3_ENDPOINT')
+    STORAGE_S3_BUCKET = os.environ.get('STORAGE_S3_BUCKET')
+    STORAGE_S3_ACCESS_KEY = os.environ.get('STORAGE_S3_ACCESS_KEY')
+    STORAGE_S3_SECRET_KEY = os.environ.get('STORAGE_S3_SECRET_KEY')
+    STORAGE_S3_REGION = os.environ.get('STORAGE_S3_REGION', 'us-east-1')
+    # Let the front server send local files: X-Sendfile (Apache/lighttpd) or
+    # X-Accel-Redirect to an internal nginx location mapped to UPLOAD_FOLDER
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE') == '1'
+    STORAGE_ACCEL_REDIRECT = os.environ.get('STORAGE_ACCEL_REDIRECT', '')
+    # Processes generating resized WebP copies of images (0 = inline)
+    IMAGE_PIPELINE_WORKERS = int(os.environ.get('IMAGE_PIPELINE_WORKERS', 0 if IS_VERCEL else 2))
+
     # Email Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
@@ -35,20 +124,70 @@ class Config:
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@gmmotors.com')
     MAIL_MAX_EMAILS = None
     MAIL_ASCII_ATTACHMENTS = False
-    
+    MAIL_TIMEOUT = float(os.environ.get('MAIL_TIMEOUT', 10))
+
+    # Outbound messaging: the site queues e-mail, WhatsApp and SMS in outbound_message and
+    # `flask send-messages` sends them. A channel is used only once its credentials are set.
+    WHATSAPP_API_URL = os.environ.get('WHATSAPP_API_URL', 'https://graph.facebook.com/v19.0')
+    WHATSAPP_PHONE_NUMBER_ID = os.environ.get('WHATSAPP_PHONE_NUMBER_ID')
+    WHATSAPP_ACCESS_TOKEN = os.environ.get('WHATSAPP_ACCESS_TOKEN')
+    TWILIO_API_URL = os.environ.get('TWILIO_API_URL', 'https://api.twilio.com/2010-04-01')
+    TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
+    TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
+    TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER')
+    # Country code added to local phone numbers
+    MESSAGING_COUNTRY_CODE = os.environ.get('MESSAGING_COUNTRY_CODE', '91')
+    # Sends in flight at once per channel (each e-mail slot keeps its own SMTP connection open)
+    MESSAGING_EMAIL_CONCURRENCY = int(os.environ.get('MESSAGING_EMAIL_CONCURRENCY', 2))
+    MESSAGING_WHATSAPP_CONCURRENCY = int(os.environ.get('MESSAGING_WHATSAPP_CONCURRENCY', 8))
+    MESSAGING_SMS_CONCURRENCY = int(os.environ.get('MESSAGING_SMS_CONCURRENCY', 4))
+    MESSAGING_CONNECT_TIMEOUT = float(os.environ.get('MESSAGING_CONNECT_TIMEOUT', 3.05))
+    MESSAGING_READ_TIMEOUT = float(os.environ.get('MESSAGING_READ_TIMEOUT', 10))
+    MESSAGING_BATCH_SIZE = int(os.environ.get('MESSAGING_BATCH_SIZE', 100))
+    MESSAGING_POLL_INTERVAL = float(os.environ.get('MESSAGING_POLL_INTERVAL', 5))
+    # A failed send is retried after MESSAGING_RETRY_BASE seconds, doubling each time
+    MESSAGING_MAX_ATTEMPTS = int(os.environ.get('MESSAGING_MAX_ATTEMPTS', 5))
+    MESSAGING_RETRY_BASE = float(os.environ.get('MESSAGING_RETRY_BASE', 30))
+    # A claimed batch not settled within this many seconds is claimed again
+    MESSAGING_LEASE = float(os.environ.get('MESSAGING_LEASE', 300))
+
+    # Transactional outbox: `flask relay-events` hands committed events to their consumers
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 200))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 2))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))
+    OUTBOX_RETRY_BASE = float(os.environ.get('OUTBOX_RETRY_BASE', 15))
+    OUTBOX_LEASE = float(os.environ.get('OUTBOX_LEASE', 120))
+
     # Payment Gateway
     RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID', 'rzp_test_XXXXXXXXXXXXX')
     RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET', 'XXXXXXXXXXXXXXXX')
-    
+    # Signs webhook deliveries (set in the Razorpay dashboard, separate from the key secret)
+    RAZORPAY_WEBHOOK_SECRET = os.environ.get('RAZORPAY_WEBHOOK_SECRET', '')
+    RAZORPAY_API_URL = os.environ.get('RAZORPAY_API_URL', 'https://api.razorpay.com/v1')
+    RAZORPAY_CONNECT_TIMEOUT = float(os.environ.get('RAZORPAY_CONNECT_TIMEOUT', 3.05))
+    RAZORPAY_READ_TIMEOUT = float(os.environ.get('RAZORPAY_READ_TIMEOUT', 10))
+    # Keep-alive connections to the gateway per worker
+    RAZORPAY_POOL_SIZE = int(os.environ.get('RAZORPAY_POOL_SIZE', 10))
+
     # Pagination
     ITEMS_PER_PAGE = 20
     MAX_SEARCH_RESULTS = 100
-    
-    # Rate Limiting
-    RATELIMIT_ENABLED = True
-    RATELIMIT_DEFAULT = "200 per day, 50 per hour"
-    RATELIMIT_STORAGE_URL = "memory://"
-    
+
+    # Rate Limiting: POSTs to these endpoints are limited per client IP ("N per [M] second|minute|hour|day",
+    # comma-separated; an empty policy uses RATELIMIT_DEFAULT). With redis://host:port/db every
+    # worker shares the counters; memory:// limits each worker separately.
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+    RATELIMIT_DEFAULT = os.environ.get('RATELIMIT_DEFAULT', "200 per day, 50 per hour")
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', "memory://")
+    RATELIMIT_STORAGE_TIMEOUT = float(os.environ.get('RATELIMIT_STORAGE_TIMEOUT', 0.25))
+    RATELIMIT_POLICIES = {
+        'public.login': os.environ.get('RATELIMIT_LOGIN', '10 per minute, 50 per hour'),
+        'api.create_booking': os.environ.get('RATELIMIT_BOOKING', '5 per minute, 30 per hour'),
+        'api.chat': os.environ.get('RATELIMIT_CHAT', '30 per minute'),
+    }
+    # Proxies in front of gunicorn that append to X-Forwarded-For (0 = use the peer address)
+    RATELIMIT_PROXY_HOPS = int(os.environ.get('RATELIMIT_PROXY_HOPS', 0))
+
     # Logging
     LOG_TO_STDOUT = os.environ.get('LOG_TO_STDOUT')
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -57,24 +196,21 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     TESTING = False
-    DB_PATH = os.path.join(os.path.dirname(__file__), 'hms.db')
-    SQLALCHEMY_DATABASE_URI = f"sqlite:///{DB_PATH.replace(os.sep, '/')}"
-    SESSION_COOKIE_SECURE = False  # Allow HTTP in development
     WTF_CSRF_ENABLED = True  # Enable CSRF in dev too
     SQLALCHEMY_ECHO = False  # Set to True to see SQL queries
+    # Cheaper hashing for quick local logins (upgraded automatically when deployed)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:16384:8:1')
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     TESTING = False
-    # Use environment variable for database URL in production
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
-        f"sqlite:///{os.path.join(os.path.dirname(__file__), 'hms.db').replace(os.sep, '/')}"
-    
+
     # Stricter security in production
     SESSION_COOKIE_SECURE = True
     PREFERRED_URL_SCHEME = 'https'
-    
+    METRICS_REQUIRE_TOKEN = True
+
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
@@ -82,6 +218,10 @@ class TestingConfig(Config):
     WTF_CSRF_ENABLED = False  # Disable CSRF for testing
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SERVER_NAME = 'localhost.localdomain'
+    N_PLUS_ONE_RAISE = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_HASH_WORKERS = 0
+    RATELIMIT_ENABLED = False
 
 # Configuration dictionary
 config = {
@@ -92,7 +232,7 @@ config = {
 }
 
 def get_config(config_name=None):
-    """Get configuration by name"""
+    """Get configuration by name (FLASK_ENV, else production on hosted deployments)"""
     if config_name is None:
-        config_name = os.environ.get('FLASK_ENV', 'development')
+        config_name = os.environ.get('FLASK_ENV') or ('production' if IS_PRODUCTION else 'development')
     return config.get(config_name, config['default'])
@@ -0,0 +1,135 @@
+"""
+Password Credentials for Gaurav Motors
+Password hashing with a configurable algorithm and cost, run on a bounded
+worker pool, with stored hashes upgraded on login when the settings change
+"""
+import hashlib
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class CredentialsBusy(Exception):
+    """Raised when the verification pool already has its limit of logins queued"""
+    pass
+
+
+@dataclass(frozen=True)
+class Verification:
+    valid: bool
+    rehash: Optional[str] = None  # new hash to store when the old one used outdated settings
+
+
+def _executor_class():
+    """concurrent.futures' pool, or gevent's when threading is monkey-patched (GUNICORN_WORKER_CLASS=gevent)
+    so hashing still runs on native threads while the worker's greenlets keep serving"""
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('threading'):
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+        return GeventThreadPoolExecutor
+    return ThreadPoolExecutor
+
+
+def canonical_method(method: str) -> str:
+    """werkzeug method string with every parameter spelt out ('scrypt' -> 'scrypt:32768:8:1').
+
+    Filled in from werkzeug's defaults rather than by hashing, so building
+    Credentials at startup costs no key derivation.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        if not args:
+            return 'scrypt:32768:8:1'
+        try:
+            n, r, p = map(int, args)
+        except ValueError:
+            raise ValueError("'scrypt' takes 3 arguments.") from None
+        return f'scrypt:{n}:{r}:{p}'
+    if name == 'pbkdf2':
+        if len(args) > 2:
+            raise ValueError("'pbkdf2' takes 2 arguments.")
+        hash_name = args[0] if args else 'sha256'
+        if hash_name not in hashlib.algorithms_available:
+            raise ValueError(f'Unknown pbkdf2 hash {hash_name!r}.')
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    raise ValueError(f"Invalid hash method '{name}'.")
+
+
+class Credentials:
+    """Hashes and verifies passwords with one werkzeug method ('scrypt:N:r:p' or 'pbkdf2:hash:iterations').
+
+    With workers > 0 the key derivation runs on a thread pool of that size:
+    hashlib releases the GIL for scrypt and PBKDF2, so hashes run in
+    parallel while the request threads (or greenlets) wait; the threads
+    start on first use, so a preloaded app forks before any exist. At most
+    workers + queue_size verifications are admitted at once; beyond that
+    verify() raises CredentialsBusy instead of piling up CPU and scrypt's
+    memory. workers=0 hashes on the calling thread.
+    """
+
+    def __init__(self, method: str = 'scrypt', workers: int = 0, queue_size: int = 32):
+        self.method = canonical_method(method)
+        self.workers = workers
+        self._executor = _executor_class()(workers) if workers else None
+        self._slots = threading.BoundedSemaphore(workers + queue_size) if workers else None
+
+    @classmethod
+    def from_config(cls, config) -> 'Credentials':
+        return cls(config['PASSWORD_HASH_METHOD'], config['PASSWORD_HASH_WORKERS'],
+                   config['PASSWORD_HASH_QUEUE'])
+
+    def hash(self, password: str) -> str:
+        # Setting a password waits for a slot rather than failing
+        return self._run(generate_password_hash, password, self.method, wait=True)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return password_hash.split('$', 1)[0] != self.method
+
+    def verify(self, password_hash: str, password: str) -> Verification:
+        """Check a password; the result carries a fresh hash when the stored one is outdated"""
+        if not password_hash:
+            return Verification(False)
+        valid = self._run(check_password_hash, password_hash, password, wait=False)
+        if valid and self.needs_rehash(password_hash):
+            return Verification(True, self._run(generate_password_hash, password, self.method, wait=True))
+        return Verification(valid)
+
+    def _run(self, function, *args, wait: bool):
+        if self._executor is None:
+            return function(*args)
+        if not self._slots.acquire(blocking=wait):
+            raise CredentialsBusy('too many password checks in progress')
+        try:
+            return self._executor.submit(function, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+_fallback: Optional[Credentials] = None
+
+
+def current_credentials() -> Credentials:
+    """The app's Credentials, or werkzeug's defaults outside an app (scripts, shells)"""
+    global _fallback
+    if has_app_context() and 'credentials' in current_app.extensions:
+        return current_app.extensions['credentials']
+    if _fallback is None:
+        _fallback = Credentials()
+    return _fallback
+
+
+def init_credentials(app) -> Credentials:
+    """Build the app's Credentials from PASSWORD_HASH_* (an unknown method fails here, at startup)"""
+    credentials = Credentials.from_config(app.config)
+    app.extensions['credentials'] = credentials
+    return credentials
@@ -0,0 +1,112 @@
+"""
+Read Replica Routing for Gaurav Motors
+Session class that sends the read-only queries of marked views to replica
+engines, and keeps writes and a client's reads after its writes on the primary
+"""
+import itertools
+import time
+from functools import wraps
+from typing import Dict, Iterable
+
+from flask import current_app, g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND_PREFIX = 'replica'
+# Flask session key holding the time until which the client reads from the
+# primary, so it sees its own writes while replicas catch up
+STICKY_SESSION_KEY = '_db_primary_until'
+DEFAULT_STICKY_SECONDS = 10
+
+_round_robin = itertools.count()
+
+
+def replica_binds(urls: Iterable[str]) -> Dict[str, str]:
+    """SQLALCHEMY_BINDS entries ('replica0', 'replica1', ...) for replica URLs"""
+    binds = {}
+    for url in urls:
+        url = url.strip()
+        if not url:
+            continue
+        if url.startswith('postgres://'):
+            url = url.replace('postgres://', 'postgresql://', 1)
+        binds[f'{REPLICA_BIND_PREFIX}{len(binds)}'] = url
+    return binds
+
+
+def read_replica(view):
+    """Allow a view's read-only queries to be answered by a replica.
+
+    Use on views that only read and tolerate slightly stale data (analytics,
+    exports, search, catalogue listings).  Writes made by the view still go
+    to the primary, as do reads following them.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        g.read_replica = True
+        return view(*args, **kwargs)
+    return decorated_function
+
+
+def stick_to_primary(seconds: float) -> None:
+    """Send this client's reads to the primary for the next `seconds`"""
+    flask_session[STICKY_SESSION_KEY] = time.time() + seconds
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session choosing between the primary and replicas.
+
+    A SELECT goes to a replica only inside a `@read_replica` view, outside a
+    flush, when this transaction has not written, when it is not SELECT ...
+    FOR UPDATE, and when the client has not committed a write within the
+    sticky window.  Each transaction reads from a single replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not self._replica_read(clause):
+            return engine
+        engines = self._db.engines
+        if engine is not engines.get(None):
+            return engine  # model bound to another database
+        replicas = self.replicas()
+        if not replicas:
+            return engine
+        index = self.info.get('routing.replica')
+        if index is None or index >= len(replicas):
+            index = self.info['routing.replica'] = next(_round_robin) % len(replicas)
+        return replicas[index]
+
+    def replicas(self):
+        engines = self._db.engines
+        return [engines[key] for key in sorted(k for k in engines if isinstance(k, str)
+                                                and k.startswith(REPLICA_BIND_PREFIX))]
+
+    def _replica_read(self, clause) -> bool:
+        if not has_request_context() or not g.get('read_replica'):
+            return False
+        if self._flushing or self.info.get('routing.wrote'):
+            return False
+        if clause is None or not getattr(clause, 'is_select', False):
+            return False
+        if getattr(clause, '_for_update_arg', None) is not None:
+            return False
+        return flask_session.get(STICKY_SESSION_KEY, 0) <= time.time()
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_write(session, flush_context):
+    session.info['routing.wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _sticky_after_write(session):
+    if session.info.pop('routing.wrote', False) and has_request_context() and session.replicas():
+        stick_to_primary(current_app.config.get('DATABASE_REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS))
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('routing.wrote', None)
+        session.info.pop('routing.replica', None)
@@ -0,0 +1,153 @@
+"""
+Database Schema Setup for Gaurav Motors
+Creates, upgrades and seeds the tables the models declare, and stamps the
+applied schema so later startups can skip the work
+"""
+import hashlib
+import threading
+
+from extensions import db
+from models import User, TechnicianProfile, CustomerProfile, ServiceCategory, CarService, SchemaStamp
+
+def upgrade_schema():
+    """Add columns and indexes introduced after a table was first created.
+
+    db.create_all() only creates missing tables, so nullable columns added to
+    existing models are appended here with ALTER TABLE.
+    """
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(db.text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+            indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+
+# werkzeug hashes of the seed accounts' default passwords (Admin@123456, doctor,
+# kar123), computed once so seeding a fresh database does not run scrypt
+SEED_PASSWORD_HASHES = {
+    'admin': 'scrypt:32768:8:1$EVqpa05H2zD2Dgph$0c3fe922fb27349a60e25325b532f08f23734cb3111866e8c9e2361d2504292151d2a58b7db0804662e6f7b590a4ff687e38a1d4a364181e107caa3108a0ae7c',
+    'drjohn': 'scrypt:32768:8:1$rv169Yzq7GHgG2l5$6219a32db8b41b63c0f38c21fefa3dd996a7a00a1fa9525914011a391257a626b41fd54f121530186190a99485de5f2222793c363db66cf66b6d427e2c7cf366',
+    'kar': 'scrypt:32768:8:1$RFOfI9BLyO00xLWF$a573d67120b591b6383e38f31ee25dc921eb0a157ed82cb36eb2e0eeace247868773fc8916ccfb4bc3c97732b510e210559db1892f9ab14cd697cf4ec77273fe',
+}
+
+# Auto-initialize database on Vercel (ephemeral /tmp filesystem)
+def init_vercel_db():
+    """Create tables and seed data for Vercel deployment"""
+    try:
+        inspector = db.inspect(db.engine)
+        has_user_table = inspector.has_table('user')
+    except Exception:
+        has_user_table = False
+
+    if has_user_table:
+        db.create_all()
+        upgrade_schema()
+    else:
+        db.create_all()
+        # Create default admin user
+        admin = User(
+            username='admin',
+            email='admin@gauravmotors.com',
+            password_hash=SEED_PASSWORD_HASHES['admin'],
+            role='admin'
+        )
+        db.session.add(admin)
+        
+        # Create sample technician
+        tech_user = User(
+            username='drjohn',
+            email='technician@gauravmotors.com',
+            password_hash=SEED_PASSWORD_HASHES['drjohn'],
+            role='technician'
+        )
+        db.session.add(tech_user)
+        db.session.flush()
+        
+        tech_profile = TechnicianProfile(
+            user_id=tech_user.id,
+            name='Rajesh Kumar',
+            specialization='Engine Specialist',
+            availability='Mon-Sat 9AM-6PM'
+        )
+        db.session.add(tech_profile)
+        
+        # Create sample customer
+        cust_user = User(
+            username='kar',
+            email='customer@gauravmotors.com',
+            password_hash=SEED_PASSWORD_HASHES['kar'],
+            role='customer'
+        )
+        db.session.add(cust_user)
+        db.session.flush()
+        
+        cust_profile = CustomerProfile(
+            user_id=cust_user.id,
+            name='Karan Singh',
+            contact='9998887770'
+        )
+        db.session.add(cust_profile)
+        
+        # Add sample services
+        # Create a service category first
+        svc_cat = ServiceCategory(name='General', icon='🔧', description='General automotive services')
+        db.session.add(svc_cat)
+        db.session.flush()
+        
+        services = [
+            CarService(name='General Service', description='Complete car checkup and maintenance', price=2999.0, duration_minutes=120, category_id=svc_cat.id, is_popular=True),
+            CarService(name='Brake Service', description='Brake pad replacement and inspection', price=3500.0, duration_minutes=90, category_id=svc_cat.id),
+            CarService(name='AC Service', description='AC gas refill and cleaning', price=2000.0, duration_minutes=60, category_id=svc_cat.id, is_popular=True),
+            CarService(name='Engine Repair', description='Engine diagnostics and repair', price=5000.0, duration_minutes=180, category_id=svc_cat.id),
+            CarService(name='Oil Change', description='Engine oil and filter replacement', price=1500.0, duration_minutes=45, category_id=svc_cat.id, is_popular=True),
+        ]
+        db.session.add_all(services)
+        
+        db.session.commit()
+        print("DB initialized with sample data")
+
+def schema_fingerprint():
+    """Hash of the tables, columns and indexes the models declare"""
+    parts = []
+    for table in db.metadata.sorted_tables:
+        columns = ','.join(column.name for column in table.columns)
+        indexes = ','.join(sorted(index.name for index in table.indexes))
+        parts.append(f'{table.name}({columns})[{indexes}]')
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def ensure_schema():
+    """Create, upgrade and seed the database once per process.
+
+    The fingerprint of the applied schema is stored in schema_stamp, so a
+    restart against an up-to-date database costs one query instead of
+    inspecting every table.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        fingerprint = schema_fingerprint()
+        try:
+            stamped = db.session.get(SchemaStamp, fingerprint) is not None
+        except Exception:
+            db.session.rollback()  # schema_stamp does not exist yet
+            stamped = False
+        if not stamped:
+            init_vercel_db()
+            db.session.merge(SchemaStamp(fingerprint=fingerprint))
+            db.session.commit()
+        _schema_ready = True
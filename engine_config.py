@@ -0,0 +1,117 @@
+"""
+Database Engine Configuration for Gaurav Motors
+SQLALCHEMY_ENGINE_OPTIONS per dialect: Postgres pools sized from the gunicorn
+worker/thread count, SQLite tuned with WAL and connection pragmas
+"""
+import os
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Connections one app instance may hold across all of its workers; keep
+# DB_MAX_CONNECTIONS x instances below the server's max_connections
+DEFAULT_MAX_CONNECTIONS = 40
+DEFAULT_POOL_RECYCLE = 1800  # seconds; below typical server/proxy idle cut-offs
+DEFAULT_POOL_TIMEOUT = 10  # seconds to wait for a free connection
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+DEFAULT_THREADS = 4  # development server / unknown runtime
+
+# Applied in order to every new SQLite connection.  WAL lets readers run
+# while a write is in progress; with WAL, synchronous=NORMAL is still safe
+# against corruption (a power cut may only lose the last transactions).
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'SQLITE_JOURNAL_MODE', 'WAL'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS', 'NORMAL'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS', '5000'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    ('cache_size', 'SQLITE_CACHE_SIZE', str(-32 * 1024)),  # negative: KiB, i.e. 32 MiB
+    ('temp_store', 'SQLITE_TEMP_STORE', 'MEMORY'),
+)
+# Pragmas that mean nothing for an in-memory database
+FILE_ONLY_PRAGMAS = {'journal_mode', 'mmap_size'}
+
+
+def _int(environ: Mapping[str, str], name: str, default: int) -> int:
+    value = environ.get(name)
+    return int(value) if value else default
+
+
+def is_memory_sqlite(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def pool_sizes(workers: int, threads: int, max_connections: int) -> Tuple[int, int]:
+    """(pool_size, max_overflow) for one worker process.
+
+    Each thread can hold one connection, so the steady pool matches the
+    thread count; overflow lets a worker burst up to its share of the
+    instance's connection budget.
+    """
+    pool_size = max(threads, 1)
+    share = max(max_connections // max(workers, 1), pool_size)
+    return pool_size, share - pool_size
+
+
+def engine_options(uri: str, environ: Optional[Mapping[str, str]] = None) -> Dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URI.
+
+    Worker and thread counts come from WEB_CONCURRENCY / GUNICORN_THREADS,
+    which gunicorn.conf.py exports before the app is loaded.
+    """
+    environ = os.environ if environ is None else environ
+    backend = make_url(uri).get_backend_name()
+    if backend == 'postgresql':
+        workers = _int(environ, 'WEB_CONCURRENCY', 1)
+        threads = _int(environ, 'GUNICORN_THREADS', DEFAULT_THREADS)
+        pool_size, max_overflow = pool_sizes(
+            workers, threads, _int(environ, 'DB_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS))
+        statement_timeout = _int(environ, 'DB_STATEMENT_TIMEOUT_MS', DEFAULT_STATEMENT_TIMEOUT_MS)
+        return {
+            'pool_size': _int(environ, 'DB_POOL_SIZE', pool_size),
+            'max_overflow': _int(environ, 'DB_MAX_OVERFLOW', max_overflow),
+            'pool_pre_ping': True,
+            'pool_recycle': _int(environ, 'DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE),
+            'pool_timeout': _int(environ, 'DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+            'connect_args': {
+                'connect_timeout': _int(environ, 'DB_CONNECT_TIMEOUT', 10),
+                'application_name': environ.get('DB_APPLICATION_NAME', 'gaurav-motors'),
+                'options': f'-c statement_timeout={statement_timeout}',
+            },
+        }
+    if backend == 'sqlite' and not is_memory_sqlite(uri):
+        busy_timeout = _int(environ, 'SQLITE_BUSY_TIMEOUT_MS', 5000)
+        # sqlite3's own lock wait, used before the busy_timeout pragma is set
+        return {'connect_args': {'timeout': busy_timeout / 1000}}
+    return {}
+
+
+def sqlite_pragmas(uri: str, environ: Optional[Mapping[str, str]] = None) -> List[Tuple[str, str]]:
+    """[(pragma, value)] to run on each new connection to a SQLite URI"""
+    environ = os.environ if environ is None else environ
+    memory = is_memory_sqlite(uri)
+    pragmas = []
+    for pragma, variable, default in SQLITE_PRAGMAS:
+        value = environ.get(variable, default)
+        if value and not (memory and pragma in FILE_ONLY_PRAGMAS):
+            pragmas.append((pragma, value))
+    return pragmas
+
+
+def configure_engine(engine, environ: Optional[Mapping[str, str]] = None) -> None:
+    """Install the per-connection SQLite pragmas on an engine (no-op elsewhere)"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(engine.url.render_as_string(hide_password=False), environ)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas:
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
@@ -84,14 +84,7 @@ def init_error_handlers(app):
         if app.debug:
             app.logger.debug(f'{request.method} {request.url}')
     
-    @app.after_request
-    def add_security_headers(response):
-        """Add security headers to all responses"""
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'SAMEORIGIN'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-        return response
+    # Security headers are set by header_policy.py (installed by factory.init_web)
     
     return app
 
@@ -0,0 +1,15 @@
+"""
+Flask Extensions for Gaurav Motors
+Created unbound so models and blueprints can import them without an app;
+create_app() in factory.py binds them with init_app()
+"""
+from flask_login import LoginManager
+from flask_mail import Mail
+from flask_sqlalchemy import SQLAlchemy
+
+from db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+mail = Mail()
+login_manager = LoginManager()
+login_manager.login_view = 'public.login'
@@ -0,0 +1,323 @@
+"""
+Application Factory for Gaurav Motors
+create_app() builds a configured app with the selected blueprints; assets,
+compression, page snapshots, security headers, messaging, payments and the
+health check are installed (and imported) only when a blueprint is served
+"""
+import mimetypes
+import os
+from typing import Iterable, Optional
+
+import click
+from flask import Flask, abort, current_app, has_app_context, jsonify, request, send_from_directory, url_for
+from flask.cli import with_appcontext
+from markupsafe import Markup
+
+from blueprints import register_blueprints, select_blueprints
+from config import IS_PRODUCTION, IS_VERCEL, get_config
+from credentials import init_credentials
+from db_routing import replica_binds
+from db_schema import ensure_schema
+from engine_config import configure_engine, engine_options
+from extensions import db, login_manager, mail
+from identity import init_identity
+from instrumentation import init_instrumentation, instrument_engine
+from models import CarService
+from ratelimit import init_rate_limits
+
+# Fingerprinted files from `flask build-assets` never change under their name
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def create_app(config_name: Optional[str] = None, blueprints: Optional[Iterable[str]] = None) -> Flask:
+    """Build the app from a config name (default: FLASK_ENV) and blueprint names.
+
+    blueprints=None registers those listed in the BLUEPRINTS setting (all by
+    default); pass e.g. ['api'] for an API-only worker, or () for scripts
+    that only need the models and an app context: those get no web stack
+    (see init_web) and never import it.
+    """
+    app = Flask(__name__)
+    app.config.from_object(get_config(config_name))
+    selected = select_blueprints(app.config['BLUEPRINTS'] if blueprints is None else blueprints)
+    # Pool sizing/pre-ping/timeouts on Postgres; SQLite gets WAL pragmas in configure_engine below
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+    app.config.setdefault('SQLALCHEMY_BINDS', replica_binds(app.config['DATABASE_REPLICA_URLS']))
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine)
+            instrument_engine(engine)
+    mail.init_app(app)
+    login_manager.init_app(app)
+    init_credentials(app)
+    init_identity(app)
+    app.cli.add_command(seed_command)
+
+    if selected:
+        init_web(app, selected)
+    # Before any hook that touches the database, so a 429 costs no queries
+    init_rate_limits(app, init_instrumentation(app))
+    if IS_VERCEL:
+        # The first request checks the schema; once stamped that is a single query (db_schema.ensure_schema)
+        app.before_request(ensure_schema)
+    elif IS_PRODUCTION:
+        with app.app_context():
+            ensure_schema()
+
+    register_blueprints(app, selected)
+    return app
+
+
+def init_web(app: Flask, blueprints: Iterable[str] = ()) -> None:
+    """Install the app-wide storage, caches, messaging, payments, asset routes and middleware.
+
+    The shared objects live in app.extensions ('storage', 'fragment_cache',
+    'image_pipeline', 'static_derivatives', 'asset_manifest',
+    'page_snapshots', 'header_policy', 'messaging', 'payments') for views
+    to reach through current_app. Their modules (Pillow, requests, ...) are
+    imported here rather than with this module, and the payment gateway only
+    when the payments blueprint is among `blueprints`.
+    """
+    from assets import AssetManifest
+    from compression import CompressionMiddleware
+    from fragment_cache import FragmentCacheExtension, create_fragment_cache
+    from header_policy import init_header_policy
+    from images import ImagePipeline, StaticDerivatives
+    from messaging import init_messaging
+    from snapshots import SnapshotMiddleware, SnapshotStore
+    from storage import create_storage
+
+    if 'payments' in blueprints:
+        from payments import init_payments
+        init_payments(app)
+    init_messaging(app)
+    fragment_cache = create_fragment_cache(app.config)
+    page_snapshots = SnapshotStore(app.config['SNAPSHOT_FOLDER'],
+                                   template_folder=os.path.join(app.root_path, app.template_folder))
+    app.extensions.update(
+        storage=create_storage(app.config),
+        fragment_cache=fragment_cache,
+        image_pipeline=ImagePipeline(app.config['IMAGE_PIPELINE_WORKERS']),
+        static_derivatives=StaticDerivatives(app.static_folder),
+        asset_manifest=AssetManifest(app.static_folder, auto_reload=app.debug),
+        page_snapshots=page_snapshots,
+    )
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = fragment_cache
+    app.add_template_global(srcset)
+    app.add_template_global(srcset_attrs)
+    app.add_template_global(asset_url)
+    app.add_url_rule('/assets/<path:filename>', 'asset', asset)
+    app.add_url_rule('/healthz', 'healthz', healthz)
+    init_header_policy(app)
+    for command in (build_images_command, build_assets_command, build_snapshots_command,
+                    send_messages_command, relay_events_command):
+        app.cli.add_command(command)
+
+    # ===== RESPONSE COMPRESSION =====
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        level=app.config['COMPRESS_LEVEL'],
+        min_size=app.config['COMPRESS_MIN_SIZE'],
+        encodings=app.config['COMPRESS_ALGORITHMS'],
+        static_folder=app.static_folder,
+        static_url_path=app.static_url_path
+    )
+
+    # ===== PAGE SNAPSHOTS =====
+    if app.config['SNAPSHOTS']:
+        app.wsgi_app = SnapshotMiddleware(
+            app.wsgi_app, page_snapshots,
+            private_cookies=(app.config['SESSION_COOKIE_NAME'], 'remember_token')
+        )
+
+
+def srcset(filename, fmt='webp'):
+    """srcset value listing the resized copies of a static image.
+
+    Accepts 'images/x.jpg' or '/static/images/x.jpg'; returns '' for remote
+    URLs or images without derivatives (run `flask build-images`).
+    """
+    if not filename:
+        return ''
+    static_prefix = current_app.static_url_path.rstrip('/') + '/'
+    if filename.startswith(static_prefix):
+        filename = filename[len(static_prefix):]
+    elif '://' in filename or filename.startswith('/'):
+        return ''
+    return ', '.join(f"{url_for('static', filename=path)} {width}w"
+                     for width, path in current_app.extensions['static_derivatives'].candidates(filename, fmt))
+
+
+def srcset_attrs(filename, sizes, fmt='webp'):
+    """`srcset` and `sizes` attributes for an <img>, or nothing when srcset() is empty"""
+    value = srcset(filename, fmt)
+    if not value:
+        return Markup('')
+    return Markup('srcset="{}" sizes="{}"').format(value, sizes)
+
+
+def asset_url(name):
+    """URL of a static asset or bundle, fingerprinted once `flask build-assets` has run"""
+    from assets import BUNDLES as ASSET_BUNDLES
+
+    hashed = current_app.extensions['asset_manifest'].lookup(name)
+    if hashed:
+        return url_for('asset', filename=hashed)
+    if name in ASSET_BUNDLES:
+        return url_for('asset', filename=name)
+    return url_for('static', filename=name)
+
+
+def asset(filename):
+    """Serve built assets, preferring the brotli/gzip copy the client accepts"""
+    from assets import BUNDLES as ASSET_BUNDLES, DIST_DIR, bundle_source, encoded_variant
+
+    dist_dir = os.path.join(current_app.static_folder, DIST_DIR)
+    if os.path.isfile(os.path.join(dist_dir, filename)):
+        send_name, encoding = encoded_variant(dist_dir, filename, request.accept_encodings)
+        response = send_from_directory(dist_dir, send_name,
+                                       mimetype=mimetypes.guess_type(filename)[0])
+        del response.headers['Content-Disposition']
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = ASSET_CACHE_CONTROL
+        response.vary.add('Accept-Encoding')
+        return response
+    if filename in ASSET_BUNDLES:
+        # Not built yet (development, Vercel): serve the unminified bundle
+        body = bundle_source(current_app.static_folder, filename, ASSET_BUNDLES[filename],
+                             current_app.static_url_path)
+        response = current_app.response_class(body, mimetype=mimetypes.guess_type(filename)[0])
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    abort(404)
+
+
+def healthz():
+    """Readiness probe for the load balancer: 200 once the database answers"""
+    try:
+        db.session.execute(db.text('SELECT 1'))
+    except Exception as e:
+        current_app.logger.warning(f'Health check failed: {e}')
+        return jsonify({'status': 'unavailable', 'database': 'error'}), 503
+    return jsonify({'status': 'ok', 'database': 'ok'})
+
+
+@click.command('build-images')
+@with_appcontext
+def build_images_command():
+    """Generate resized WebP copies of static/images."""
+    from images import ImagePipeline, build_static_derivatives
+
+    pipeline = ImagePipeline(max(current_app.config['IMAGE_PIPELINE_WORKERS'], os.cpu_count() or 1))
+    try:
+        count = build_static_derivatives(current_app.static_folder, pipeline)
+    finally:
+        pipeline.shutdown()
+    current_app.extensions['static_derivatives'].refresh()
+    current_app.extensions['fragment_cache'].invalidate('images')
+    current_app.extensions['page_snapshots'].invalidate()
+    print(f'{count} image derivatives up to date in static/images/derived')
+
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Bundle, minify, fingerprint and precompress static files into static/dist."""
+    from assets import DIST_DIR, build_assets, precompress_static
+
+    manifest = build_assets(current_app.static_folder, static_url_path=current_app.static_url_path)
+    current_app.extensions['asset_manifest'].refresh()
+    current_app.extensions['fragment_cache'].invalidate('assets')
+    current_app.extensions['page_snapshots'].invalidate()
+    print(f'{len(manifest)} assets written to static/{DIST_DIR}')
+    print(f'{precompress_static(current_app.static_folder)} static files precompressed in place')
+
+
+@click.command('build-snapshots')
+@with_appcontext
+def build_snapshots_command():
+    """Render the public marketing pages to static HTML in SNAPSHOT_FOLDER."""
+    from snapshots import render_snapshots
+
+    app = current_app._get_current_object()
+    count = render_snapshots(app, app.extensions['page_snapshots'], app.config['SNAPSHOT_BASE_URLS'])
+    print(f"{count} page snapshots written to {app.config['SNAPSHOT_FOLDER']}")
+
+
+@click.command('seed')
+@click.option('--scale', type=float, default=1.0, show_default=True,
+              help='Size relative to the base volumes (1 = 100k bookings, 1M notifications).')
+@click.option('--seed', 'rng_seed', type=int, default=None, help='RNG seed (same seed and scale, same rows).')
+@click.option('--anchor', type=click.DateTime(['%Y-%m-%d']), default=None,
+              help='Day the history ends and the calendars start (default: today).')
+@click.option('--reset', is_flag=True, help='Drop and recreate every table first.')
+@with_appcontext
+def seed_command(scale, rng_seed, anchor, reset):
+    """Fill the database with synthetic customers, bookings, orders and notifications."""
+    from seeding import DEFAULT_SEED, PASSWORD, SeedError, seed_database
+
+    if reset:
+        click.confirm(f'Drop every table in {db.engine.url.render_as_string(hide_password=True)}?', abort=True)
+    try:
+        counts = seed_database(db.engine, scale, DEFAULT_SEED if rng_seed is None else rng_seed,
+                               anchor.date() if anchor else None, reset=reset, log=click.echo)
+    except SeedError as e:
+        raise click.ClickException(str(e))
+    if 'page_snapshots' in current_app.extensions:
+        current_app.extensions['page_snapshots'].invalidate()
+    click.echo(f'{sum(counts.values())} rows seeded; accounts admin, tech1.., customer1.. use password {PASSWORD}')
+
+
+@click.command('send-messages')
+@click.option('--once', is_flag=True, help='Send what is due and exit instead of polling.')
+@with_appcontext
+def send_messages_command(once):
+    """Send queued e-mail, WhatsApp and SMS messages in batches until stopped."""
+    import asyncio
+    from messaging import Dispatcher
+
+    dispatcher = Dispatcher.from_config(current_app.config, current_app.extensions['messaging'].templates)
+    if not dispatcher.channels:
+        raise click.ClickException('No messaging channel is configured (MAIL_SERVER, WHATSAPP_*, TWILIO_*)')
+    ensure_schema()
+    click.echo(f'Sending {", ".join(dispatcher.channels)} messages')
+    try:
+        totals = asyncio.run(dispatcher.run(current_app.config['MESSAGING_POLL_INTERVAL'], once=once))
+    except KeyboardInterrupt:
+        totals = None
+    finally:
+        dispatcher.close()
+    if totals is not None:
+        click.echo(f"{totals['sent']} sent, {totals['retried']} to retry, {totals['failed']} failed")
+
+
+@click.command('relay-events')
+@click.option('--once', is_flag=True, help='Relay what is due and exit instead of polling.')
+@with_appcontext
+def relay_events_command(once):
+    """Hand committed outbox events to the notification, messaging and analytics consumers."""
+    from outbox import Relay
+
+    ensure_schema()
+    relay = Relay.from_config(current_app.config)
+    try:
+        totals = relay.run(current_app.config['OUTBOX_POLL_INTERVAL'], once=once)
+    except KeyboardInterrupt:
+        return
+    click.echo(f"{totals['published']} published, {totals['retried']} to retry, {totals['failed']} failed")
+
+
+def _invalidate_service_fragments(mapper, connection, target):
+    """Drop cached service JSON-LD and page snapshots when the catalogue changes"""
+    if not has_app_context() or 'page_snapshots' not in current_app.extensions:
+        return
+    current_app.extensions['fragment_cache'].invalidate('services')
+    current_app.extensions['page_snapshots'].invalidate()
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    db.event.listen(CarService, _event, _invalidate_service_fragments)
@@ -0,0 +1,195 @@
+"""
+Fragment Cache for Gaurav Motors
+`{% cache key, ttl, tags %}` Jinja extension and a small value cache with
+tag-based invalidation over a pluggable store
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class CacheStore(ABC):
+    """Interface every fragment cache store implements.
+
+    Values are stored under string keys with a TTL in seconds.  `incr()`
+    maintains the tag version counters and must not expire or be evicted.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the value for key, or None"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key for ttl seconds"""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Increment the counter under key and return its new value"""
+
+    @abstractmethod
+    def get_counter(self, key: str) -> int:
+        """Current value of the counter under key (0 when missing)"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every value and counter"""
+
+
+class NullStore(CacheStore):
+    """Caches nothing; every fragment is rendered"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def incr(self, key):
+        return 0
+
+    def get_counter(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+
+class MemoryStore(CacheStore):
+    """Per-process LRU store holding at most `max_entries` values"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._values: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires and expires < time.monotonic():
+            self._values.pop(key, None)
+            return None
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else 0
+        with self._lock:
+            self._values[key] = (expires, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+        return value
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class FragmentCache:
+    """Cached values whose keys embed the current version of their tags.
+
+    `invalidate('services')` bumps the tag's version, so every entry stored
+    under the old version is simply never read again (and ages out of the
+    store).  This works with any store that can count, without tracking
+    which keys belong to a tag.
+    """
+
+    def __init__(self, store: Optional[CacheStore] = None, default_ttl: float = 300,
+                 prefix: str = 'fragment'):
+        self.store = store if store is not None else MemoryStore()
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    def _key(self, key, tags: Iterable[str]) -> str:
+        if isinstance(key, (tuple, list)):
+            key = ':'.join(str(part) for part in key)
+        versions = ','.join(f'{tag}={self.store.get_counter(f"{self.prefix}:tag:{tag}")}'
+                            for tag in sorted(tags))
+        return f'{self.prefix}:{key}|{versions}'
+
+    def get(self, key: Hashable, tags: Iterable[str] = ()) -> Any:
+        return self.store.get(self._key(key, tags))
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            tags: Iterable[str] = ()) -> None:
+        self.store.set(self._key(key, tags), value, self.default_ttl if ttl is None else ttl)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None,
+                   tags: Iterable[str] = ()) -> Any:
+        """Return the cached value, calling loader() to fill a miss"""
+        tags = tuple(tags)
+        full_key = self._key(key, tags)
+        value = self.store.get(full_key)
+        if value is None:
+            value = loader()
+            self.store.set(full_key, value, self.default_ttl if ttl is None else ttl)
+        return value
+
+    def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self.store.incr(f'{self.prefix}:tag:{tag}')
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+class FragmentCacheExtension(Extension):
+    """Adds `{% cache key[, ttl[, tags]] %}...{% endcache %}` to Jinja.
+
+    The key may be a string or a tuple of parts; include everything the
+    fragment depends on (e.g. the user's role).  The cache is read from
+    `environment.fragment_cache`; when that is None fragments always render.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        for default in (nodes.Const(None), nodes.Const(())):
+            args.append(parser.parse_expression() if parser.stream.skip_if('comma') else default)
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', args), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, ttl, tags, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        if isinstance(tags, str):
+            tags = (tags,)
+        parts = tuple(key) if isinstance(key, (tuple, list)) else (key,)
+        html = cache.get_or_set(('template',) + parts, lambda: str(caller()), ttl=ttl, tags=tags)
+        return Markup(html)
+
+
+def create_fragment_cache(config) -> FragmentCache:
+    """Build the fragment cache selected by FRAGMENT_CACHE ('memory' or 'null')"""
+    if config.get('FRAGMENT_CACHE') == 'null':
+        store = NullStore()
+    else:
+        store = MemoryStore(max_entries=int(config.get('FRAGMENT_CACHE_MAX_ENTRIES') or 1024))
+    return FragmentCache(store, default_ttl=float(config.get('FRAGMENT_CACHE_TTL') or 300))
@@ -0,0 +1,116 @@
+"""
+Gunicorn Runtime Profile for Gaurav Motors
+Sizes workers and threads from the CPU cores the process may use and picks
+the worker class; every value can be overridden from the environment
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+import os
+import sys
+
+# Worker classes in order of preference when GUNICORN_WORKER_CLASS is unset.
+# gthread keeps a worker responsive while some threads wait on SMTP or a
+# long export; gevent does the same with greenlets but needs gevent installed.
+WORKER_CLASSES = ('gthread', 'gevent', 'sync')
+
+
+def cpu_count():
+    """Cores available to this process (respects affinity/cgroup cpusets)"""
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:  # macOS, Windows
+        return os.cpu_count() or 1
+
+
+def select_worker_class(requested):
+    """The requested worker class, falling back to gthread without gevent"""
+    requested = (requested or 'gthread').lower()
+    if requested not in WORKER_CLASSES:
+        raise ValueError(f'GUNICORN_WORKER_CLASS must be one of {", ".join(WORKER_CLASSES)}')
+    if requested == 'gevent':
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            print('gevent is not installed; using gthread workers', file=sys.stderr)
+            return 'gthread'
+    return requested
+
+
+def size_workers(worker_class, cores):
+    """(workers, threads) for a worker class on `cores` CPUs.
+
+    Sync workers handle one request each, so the classic 2 x cores + 1 keeps
+    CPUs busy while some block.  Threaded and gevent workers overlap I/O
+    inside the process, so one or two per core is enough.
+    """
+    if worker_class == 'sync':
+        return 2 * cores + 1, 1
+    if worker_class == 'gevent':
+        return cores + 1, 1
+    return max(cores, 2), 4
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+worker_class = select_worker_class(os.environ.get('GUNICORN_WORKER_CLASS'))
+
+_workers, _threads = size_workers(worker_class, cpu_count())
+workers = _env_int('WEB_CONCURRENCY', _workers)
+threads = _env_int('GUNICORN_THREADS', _threads)
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+# Read by engine_config.py to size each worker's database pool
+os.environ['WEB_CONCURRENCY'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+backlog = _env_int('GUNICORN_BACKLOG', 2048)
+
+# Import the app once in the master; workers fork with it already loaded.
+# gevent workers monkey-patch themselves after the fork, so they import the
+# app afterwards instead, or its locks and pools would be unpatched
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0' if worker_class == 'gevent' else '1') == '1'
+
+# Recycle workers after a while (guards against slow leaks); the jitter stops
+# every worker restarting at the same moment
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+# Seconds an idle keep-alive connection is held; keep this above the load
+# balancer's idle timeout so it never reuses a connection gunicorn closed
+keepalive = _env_int('GUNICORN_KEEPALIVE', 75)
+
+# Worker heartbeat files in memory rather than on a possibly slow disk
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+
+def when_ready(server):
+    server.log.info('Serving with %s %s worker(s) x %s thread(s)', workers, worker_class, threads)
+
+
+def post_fork(server, worker):
+    """Drop pooled DB connections inherited from the master.
+
+    A connection opened while preloading would otherwise be shared by every
+    worker; close=False leaves the parent's sockets alone and just starts
+    this worker with an empty pool.
+    """
+    # The preloaded app: app:app or an app from factory:create_app(...)
+    flask_app = getattr(getattr(server, 'app', None), 'callable', None)
+    if flask_app is None:
+        flask_app = getattr(sys.modules.get('app'), 'app', None)
+    db = getattr(flask_app, 'extensions', {}).get('sqlalchemy')
+    if db is None:
+        return
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
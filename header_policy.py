@@ -0,0 +1,129 @@
+"""
+Response Header Policy for Gaurav Motors
+Security and cache headers per route class (static, api, authenticated,
+public HTML), built once at startup and applied in one after_request pass,
+with an optional per-request CSP nonce for inline scripts
+"""
+import secrets
+from typing import Dict, Optional, Tuple
+
+from flask import g, request, session
+
+Headers = Tuple[Tuple[str, str], ...]
+
+STATIC_ENDPOINTS = frozenset(('static', 'asset'))
+
+# Sent with every response
+BASE_HEADERS: Headers = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('Strict-Transport-Security', 'max-age=31536000; includeSubDomains'),
+)
+
+# Added to HTML pages
+PAGE_HEADERS: Headers = (
+    ('X-Frame-Options', 'SAMEORIGIN'),
+    ('X-XSS-Protection', '1; mode=block'),
+    ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+    ('Permissions-Policy', 'geolocation=(), microphone=(), camera=()'),
+)
+
+CSP_DIRECTIVES: Tuple[Tuple[str, str], ...] = (
+    ('default-src', "'self'"),
+    ('script-src', "'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com "
+                   "https://fonts.googleapis.com https://checkout.razorpay.com"),
+    ('style-src', "'self' 'unsafe-inline' https://cdn.jsdelivr.net https://fonts.googleapis.com "
+                  "https://cdnjs.cloudflare.com"),
+    ('connect-src', "'self' https://cdn.jsdelivr.net https://lumberjack.razorpay.com"),
+    ('img-src', "'self' data: https:"),
+    ('font-src', "'self' https://fonts.gstatic.com https://cdnjs.cloudflare.com"),
+    ('frame-src', "'self' https://www.google.com https://maps.google.com https://api.razorpay.com "
+                  "https://checkout.razorpay.com"),
+)
+API_CSP = "default-src 'none'; frame-ancestors 'none'"
+
+NO_STORE = 'no-cache, no-store, must-revalidate'
+# Applied when the view did not choose its own Cache-Control, except for the
+# route classes in FORCED_CACHE, where they replace whatever the view chose
+CACHE_HEADERS: Dict[str, Headers] = {
+    'static': (),  # keep the long lifetimes set when static files and assets are sent
+    'api': (('Cache-Control', 'no-store'),),
+    'authenticated': (('Cache-Control', 'private, ' + NO_STORE), ('Pragma', 'no-cache'), ('Expires', '0')),
+    'public': (('Cache-Control', NO_STORE), ('Pragma', 'no-cache'), ('Expires', '0')),
+}
+# A signed-in user's responses (pages, record downloads through send_file)
+# must never land in a shared cache, whatever max-age the view set
+FORCED_CACHE = frozenset(('authenticated',))
+
+NONCE_PLACEHOLDER = '{nonce}'
+
+
+def build_csp(directives=CSP_DIRECTIVES, nonce: Optional[str] = None) -> str:
+    """The policy string; with a nonce it is added to script-src.
+
+    Browsers that understand nonces then ignore 'unsafe-inline', so a page
+    that asks for a nonce must put it on every inline <script>.
+    """
+    parts = []
+    for name, value in directives:
+        if nonce and name == 'script-src':
+            value = f"{value} 'nonce-{nonce}'"
+        parts.append(f'{name} {value}')
+    return '; '.join(parts)
+
+
+class HeaderPolicy:
+    """Precomputed header tuples per route class, applied to a response in one pass"""
+
+    def __init__(self, directives=CSP_DIRECTIVES):
+        csp = build_csp(directives)
+        # The nonce variant is split around the nonce once, so a request only concatenates
+        self.csp_with_nonce = tuple(build_csp(directives, NONCE_PLACEHOLDER).split(NONCE_PLACEHOLDER))
+        page = BASE_HEADERS + PAGE_HEADERS
+        self.security: Dict[str, Headers] = {
+            'static': BASE_HEADERS,
+            'api': BASE_HEADERS + (('X-Frame-Options', 'DENY'), ('Content-Security-Policy', API_CSP)),
+            'authenticated': page + (('Content-Security-Policy', csp),),
+            'public': page + (('Content-Security-Policy', csp),),
+        }
+        self.cache = CACHE_HEADERS
+        self.forced_cache = FORCED_CACHE
+
+    @staticmethod
+    def route_class() -> str:
+        if request.endpoint in STATIC_ENDPOINTS:
+            return 'static'
+        if request.blueprint == 'api' or request.path.startswith('/api/'):
+            return 'api'
+        # Flask-Login keeps the signed-in user's id in the session
+        if '_user_id' in session:
+            return 'authenticated'
+        return 'public'
+
+    def apply(self, response):
+        route_class = self.route_class()
+        headers = response.headers
+        headers.update(self.security[route_class])
+        nonce = g.get('csp_nonce')
+        if nonce and route_class in ('authenticated', 'public'):
+            headers['Content-Security-Policy'] = nonce.join(self.csp_with_nonce)
+        if route_class in self.forced_cache:
+            headers.update(self.cache[route_class])
+        elif 'Cache-Control' not in headers:
+            headers.extend(self.cache[route_class])
+        return response
+
+
+def csp_nonce() -> str:
+    """Nonce for this response's inline scripts (`<script nonce="{{ csp_nonce() }}">`), made on first use"""
+    nonce = g.get('csp_nonce')
+    if nonce is None:
+        nonce = g.csp_nonce = secrets.token_urlsafe(16)
+    return nonce
+
+
+def init_header_policy(app) -> HeaderPolicy:
+    policy = HeaderPolicy()
+    app.extensions['header_policy'] = policy
+    app.after_request(policy.apply)
+    app.add_template_global(csp_nonce)
+    return policy
@@ -0,0 +1,169 @@
+"""
+Shared Helpers for Gaurav Motors
+Role checks, queued e-mail and in-app notifications, dashboard statistics, and the
+catalogue-backed quote and chatbot engines used by the blueprints
+"""
+from datetime import datetime
+
+from flask import current_app, stream_with_context
+from flask_login import current_user
+
+from chatbot import CatalogueCache, IntentEngine
+from extensions import db
+from messaging import queue_message
+from models import (CustomerProfile, TechnicianProfile, SparePartCategory, SparePart, PartOrder,
+                    CarAccessory, CarService, ServiceBooking, TechnicianReview, Payment, Notification)
+from quotes import PriceEntry, PriceTable, QuoteEngine, WASH_CHARGE
+
+def is_admin():
+    return current_user.is_authenticated and current_user.role == 'admin'
+
+def is_technician():
+    return current_user.is_authenticated and current_user.role == 'technician'
+
+def is_customer():
+    return current_user.is_authenticated and current_user.role == 'customer'
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+
+def send_email(recipient, subject, body, html=True):
+    """Queue an already-rendered email in the current transaction (the caller commits);
+    False when e-mail is not configured"""
+    queued = queue_message('email', recipient, 'raw', subject=subject, body=body, html=html)
+    return queued is not None
+
+def send_service_confirmation(booking):
+    """Queue the service booking confirmation by email and WhatsApp in the current transaction"""
+    context = dict(
+        customer_name=booking.customer_name,
+        vehicle=f'{booking.vehicle_brand} {booking.vehicle_model} ({booking.vehicle_year})',
+        service_name=booking.service.name if booking.service else 'Service Booking',
+        booking_date=booking.booking_date.strftime('%B %d, %Y'),
+        booking_time=booking.booking_time.strftime('%I:%M %p'),
+        total_amount=booking.total_amount,
+    )
+    if booking.customer_email:
+        queue_message('email', booking.customer_email, 'service_confirmation', **context)
+    queue_message('whatsapp', booking.customer_phone, 'service_confirmation', **context)
+
+def create_notification(user_id, title, message, notification_type='system'):
+    """Create in-app notification in the current transaction (the caller commits)"""
+    notification = Notification(
+        user_id=user_id,
+        title=title,
+        message=message,
+        notification_type=notification_type
+    )
+    db.session.add(notification)
+    return notification
+
+def calculate_technician_rating(technician_id):
+    """Calculate average rating for a technician"""
+    reviews = TechnicianReview.query.filter_by(technician_id=technician_id).all()
+    if not reviews:
+        return 0
+    total = sum(review.rating for review in reviews)
+    return round(total / len(reviews), 1)
+
+def get_dashboard_stats():
+    """Get comprehensive statistics for admin dashboard"""
+    today = datetime.now().date()
+    this_month = datetime.now().replace(day=1).date()
+    
+    stats = {
+        'total_customers': CustomerProfile.query.count(),
+        'total_technicians': TechnicianProfile.query.count(),
+        'total_bookings': ServiceBooking.query.count(),
+        'todays_bookings': ServiceBooking.query.filter_by(booking_date=today).count(),
+        'pending_bookings': ServiceBooking.query.filter_by(status='Pending').count(),
+        'completed_bookings': ServiceBooking.query.filter_by(status='Completed').count(),
+        'monthly_bookings': ServiceBooking.query.filter(ServiceBooking.booking_date >= this_month).count(),
+        'total_revenue': db.session.query(db.func.sum(Payment.amount)).filter_by(status='Success').scalar() or 0,
+        'monthly_revenue': db.session.query(db.func.sum(Payment.amount)).filter(
+            Payment.status == 'Success',
+            Payment.transaction_date >= datetime.now().replace(day=1)
+        ).scalar() or 0,
+        'service_bookings': ServiceBooking.query.count(),
+        'pending_service_bookings': ServiceBooking.query.filter_by(status='Pending').count(),
+        'spare_parts_orders': PartOrder.query.count(),
+        'average_rating': db.session.query(db.func.avg(TechnicianReview.rating)).scalar() or 0
+    }
+    return stats
+
+def _load_price_table():
+    """Build the quoting engine's price table from the catalogue"""
+    services = db.session.query(CarService.id, CarService.name, CarService.price,
+                                CarService.duration_minutes).filter_by(is_active=True)
+    parts = db.session.query(SparePart.id, SparePart.name, SparePart.price)
+    accessories = db.session.query(CarAccessory.id, CarAccessory.name, CarAccessory.price)
+    return PriceTable(
+        services=[PriceEntry(*row) for row in services],
+        parts=[PriceEntry(*row) for row in parts],
+        accessories=[PriceEntry(*row) for row in accessories]
+    )
+
+quote_engine = QuoteEngine(_load_price_table)
+
+def _invalidate_price_table(mapper, connection, target):
+    quote_engine.invalidate()
+
+for _model in (CarService, SparePart, CarAccessory):
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        db.event.listen(_model, _event, _invalidate_price_table)
+
+def _services_snippet():
+    services = sorted(quote_engine.table.services.values(), key=lambda s: s.id)[:5]
+    if not services:
+        return "We offer various car services including maintenance, repairs, and detailing. Please visit our services page for more details."
+    response = "Here are our available services:\n"
+    for service in services:
+        response += f"• {service.name} - ₹{service.price} ({service.duration_minutes} mins)\n"
+    response += "\nYou can book a service through our website or contact us directly."
+    return response
+
+def _parts_snippet():
+    categories = SparePartCategory.query.all()
+    if not categories:
+        return "We stock a wide range of genuine spare parts for various car brands. Check our spare parts section."
+    response = "We have spare parts in these categories:\n"
+    for cat in categories:
+        response += f"• {cat.name}\n"
+    response += "\nBrowse our spare parts catalog on the website."
+    return response
+
+def _price_snippet():
+    services = quote_engine.price_list()
+    if not services:
+        return "💰 Our services start from budget-friendly prices.\n\n💳 50% advance payment accepted\n📞 Call for custom quote: 9997612579"
+    response = "💰 Our Current Pricing:\n\n"
+    for service in services:
+        response += f"🔧 {service.name}: ₹{service.price:,.0f} (~{service.duration_minutes} mins)\n"
+    response += f"\n🧽 Car wash add-on: +₹{WASH_CHARGE:,.0f}\n💳 50% advance payment accepted\n📞 Call for custom quote: 9997612579"
+    return response
+
+chatbot_catalogue = CatalogueCache()
+chatbot_catalogue.register('services', _services_snippet)
+chatbot_catalogue.register('parts', _parts_snippet)
+chatbot_catalogue.register('price', _price_snippet)
+chatbot_engine = IntentEngine(catalogue=chatbot_catalogue)
+
+def _invalidate_chatbot_snippet(name):
+    def listener(mapper, connection, target):
+        chatbot_catalogue.invalidate(name)
+    return listener
+
+for _model, _snippet in ((CarService, 'services'), (CarService, 'price'), (SparePartCategory, 'parts')):
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        db.event.listen(_model, _event, _invalidate_chatbot_snippet(_snippet))
+
+def get_chatbot_response(message):
+    """Generate chatbot response based on user message"""
+    return chatbot_engine.respond(message)
+
+# Export Routes
+def csv_response(rows, filename):
+    """Stream CSV rows as a download (compressed on the fly by the middleware)"""
+    response = current_app.response_class(stream_with_context(rows), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
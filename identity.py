@@ -0,0 +1,140 @@
+"""
+Identity Cache for Gaurav Motors
+Flask-Login's user loader: the user and their customer/technician profile in
+one joined query, remembered per process for a few seconds
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from flask import current_app, has_app_context, has_request_context, session
+from flask_login import user_logged_in
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from extensions import db, login_manager
+from fragment_cache import MemoryStore
+from models import CustomerProfile, TechnicianProfile, User
+
+PROFILES = {'customer_profile': CustomerProfile, 'technician_profile': TechnicianProfile}
+SESSION_KEY = '_identity_version'
+
+
+@dataclass(frozen=True)
+class Identity:
+    """Column values of a user and their profiles, never attached to a session"""
+    user: Tuple[Tuple[str, object], ...]
+    profiles: Tuple[Tuple[str, Optional[Tuple[Tuple[str, object], ...]]], ...]
+
+
+def _columns(instance) -> Tuple[Tuple[str, object], ...]:
+    return tuple((attr.key, getattr(instance, attr.key)) for attr in inspect(type(instance)).column_attrs)
+
+
+def _detached(model, columns):
+    instance = model(**dict(columns))
+    make_transient_to_detached(instance)
+    return instance
+
+
+class IdentityCache:
+    """Snapshots of loaded users keyed on user id, a per-user generation and the session's version.
+
+    A hit rebuilds fresh User/profile instances from the snapshot and attaches
+    them to the request's session without querying, so views can still edit
+    and commit them. Committing a change to a user or profile bumps that
+    user's generation in this process; the editing user's own session version
+    is bumped too, so their next request misses in every process. Other
+    processes see changes made elsewhere within `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 30, max_entries: int = 4096):
+        self.ttl = ttl
+        self.store = MemoryStore(max_entries)
+
+    def _key(self, user_id: int, version: int) -> str:
+        return f'{user_id}:{self.store.get_counter(f"user:{user_id}")}:{version}'
+
+    def load(self, user_id: int, version: int = 0) -> Optional[User]:
+        key = self._key(user_id, version)
+        identity = self.store.get(key) if self.ttl else None
+        if identity is not None:
+            return self._attach(identity)
+        user = User.with_profile('identity').filter_by(id=user_id).first()
+        if user is not None and self.ttl:
+            self.store.set(key, self.snapshot(user), self.ttl)
+        return user
+
+    @staticmethod
+    def snapshot(user: User) -> Identity:
+        return Identity(_columns(user), tuple(
+            (name, _columns(getattr(user, name)) if getattr(user, name) is not None else None)
+            for name in PROFILES))
+
+    @staticmethod
+    def _attach(identity: Identity) -> User:
+        user = _detached(User, identity.user)
+        for name, columns in identity.profiles:
+            profile = _detached(PROFILES[name], columns) if columns is not None else None
+            if profile is not None:
+                set_committed_value(profile, 'user', user)
+            set_committed_value(user, name, profile)
+        db.session.add(user)
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        self.store.incr(f'user:{user_id}')
+
+
+def session_version() -> int:
+    return session.get(SESSION_KEY, 0)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return current_app.extensions['identity_cache'].load(int(user_id), session_version())
+
+
+def _touched_users(db_session, flush_context, instances):
+    """Remember which users' identities a flush changed (applied once the transaction commits)"""
+    touched = db_session.info.setdefault('identity_touched', set())
+    for instance in list(db_session.dirty) + list(db_session.deleted):
+        if isinstance(instance, User):
+            touched.add(instance.id)
+    for instance in list(db_session.new) + list(db_session.dirty) + list(db_session.deleted):
+        if isinstance(instance, (CustomerProfile, TechnicianProfile)) and instance.user_id is not None:
+            touched.add(instance.user_id)
+
+
+def _invalidate_touched(db_session):
+    touched = db_session.info.pop('identity_touched', None)
+    if not touched or not has_app_context():
+        return
+    cache = current_app.extensions.get('identity_cache')
+    if cache is None:
+        return
+    for user_id in touched:
+        cache.invalidate(user_id)
+    if has_request_context() and session.get('_user_id') in {str(user_id) for user_id in touched}:
+        session[SESSION_KEY] = session_version() + 1
+
+
+def _forget_touched(db_session, previous_transaction=None):
+    db_session.info.pop('identity_touched', None)
+
+
+def _fresh_login(app, user, **extra):
+    # A login always starts from the database (ids can be reused once rows are deleted)
+    app.extensions['identity_cache'].invalidate(user.id)
+
+
+def init_identity(app) -> IdentityCache:
+    cache = IdentityCache(app.config['IDENTITY_CACHE_TTL'])
+    app.extensions['identity_cache'] = cache
+    return cache
+
+
+event.listen(Session, 'before_flush', _touched_users)
+event.listen(Session, 'after_commit', _invalidate_touched)
+event.listen(Session, 'after_soft_rollback', _forget_touched)
+user_logged_in.connect(_fresh_login)
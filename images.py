@@ -0,0 +1,156 @@
+"""
+Image Derivative Pipeline for Gaurav Motors
+Generates resized WebP copies of uploaded and static images in a process
+pool, and builds `srcset` strings for templates
+"""
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STANDARD_WIDTHS = (320, 640, 960, 1280)
+# Only formats the templates reference: srcset() lists WebP copies in <img srcset>
+FORMATS = ('webp',)
+QUALITY = {'webp': 80}
+SOURCE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
+DERIVED_DIR = 'images/derived'
+
+_DERIVATIVE_RE = re.compile(r'^(?P<stem>.+)-(?P<width>\d+)w\.(?P<fmt>[a-z0-9]+)$')
+
+logger = logging.getLogger(__name__)
+
+
+def derivative_name(stem: str, width: int, fmt: str) -> str:
+    return f'{stem}-{width}w.{fmt}'
+
+
+def is_image(filename: str) -> bool:
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in SOURCE_EXTENSIONS
+
+
+def make_derivatives(source_path: str, out_dir: str, stem: str,
+                     widths: Iterable[int] = STANDARD_WIDTHS,
+                     formats: Iterable[str] = FORMATS) -> List[Tuple[int, str, str]]:
+    """Write resized copies of an image; returns (width, format, path) tuples.
+
+    Widths wider than the source are skipped (the source width is used
+    instead), and existing derivatives newer than the source are kept.
+    Runs inside pool workers, so it must only depend on Pillow, which is
+    imported here so web processes that only list derivatives never load it.
+    """
+    from PIL import Image, ImageOps
+
+    os.makedirs(out_dir, exist_ok=True)
+    source_mtime = os.path.getmtime(source_path)
+    written = []
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        targets = sorted({min(width, image.width) for width in widths})
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = None
+            for fmt in formats:
+                path = os.path.join(out_dir, derivative_name(stem, width, fmt))
+                if os.path.exists(path) and os.path.getmtime(path) >= source_mtime:
+                    written.append((width, fmt, path))
+                    continue
+                if resized is None:
+                    resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                resized.save(tmp_path, format=fmt.upper(), quality=QUALITY.get(fmt, 80))
+                os.replace(tmp_path, path)
+                written.append((width, fmt, path))
+    return written
+
+
+class ImagePipeline:
+    """Runs make_derivatives() in a process pool.
+
+    The pool is created on first use with the 'spawn' start method so that
+    workers never inherit locks or DB connections from a threaded server.
+    With max_workers=0 jobs run inline (serverless, tests).
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, source_path: str, out_dir: str, stem: str, **options) -> Future:
+        if self.max_workers <= 0:
+            future = Future()
+            try:
+                future.set_result(make_derivatives(source_path, out_dir, stem, **options))
+            except Exception as e:
+                logger.warning(f'Image derivatives failed for {source_path}: {e}')
+                future.set_exception(e)
+            return future
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        future = self._executor.submit(make_derivatives, source_path, out_dir, stem, **options)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f'Image derivatives failed: {future.exception()}')
+
+    def map(self, jobs: Iterable[Tuple[str, str, str]]) -> List[Future]:
+        return [self.submit(*job) for job in jobs]
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def build_static_derivatives(static_folder: str, pipeline: ImagePipeline,
+                             widths: Iterable[int] = STANDARD_WIDTHS) -> int:
+    """Generate derivatives for every raster image under static/images"""
+    source_dir = os.path.join(static_folder, 'images')
+    out_dir = os.path.join(static_folder, DERIVED_DIR)
+    jobs = []
+    for name in sorted(os.listdir(source_dir)):
+        path = os.path.join(source_dir, name)
+        if os.path.isfile(path) and is_image(name):
+            jobs.append((path, out_dir, os.path.splitext(name)[0]))
+    futures = [pipeline.submit(*job, widths=widths) for job in jobs]
+    return sum(len(future.result()) for future in futures)
+
+
+class StaticDerivatives:
+    """Index of built static derivatives used by the srcset() helper"""
+
+    def __init__(self, static_folder: str):
+        self.static_folder = static_folder
+        self._index: Optional[Dict[Tuple[str, str], List[Tuple[int, str]]]] = None
+
+    def refresh(self) -> None:
+        self._index = None
+
+    def _load(self):
+        index: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        derived = os.path.join(self.static_folder, DERIVED_DIR)
+        if os.path.isdir(derived):
+            for name in os.listdir(derived):
+                match = _DERIVATIVE_RE.match(name)
+                if match:
+                    key = (match['stem'], match['fmt'])
+                    index.setdefault(key, []).append((int(match['width']), f'{DERIVED_DIR}/{name}'))
+        for entries in index.values():
+            entries.sort()
+        self._index = index
+        return index
+
+    def candidates(self, filename: str, fmt: str = 'webp') -> List[Tuple[int, str]]:
+        """(width, static filename) pairs for an image such as 'images/gm1.jpg'"""
+        index = self._index if self._index is not None else self._load()
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        return index.get((stem, fmt), [])
@@ -3,12 +3,16 @@ Database initialization script for Gaurav Motors Car Service Center
 Transforms the HMS database to automotive service management
 """
 
-from app import app, db
-from app import (User, ServiceDepartment, TechnicianProfile, CustomerProfile, 
+from credentials import current_credentials
+from extensions import db
+from factory import create_app
+from models import (User, ServiceDepartment, TechnicianProfile, CustomerProfile, 
                 ServiceBooking, ServiceWork, Availability, VehicleRecord, 
                 VehicleHistory, TechnicianReview, ServiceReview, SparePartCategory, 
                 SparePart, PartOrder, Payment, Notification)
-from werkzeug.security import generate_password_hash
+
+# Only the models are needed, so no blueprints are loaded
+app = create_app(blueprints=())
 
 def init_automotive_db():
     """Initialize the automotive service database with sample data"""
@@ -24,7 +28,7 @@ def init_automotive_db():
             admin_user = User(
                 username='admin',
                 email='admin@gauravmotors.com',
-                password_hash=generate_password_hash('Admin@123456'),
+                password_hash=current_credentials().hash('Admin@123456'),
                 role='admin'
             )
             db.session.add(admin_user)
@@ -53,7 +57,7 @@ def init_automotive_db():
             tech_user = User(
                 username='drjohn',
                 email='technician@gauravmotors.com',
-                password_hash=generate_password_hash('doctor'),
+                password_hash=current_credentials().hash('doctor'),
                 role='technician'
             )
             db.session.add(tech_user)
@@ -76,7 +80,7 @@ def init_automotive_db():
             customer_user = User(
                 username='kar',
                 email='customer@gauravmotors.com',
-                password_hash=generate_password_hash('kar123'),
+                password_hash=current_credentials().hash('kar123'),
                 role='customer'
             )
             db.session.add(customer_user)
@@ -3,7 +3,9 @@
 import sys
 sys.path.insert(0, '.')
 
-from app import app, db
+from db_schema import upgrade_schema
+from extensions import db
+from init_automotive_db import app, init_automotive_db
 
 print("Initializing database...")
 
@@ -11,11 +13,11 @@ with app.app_context():
     try:
         print("Creating all tables...")
         db.create_all()
+        upgrade_schema()
         print("✓ Database tables created successfully!")
         
         # Now try to init with sample data
         print("\nInitializing with sample data...")
-        from init_automotive_db import init_automotive_db
         init_automotive_db()
         print("✓ Sample data loaded!")
         
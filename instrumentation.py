@@ -0,0 +1,284 @@
+"""
+Request Instrumentation for Gaurav Motors
+Per-request timing (Server-Timing header), SQL query counting with a slow
+query log and N+1 detection (fatal in tests), and Prometheus metrics served at /metrics
+"""
+import bisect
+import hmac
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger('instrumentation')
+
+# Latency buckets in seconds (the Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+# Endpoints left out of the metrics (scrapes and static files would swamp them)
+SKIP_ENDPOINTS = {'metrics', 'static', 'asset'}
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class QueryStats:
+    """Queries run while handling one request"""
+
+    __slots__ = ('count', 'duration', 'statements', 'slow')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.slow = 0
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int):
+        """[(statement, times)] run at least `threshold` times, most repeated first"""
+        if threshold <= 0:
+            return []
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+
+
+class RepeatedQueryError(AssertionError):
+    """Raised in N_PLUS_ONE_RAISE mode when a request repeats a statement"""
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Query statistics of the request being handled, if it is instrumented"""
+    return g.get('query_stats') if has_request_context() else None
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, documentation, labels, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts (last one is +Inf), then the sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                yield '_bucket', labels + (_format_bound(bound),), self.labels + ('le',), cumulative
+            yield '_sum', labels, self.labels, series[-1]
+            yield '_count', labels, self.labels, cumulative
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for suffix, values, names, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}')
+        return lines
+
+
+class CounterMetric:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple[str, ...]) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f'{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics one process exports.
+
+    Values are per process: with several gunicorn workers each scrape
+    reaches one of them, so aggregate with sum()/rate() across instances
+    or scrape every worker.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Time spent handling a request, by route.',
+            ('endpoint', 'method'), buckets)
+        self.requests = CounterMetric(
+            'http_requests_total', 'Requests handled, by route and status code.',
+            ('endpoint', 'method', 'status'))
+        self.request_queries = Histogram(
+            'db_queries_per_request', 'SQL statements run while handling a request, by route.',
+            ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.query_duration = CounterMetric(
+            'db_query_duration_seconds_total', 'Time spent in SQL statements, by route.', ('endpoint',))
+        self.slow_queries = CounterMetric(
+            'db_slow_queries_total', 'Statements slower than SLOW_QUERY_MS, by route.', ('endpoint',))
+        self.repeated_queries = CounterMetric(
+            'db_repeated_query_requests_total',
+            'Requests that repeated one statement N_PLUS_ONE_THRESHOLD times or more (likely N+1), by route.',
+            ('endpoint',))
+        self.rate_limited = CounterMetric(
+            'http_rate_limited_total', 'Requests rejected with 429 by the rate limiter, by route.', ('endpoint',))
+        self.rate_limit_errors = CounterMetric(
+            'rate_limit_backend_errors_total',
+            'Rate limit checks skipped because the counter store failed, by route.', ('endpoint',))
+
+    def metrics(self):
+        return (self.request_duration, self.requests, self.request_queries, self.query_duration,
+                self.slow_queries, self.repeated_queries, self.rate_limited, self.rate_limit_errors)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _endpoint() -> str:
+    # The route name, never the raw path, so labels stay bounded
+    return request.endpoint or 'unmatched'
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement run on an engine and charge it to the current request"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('instrumentation.started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('instrumentation.started')
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        stats = current_stats()
+        if stats is None:
+            return
+        stats.record(statement, duration)
+        slow_after = current_app.config['SLOW_QUERY_MS'] / 1000
+        if slow_after and duration >= slow_after:
+            stats.slow += 1
+            # Bound parameters are left out: they carry e-mails, phone numbers and password hashes
+            logger.warning('Slow query (%.1f ms) in %s: %s', duration * 1000, _endpoint(), statement)
+
+    @event.listens_for(engine, 'handle_error')
+    def drop_timer(exception_context):
+        # after_cursor_execute is not called for failed statements
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('instrumentation.started'):
+            connection.info['instrumentation.started'].pop()
+
+
+def init_instrumentation(app, registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """Install the request timer, Server-Timing header and /metrics route"""
+    registry = registry or MetricsRegistry()
+    app.extensions['metrics'] = registry
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        stats = g.pop('query_stats', None)
+        if started is None or stats is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = _endpoint()
+        if app.config['SERVER_TIMING']:
+            response.headers.add('Server-Timing', server_timing(elapsed, stats))
+        repeated = stats.repeated(app.config['N_PLUS_ONE_THRESHOLD'])
+        for statement, times in repeated:
+            logger.warning('Possible N+1 in %s: statement run %d times: %s', endpoint, times, statement)
+        if repeated and app.config['N_PLUS_ONE_RAISE']:
+            statement, times = repeated[0]
+            raise RepeatedQueryError(f'{endpoint} ran one statement {times} times '
+                                     f'(N_PLUS_ONE_THRESHOLD={app.config["N_PLUS_ONE_THRESHOLD"]}): {statement}')
+        if endpoint in SKIP_ENDPOINTS:
+            return response
+        registry.request_duration.observe((endpoint, request.method), elapsed)
+        registry.requests.inc((endpoint, request.method, str(response.status_code)))
+        registry.request_queries.observe((endpoint,), stats.count)
+        if stats.duration:
+            registry.query_duration.inc((endpoint,), stats.duration)
+        if stats.slow:
+            registry.slow_queries.inc((endpoint,), stats.slow)
+        if repeated:
+            registry.repeated_queries.inc((endpoint,))
+        return response
+
+    # In production /metrics only exists behind a token; an unset token must not publish it
+    if app.config['METRICS_TOKEN'] or not app.config['METRICS_REQUIRE_TOKEN']:
+        app.add_url_rule('/metrics', 'metrics', metrics)
+    return registry
+
+
+def server_timing(elapsed: float, stats: QueryStats) -> str:
+    """Server-Timing value: time in SQL, in the app outside SQL, and in total"""
+    db_ms = stats.duration * 1000
+    total_ms = elapsed * 1000
+    return (f'db;dur={db_ms:.1f};desc="{stats.count} queries", '
+            f'app;dur={max(total_ms - db_ms, 0):.1f}, total;dur={total_ms:.1f}')
+
+
+def metrics():
+    """Prometheus text exposition of this process's metrics"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            return 'Unauthorized\n', 401, {'Content-Type': 'text/plain', 'WWW-Authenticate': 'Bearer'}
+    body = current_app.extensions['metrics'].render()
+    return body, 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE}
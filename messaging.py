@@ -0,0 +1,453 @@
+"""
+Outbound Messaging for Gaurav Motors
+E-mail, WhatsApp and SMS queued in the outbound_message table and sent in
+batches by an asyncio dispatcher (`flask send-messages`): persistent SMTP
+connections, pooled HTTP sessions for the WhatsApp and SMS APIs, per-channel
+concurrency limits and retries with backoff, and message bodies rendered from
+templates compiled once per process
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import re
+import smtplib
+import ssl
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flask import current_app
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+from extensions import db
+from models import OutboundMessage
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ('email', 'whatsapp', 'sms')
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'messages')
+
+
+class DeliveryError(Exception):
+    """Raised by a channel when a message was not delivered; `retry` is False when resending cannot help"""
+
+    def __init__(self, message: str, retry: bool = True):
+        super().__init__(message)
+        self.retry = retry
+
+
+@dataclass(frozen=True)
+class Rendered:
+    id: int
+    channel: str
+    recipient: str
+    subject: str
+    body: str
+    html: bool
+
+
+def normalize_phone(phone: str, country_code: str = '91') -> str:
+    """'98765 43210' or '+91-9876543210' to E.164 ('+919876543210'); local numbers get country_code"""
+    digits = re.sub(r'\D', '', phone or '')
+    if not digits:
+        return ''
+    if (phone or '').strip().startswith('+'):
+        return f'+{digits}'
+    return f'+{country_code}{digits.lstrip("0")}' if len(digits.lstrip('0')) <= 10 else f'+{digits}'
+
+
+class MessageTemplates:
+    """Every template in templates/messages, compiled once when the process starts.
+
+    `<name>.email.html` is the e-mail body and sets `subject` at the top
+    (`{% set subject = ... %}`); `<name>.txt` is the WhatsApp/SMS text. One
+    render produces both: the subject is read off the rendered module.
+    """
+
+    def __init__(self, folder: str = TEMPLATE_FOLDER):
+        self.env = Environment(loader=FileSystemLoader(folder), autoescape=select_autoescape(['html']),
+                               undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
+        self.templates = {name: self.env.get_template(name) for name in self.env.list_templates()}
+
+    @staticmethod
+    def filename(name: str, channel: str) -> str:
+        return f'{name}.email.html' if channel == 'email' else f'{name}.txt'
+
+    def exists(self, name: str, channel: str) -> bool:
+        return self.filename(name, channel) in self.templates
+
+    def render(self, name: str, channel: str, context: dict) -> Tuple[str, str, bool]:
+        """(subject, body, is_html) for one message"""
+        template = self.templates.get(self.filename(name, channel))
+        if template is None:
+            raise DeliveryError(f'No {channel} template {name!r}', retry=False)
+        module = template.make_module(context)
+        return (str(getattr(module, 'subject', '')).strip(), str(module).strip(),
+                channel == 'email' and getattr(module, 'html', True))
+
+
+class Channel(ABC):
+    """Delivers rendered messages of one kind, at most `concurrency` at a time.
+
+    Delivery runs on the channel's own threads, so a slow mail server never
+    holds up WhatsApp or SMS sends.
+    """
+    name = ''
+
+    def __init__(self, concurrency: int = 4):
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(concurrency, thread_name_prefix=f'send-{self.name}')
+
+    async def send(self, message: Rendered) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.deliver, message)
+
+    @abstractmethod
+    def deliver(self, message: Rendered) -> None:
+        """Send one message, raising DeliveryError when it did not go out"""
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class SmtpChannel(Channel):
+    """E-mail over SMTP connections kept open between messages (one per concurrent send).
+
+    A connection the server closed while idle is replaced and the message
+    resent once; refused recipients and other 5xx replies are not retried.
+    """
+    name = 'email'
+
+    def __init__(self, host: str, port: int, sender: str, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: bool = False, use_ssl: bool = False,
+                 timeout: float = 10, concurrency: int = 2):
+        super().__init__(concurrency)
+        self.host, self.port, self.sender = host, port, sender
+        self.username, self.password = username, password
+        self.use_tls, self.use_ssl, self.timeout = use_tls, use_ssl, timeout
+        self._idle: 'queue.LifoQueue[smtplib.SMTP]' = queue.LifoQueue()
+
+    @classmethod
+    def from_config(cls, config) -> 'SmtpChannel':
+        return cls(config['MAIL_SERVER'], config['MAIL_PORT'], config['MAIL_DEFAULT_SENDER'],
+                   config['MAIL_USERNAME'], config['MAIL_PASSWORD'], config['MAIL_USE_TLS'],
+                   config['MAIL_USE_SSL'], config['MAIL_TIMEOUT'], config['MESSAGING_EMAIL_CONCURRENCY'])
+
+    def _connect(self) -> smtplib.SMTP:
+        try:
+            if self.use_ssl:
+                smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                        context=ssl.create_default_context())
+            else:
+                smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.username:
+                smtp.login(self.username, self.password)
+        except (OSError, smtplib.SMTPException) as e:
+            raise DeliveryError(f'SMTP {self.host}:{self.port}: {e}') from e
+        return smtp
+
+    def _email(self, message: Rendered) -> EmailMessage:
+        email = EmailMessage()
+        email['Subject'] = message.subject
+        email['From'] = self.sender
+        email['To'] = message.recipient
+        # The same id on every attempt, so a resend after a lost reply can be recognised downstream
+        email['Message-ID'] = f'<outbound-{message.id}@{self.sender.rpartition("@")[2] or "localhost"}>'
+        email.set_content(message.body, subtype='html' if message.html else 'plain')
+        return email
+
+    def deliver(self, message):
+        email = self._email(message)
+        try:
+            smtp, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            smtp, reused = self._connect(), False
+        try:
+            self._send(smtp, email)
+        except smtplib.SMTPServerDisconnected as e:
+            if not reused:
+                raise DeliveryError(f'SMTP {self.host}:{self.port}: {e}') from e
+            # The server dropped the connection while it sat idle: resend once on a new one
+            try:
+                self._send(self._connect(), email)
+            except smtplib.SMTPServerDisconnected as retry_error:
+                raise DeliveryError(f'SMTP {self.host}:{self.port}: {retry_error}') from retry_error
+
+    def _send(self, smtp: smtplib.SMTP, email: EmailMessage) -> None:
+        """Send on this connection and return it to the idle pool unless it is broken"""
+        try:
+            smtp.send_message(email)
+        except smtplib.SMTPServerDisconnected:
+            smtp.close()
+            raise
+        except smtplib.SMTPRecipientsRefused as e:
+            self._idle.put(smtp)
+            raise DeliveryError(f'Recipient refused: {e.recipients}', retry=False) from e
+        except smtplib.SMTPResponseException as e:
+            self._idle.put(smtp)
+            raise DeliveryError(f'SMTP {e.smtp_code}: {e.smtp_error!r}', retry=e.smtp_code < 500) from e
+        except (OSError, smtplib.SMTPException) as e:
+            smtp.close()
+            raise DeliveryError(f'SMTP {self.host}:{self.port}: {e}') from e
+        self._idle.put(smtp)
+
+    def close(self):
+        super().close()
+        while True:
+            try:
+                smtp = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                smtp.close()
+
+
+class HttpChannel(Channel):
+    """Messages posted to an HTTP API over one keep-alive connection pool.
+
+    Timeouts, connection errors, 429 and 5xx answers are retried later;
+    other 4xx answers mean the request itself is wrong and are not.
+    """
+
+    def __init__(self, url: str, concurrency: int = 4, timeout: Tuple[float, float] = (3.05, 10)):
+        # Only the dispatcher sends; web workers that merely queue never import requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        super().__init__(concurrency)
+        self.url = url
+        self.timeout = timeout
+        self.session_error = requests.RequestException
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @abstractmethod
+    def request(self, message: Rendered) -> dict:
+        """Keyword arguments for session.post()"""
+
+    def deliver(self, message):
+        try:
+            response = self.session.post(self.url, timeout=self.timeout, **self.request(message))
+        except self.session_error as e:
+            raise DeliveryError(f'{self.name} API: {e}') from e
+        if response.status_code >= 400:
+            raise DeliveryError(f'{self.name} API returned {response.status_code}: {response.text[:200]}',
+                                retry=response.status_code == 429 or response.status_code >= 500)
+
+    def close(self):
+        super().close()
+        self.session.close()
+
+
+class WhatsAppChannel(HttpChannel):
+    """Text messages through the WhatsApp Business Cloud API"""
+    name = 'whatsapp'
+
+    def __init__(self, api_url: str, phone_number_id: str, access_token: str, **kwargs):
+        super().__init__(f'{api_url.rstrip("/")}/{phone_number_id}/messages', **kwargs)
+        self.session.headers['Authorization'] = f'Bearer {access_token}'
+
+    @classmethod
+    def from_config(cls, config) -> 'WhatsAppChannel':
+        return cls(config['WHATSAPP_API_URL'], config['WHATSAPP_PHONE_NUMBER_ID'], config['WHATSAPP_ACCESS_TOKEN'],
+                   concurrency=config['MESSAGING_WHATSAPP_CONCURRENCY'],
+                   timeout=(config['MESSAGING_CONNECT_TIMEOUT'], config['MESSAGING_READ_TIMEOUT']))
+
+    def request(self, message):
+        return {'json': {'messaging_product': 'whatsapp', 'to': message.recipient.lstrip('+'),
+                         'type': 'text', 'text': {'preview_url': False, 'body': message.body}}}
+
+
+class SmsChannel(HttpChannel):
+    """SMS through Twilio's Messages API"""
+    name = 'sms'
+
+    def __init__(self, api_url: str, account_sid: str, auth_token: str, sender: str, **kwargs):
+        super().__init__(f'{api_url.rstrip("/")}/Accounts/{account_sid}/Messages.json', **kwargs)
+        self.session.auth = (account_sid, auth_token)
+        self.sender = sender
+
+    @classmethod
+    def from_config(cls, config) -> 'SmsChannel':
+        return cls(config['TWILIO_API_URL'], config['TWILIO_ACCOUNT_SID'], config['TWILIO_AUTH_TOKEN'],
+                   config['TWILIO_PHONE_NUMBER'], concurrency=config['MESSAGING_SMS_CONCURRENCY'],
+                   timeout=(config['MESSAGING_CONNECT_TIMEOUT'], config['MESSAGING_READ_TIMEOUT']))
+
+    def request(self, message):
+        return {'data': {'From': self.sender, 'To': message.recipient, 'Body': message.body}}
+
+
+CHANNEL_CLASSES = {'email': SmtpChannel, 'whatsapp': WhatsAppChannel, 'sms': SmsChannel}
+
+
+def enabled_channels(config) -> Tuple[str, ...]:
+    """Channels whose credentials are configured; messages for the others are never queued"""
+    required = {
+        # MAIL_SERVER and MAIL_DEFAULT_SENDER have defaults, so only the login shows e-mail is set up
+        'email': ('MAIL_SERVER', 'MAIL_DEFAULT_SENDER', 'MAIL_USERNAME'),
+        'whatsapp': ('WHATSAPP_PHONE_NUMBER_ID', 'WHATSAPP_ACCESS_TOKEN'),
+        'sms': ('TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN', 'TWILIO_PHONE_NUMBER'),
+    }
+    return tuple(channel for channel in CHANNELS if all(config.get(key) for key in required[channel]))
+
+
+class Dispatcher:
+    """Sends due outbound messages in batches.
+
+    Each batch is claimed by pushing its rows' next attempt `lease` seconds
+    ahead (with SKIP LOCKED where the database has it, so several
+    dispatchers can share the table), sent concurrently within each
+    channel's limit, and settled in one commit. A dispatcher that dies
+    mid-batch leaves its rows to be claimed again once the lease runs out, so
+    delivery is at least once. Failures are retried `retry_base` seconds
+    later, doubling each attempt, up to `max_attempts`.
+    """
+
+    def __init__(self, channels: Dict[str, Channel], templates: MessageTemplates, batch_size: int = 100,
+                 max_attempts: int = 5, retry_base: float = 30, lease: float = 300):
+        self.channels = channels
+        self.templates = templates
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lease = lease
+
+    @classmethod
+    def from_config(cls, config, templates: MessageTemplates) -> 'Dispatcher':
+        channels = {name: CHANNEL_CLASSES[name].from_config(config) for name in enabled_channels(config)}
+        return cls(channels, templates, config['MESSAGING_BATCH_SIZE'], config['MESSAGING_MAX_ATTEMPTS'],
+                   config['MESSAGING_RETRY_BASE'], config['MESSAGING_LEASE'])
+
+    def claim(self, now: datetime) -> List[OutboundMessage]:
+        messages = (OutboundMessage.query
+                    .filter(OutboundMessage.status == 'Pending', OutboundMessage.next_attempt_at <= now,
+                            OutboundMessage.channel.in_(list(self.channels)))
+                    .order_by(OutboundMessage.next_attempt_at, OutboundMessage.id)
+                    .limit(self.batch_size).with_for_update(skip_locked=True).all())
+        for message in messages:
+            message.attempts += 1
+            message.next_attempt_at = now + timedelta(seconds=self.lease)
+        db.session.commit()
+        return messages
+
+    def render(self, message: OutboundMessage) -> Rendered:
+        subject, body, html = self.templates.render(message.template, message.channel, json.loads(message.context))
+        return Rendered(message.id, message.channel, message.recipient, subject, body, html)
+
+    async def dispatch(self, messages: Sequence[Rendered]) -> List[Optional[DeliveryError]]:
+        """Send the messages, each channel at most `concurrency` at once; None for each one delivered"""
+        limits = {name: asyncio.Semaphore(channel.concurrency) for name, channel in self.channels.items()}
+
+        async def send(message):
+            async with limits[message.channel]:
+                try:
+                    await self.channels[message.channel].send(message)
+                except DeliveryError as e:
+                    return e
+                except Exception as e:
+                    logger.exception('Unexpected error sending message %s', message.id)
+                    return DeliveryError(f'{type(e).__name__}: {e}')
+            return None
+
+        return await asyncio.gather(*(send(message) for message in messages))
+
+    def settle(self, message: OutboundMessage, error: Optional[DeliveryError], now: datetime) -> str:
+        if error is None:
+            message.status, message.sent_at, message.last_error = 'Sent', now, None
+            return 'sent'
+        message.last_error = str(error)[:500]
+        if not error.retry or message.attempts >= self.max_attempts:
+            message.status = 'Failed'
+            logger.warning('Giving up on %s message %s to %s: %s', message.channel, message.id,
+                           message.recipient, error)
+            return 'failed'
+        message.next_attempt_at = now + timedelta(seconds=self.retry_base * 2 ** (message.attempts - 1))
+        return 'retried'
+
+    async def run_batch(self) -> Counter:
+        """Claim, send and settle one batch; returns how many were sent, retried and failed"""
+        messages = self.claim(datetime.utcnow())
+        results: Dict[int, Optional[DeliveryError]] = {}
+        rendered = []
+        for message in messages:
+            try:
+                rendered.append(self.render(message))
+            except DeliveryError as e:
+                results[message.id] = e
+            except Exception as e:
+                results[message.id] = DeliveryError(f'Rendering failed: {type(e).__name__}: {e}', retry=False)
+        results.update(zip((message.id for message in rendered), await self.dispatch(rendered)))
+        now = datetime.utcnow()
+        outcome = Counter(self.settle(message, results[message.id], now) for message in messages)
+        db.session.commit()
+        return outcome
+
+    async def run(self, poll_interval: float = 5, once: bool = False) -> Counter:
+        """Send batches until the queue is drained (once) or forever, polling while it is empty"""
+        totals = Counter()
+        while True:
+            outcome = await self.run_batch()
+            totals.update(outcome)
+            if not outcome:
+                if once:
+                    return totals
+                await asyncio.sleep(poll_interval)
+
+    def close(self) -> None:
+        for channel in self.channels.values():
+            channel.close()
+
+
+class Messaging:
+    """The web side: the compiled templates and which channels can be queued for"""
+
+    def __init__(self, templates: MessageTemplates, channels: Sequence[str], country_code: str = '91'):
+        self.templates = templates
+        self.channels = tuple(channels)
+        self.country_code = country_code
+
+    def queue(self, channel: str, recipient: str, template: str, **context) -> Optional[OutboundMessage]:
+        if channel not in CHANNELS:
+            raise ValueError(f'Unknown channel {channel!r} (choose from {", ".join(CHANNELS)})')
+        if not self.templates.exists(template, channel):
+            raise ValueError(f'No {channel} template {template!r} in templates/messages')
+        if channel != 'email':
+            recipient = normalize_phone(recipient, self.country_code)
+        if channel not in self.channels or not recipient:
+            return None
+        message = OutboundMessage(channel=channel, recipient=recipient, template=template,
+                                  context=json.dumps(context, default=str))
+        db.session.add(message)
+        return message
+
+
+def queue_message(channel: str, recipient: str, template: str, **context) -> Optional[OutboundMessage]:
+    """Add a message to the outbox in the current transaction (the caller commits).
+
+    Returns None without queueing when the channel is not configured or the
+    recipient is empty. Context values must be JSON-serialisable (anything
+    else is stored as its str()).
+    """
+    return current_app.extensions['messaging'].queue(channel, recipient, template, **context)
+
+
+def render_message(template: str, channel: str = 'whatsapp', **context) -> str:
+    """A message body rendered now, for links that prefill a message (wa.me, sms:)"""
+    return current_app.extensions['messaging'].templates.render(template, channel, context)[1]
+
+
+def init_messaging(app) -> Messaging:
+    messaging = Messaging(MessageTemplates(), enabled_channels(app.config), app.config['MESSAGING_COUNTRY_CODE'])
+    app.extensions['messaging'] = messaging
+    return messaging
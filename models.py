@@ -0,0 +1,447 @@
+"""
+Database Models for Gaurav Motors
+Importing this module needs only Flask-SQLAlchemy and Flask-Login, so scripts
+that work on the database alone skip the routes and their dependencies
+"""
+from datetime import datetime
+
+from flask_login import UserMixin
+from sqlalchemy.orm import joinedload, selectinload
+
+from credentials import current_credentials
+from extensions import db
+
+class LoadingProfiles:
+    """Named eager-loading option sets for a model's views.
+
+    A profile lists relationship paths ('part', 'user', 'part.category');
+    many-to-one steps are joined into the query and collections fetched
+    with one SELECT ... IN per level, so a page costs the same number of
+    queries whether it lists ten rows or ten thousand.
+    """
+    loading_profiles = {}
+
+    @classmethod
+    def loader_options(cls, name):
+        try:
+            paths = cls.loading_profiles[name]
+        except KeyError:
+            raise ValueError(f'{cls.__name__} has no loading profile {name!r}') from None
+        return [_loader_option(cls, path) for path in paths]
+
+    @classmethod
+    def with_profile(cls, name):
+        """cls.query with the named profile's loader options applied"""
+        return cls.query.options(*cls.loader_options(name))
+
+def _loader_option(model, path):
+    option = None
+    for step in path.split('.'):
+        relationship = db.inspect(model).relationships[step]
+        strategy = selectinload if relationship.uselist else joinedload
+        attribute = relationship.class_attribute
+        option = strategy(attribute) if option is None else getattr(option, strategy.__name__)(attribute)
+        model = relationship.mapper.class_
+    return option
+
+class User(LoadingProfiles, UserMixin, db.Model):
+    # Flask-Login's loader (identity.py) reads the user and profile in one query
+    loading_profiles = {'identity': ('customer_profile', 'technician_profile')}
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(200), nullable=False)
+    role = db.Column(db.String(20), nullable=False)  # 'admin', 'technician', 'customer'
+
+    def set_password(self, password):
+        self.password_hash = current_credentials().hash(password)
+
+    def check_password(self, password):
+        """Verify a password, upgrading the stored hash if PASSWORD_HASH_METHOD has changed
+        (the caller commits). Raises CredentialsBusy when the verification pool is full."""
+        verification = current_credentials().verify(self.password_hash, password)
+        if verification.rehash:
+            self.password_hash = verification.rehash
+        return verification.valid
+
+class ServiceDepartment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), unique=True, nullable=False)
+    description = db.Column(db.String(300))
+    technicians = db.relationship('TechnicianProfile', backref='service_department', lazy=True)
+
+class TechnicianProfile(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    specialization = db.Column(db.String(120), nullable=False)  # Engine, Transmission, Electrical etc.
+    department_id = db.Column(db.Integer, db.ForeignKey('service_department.id'), nullable=True)
+    availability = db.Column(db.String(300))  # simple text or JSON string of available days/times
+    user = db.relationship('User', backref=db.backref('technician_profile', uselist=False))
+    service_bookings = db.relationship('ServiceBooking', backref='technician', lazy=True)
+    avail_slots = db.relationship('Availability', backref='technician', lazy=True, cascade='all, delete-orphan')
+
+class CustomerProfile(LoadingProfiles, db.Model):
+    loading_profiles = {'admin_list': ('user',)}
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    contact = db.Column(db.String(40))
+    user = db.relationship('User', backref=db.backref('customer_profile', uselist=False))
+
+# Note: ServiceBooking model defined later in the file with enhanced fields
+
+class Availability(db.Model):
+    __tablename__ = 'availability'
+    id = db.Column(db.Integer, primary_key=True)
+    technician_id = db.Column(db.Integer, db.ForeignKey('technician_profile.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    time = db.Column(db.Time, nullable=False)
+    is_available = db.Column(db.Boolean, default=True, nullable=False)
+
+
+class ServiceWork(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    service_booking_id = db.Column(db.Integer, db.ForeignKey('service_booking.id'), nullable=False)
+    assessment = db.Column(db.String(500))  # Issues found during inspection
+    work_performed = db.Column(db.String(500))  # Services/repairs performed
+    parts_used = db.Column(db.String(500))  # Parts replaced/installed
+    recommendations = db.Column(db.String(500))  # Future maintenance recommendations
+    labor_cost = db.Column(db.Float, default=0.0)
+    parts_cost = db.Column(db.Float, default=0.0)
+    total_cost = db.Column(db.Float, default=0.0)
+    notes = db.Column(db.String(1000))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Spare Parts Models
+class SparePartCategory(db.Model):
+    __tablename__ = 'spare_part_category'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    icon = db.Column(db.String(50))  # Font Awesome icon name
+    color = db.Column(db.String(20))  # Hex color code
+    image_url = db.Column(db.String(500))  # Unsplash or local image URL
+    description = db.Column(db.String(500))
+    parts = db.relationship('SparePart', backref='category', lazy=True, cascade='all, delete-orphan')
+
+class SparePart(db.Model):
+    __tablename__ = 'spare_part'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('spare_part_category.id'), nullable=False)
+    part_number = db.Column(db.String(100), unique=True)
+    brand = db.Column(db.String(100))
+    price = db.Column(db.Float, nullable=False)
+    stock_quantity = db.Column(db.Integer, default=0)
+    image_url = db.Column(db.String(500))
+    description = db.Column(db.String(1000))
+    compatible_brands = db.Column(db.String(300))  # Comma-separated car brands
+    warranty_months = db.Column(db.Integer, default=6)
+    is_oem = db.Column(db.Boolean, default=False)  # Original Equipment Manufacturer
+    is_featured = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    orders = db.relationship('PartOrder', backref='part', lazy=True)
+
+class PartOrder(LoadingProfiles, db.Model):
+    __tablename__ = 'part_order'
+    loading_profiles = {'admin_list': ('part',)}
+    id = db.Column(db.Integer, primary_key=True)
+    order_number = db.Column(db.String(20), unique=True, nullable=False)  # GM-PART-00001
+    customer_name = db.Column(db.String(120), nullable=False)
+    customer_phone = db.Column(db.String(20), nullable=False)
+    customer_email = db.Column(db.String(120))
+    part_id = db.Column(db.Integer, db.ForeignKey('spare_part.id'), nullable=False)
+    quantity = db.Column(db.Integer, default=1, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
+    subtotal = db.Column(db.Float, nullable=False)
+    advance_amount = db.Column(db.Float, nullable=False)  # 50% advance
+    remaining_amount = db.Column(db.Float, nullable=False)  # 50% on delivery
+    total_price = db.Column(db.Float, nullable=False)
+    car_brand = db.Column(db.String(50))
+    car_model = db.Column(db.String(100))
+    car_year = db.Column(db.Integer)
+    installation_required = db.Column(db.Boolean, default=False)
+    installation_charges = db.Column(db.Float, default=0)
+    delivery_address = db.Column(db.String(500))
+    payment_status = db.Column(db.String(20), default='Pending')  # Pending/Advance Paid/Fully Paid
+    order_status = db.Column(db.String(20), default='Pending')  # Pending/Confirmed/Processing/Shipped/Delivered/Cancelled
+    order_date = db.Column(db.DateTime, default=datetime.utcnow)
+    confirmed_date = db.Column(db.DateTime)
+    delivery_date = db.Column(db.DateTime)
+    notes = db.Column(db.String(500))
+    admin_notes = db.Column(db.String(500))
+    payment_order_id = db.Column(db.Integer, db.ForeignKey('payment_order.id'), index=True)
+
+class CartItem(LoadingProfiles, db.Model):
+    __tablename__ = 'cart_item'
+    loading_profiles = {'checkout': ('part', 'accessory')}
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(100), nullable=False)  # For guest users
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # For logged-in users
+    part_id = db.Column(db.Integer, db.ForeignKey('spare_part.id'))
+    accessory_id = db.Column(db.Integer, db.ForeignKey('car_accessory.id'))
+    quantity = db.Column(db.Integer, default=1, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    part = db.relationship('SparePart', backref='cart_items', foreign_keys=[part_id])
+    accessory = db.relationship('CarAccessory', backref='cart_items', foreign_keys=[accessory_id])
+    user = db.relationship('User', backref='cart_items')
+
+# Car Accessories Models
+class AccessoryCategory(db.Model):
+    __tablename__ = 'accessory_category'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    icon = db.Column(db.String(50))  # Font Awesome icon name
+    color = db.Column(db.String(20))  # Hex color code
+    image_url = db.Column(db.String(500))  # Category image
+    description = db.Column(db.String(500))
+    accessories = db.relationship('CarAccessory', backref='category', lazy=True, cascade='all, delete-orphan')
+
+class CarAccessory(db.Model):
+    __tablename__ = 'car_accessory'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('accessory_category.id'), nullable=False)
+    brand = db.Column(db.String(100))
+    price = db.Column(db.Float, nullable=False)
+    stock = db.Column(db.Integer, default=0)
+    image_url = db.Column(db.String(500))
+    description = db.Column(db.String(1000))
+    features = db.Column(db.String(1000))  # JSON or comma-separated
+    compatible_cars = db.Column(db.String(300))  # Universal or specific cars
+    warranty_months = db.Column(db.Integer, default=6)
+    is_featured = db.Column(db.Boolean, default=False)
+    is_universal = db.Column(db.Boolean, default=True)  # Fits all cars
+    rating = db.Column(db.Float, default=0)
+    review_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Car Service Models
+class ServiceCategory(db.Model):
+    __tablename__ = 'service_category'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    icon = db.Column(db.String(50))  # Emoji or icon
+    description = db.Column(db.String(500))
+    services = db.relationship('CarService', backref='category', lazy=True, cascade='all, delete-orphan')
+
+class CarService(LoadingProfiles, db.Model):
+    __tablename__ = 'car_service'
+    loading_profiles = {'api_list': ('category',)}
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('service_category.id'), nullable=False)
+    description = db.Column(db.String(1000))
+    price = db.Column(db.Float, nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False)  # Service duration
+    icon = db.Column(db.String(50))
+    includes = db.Column(db.String(1000))  # JSON string or comma-separated list
+    is_popular = db.Column(db.Boolean, default=False)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    bookings = db.relationship('ServiceBooking', backref='service', lazy=True)
+
+class ServiceBooking(db.Model):
+    __tablename__ = 'service_booking'
+    id = db.Column(db.Integer, primary_key=True)
+    booking_id = db.Column(db.String(20), unique=True, nullable=False)  # GM123456
+    customer_name = db.Column(db.String(120), nullable=False)
+    customer_phone = db.Column(db.String(20), nullable=False)
+    customer_email = db.Column(db.String(120))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # customer account that booked, for notifications
+    vehicle_brand = db.Column(db.String(50), nullable=False)
+    vehicle_model = db.Column(db.String(100), nullable=False)
+    vehicle_year = db.Column(db.Integer)
+    vehicle_registration = db.Column(db.String(50))
+    service_id = db.Column(db.Integer, db.ForeignKey('car_service.id'), nullable=False)
+    technician_id = db.Column(db.Integer, db.ForeignKey('technician_profile.id'), nullable=True)
+    booking_date = db.Column(db.Date, nullable=False)
+    booking_time = db.Column(db.Time, nullable=False)
+    status = db.Column(db.String(20), default='Pending')  # Pending/Confirmed/In Progress/Completed/Cancelled
+    payment_status = db.Column(db.String(20), default='Pending')  # Pending/Paid/Refunded
+    total_amount = db.Column(db.Float, nullable=False)
+    notes = db.Column(db.String(1000))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+class TimeSlot(db.Model):
+    __tablename__ = 'time_slot'
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    time = db.Column(db.Time, nullable=False)
+    is_available = db.Column(db.Boolean, default=True)
+    max_bookings = db.Column(db.Integer, default=3)  # Multiple bookings per slot
+    current_bookings = db.Column(db.Integer, default=0)
+
+# Vehicle Records System
+class VehicleRecord(db.Model):
+    __tablename__ = 'vehicle_record'
+    id = db.Column(db.Integer, primary_key=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer_profile.id'), nullable=False)
+    record_type = db.Column(db.String(50), nullable=False)  # Service Report, Inspection, Part Replacement, etc.
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    file_path = db.Column(db.String(500))  # Storage key of uploaded file
+    file_size = db.Column(db.Integer)  # Bytes
+    file_hash = db.Column(db.String(64), index=True)  # SHA-256, also the ETag
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+    customer = db.relationship('CustomerProfile', backref='vehicle_records')
+
+# Vehicle History
+class VehicleHistory(db.Model):
+    __tablename__ = 'vehicle_history'
+    id = db.Column(db.Integer, primary_key=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer_profile.id'), nullable=False)
+    make = db.Column(db.String(50))  # Toyota, Honda, etc.
+    model = db.Column(db.String(100))  # Camry, Civic, etc.
+    year = db.Column(db.Integer)
+    vin = db.Column(db.String(17))  # Vehicle Identification Number
+    license_plate = db.Column(db.String(20))
+    mileage = db.Column(db.Integer)
+    fuel_type = db.Column(db.String(20))  # Gasoline, Diesel, Electric, etc.
+    transmission = db.Column(db.String(20))  # Manual, Automatic, CVT
+    engine_size = db.Column(db.String(20))  # 2.0L, 3.5L V6, etc.
+    color = db.Column(db.String(30))
+    last_service_date = db.Column(db.Date)
+    next_service_due = db.Column(db.Date)
+    insurance_company = db.Column(db.String(200))
+    insurance_policy = db.Column(db.String(100))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    customer = db.relationship('CustomerProfile', backref='vehicle_history', uselist=False)
+
+# Technician Reviews and Ratings
+class TechnicianReview(db.Model):
+    __tablename__ = 'technician_review'
+    id = db.Column(db.Integer, primary_key=True)
+    technician_id = db.Column(db.Integer, db.ForeignKey('technician_profile.id'), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer_profile.id'), nullable=False)
+    service_booking_id = db.Column(db.Integer, db.ForeignKey('service_booking.id'))
+    rating = db.Column(db.Integer, nullable=False)  # 1-5 stars
+    comment = db.Column(db.Text)
+    is_verified = db.Column(db.Boolean, default=True)  # Verified customer
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    technician_profile = db.relationship('TechnicianProfile', backref='reviews')
+    customer = db.relationship('CustomerProfile', backref='reviews')
+
+# Service Reviews
+class ServiceReview(db.Model):
+    __tablename__ = 'service_review'
+    id = db.Column(db.Integer, primary_key=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('service_booking.id'), nullable=False)
+    customer_name = db.Column(db.String(120), nullable=False)
+    rating = db.Column(db.Integer, nullable=False)  # 1-5 stars
+    comment = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    booking = db.relationship('ServiceBooking', backref='review', uselist=False)
+
+# Payment Records
+class Payment(db.Model):
+    __tablename__ = 'payment'
+    id = db.Column(db.Integer, primary_key=True)
+    payment_id = db.Column(db.String(100), unique=True, nullable=False)  # Razorpay/Stripe ID
+    service_booking_id = db.Column(db.Integer, db.ForeignKey('service_booking.id'))
+    part_order_id = db.Column(db.Integer, db.ForeignKey('part_order.id'))
+    amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(10), default='INR')
+    payment_method = db.Column(db.String(50))  # Card, UPI, Net Banking
+    status = db.Column(db.String(20), default='Pending')  # Pending/Success/Failed/Refunded
+    transaction_date = db.Column(db.DateTime, default=datetime.utcnow)
+    receipt_url = db.Column(db.String(500))
+    payment_order_id = db.Column(db.Integer, db.ForeignKey('payment_order.id'), index=True)
+
+# Gateway orders: one per set of part orders being paid online, found again by its
+# idempotency key so a double-submit reuses it instead of opening another
+class PaymentOrder(db.Model):
+    __tablename__ = 'payment_order'
+    id = db.Column(db.Integer, primary_key=True)
+    idempotency_key = db.Column(db.String(64), unique=True, nullable=False)
+    gateway_order_id = db.Column(db.String(64), unique=True)  # Razorpay order_...
+    amount_paise = db.Column(db.Integer, nullable=False)
+    currency = db.Column(db.String(10), default='INR', nullable=False)
+    status = db.Column(db.String(20), default='Created', nullable=False)  # Created/Paid/Failed
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # who started the payment, for notifications
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    paid_at = db.Column(db.DateTime)
+    part_orders = db.relationship('PartOrder', backref='payment_order', lazy=True)
+    payments = db.relationship('Payment', backref='payment_order', lazy=True)
+
+# Notifications System
+class Notification(db.Model):
+    __tablename__ = 'notification'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    notification_type = db.Column(db.String(50))  # booking, payment, reminder, system
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    user = db.relationship('User', backref='notifications')
+
+# Email Queue for async sending
+class EmailQueue(db.Model):
+    __tablename__ = 'email_queue'
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    is_sent = db.Column(db.Boolean, default=False)
+    attempts = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+# Outbound e-mail, WhatsApp and SMS, sent in batches by `flask send-messages`
+class OutboundMessage(db.Model):
+    __tablename__ = 'outbound_message'
+    # The dispatcher's claim: pending rows whose next attempt is due
+    __table_args__ = (db.Index('ix_outbound_message_due', 'status', 'next_attempt_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False)  # email/whatsapp/sms
+    recipient = db.Column(db.String(120), nullable=False)  # address, or phone in E.164
+    template = db.Column(db.String(100), nullable=False)  # templates/messages/<template>.email.html or .txt
+    context = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    status = db.Column(db.String(20), default='Pending', nullable=False)  # Pending/Sent/Failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+# Side effects of a business write, recorded in its transaction and relayed by `flask relay-events`
+class OutboxEvent(db.Model):
+    __tablename__ = 'outbox_event'
+    # The relay's claim: pending events whose next attempt is due
+    __table_args__ = (db.Index('ix_outbox_event_due', 'status', 'next_attempt_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String(50), nullable=False)  # booking.created, part_orders.confirmed, ...
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(20), default='Pending', nullable=False)  # Pending/Published/Failed
+    pending = db.Column(db.Text)  # JSON list of consumers still to run (NULL: all of them)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    published_at = db.Column(db.DateTime)
+
+# Consumers that have already handled an event, so a redelivered event is not applied twice
+class ProcessedEvent(db.Model):
+    __tablename__ = 'processed_event'
+    event_id = db.Column(db.Integer, db.ForeignKey('outbox_event.id'), primary_key=True)
+    consumer = db.Column(db.String(50), primary_key=True)
+    processed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Daily business counters kept by the outbox's analytics consumer (applied once per event via ProcessedEvent)
+class DailyMetric(db.Model):
+    __tablename__ = 'daily_metric'
+    day = db.Column(db.Date, primary_key=True)
+    name = db.Column(db.String(50), primary_key=True)  # bookings_created, part_orders_confirmed, ...
+    count = db.Column(db.Integer, default=0, nullable=False)
+    total = db.Column(db.Float, default=0, nullable=False)  # amount or rating summed over the day
+
+# Fingerprint of the model schema last applied to this database
+class SchemaStamp(db.Model):
+    __tablename__ = 'schema_stamp'
+    fingerprint = db.Column(db.String(40), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,144 @@
+"""
+Transactional Outbox for Gaurav Motors
+Side effects of booking, order and review writes are recorded as events in
+the same transaction as the change (one insert on the request path) and
+relayed in batches to the notification, messaging and analytics consumers
+by `flask relay-events`
+"""
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from extensions import db
+from models import OutboxEvent, ProcessedEvent
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ('booking.created', 'booking.completed', 'part_orders.confirmed', 'review.submitted')
+
+Handler = Callable[[OutboxEvent, dict], None]
+# topic -> [(consumer name, handler)], filled by @consumer in outbox_consumers
+CONSUMERS: Dict[str, List[Tuple[str, Handler]]] = defaultdict(list)
+
+
+def consumer(name: str, *topics: str):
+    """Register the decorated function as consumer `name` of these topics.
+
+    A handler runs inside the relay's transaction and must not commit: its
+    writes, the event's progress and a ProcessedEvent row for (event,
+    consumer) are committed together. Delivery is at least once, but a
+    redelivered event skips the consumers already recorded, so database
+    writes are applied once; effects outside the database may repeat.
+    """
+    def register(handler: Handler) -> Handler:
+        for topic in topics:
+            if topic not in TOPICS:
+                raise ValueError(f'Unknown topic {topic!r}')
+            CONSUMERS[topic].append((name, handler))
+        return handler
+    return register
+
+
+def publish(topic: str, **payload) -> OutboxEvent:
+    """Record an event in the current transaction; it is relayed only if the caller commits.
+
+    Payload values must be JSON-serialisable (anything else is stored as
+    its str()).
+    """
+    if topic not in TOPICS:
+        raise ValueError(f'Unknown topic {topic!r} (choose from {", ".join(TOPICS)})')
+    event = OutboxEvent(topic=topic, payload=json.dumps(payload, default=str))
+    db.session.add(event)
+    return event
+
+
+class Relay:
+    """Hands committed events to their consumers in batches.
+
+    A batch is claimed by pushing its events' next attempt `lease` seconds
+    ahead (with SKIP LOCKED where the database has it), each consumer runs
+    in its own savepoint, and the whole batch is settled in one commit. An
+    event remembers which consumers still owe it, so a failing consumer is
+    retried on its own, `retry_base` seconds later and doubling, up to
+    `max_attempts`; the others are not run twice. A relay that outlives its
+    lease may deliver an event another relay has claimed again; the
+    ProcessedEvent key keeps the consumers from being applied twice.
+    """
+
+    def __init__(self, consumers: Optional[Dict[str, List[Tuple[str, Handler]]]] = None, batch_size: int = 200,
+                 max_attempts: int = 8, retry_base: float = 15, lease: float = 120):
+        if consumers is None:
+            import outbox_consumers  # noqa: F401  registers the consumers
+            consumers = CONSUMERS
+        self.consumers = consumers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lease = lease
+
+    @classmethod
+    def from_config(cls, config) -> 'Relay':
+        return cls(batch_size=config['OUTBOX_BATCH_SIZE'], max_attempts=config['OUTBOX_MAX_ATTEMPTS'],
+                   retry_base=config['OUTBOX_RETRY_BASE'], lease=config['OUTBOX_LEASE'])
+
+    def claim(self, now: datetime) -> List[OutboxEvent]:
+        events = (OutboxEvent.query
+                  .filter(OutboxEvent.status == 'Pending', OutboxEvent.next_attempt_at <= now)
+                  .order_by(OutboxEvent.next_attempt_at, OutboxEvent.id)
+                  .limit(self.batch_size).with_for_update(skip_locked=True).all())
+        for event in events:
+            event.attempts += 1
+            event.next_attempt_at = now + timedelta(seconds=self.lease)
+        db.session.commit()
+        return events
+
+    def deliver(self, event: OutboxEvent, now: datetime) -> str:
+        """Run the consumers the event still owes; returns 'published', 'retried' or 'failed'"""
+        consumers = self.consumers.get(event.topic, [])
+        owed = json.loads(event.pending) if event.pending is not None else [name for name, _ in consumers]
+        payload = json.loads(event.payload)
+        failed, errors = [], []
+        for name, handler in consumers:
+            if name not in owed:
+                continue
+            try:
+                with db.session.begin_nested():
+                    if db.session.get(ProcessedEvent, (event.id, name)) is None:
+                        handler(event, payload)
+                        db.session.add(ProcessedEvent(event_id=event.id, consumer=name))
+            except Exception as e:
+                logger.exception('Consumer %s failed on %s event %s', name, event.topic, event.id)
+                failed.append(name)
+                errors.append(f'{name}: {type(e).__name__}: {e}')
+        event.pending = json.dumps(failed)
+        if not failed:
+            event.status, event.published_at, event.last_error = 'Published', now, None
+            return 'published'
+        event.last_error = '; '.join(errors)[:500]
+        if event.attempts >= self.max_attempts:
+            event.status = 'Failed'
+            return 'failed'
+        event.next_attempt_at = now + timedelta(seconds=self.retry_base * 2 ** (event.attempts - 1))
+        return 'retried'
+
+    def run_batch(self) -> Counter:
+        """Claim, deliver and settle one batch; returns how many were published, retried and failed"""
+        events = self.claim(datetime.utcnow())
+        now = datetime.utcnow()
+        outcome = Counter(self.deliver(event, now) for event in events)
+        db.session.commit()
+        return outcome
+
+    def run(self, poll_interval: float = 2, once: bool = False) -> Counter:
+        """Relay batches until the outbox is drained (once) or forever, polling while it is empty"""
+        totals = Counter()
+        while True:
+            outcome = self.run_batch()
+            totals.update(outcome)
+            if not outcome:
+                if once:
+                    return totals
+                time.sleep(poll_interval)
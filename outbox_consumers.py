@@ -0,0 +1,131 @@
+"""
+Outbox Consumers for Gaurav Motors
+What happens after a booking, part order or review is committed: in-app
+notifications, queued e-mail/WhatsApp messages and daily analytics counters
+"""
+from datetime import datetime
+
+from extensions import db
+from helpers import create_notification, send_service_confirmation
+from messaging import queue_message
+from models import DailyMetric, PartOrder, ServiceBooking, TechnicianProfile
+from outbox import consumer
+
+
+def _booking(payload) -> ServiceBooking:
+    return ServiceBooking.query.filter_by(booking_id=payload['booking_id']).one()
+
+
+def _part_orders(payload):
+    return PartOrder.query.filter(PartOrder.id.in_(payload['order_ids'])).order_by(PartOrder.id).all()
+
+
+# ===== NOTIFICATIONS =====
+
+@consumer('notifications', 'part_orders.confirmed')
+def notify_orders_confirmed(event, payload):
+    if not payload.get('user_id'):
+        return
+    for order in _part_orders(payload):
+        create_notification(payload['user_id'], 'Order Confirmed',
+                            f'Your order {order.order_number} has been confirmed. Advance payment received.',
+                            'payment')
+
+
+@consumer('notifications', 'booking.completed')
+def notify_booking_completed(event, payload):
+    if not payload.get('user_id'):
+        return
+    booking = _booking(payload)
+    create_notification(payload['user_id'], 'Service Completed',
+                        f'Your {booking.service.name} ({booking.booking_id}) is complete. '
+                        'Rate the service from your dashboard.', 'booking')
+
+
+@consumer('notifications', 'review.submitted')
+def notify_review_submitted(event, payload):
+    technician = db.session.get(TechnicianProfile, payload['technician_id'])
+    if technician:
+        create_notification(technician.user_id, 'New Review',
+                            f'A customer rated your service {payload["rating"]}/5.', 'system')
+
+
+# ===== MESSAGES =====
+
+@consumer('messages', 'part_orders.confirmed')
+def send_order_confirmations(event, payload):
+    for order in _part_orders(payload):
+        context = dict(
+            order_number=order.order_number,
+            customer_name=order.customer_name,
+            customer_phone=order.customer_phone,
+            part_name=order.part.name,
+            quantity=order.quantity,
+            unit_price=order.unit_price,
+            subtotal=order.subtotal,
+            installation_required=order.installation_required,
+            installation_charges=order.installation_charges,
+            total_price=order.total_price,
+            advance_amount=order.advance_amount,
+            remaining_amount=order.remaining_amount,
+            delivery_address=order.delivery_address,
+        )
+        if order.customer_email:
+            queue_message('email', order.customer_email, 'order_confirmation', **context)
+        queue_message('whatsapp', order.customer_phone, 'order_confirmation', **context)
+
+
+@consumer('messages', 'booking.created')
+def send_booking_confirmation(event, payload):
+    send_service_confirmation(_booking(payload))
+
+
+@consumer('messages', 'booking.completed')
+def send_booking_completed(event, payload):
+    booking = _booking(payload)
+    context = dict(
+        booking_id=booking.booking_id,
+        customer_name=booking.customer_name,
+        service_name=booking.service.name,
+        vehicle=f'{booking.vehicle_brand} {booking.vehicle_model}'.strip(),
+        total_amount=booking.total_amount,
+    )
+    if booking.customer_email:
+        queue_message('email', booking.customer_email, 'service_completed', **context)
+    queue_message('whatsapp', booking.customer_phone, 'service_completed', **context)
+
+
+# ===== ANALYTICS =====
+
+def _count(day, name, amount=0.0):
+    metric = db.session.get(DailyMetric, (day, name))
+    if metric is None:
+        metric = DailyMetric(day=day, name=name, count=0, total=0.0)
+        db.session.add(metric)
+    metric.count += 1
+    metric.total += amount or 0.0
+
+
+def _event_day(event):
+    return (event.created_at or datetime.utcnow()).date()
+
+
+@consumer('analytics', 'booking.created')
+def count_booking_created(event, payload):
+    _count(_event_day(event), 'bookings_created', _booking(payload).total_amount)
+
+
+@consumer('analytics', 'booking.completed')
+def count_booking_completed(event, payload):
+    _count(_event_day(event), 'bookings_completed', _booking(payload).total_amount)
+
+
+@consumer('analytics', 'part_orders.confirmed')
+def count_part_orders_confirmed(event, payload):
+    for order in _part_orders(payload):
+        _count(_event_day(event), 'part_orders_confirmed', order.advance_amount)
+
+
+@consumer('analytics', 'review.submitted')
+def count_review_submitted(event, payload):
+    _count(_event_day(event), 'reviews_submitted', payload['rating'])
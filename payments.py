@@ -0,0 +1,204 @@
+"""
+Online Payments for Gaurav Motors
+Razorpay orders over a pooled HTTP session, signature checks for checkout
+callbacks and webhooks, and idempotent recording of captured payments
+"""
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import PartOrder, Payment, PaymentOrder
+from outbox import publish
+
+PAID_EVENTS = frozenset(('payment.captured', 'order.paid'))
+FAILED_EVENTS = frozenset(('payment.failed',))
+
+
+class PaymentError(Exception):
+    """Raised when the gateway cannot be reached or rejects a request"""
+    pass
+
+
+class SignatureError(PaymentError):
+    """Raised when a checkout callback or webhook is not signed with our secret"""
+    pass
+
+
+def to_paise(amount) -> int:
+    """Rupees (float or Decimal) to the integer paise Razorpay expects"""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def sign(secret: str, message: bytes) -> str:
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, message: bytes, signature: Optional[str]) -> bool:
+    return bool(secret and signature) and hmac.compare_digest(sign(secret, message), signature)
+
+
+def idempotency_key(kind: str, ids: Iterable[int]) -> str:
+    """Stable key for paying one set of records: the same orders always give the same key"""
+    joined = ','.join(str(i) for i in sorted(ids))
+    return hashlib.sha256(f'{kind}:{joined}'.encode()).hexdigest()[:40]
+
+
+class RazorpayGateway:
+    """Razorpay's REST API over one keep-alive connection pool per worker.
+
+    Every call has a connect and read timeout. Order creation is not retried
+    automatically; the caller's idempotency key makes resubmitting safe.
+    """
+
+    def __init__(self, key_id: str, key_secret: str, api_url: str = 'https://api.razorpay.com/v1',
+                 timeout: Tuple[float, float] = (3.05, 10), pool_size: int = 10):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = (key_id, key_secret)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_config(cls, config) -> 'RazorpayGateway':
+        return cls(config['RAZORPAY_KEY_ID'], config['RAZORPAY_KEY_SECRET'], config['RAZORPAY_API_URL'],
+                   (config['RAZORPAY_CONNECT_TIMEOUT'], config['RAZORPAY_READ_TIMEOUT']),
+                   config['RAZORPAY_POOL_SIZE'])
+
+    def _request(self, method: str, path: str, **kwargs) -> dict:
+        try:
+            response = self.session.request(method, f'{self.api_url}{path}', timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise PaymentError(f'Razorpay {method} {path} failed: {e}') from e
+        if response.status_code >= 400:
+            try:
+                description = response.json()['error']['description']
+            except (ValueError, KeyError, TypeError):
+                description = response.text[:200]
+            raise PaymentError(f'Razorpay {method} {path} returned {response.status_code}: {description}')
+        return response.json()
+
+    def create_order(self, amount_paise: int, receipt: str, currency: str = 'INR', notes=None) -> dict:
+        return self._request('POST', '/orders', json={
+            'amount': amount_paise, 'currency': currency, 'receipt': receipt, 'notes': notes or {}})
+
+    def fetch_payment(self, payment_id: str) -> dict:
+        return self._request('GET', f'/payments/{payment_id}')
+
+    def verify_checkout(self, order_id: str, payment_id: str, signature: Optional[str]) -> bool:
+        """Signature Razorpay Checkout returns to the browser: HMAC(order_id|payment_id, key secret)"""
+        return verify_signature(self.key_secret, f'{order_id}|{payment_id}'.encode(), signature)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def open_part_payment(gateway: RazorpayGateway, part_orders: Iterable[PartOrder],
+                      user_id: Optional[int] = None) -> PaymentOrder:
+    """The gateway order paying the advance on these part orders, created once and reused afterwards.
+
+    The row is committed before the gateway is called, so of two concurrent
+    submits one wins the unique idempotency key and the other reuses its row;
+    a submit after a failed gateway call retries the call for the same row.
+    """
+    part_orders = list(part_orders)
+    key = idempotency_key('part-orders', (order.id for order in part_orders))
+    payment_order = PaymentOrder.query.filter_by(idempotency_key=key).first()
+    if payment_order is None:
+        amount = sum(Decimal(str(order.advance_amount)) for order in part_orders)
+        payment_order = PaymentOrder(idempotency_key=key, amount_paise=to_paise(amount), user_id=user_id)
+        for order in part_orders:
+            order.payment_order = payment_order
+        db.session.add(payment_order)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            payment_order = PaymentOrder.query.filter_by(idempotency_key=key).one()
+    if payment_order.gateway_order_id is None:
+        order = gateway.create_order(payment_order.amount_paise, receipt=key, currency=payment_order.currency,
+                                     notes={'part_orders': ','.join(o.order_number for o in part_orders)})
+        payment_order.gateway_order_id = order['id']
+        db.session.commit()
+    return payment_order
+
+
+def record_payment(payment_order: PaymentOrder, payment_id: str, amount_paise: int,
+                   method: Optional[str] = None) -> Tuple[Payment, bool]:
+    """Store a captured payment and confirm its part orders, once; returns (payment, created).
+
+    Payment.payment_id is unique, so a retried webhook or a callback racing
+    the webhook finds (or collides with) the first row and changes nothing,
+    including the confirmation event published in the same commit.
+    """
+    payment = Payment.query.filter_by(payment_id=payment_id).first()
+    if payment is not None:
+        return payment, False
+    payment = Payment(payment_id=payment_id, payment_order_id=payment_order.id, amount=amount_paise / 100,
+                      currency=payment_order.currency, payment_method=method or 'Online Payment',
+                      status='Success', transaction_date=datetime.utcnow())
+    part_orders = payment_order.part_orders
+    if len(part_orders) == 1:
+        payment.part_order_id = part_orders[0].id
+    db.session.add(payment)
+    payment_order.status = 'Paid'
+    payment_order.paid_at = datetime.utcnow()
+    for order in part_orders:
+        order.payment_status = 'Advance Paid'
+        order.order_status = 'Confirmed'
+        order.confirmed_date = datetime.now()
+    publish('part_orders.confirmed', order_ids=[order.id for order in part_orders],
+            user_id=payment_order.user_id, payment_id=payment_id)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return Payment.query.filter_by(payment_id=payment_id).one(), False
+    return payment, True
+
+
+def handle_webhook(body: bytes, signature: Optional[str], secret: str) -> Tuple[Optional[Payment], bool]:
+    """Apply a Razorpay webhook delivery; returns (payment, created).
+
+    A redelivered payment event is answered after one lookup on the unique
+    payment id. Events for orders this site did not create are ignored.
+    """
+    if not verify_signature(secret, body, signature):
+        raise SignatureError('Webhook signature does not match RAZORPAY_WEBHOOK_SECRET')
+    event = json.loads(body)
+    entity = ((event.get('payload') or {}).get('payment') or {}).get('entity') or {}
+    payment_id, gateway_order_id = entity.get('id'), entity.get('order_id')
+    if not payment_id or not gateway_order_id:
+        return None, False
+    if event.get('event') in PAID_EVENTS:
+        payment = Payment.query.filter_by(payment_id=payment_id).first()
+        if payment is not None:
+            return payment, False
+        payment_order = PaymentOrder.query.filter_by(gateway_order_id=gateway_order_id).first()
+        if payment_order is None:
+            return None, False
+        if entity.get('amount') != payment_order.amount_paise:
+            raise PaymentError(f'Payment {payment_id} is for {entity.get("amount")} paise, '
+                               f'order {gateway_order_id} for {payment_order.amount_paise}')
+        return record_payment(payment_order, payment_id, entity['amount'], entity.get('method'))
+    if event.get('event') in FAILED_EVENTS:
+        PaymentOrder.query.filter_by(gateway_order_id=gateway_order_id, status='Created').update({'status': 'Failed'})
+        db.session.commit()
+    return None, False
+
+
+def init_payments(app) -> RazorpayGateway:
+    gateway = RazorpayGateway.from_config(app.config)
+    app.extensions['payments'] = gateway
+    return gateway
@@ -0,0 +1,138 @@
+"""
+Price/ETA Quoting Engine for Gaurav Motors
+Single code path for every service and parts quote, backed by an in-memory
+price table that is rebuilt when CarService/SparePart/CarAccessory change
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+# Pricing rules
+ADVANCE_RATE = 0.5          # 50% advance, remainder on delivery/after service
+WASH_CHARGE = 300.0         # Car wash add-on for service bookings
+PICKUP_CHARGE = 0.0         # Pick-up & drop is complimentary
+INSTALLATION_CHARGE = 500.0  # Per order line when installation is requested
+
+
+class QuoteError(ValueError):
+    """Raised when a quote cannot be priced"""
+    pass
+
+
+@dataclass(frozen=True)
+class PriceEntry:
+    id: int
+    name: str
+    price: float
+    duration_minutes: int = 0
+
+
+@dataclass(frozen=True)
+class Quote:
+    """A priced request; all amounts are in INR"""
+    label: str
+    unit_price: float
+    quantity: int = 1
+    addons: Tuple[Tuple[str, float], ...] = ()
+    duration_minutes: int = 0
+    subtotal: float = field(init=False)
+    total: float = field(init=False)
+    advance: float = field(init=False)
+    remaining: float = field(init=False)
+
+    def __post_init__(self):
+        subtotal = round(self.unit_price * self.quantity, 2)
+        total = round(subtotal + sum(amount for _label, amount in self.addons), 2)
+        advance = round(total * ADVANCE_RATE, 2)
+        object.__setattr__(self, 'subtotal', subtotal)
+        object.__setattr__(self, 'total', total)
+        object.__setattr__(self, 'advance', advance)
+        object.__setattr__(self, 'remaining', round(total - advance, 2))
+
+    def addon(self, label: str) -> float:
+        return sum(amount for name, amount in self.addons if name == label)
+
+
+class PriceTable:
+    """Immutable snapshot of current catalogue prices"""
+
+    def __init__(self, services=(), parts=(), accessories=()):
+        self.services: Dict[int, PriceEntry] = {s.id: s for s in services}
+        self.parts: Dict[int, PriceEntry] = {p.id: p for p in parts}
+        self.accessories: Dict[int, PriceEntry] = {a.id: a for a in accessories}
+
+
+class QuoteEngine:
+    """Computes quotes from a cached PriceTable.
+
+    `loader` returns a fresh PriceTable from the database. The table is
+    rebuilt lazily after `invalidate()` (wired to model change events) or
+    once `ttl` seconds pass, which bounds staleness across workers.
+    """
+
+    def __init__(self, loader: Callable[[], PriceTable], ttl: float = 60):
+        self.loader = loader
+        self.ttl = ttl
+        self._table: Optional[PriceTable] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def table(self) -> PriceTable:
+        table = self._table
+        if table is None or time.monotonic() - self._loaded_at >= self.ttl:
+            with self._lock:
+                table = self.loader()
+                self._table = table
+                self._loaded_at = time.monotonic()
+        return table
+
+    def invalidate(self) -> None:
+        self._table = None
+
+    def find_service(self, service_id: int) -> Optional[PriceEntry]:
+        """Look up a catalogue service by its CarService id"""
+        entry = self.table.services.get(service_id)
+        if entry is None:
+            # Rows added by another worker are not in our table yet
+            self.invalidate()
+            entry = self.table.services.get(service_id)
+        return entry
+
+    def service_quote(self, service_id: int, wash: bool = False, pickup: bool = False) -> Quote:
+        """Quote a service booking with optional wash and pickup add-ons"""
+        entry = self.find_service(service_id)
+        if entry is None:
+            raise QuoteError(f'Unknown service: {service_id}')
+        addons = []
+        if wash:
+            addons.append(('wash', WASH_CHARGE))
+        if pickup:
+            addons.append(('pickup', PICKUP_CHARGE))
+        return Quote(label=entry.name, unit_price=entry.price, addons=tuple(addons),
+                     duration_minutes=entry.duration_minutes)
+
+    def part_quote(self, part_id: int, quantity: int = 1, installation: bool = False,
+                   kind: str = 'part') -> Quote:
+        """Quote a spare part (or accessory, with kind='accessory') order line"""
+        entry = self._catalogue_entry(kind, part_id)
+        if entry is None:
+            # Rows added by another worker are not in our table yet
+            self.invalidate()
+            entry = self._catalogue_entry(kind, part_id)
+        if entry is None:
+            raise QuoteError(f'Unknown {kind}: {part_id}')
+        if quantity < 1:
+            raise QuoteError('Quantity must be at least 1')
+        addons = (('installation', INSTALLATION_CHARGE),) if installation else ()
+        return Quote(label=entry.name, unit_price=entry.price, quantity=quantity, addons=addons)
+
+    def _catalogue_entry(self, kind: str, item_id: int) -> Optional[PriceEntry]:
+        table = self.table
+        prices = table.accessories if kind == 'accessory' else table.parts
+        return prices.get(item_id)
+
+    def price_list(self):
+        """Active services ordered by price, for listings and the chatbot"""
+        return sorted(self.table.services.values(), key=lambda s: (s.price, s.id))
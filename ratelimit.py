@@ -0,0 +1,321 @@
+"""
+Rate Limiting for Gaurav Motors
+Sliding-window limits per route and client, counted in process memory or in
+a Redis-protocol server shared by every worker, checked before any view runs
+"""
+import logging
+import math
+import queue
+import re
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlsplit
+
+from flask import current_app, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+LIMIT_PATTERN = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$', re.IGNORECASE)
+
+
+class RateLimitBackendError(Exception):
+    """Raised when the counter store cannot be reached or answers with an error"""
+    pass
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    amount: int
+    seconds: int
+
+    def __str__(self):
+        return f'{self.amount} per {self.seconds}s'
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    retry_after: int = 0
+    limit: Optional[RateLimit] = None
+
+
+def parse_limits(text: str) -> Tuple[RateLimit, ...]:
+    """'10 per minute, 50 per hour' (or ';'-separated, '10/minute', '5 per 10 minutes')"""
+    limits = []
+    for part in re.split(r'[,;]', text or ''):
+        if not part.strip():
+            continue
+        match = LIMIT_PATTERN.match(part)
+        if not match:
+            raise ValueError(f'Invalid rate limit {part.strip()!r}')
+        amount, multiplier, unit = match.groups()
+        limits.append(RateLimit(int(amount), int(multiplier or 1) * UNITS[unit.lower()]))
+    return tuple(limits)
+
+
+class CounterBackend(ABC):
+    """Interface every counter store implements.
+
+    `hit()` takes (current_key, previous_key, ttl) triples; for each it
+    increments current_key (expiring it after ttl seconds) and returns the
+    new count with the count under previous_key (0 when missing).
+    """
+
+    @abstractmethod
+    def hit(self, windows: Sequence[Tuple[str, str, int]]) -> List[Tuple[int, int]]:
+        """Count one hit in each window; [(current, previous), ...] in the same order"""
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CounterBackend):
+    """Counters in this process only (each gunicorn worker limits on its own)"""
+
+    def __init__(self):
+        self._counts: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def hit(self, windows):
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            for current_key, previous_key, ttl in windows:
+                expires, count = self._counts.get(current_key, (0.0, 0))
+                if expires <= now:
+                    expires, count = now + ttl, 0
+                self._counts[current_key] = (expires, count + 1)
+                previous = self._counts.get(previous_key)
+                results.append((count + 1, previous[1] if previous and previous[0] > now else 0))
+        return results
+
+    def _sweep(self, now):
+        for key in [key for key, (expires, _) in self._counts.items() if expires <= now]:
+            del self._counts[key]
+        self._next_sweep = now + 60
+
+
+class RedisBackend(CounterBackend):
+    """Counters in Redis (or anything speaking its protocol), shared by every worker.
+
+    Speaks RESP over a small pool of plain sockets: one round trip per check,
+    pipelining INCR, PEXPIRE and GET for every window of the policy.
+    """
+
+    def __init__(self, url: str, timeout: float = 0.25, pool_size: int = 8):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.username = unquote(parts.username) if parts.username else None
+        self.db = int(parts.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._pool: 'queue.LifoQueue[socket.socket]' = queue.LifoQueue(pool_size)
+
+    def hit(self, windows):
+        commands = []
+        for current_key, previous_key, ttl in windows:
+            commands += [('INCR', current_key), ('PEXPIRE', current_key, str(ttl * 1000)), ('GET', previous_key)]
+        replies = self.execute(commands)
+        return [(int(replies[i]), int(replies[i + 2] or 0)) for i in range(0, len(replies), 3)]
+
+    def execute(self, commands: Sequence[Tuple[str, ...]]) -> list:
+        """Send the commands in one write and read their replies"""
+        conn = self._checkout()
+        replies = self._roundtrip(conn, commands)
+        self._checkin(conn)
+        return _raise_errors(replies)
+
+    def _roundtrip(self, conn, commands):
+        try:
+            conn.sendall(b''.join(_encode(command) for command in commands))
+            reader = conn.makefile('rb')
+            return [_read_reply(reader) for _ in commands]
+        except (OSError, ValueError) as e:
+            conn.close()
+            raise RateLimitBackendError(f'Redis at {self.host}:{self.port}: {e}') from e
+
+    def _checkout(self) -> socket.socket:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            conn = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise RateLimitBackendError(f'Redis at {self.host}:{self.port}: {e}') from e
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        setup = []
+        if self.password:
+            setup.append(('AUTH', self.username, self.password) if self.username else ('AUTH', self.password))
+        if self.db:
+            setup.append(('SELECT', str(self.db)))
+        if setup:
+            try:
+                _raise_errors(self._roundtrip(conn, setup))
+            except RateLimitBackendError:
+                conn.close()
+                raise
+        return conn
+
+    def _checkin(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _raise_errors(replies):
+    for reply in replies:
+        if isinstance(reply, RateLimitBackendError):
+            raise reply
+    return replies
+
+
+def _encode(command: Tuple[str, ...]) -> bytes:
+    out = [b'*%d\r\n' % len(command)]
+    for arg in command:
+        data = arg.encode()
+        out.append(b'$%d\r\n%s\r\n' % (len(data), data))
+    return b''.join(out)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line.endswith(b'\r\n'):
+        raise ValueError('connection closed')
+    kind, payload = line[:1], line[1:-2]
+    if kind == b'+':
+        return payload.decode()
+    if kind == b'-':
+        return RateLimitBackendError(payload.decode())
+    if kind == b':':
+        return int(payload)
+    if kind == b'$':
+        length = int(payload)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2].decode()
+    if kind == b'*':
+        length = int(payload)
+        return None if length < 0 else [_read_reply(reader) for _ in range(length)]
+    raise ValueError(f'unexpected reply {line!r}')
+
+
+def create_backend(url: str, timeout: float = 0.25) -> CounterBackend:
+    """Backend for RATELIMIT_STORAGE_URL: 'memory://' or 'redis://[:password@]host[:port][/db]'"""
+    scheme = urlsplit(url or 'memory://').scheme
+    if scheme == 'memory':
+        return MemoryBackend()
+    if scheme == 'redis':
+        return RedisBackend(url, timeout)
+    raise ValueError(f'Unsupported RATELIMIT_STORAGE_URL scheme {scheme!r}')
+
+
+class RateLimiter:
+    """Sliding-window counter limits, per endpoint and client.
+
+    Each limit keeps one counter per fixed window; a request is allowed
+    while this window's count plus the previous window's count, weighted by
+    how much of it still overlaps the sliding window, stays within the
+    limit. Rejected attempts are counted too, so a client that keeps
+    hammering stays limited until it backs off.
+    """
+
+    def __init__(self, backend: CounterBackend, policies: Dict[str, Tuple[RateLimit, ...]],
+                 prefix: str = 'ratelimit'):
+        self.backend = backend
+        self.policies = {endpoint: limits for endpoint, limits in policies.items() if limits}
+        self.prefix = prefix
+
+    def check(self, endpoint: str, client: str, now: Optional[float] = None) -> Decision:
+        limits = self.policies.get(endpoint)
+        if not limits:
+            return Decision(True)
+        now = time.time() if now is None else now
+        windows = []
+        for limit in limits:
+            index = int(now // limit.seconds)
+            key = f'{self.prefix}:{endpoint}:{client}:{limit.seconds}'
+            windows.append((f'{key}:{index}', f'{key}:{index - 1}', limit.seconds * 2))
+        counts = self.backend.hit(windows)
+        for limit, (current, previous) in zip(limits, counts):
+            elapsed = now % limit.seconds
+            weight = (limit.seconds - elapsed) / limit.seconds
+            if previous * weight + current > limit.amount:
+                return Decision(False, self._retry_after(limit, current, previous, elapsed), limit)
+        return Decision(True)
+
+    @staticmethod
+    def _retry_after(limit, current, previous, elapsed) -> int:
+        """Seconds until the weighted count falls back within the limit, if the client stops now"""
+        if current > limit.amount:
+            wait = limit.seconds - elapsed + limit.seconds * (1 - limit.amount / current)
+        else:
+            wait = limit.seconds * (1 - (limit.amount - current) / previous) - elapsed
+        return max(1, math.ceil(wait))
+
+
+def client_address(proxy_hops: int = 0) -> str:
+    """The client's IP; with proxy_hops trusted proxies in front, read from X-Forwarded-For"""
+    if proxy_hops:
+        forwarded = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if len(forwarded) >= proxy_hops:
+            return forwarded[-proxy_hops]
+    return request.remote_addr or 'unknown'
+
+
+def policies_from_config(config) -> Dict[str, Tuple[RateLimit, ...]]:
+    """RATELIMIT_POLICIES maps endpoints to limit strings; an empty string means RATELIMIT_DEFAULT"""
+    default = config['RATELIMIT_DEFAULT']
+    return {endpoint: parse_limits(limits or default) for endpoint, limits in config['RATELIMIT_POLICIES'].items()}
+
+
+def init_rate_limits(app, registry) -> RateLimiter:
+    """Reject over-limit POSTs to the RATELIMIT_POLICIES endpoints with 429 before the view runs"""
+    limiter = RateLimiter(create_backend(app.config['RATELIMIT_STORAGE_URL'], app.config['RATELIMIT_STORAGE_TIMEOUT']),
+                          policies_from_config(app.config))
+    app.extensions['rate_limiter'] = limiter
+
+    @app.before_request
+    def enforce_rate_limit():
+        if request.method in SAFE_METHODS or not current_app.config['RATELIMIT_ENABLED']:
+            return None
+        limiter = current_app.extensions['rate_limiter']
+        endpoint = request.endpoint
+        if endpoint not in limiter.policies:
+            return None
+        try:
+            decision = limiter.check(endpoint, client_address(current_app.config['RATELIMIT_PROXY_HOPS']))
+        except RateLimitBackendError as e:
+            # Fail open: an unreachable counter store must not take the site down with it
+            registry.rate_limit_errors.inc((endpoint,))
+            logger.warning('Rate limit check skipped for %s: %s', endpoint, e)
+            return None
+        if decision.allowed:
+            return None
+        registry.rate_limited.inc((endpoint,))
+        message = f'Too many requests, please try again in {decision.retry_after} seconds'
+        headers = {'Retry-After': str(decision.retry_after)}
+        if request.path.startswith('/api/'):
+            return jsonify({'success': False, 'error': message}), 429, headers
+        return message, 429, dict(headers, **{'Content-Type': 'text/plain; charset=utf-8'})
+
+    return limiter
@@ -0,0 +1,418 @@
+"""
+Synthetic Data Seeder for Gaurav Motors
+Generates a realistically shaped workshop (customers, technicians and their
+availability calendars, bookings, part orders, payments, reviews and
+notifications) from a seeded RNG and bulk-loads it: COPY on PostgreSQL,
+batched Core INSERTs elsewhere. The same scale and seed always produce the
+same rows and ids
+"""
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, time as time_of_day, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_SEED = 2024
+BATCH_SIZE = 10000
+# Every generated account (admin, tech<N>, customer<N>) logs in with this password;
+# its werkzeug hash is fixed so the user table is identical from run to run
+PASSWORD = 'Bench@12345'
+PASSWORD_HASH = ('scrypt:32768:8:1$slM0UxsNdrD6Vpgg$9ef35c1dc28b440817c7157f5af2e48e364fcf664e765b41f5596a5417672a3d'
+                 'b0ee1dc454248b7e7cb38d2cd979b5906a56d0300f4cb10c7d41899f92ded5bb')
+
+# Row counts at scale 1; catalogue tables (categories, services) are not scaled
+VOLUMES = {
+    'technicians': 200,
+    'customers': 20000,
+    'parts': 50000,
+    'accessories': 5000,
+    'bookings': 100000,
+    'part_orders': 25000,
+    'reviews': 30000,
+    'notifications': 1000000,
+}
+CALENDAR_DAYS = 14  # availability published this many days ahead of the anchor
+
+SERVICE_CATEGORIES = ['Periodic Service', 'AC Service', 'Denting & Painting', 'Batteries',
+                      'Tyres & Wheels', 'Detailing', 'Clutch & Brakes', 'Electrical']
+SERVICE_NAMES = ['Basic', 'Standard', 'Comprehensive', 'Express', 'Premium']
+PART_CATEGORIES = ['Brakes', 'Filters', 'Suspension', 'Engine', 'Clutch', 'Electrical', 'Lighting',
+                   'Cooling', 'Exhaust', 'Steering', 'Body', 'Transmission']
+ACCESSORY_CATEGORIES = ['Interior', 'Exterior', 'Electronics', 'Car Care', 'Safety', 'Lighting',
+                        'Seat Covers', 'Floor Mats']
+DEPARTMENTS = ['Engine', 'Transmission', 'Electrical', 'Body Shop', 'AC & Cooling', 'Tyres']
+BRANDS = ['Maruti Suzuki', 'Hyundai', 'Tata', 'Mahindra', 'Honda', 'Toyota', 'Kia', 'Renault']
+MODELS = ['Swift', 'Creta', 'Nexon', 'XUV700', 'City', 'Innova', 'Seltos', 'Kwid', 'Baleno', 'i20']
+PART_BRANDS = ['Bosch', 'Brembo', 'Denso', 'Mahle', 'Valeo', 'Minda', 'Lumax', 'Exide', 'NGK']
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Ishaan', 'Kabir', 'Meera', 'Riya',
+               'Rohan', 'Saanvi', 'Arjun', 'Kavya', 'Neha', 'Vikram', 'Pooja', 'Rahul', 'Sneha']
+LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Singh', 'Rawat', 'Negi', 'Bisht', 'Joshi', 'Kumar',
+              'Mehta', 'Chauhan', 'Thapa']
+TIMES = [time_of_day(hour, minute) for hour in (9, 10, 11, 12, 14, 15, 16, 17) for minute in (0, 30)]
+BOOKING_STATUSES = (['Completed', 'Confirmed', 'Pending', 'In Progress', 'Cancelled'], [55, 15, 15, 5, 10])
+ORDER_STATUSES = (['Delivered', 'Shipped', 'Processing', 'Confirmed', 'Pending', 'Cancelled'],
+                  [50, 10, 10, 10, 12, 8])
+RATINGS = ([1, 2, 3, 4, 5], [2, 3, 10, 35, 50])
+NOTIFICATION_TYPES = (['booking', 'payment', 'reminder', 'system'], [45, 25, 20, 10])
+PAYMENT_METHODS = ['UPI', 'Card', 'Net Banking', 'Cash']
+REVIEWED_SHARE = 0.3  # completed bookings that get a service review
+BOOKED_SHARE = 0.35  # upcoming calendar slots already taken
+
+
+class SeedError(Exception):
+    """Raised when the target database cannot be seeded"""
+    pass
+
+
+def scaled(name: str, scale: float) -> int:
+    return max(1, int(VOLUMES[name] * scale))
+
+
+def batched(rows: Iterable[dict], size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def person(rng: random.Random) -> str:
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def phone(rng: random.Random) -> str:
+    return f'9{rng.randrange(10 ** 9):09d}'
+
+
+def moment(rng: random.Random, anchor: date, days_before: float, days_after: float = 0) -> datetime:
+    """A datetime between days_before days ahead of anchor and days_after after it"""
+    offset = rng.uniform(-days_before, days_after)
+    return datetime.combine(anchor, time_of_day(12)) + timedelta(days=offset)
+
+
+class Plan:
+    """Row counts and id ranges, fixed by scale alone so tables can refer to each other"""
+
+    def __init__(self, scale: float):
+        self.technicians = scaled('technicians', scale)
+        self.customers = scaled('customers', scale)
+        # user ids: 1 is the admin, then technicians, then customers
+        self.first_technician_user = 2
+        self.first_customer_user = 2 + self.technicians
+        self.users = 1 + self.technicians + self.customers
+        self.services = len(SERVICE_CATEGORIES) * len(SERVICE_NAMES)
+        self.parts = scaled('parts', scale)
+        self.accessories = scaled('accessories', scale)
+        self.bookings = scaled('bookings', scale)
+        self.part_orders = scaled('part_orders', scale)
+        self.reviews = scaled('reviews', scale)
+        self.notifications = scaled('notifications', scale)
+
+    def counts(self) -> Dict[str, int]:
+        return {name: count for name, count in vars(self).items() if not name.startswith('first_')}
+
+
+def catalogue_rows(rng, plan, anchor):
+    created = datetime.combine(anchor - timedelta(days=400), time_of_day(9))
+    yield 'service_department', [{'id': i, 'name': name, 'description': f'{name} department'}
+                                 for i, name in enumerate(DEPARTMENTS, 1)]
+    yield 'service_category', [{'id': i, 'name': name, 'description': f'{name} for all makes'}
+                               for i, name in enumerate(SERVICE_CATEGORIES, 1)]
+    services = []
+    for category_id, category in enumerate(SERVICE_CATEGORIES, 1):
+        for level, name in enumerate(SERVICE_NAMES):
+            services.append({
+                'id': len(services) + 1, 'category_id': category_id, 'name': f'{name} {category}',
+                'description': f'{name} {category.lower()} package',
+                'price': float(999 + 500 * level + rng.randrange(0, 2000, 50)),
+                'duration_minutes': rng.choice([60, 90, 120, 180, 240]), 'includes': 'Inspection,Labour',
+                'is_popular': level == 1, 'is_active': True, 'created_at': created,
+            })
+    yield 'car_service', services
+    yield 'spare_part_category', [{'id': i, 'name': name, 'description': f'{name} parts'}
+                                  for i, name in enumerate(PART_CATEGORIES, 1)]
+    yield 'accessory_category', [{'id': i, 'name': name, 'description': f'{name} accessories'}
+                                 for i, name in enumerate(ACCESSORY_CATEGORIES, 1)]
+
+
+def user_rows(rng, plan):
+    yield {'id': 1, 'username': 'admin', 'email': 'admin@bench.local', 'password_hash': PASSWORD_HASH,
+           'role': 'admin'}
+    for n in range(plan.technicians):
+        yield {'id': plan.first_technician_user + n, 'username': f'tech{n + 1}',
+               'email': f'tech{n + 1}@bench.local', 'password_hash': PASSWORD_HASH, 'role': 'technician'}
+    for n in range(plan.customers):
+        yield {'id': plan.first_customer_user + n, 'username': f'customer{n + 1}',
+               'email': f'customer{n + 1}@bench.local', 'password_hash': PASSWORD_HASH, 'role': 'customer'}
+
+
+def technician_rows(rng, plan):
+    for n in range(plan.technicians):
+        department = rng.randrange(len(DEPARTMENTS))
+        yield {'id': n + 1, 'user_id': plan.first_technician_user + n, 'name': person(rng),
+               'specialization': DEPARTMENTS[department], 'department_id': department + 1,
+               'availability': 'Mon-Sat 09:00-18:00'}
+
+
+def availability_rows(rng, plan, anchor):
+    """Each technician's bookable slots for the coming CALENDAR_DAYS, Sundays off"""
+    number = 0
+    for technician_id in range(1, plan.technicians + 1):
+        for day in range(1, CALENDAR_DAYS + 1):
+            slot_date = anchor + timedelta(days=day)
+            if slot_date.weekday() == 6:
+                continue
+            for slot_time in TIMES:
+                number += 1
+                yield {'id': number, 'technician_id': technician_id, 'date': slot_date, 'time': slot_time,
+                       'is_available': rng.random() >= BOOKED_SHARE}
+
+
+def customer_rows(rng, plan):
+    for n in range(plan.customers):
+        yield {'id': n + 1, 'user_id': plan.first_customer_user + n, 'name': person(rng), 'contact': phone(rng)}
+
+
+def part_rows(rng, plan, anchor):
+    for n in range(plan.parts):
+        category = rng.randrange(len(PART_CATEGORIES))
+        brand = rng.choice(PART_BRANDS)
+        created = moment(rng, anchor, 400, -30)
+        yield {'id': n + 1, 'category_id': category + 1, 'name': f'{brand} {PART_CATEGORIES[category]} {n + 1}',
+               'part_number': f'{brand[:3].upper()}-{n + 1:07d}', 'brand': brand,
+               # long tail: most parts are cheap, a few cost tens of thousands
+               'price': round(150 + rng.paretovariate(1.5) * 400, 2), 'stock_quantity': rng.randrange(0, 200),
+               'description': f'{PART_CATEGORIES[category]} part by {brand}',
+               'compatible_brands': ','.join(rng.sample(BRANDS, 3)), 'warranty_months': rng.choice([3, 6, 12]),
+               'is_oem': rng.random() < 0.3, 'is_featured': rng.random() < 0.02,
+               'created_at': created, 'updated_at': created}
+
+
+def accessory_rows(rng, plan, anchor):
+    for n in range(plan.accessories):
+        category = rng.randrange(len(ACCESSORY_CATEGORIES))
+        created = moment(rng, anchor, 400, -30)
+        yield {'id': n + 1, 'category_id': category + 1, 'name': f'{ACCESSORY_CATEGORIES[category]} Kit {n + 1}',
+               'brand': rng.choice(PART_BRANDS), 'price': round(99 + rng.paretovariate(2) * 300, 2),
+               'stock': rng.randrange(0, 100), 'description': 'Universal fit', 'is_universal': True,
+               'is_featured': rng.random() < 0.05, 'rating': round(rng.uniform(3, 5), 1),
+               'review_count': rng.randrange(0, 500), 'created_at': created, 'updated_at': created}
+
+
+def booking_rows(rng, plan, anchor, prices):
+    statuses, weights = BOOKING_STATUSES
+    for n in range(plan.bookings):
+        service_id = rng.randrange(plan.services) + 1
+        booking_date = anchor + timedelta(days=rng.randrange(-365, 31))
+        status = 'Confirmed' if booking_date > anchor else rng.choices(statuses, weights)[0]
+        created = datetime.combine(booking_date, time_of_day(8)) - timedelta(days=rng.randrange(0, 14))
+        yield {'id': n + 1, 'booking_id': f'GM{n + 1:06d}', 'customer_name': person(rng),
+               'customer_phone': phone(rng),
+               'customer_email': f'customer{rng.randrange(plan.customers) + 1}@bench.local',
+               'vehicle_brand': rng.choice(BRANDS), 'vehicle_model': rng.choice(MODELS),
+               'vehicle_year': rng.randrange(2008, 2025), 'vehicle_registration': f'UK07{rng.randrange(10000):04d}',
+               'service_id': service_id, 'technician_id': rng.randrange(plan.technicians) + 1,
+               'booking_date': booking_date, 'booking_time': rng.choice(TIMES), 'status': status,
+               'payment_status': 'Paid' if status == 'Completed' else 'Pending',
+               'total_amount': prices[service_id], 'created_at': created, 'updated_at': created}
+
+
+def part_order_rows(rng, plan, anchor, part_prices):
+    statuses, weights = ORDER_STATUSES
+    for n in range(plan.part_orders):
+        part_id = rng.randrange(plan.parts) + 1
+        quantity = rng.choice([1, 1, 1, 2, 4])
+        subtotal = round(part_prices[part_id] * quantity, 2)
+        installation = rng.random() < 0.3
+        total = subtotal + (500 if installation else 0)
+        status = rng.choices(statuses, weights)[0]
+        paid = ('Fully Paid' if status == 'Delivered' else
+                'Pending' if status in ('Pending', 'Cancelled') else 'Advance Paid')
+        yield {'id': n + 1, 'order_number': f'GM-PART-{n + 1:05d}', 'customer_name': person(rng),
+               'customer_phone': phone(rng),
+               'customer_email': f'customer{rng.randrange(plan.customers) + 1}@bench.local',
+               'part_id': part_id, 'quantity': quantity, 'unit_price': part_prices[part_id], 'subtotal': subtotal,
+               'installation_required': installation, 'installation_charges': 500.0 if installation else 0.0,
+               'total_price': total, 'advance_amount': round(total / 2, 2), 'remaining_amount': round(total / 2, 2),
+               'car_brand': rng.choice(BRANDS), 'car_model': rng.choice(MODELS), 'delivery_address': 'Dehradun',
+               'payment_status': paid, 'order_status': status, 'order_date': moment(rng, anchor, 365)}
+
+
+def payment_rows(rng, bookings, orders):
+    """One payment per completed booking and per paid part order"""
+    number = 0
+    for booking in bookings:
+        if booking['status'] == 'Completed':
+            number += 1
+            yield {'id': number, 'payment_id': f'pay_bench{number:08d}', 'service_booking_id': booking['id'],
+                   'part_order_id': None, 'amount': booking['total_amount'], 'currency': 'INR',
+                   'payment_method': rng.choice(PAYMENT_METHODS), 'status': 'Success',
+                   'transaction_date': datetime.combine(booking['booking_date'], booking['booking_time'])}
+    for order in orders:
+        if order['payment_status'] != 'Pending':
+            number += 1
+            amount = order['total_price'] if order['payment_status'] == 'Fully Paid' else order['advance_amount']
+            yield {'id': number, 'payment_id': f'pay_bench{number:08d}', 'service_booking_id': None,
+                   'part_order_id': order['id'], 'amount': amount, 'currency': 'INR',
+                   'payment_method': rng.choice(PAYMENT_METHODS), 'status': 'Success',
+                   'transaction_date': order['order_date']}
+
+
+def service_review_rows(rng, bookings):
+    ratings, weights = RATINGS
+    number = 0
+    for booking in bookings:
+        if booking['status'] == 'Completed' and rng.random() < REVIEWED_SHARE:
+            number += 1
+            yield {'id': number, 'booking_id': booking['id'], 'customer_name': booking['customer_name'],
+                   'rating': rng.choices(ratings, weights)[0], 'comment': 'Quick and professional',
+                   'created_at': datetime.combine(booking['booking_date'], time_of_day(18))}
+
+
+def technician_review_rows(rng, plan, anchor):
+    ratings, weights = RATINGS
+    for n in range(plan.reviews):
+        yield {'id': n + 1, 'technician_id': rng.randrange(plan.technicians) + 1,
+               'customer_id': rng.randrange(plan.customers) + 1,
+               'service_booking_id': rng.randrange(plan.bookings) + 1,
+               'rating': rng.choices(ratings, weights)[0], 'comment': 'Good service', 'is_verified': True,
+               'created_at': moment(rng, anchor, 365)}
+
+
+def notification_rows(rng, plan, anchor):
+    kinds, weights = NOTIFICATION_TYPES
+    for n in range(plan.notifications):
+        kind = rng.choices(kinds, weights)[0]
+        # skewed towards low customer numbers: a few accounts get most notifications
+        customer = int(plan.customers * rng.random() ** 3)
+        yield {'id': n + 1, 'user_id': plan.first_customer_user + customer, 'title': f'{kind.title()} update',
+               'message': f'Your {kind} has been updated', 'notification_type': kind,
+               'is_read': rng.random() < 0.7, 'created_at': moment(rng, anchor, 365)}
+
+
+class CoreWriter:
+    """Batched Core INSERTs, one executemany per batch.
+
+    The dialect turns these into multi-row INSERT ... VALUES where it can
+    (insertmanyvalues) with a statement compiled once; building the VALUES
+    list by hand with insert().values(rows) recompiles every batch and runs
+    an order of magnitude slower.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write(self, table, rows: List[dict]) -> None:
+        self.connection.execute(table.insert(), rows)
+
+
+class CopyWriter:
+    """COPY ... FROM STDIN in CSV form (PostgreSQL with psycopg2)"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write(self, table, rows: List[dict]) -> None:
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        names = ', '.join(f'"{column}"' for column in columns)
+        cursor = self.connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f'COPY "{table.name}" ({names}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')', buffer)
+        finally:
+            cursor.close()
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return value
+
+
+def writer_for(connection):
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2':
+        return CopyWriter(connection)
+    return CoreWriter(connection)
+
+
+def reset_sequences(connection, tables) -> None:
+    """Move PostgreSQL id sequences past the explicit ids the seeder wrote"""
+    from sqlalchemy import text
+    for table in tables:
+        if 'id' in table.c and connection.dialect.name == 'postgresql':
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM \"{table.name}\"), 0) + 1, false)"))
+
+
+def seed_database(engine, scale: float = 1.0, seed: int = DEFAULT_SEED, anchor: Optional[date] = None,
+                  reset: bool = False, log: Optional[Callable[[str], None]] = None) -> Dict[str, int]:
+    """Create the schema and fill it; returns {table: rows written}.
+
+    The tables must be empty unless reset=True, which drops and recreates
+    them first. anchor is the "today" the dates are spread around.
+    """
+    from extensions import db
+    import models  # noqa: F401  registers the tables on db.metadata
+
+    anchor = anchor or date.today()
+    tables = db.metadata.tables
+    if reset:
+        db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if conn.execute(tables['user'].select().limit(1)).first():
+            raise SeedError('the database already has users; seed an empty database or reset it')
+
+    rng = random.Random(seed)
+    plan = Plan(scale)
+    counts: Dict[str, int] = {}
+
+    with engine.begin() as conn:
+        writer = writer_for(conn)
+
+        def load(table, rows):
+            started = time.perf_counter()
+            total = 0
+            for batch in batched(rows):
+                writer.write(tables[table], batch)
+                total += len(batch)
+            counts[table] = counts.get(table, 0) + total
+            if log:
+                log(f'{table}: {total} rows in {time.perf_counter() - started:.1f}s')
+
+        service_prices = {}
+        for table, rows in catalogue_rows(rng, plan, anchor):
+            if table == 'car_service':
+                service_prices = {row['id']: row['price'] for row in rows}
+            load(table, rows)
+        load('user', user_rows(rng, plan))
+        load('technician_profile', technician_rows(rng, plan))
+        load('availability', availability_rows(rng, plan, anchor))
+        load('customer_profile', customer_rows(rng, plan))
+        parts = list(part_rows(rng, plan, anchor))
+        load('spare_part', parts)
+        part_prices = {row['id']: row['price'] for row in parts}
+        del parts
+        load('car_accessory', accessory_rows(rng, plan, anchor))
+        bookings = list(booking_rows(rng, plan, anchor, service_prices))
+        load('service_booking', bookings)
+        orders = list(part_order_rows(rng, plan, anchor, part_prices))
+        load('part_order', orders)
+        load('payment', payment_rows(rng, bookings, orders))
+        load('service_review', service_review_rows(rng, bookings))
+        del bookings, orders
+        load('technician_review', technician_review_rows(rng, plan, anchor))
+        load('notification', notification_rows(rng, plan, anchor))
+        reset_sequences(conn, [tables[name] for name in counts])
+    return counts
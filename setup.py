@@ -41,7 +41,7 @@ def check_dependencies():
         'pillow',
         'reportlab',
         'pandas',
-        'razorpay'
+        'requests'
     ]
     
     missing = []
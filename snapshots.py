@@ -0,0 +1,383 @@
+"""
+Page Snapshots for Gaurav Motors
+Public marketing pages rendered to static HTML (with .br/.gz copies) and
+served by a WSGI middleware in front of Flask until data or templates change
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from assets import compress_variants
+from compression import negotiate
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: locking is per process only
+    fcntl = None
+
+# Pages whose HTML depends only on the site root for anonymous visitors
+SNAPSHOT_ROUTES = ('/', '/about', '/services', '/faq', '/contact', '/spare-parts', '/accessories')
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.lock'
+# Distinct site roots (scheme + host) kept; bounds what arbitrary Host
+# headers can make the middleware write to disk
+MAX_ROOTS = 8
+# Cookies that mean the visitor may see a personalised page (logged in,
+# flashed messages, remember-me)
+PRIVATE_COOKIES = ('session', 'remember_token')
+# Set on the environ of requests that render a snapshot, so they reach Flask
+RENDER_KEY = 'snapshots.render'
+# Response headers that are not stored with a snapshot
+SKIP_HEADERS = {'content-length', 'content-encoding', 'set-cookie', 'vary', 'etag', 'date',
+                'server-timing'}  # per-render timings are meaningless when replayed
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class Snapshot:
+    """One stored page: its files, digest and the headers Flask sent"""
+
+    __slots__ = ('digest', 'headers', 'encodings')
+
+    def __init__(self, digest: str, headers: List[Tuple[str, str]], encodings: Iterable[str]):
+        self.digest = digest
+        self.headers = headers
+        self.encodings = tuple(encodings)
+
+
+class SnapshotStore:
+    """Snapshots on disk, indexed by manifest.json.
+
+    Files are named after the digest of their content, so a page being
+    replaced never changes under a reader.  `invalidate()` starts a new
+    generation: the manifest is emptied and every process sharing the
+    directory picks that up on its next check (every `check_interval`
+    seconds).  The same check compares template mtimes with the ones the
+    snapshots were rendered from.
+    """
+
+    def __init__(self, directory: str, template_folder: Optional[str] = None,
+                 check_interval: float = 2.0):
+        self.directory = directory
+        self.template_folder = template_folder
+        self.check_interval = check_interval
+        self._manifest: Optional[Dict] = None
+        self._mtime = 0.0
+        self._checked_at = 0.0
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    @property
+    def generation(self) -> str:
+        return self._current()['generation']
+
+    def lookup(self, root: str, path: str) -> Optional[Snapshot]:
+        entry = self._current()['pages'].get(root + path)
+        if entry is None:
+            return None
+        return Snapshot(entry['digest'], entry['headers'], entry['encodings'])
+
+    def body(self, snapshot: Snapshot, encoding: Optional[str] = None) -> Optional[bytes]:
+        """File contents for a snapshot, cached in memory; None if it is gone"""
+        name = snapshot.digest + '.html' + dict(ENCODINGS).get(encoding, '')
+        data = self._bodies.get(name)
+        if data is None:
+            try:
+                with open(os.path.join(self.directory, name), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+            self._bodies[name] = data
+        return data
+
+    def save(self, root: str, path: str, body: bytes, headers: Iterable[Tuple[str, str]],
+             generation: Optional[str] = None) -> bool:
+        """Store a rendered page.
+
+        With `generation`, the page is dropped if the store was invalidated
+        since that generation was read, so a render racing a data change
+        cannot bring back stale HTML.
+        """
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        with self._locked():
+            manifest = self._load()
+            if generation is not None and manifest['generation'] != generation:
+                return False
+            roots = {entry['root'] for entry in manifest['pages'].values()}
+            if root not in roots and len(roots) >= MAX_ROOTS:
+                return False
+            files = {'.html': body}
+            files.update({'.html' + suffix: data for suffix, data in compress_variants(body).items()})
+            for suffix, data in files.items():
+                _write(os.path.join(self.directory, digest + suffix), data)
+            manifest['pages'][root + path] = {
+                'root': root,
+                'digest': digest,
+                'headers': [[k, v] for k, v in headers if k.lower() not in SKIP_HEADERS],
+                'encodings': [name for name, suffix in ENCODINGS if '.html' + suffix in files],
+            }
+            self._store(manifest)
+        return True
+
+    def invalidate(self) -> None:
+        """Drop every snapshot; pages are re-rendered on their next request"""
+        if not os.path.exists(self.manifest_path):
+            return  # nothing rendered yet
+        with self._locked():
+            self._store(self._empty())
+            self._prune()
+
+    def _current(self) -> Dict:
+        manifest = self._manifest
+        now = time.monotonic()
+        if manifest is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.manifest_path)
+            except OSError:
+                mtime = 0.0
+            if manifest is None or mtime != self._mtime:
+                manifest = self._load()
+            if manifest['pages'] and manifest['templates'] != self._templates_mtime():
+                self.invalidate()
+                manifest = self._manifest
+        return manifest
+
+    def _load(self) -> Dict:
+        try:
+            self._mtime = os.path.getmtime(self.manifest_path)
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            self._mtime = 0.0
+            manifest = self._empty(generation='')
+        self._set(manifest)
+        return manifest
+
+    def _store(self, manifest: Dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+        self._mtime = os.path.getmtime(self.manifest_path)
+        self._set(manifest)
+
+    def _set(self, manifest: Dict) -> None:
+        self._manifest = manifest
+        live = {entry['digest'] for entry in manifest['pages'].values()}
+        self._bodies = {name: data for name, data in self._bodies.items()
+                        if name.split('.', 1)[0] in live}
+
+    def _empty(self, generation: Optional[str] = None) -> Dict:
+        if generation is None:
+            generation = uuid.uuid4().hex
+        return {'generation': generation, 'templates': self._templates_mtime(), 'pages': {}}
+
+    def _templates_mtime(self) -> float:
+        if not self.template_folder:
+            return 0.0
+        latest = 0.0
+        for dirpath, _, filenames in os.walk(self.template_folder):
+            for name in filenames:
+                try:
+                    latest = max(latest, os.path.getmtime(os.path.join(dirpath, name)))
+                except OSError:
+                    pass
+        return latest
+
+    def _prune(self) -> None:
+        live = {entry['digest'] for entry in self._manifest['pages'].values()}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(('.html', '.html.gz', '.html.br')) and name.split('.', 1)[0] not in live:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _locked(self):
+        return _FileLock(self._lock, os.path.join(self.directory, LOCK_FILE))
+
+
+class _FileLock:
+    """Thread lock plus an flock on the store directory, where available"""
+
+    def __init__(self, lock: threading.Lock, path: str):
+        self.lock = lock
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        if fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.file = open(self.path, 'a')
+                fcntl.flock(self.file, fcntl.LOCK_EX)
+            except OSError:
+                self.file = None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+        self.lock.release()
+
+
+class SnapshotMiddleware:
+    """Serve page snapshots to anonymous GET/HEAD requests.
+
+    Requests with a query string or a session/remember cookie, and paths
+    outside `routes`, go straight to the app.  A missing snapshot is
+    rendered by the app and saved, then served like any other, so the
+    first visitor after an invalidation regenerates the page.
+    """
+
+    def __init__(self, app, store: SnapshotStore, routes: Iterable[str] = SNAPSHOT_ROUTES,
+                 private_cookies: Iterable[str] = PRIVATE_COOKIES):
+        self.app = app
+        self.store = store
+        self.routes = frozenset(routes)
+        self.private_cookies = tuple(f'{name}=' for name in private_cookies)
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, environ, start_response):
+        if not self._eligible(environ):
+            return self.app(environ, start_response)
+        root, path = site_root(environ), environ.get('PATH_INFO') or '/'
+        snapshot = self.store.lookup(root, path)
+        if snapshot is not None:
+            response = self._serve(environ, start_response, snapshot)
+            if response is not None:
+                self.hits += 1
+                return response
+        self.misses += 1
+        if environ['REQUEST_METHOD'] == 'GET' and self._render(environ, root, path):
+            snapshot = self.store.lookup(root, path)
+            response = snapshot and self._serve(environ, start_response, snapshot)
+            if response is not None:
+                return response
+        return self.app(environ, start_response)
+
+    def _eligible(self, environ) -> bool:
+        if environ.get('REQUEST_METHOD') not in ('GET', 'HEAD') or environ.get(RENDER_KEY):
+            return False
+        if environ.get('QUERY_STRING') or environ.get('PATH_INFO', '/') not in self.routes:
+            return False
+        cookies = environ.get('HTTP_COOKIE', '')
+        return not any(cookie.strip().startswith(self.private_cookies)
+                       for cookie in cookies.split(';')) if cookies else True
+
+    def _render(self, environ, root: str, path: str) -> bool:
+        """Render the page through the app (uncompressed) and save it"""
+        generation = self.store.generation
+        render_environ = dict(environ, **{RENDER_KEY: True})
+        render_environ.pop('HTTP_ACCEPT_ENCODING', None)
+        render_environ.pop('HTTP_IF_NONE_MATCH', None)
+        render_environ.pop('HTTP_IF_MODIFIED_SINCE', None)
+        status, headers, body = call_app(self.app, render_environ)
+        if not cacheable(status, headers):
+            return False
+        try:
+            return self.store.save(root, path, body, headers, generation)
+        except OSError:
+            return False  # read-only filesystem: keep rendering per request
+
+    def _serve(self, environ, start_response, snapshot: Snapshot):
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''), snapshot.encodings)
+        body = self.store.body(snapshot, encoding)
+        if body is None:
+            return None
+        etag = f'"{snapshot.digest}-{encoding}"' if encoding else f'"{snapshot.digest}"'
+        headers = [tuple(header) for header in snapshot.headers]
+        headers += [('ETag', etag), ('Vary', 'Accept-Encoding')]
+        if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', headers)
+            return []
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(len(body))))
+        start_response('200 OK', headers)
+        return [] if environ['REQUEST_METHOD'] == 'HEAD' else [body]
+
+
+def site_root(environ) -> str:
+    """scheme://host/script-root the page links are rendered against"""
+    host = environ.get('HTTP_HOST')
+    if not host:
+        host = environ.get('SERVER_NAME', '')
+        port = environ.get('SERVER_PORT')
+        if port and port not in ('80', '443'):
+            host = f'{host}:{port}'
+    return f"{environ.get('wsgi.url_scheme', 'http')}://{host.lower()}{environ.get('SCRIPT_NAME', '')}"
+
+
+def call_app(app, environ) -> Tuple[str, List[Tuple[str, str]], bytes]:
+    """Run a WSGI app to completion, returning status, headers and body"""
+    captured: List = []
+    written: List[bytes] = []
+
+    def start_response(status, headers, exc_info=None):
+        captured[:] = [status, headers]
+        return written.append
+
+    result = app(environ, start_response)
+    try:
+        written.extend(result)
+    finally:
+        close = getattr(result, 'close', None)
+        if close is not None:
+            close()
+    status, headers = captured
+    return status, list(headers), b''.join(written)
+
+
+def cacheable(status: str, headers: Iterable[Tuple[str, str]]) -> bool:
+    """Only plain 200 HTML pages that set no cookie and use no CSP nonce become snapshots"""
+    if not status.startswith('200'):
+        return False
+    values = {k.lower(): v for k, v in headers}
+    return ('set-cookie' not in values and 'content-encoding' not in values
+            and "'nonce-" not in values.get('content-security-policy', '')
+            and values.get('content-type', '').startswith('text/html'))
+
+
+def render_snapshots(app, store: SnapshotStore, base_urls: Iterable[str],
+                     routes: Iterable[str] = SNAPSHOT_ROUTES) -> int:
+    """Render every route for every site root into a fresh store generation"""
+    store.invalidate()
+    generation = store.generation
+    client = app.test_client()
+    count = 0
+    for base_url in base_urls:
+        for path in routes:
+            response = client.get(path, base_url=base_url, environ_overrides={RENDER_KEY: True})
+            headers = list(response.headers.items())
+            if not cacheable(response.status, headers):
+                continue
+            root = site_root(response.request.environ)
+            if store.save(root, path, response.get_data(), headers, generation):
+                count += 1
+    return count
+
+
+def _write(path: str, data: bytes) -> None:
+    if os.path.exists(path):
+        return  # named by digest: same name, same bytes
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -47,7 +47,9 @@ def main():
         check_setup()
         
         # Import and run Flask app
-        from app import app, db
+        from app import app, db, upgrade_schema
+        with app.app_context():
+            upgrade_schema()
         
         # Get configuration
         debug = os.environ.get('FLASK_DEBUG', '1') == '1'
@@ -64,6 +66,11 @@ def main():
         print(f"\n Press CTRL+C to stop the server\n")
         print("=" * 60 + "\n")
         
+        if not debug and os.name != 'nt':
+            # Production: hand over to gunicorn with the tuned runtime profile
+            os.environ.setdefault('GUNICORN_BIND', f'{host}:{port}')
+            os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'])
+        
         # Run the application
         app.run(
             host=host,
@@ -0,0 +1,252 @@
+// ============= PREMIUM CHATBOT V2 JAVASCRIPT =============
+console.log('🚀 Initializing Premium Chatbot V2...');
+
+document.addEventListener('DOMContentLoaded', function() {
+    const fab = document.getElementById('chatbot-fab');
+    const chatWindow = document.getElementById('chatbot-window');
+    const closeBtn = document.querySelector('.close-btn-v2');
+    const sendBtn = document.getElementById('chatbot-send');
+    const input = document.getElementById('chatbot-input');
+    const messages = document.getElementById('chatbot-messages');
+    const typingIndicator = document.getElementById('typing-indicator');
+
+    // Toggle chatbot window
+    if (fab && chatWindow) {
+        fab.onclick = function() {
+            chatWindow.classList.toggle('open');
+            if (chatWindow.classList.contains('open')) {
+                fab.style.transform = 'scale(0)';
+                setTimeout(() => { fab.style.display = 'none'; }, 300);
+                if (input) input.focus();
+            }
+        };
+    }
+
+    // Close chatbot
+    if (closeBtn && chatWindow && fab) {
+        closeBtn.onclick = function() {
+            chatWindow.classList.remove('open');
+            fab.style.display = 'flex';
+            setTimeout(() => { fab.style.transform = 'scale(1)'; }, 50);
+        };
+    }
+
+    // Chat responses database - Enhanced with more responses
+    const responses = {
+        "hello": "🙏 Namaste! Welcome to **Gaurav Motors** - Uttarakhand's #1 Auto Workshop!\n\nI'm your AI assistant. How can I help you today?\n\n🔧 Services | 🛠️ Spare Parts | 📅 Book Now",
+        "hi": "👋 Hi there! Welcome to Gaurav Motors!\n\n15+ years of trusted automotive care. What can I help you with?",
+        "hey": "👋 Hey! Great to see you at Gaurav Motors!\n\nI can help with bookings, prices, spare parts & more. What do you need?",
+        "services": "🔧 **Our Premium Services:**\n\n⚙️ General Service - ₹2,999\n🛢️ Oil Change - ₹1,500\n🔴 Brake Service - ₹2,000\n❄️ AC Service - ₹1,800\n🔋 Battery Check - FREE\n🔍 Engine Diagnostic - ₹1,000\n✨ Car Wash & Detailing - ₹500\n🛡️ Full Comprehensive Service - ₹5,000\n\nWhich service interests you?",
+        "spare parts": "🛠️ **Genuine Spare Parts:**\n\n• Oil Filters - ₹350+\n• Brake Pads - ₹1,800+\n• Air Filters - ₹550+\n• Batteries - ₹4,500+\n• Wipers - ₹400+\n• Clutch Plates - ₹2,500+\n• Suspension Parts - ₹3,000+\n\n✅ 100% Genuine | 🛡️ Warranty Available\n\nWhat part do you need?",
+        "accessories": "🎨 **Car Accessories:**\n\n• Seat Covers - ₹2,000+\n• Floor Mats - ₹800+\n• Music System - ₹5,000+\n• Car Perfumes - ₹200+\n• Mobile Holders - ₹300+\n• Dashcam - ₹3,000+\n\nWant to see our full catalog?",
+        "price": "💰 **Service Pricing:**\n\n• Oil Change: ₹1,500\n• Brake Service: ₹2,000\n• AC Repair: ₹1,800\n• Engine Tune-up: ₹1,000\n• Full Service: ₹5,000\n• Wheel Alignment: ₹800\n• Car Wash: ₹500\n\n📱 For detailed quote, call: +91 9997612579",
+        "book service": "📅 **Book Your Service:**\n\nPlease share:\n1️⃣ Your Name\n2️⃣ Phone Number\n3️⃣ Car Model\n4️⃣ Service Needed\n5️⃣ Preferred Date\n\n📞 Quick Book: +91 9997612579\n📱 WhatsApp: wa.me/919997612579",
+        "book": "📅 Ready to book a service?\n\n📞 Call: +91 9997612579\n📱 WhatsApp: Tap to chat instantly\n\nOr share your details here and we'll call you back!",
+        "phone": "📞 **Contact Gaurav Motors:**\n\n📱 Phone: +91 9997612579\n📧 Email: gauravmotors@gmail.com\n📍 Location: Lohaghat, Uttarakhand\n⏰ Hours: Open 7 Days 9AM-7PM\n\nWe're here to help! 🚗",
+        "contact": "📞 **Get in Touch:**\n\n📱 Call: +91 9997612579\n💬 WhatsApp: wa.me/919997612579\n📧 Email: gauravmotors@gmail.com\n📍 Visit: Lohaghat, Uttarakhand\n\nWe respond within minutes! ⚡",
+        "location": "📍 **Find Us Here:**\n\nGaurav Motors\nMain Road, Lohaghat\nChampawat District, Uttarakhand\n\n🗺️ Google Maps: Search 'Gaurav Motors Lohaghat'\n📞 Directions: +91 9997612579",
+        "address": "📍 **Our Workshop Location:**\n\nGaurav Motors Auto Care\nMain Market Road\nLohaghat - 262524\nUttarakhand, India\n\n🚗 Easy parking available!",
+        "timing": "⏰ **Working Hours:**\n\n🗓️ Open 7 Days a Week!\n🗓️ Monday - Sunday: 9:00 AM - 7:00 PM\n\n🚨 Emergency: +91 9997612579 (24/7)",
+        "hours": "⏰ **Workshop Timings:**\n\n• Open 7 Days: 9AM - 7PM\n• No Weekly Off!\n• Emergency: 24/7 Available\n\nCall us anytime! 📞 +91 9997612579",
+        "emergency": "🚨 **24/7 Emergency Service:**\n\n📞 Helpline: +91 9997612579\n\nServices Available:\n• Roadside Assistance\n• Towing Service\n• Breakdown Support\n• Emergency Repairs\n\nWe'll reach you ASAP! 🚗💨",
+        "towing": "🚗 **Towing Service:**\n\n📞 Emergency: +91 9997612579\n\n• Available 24/7\n• Within 30 mins response\n• Safe vehicle handling\n• Affordable rates\n\nCall us now for immediate help!",
+        "warranty": "🛡️ **Our Warranty Policy:**\n\n✅ 6 months warranty on all services\n✅ Genuine spare parts only\n✅ Free re-service if issues persist\n✅ Transparent pricing\n\nYour satisfaction is guaranteed! 💯",
+        "offers": "🎉 **Current Offers:**\n\n🔥 20% OFF on Full Service\n✨ FREE Car Wash with any service\n🛢️ Synthetic Oil Change @ ₹1,299\n🔋 FREE Battery Health Check\n\n📞 Book now: +91 9997612579",
+        "discount": "💸 **Special Discounts:**\n\n• First-time customers: 10% OFF\n• Refer a friend: ₹500 credit\n• Full service: 20% OFF (limited time)\n\n📱 Mention 'AI DISCOUNT' when booking!",
+        "owner": "👔 **About Our Founder:**\n\nMadan Mohan Chilkoti\n15+ Years Experience | Automotive Expert\n\nPersonally oversees every major repair. Committed to quality and customer satisfaction.\n\n📞 Connect: +91 9997612579",
+        "about": "🏢 **About Gaurav Motors:**\n\n• Established: 2010\n• Experience: 15+ Years\n• Team: 10+ Expert Mechanics\n• Customers Served: 5000+\n• Rating: 4.8★\n\nUttarakhand's most trusted workshop! 🏆",
+        "thank": "🙏 Thank you for choosing Gaurav Motors!\n\nWe appreciate your trust. See you soon at our workshop!\n\n📞 +91 9997612579 | ⭐ Rate us 5 stars!",
+        "thanks": "😊 You're welcome! Happy to help!\n\nFor any more questions, feel free to ask. Drive safe! 🚗",
+        "bye": "👋 Goodbye! Thank you for chatting with Gaurav Motors AI.\n\nSafe travels! 🚗 See you at our workshop soon!",
+        "ok": "👍 Great! Is there anything else I can help you with?\n\n📅 Book Service | 💰 Check Prices | 📞 Contact Us",
+        "default": "🤖 I can help you with:\n\n🔧 Service Information\n📅 Book a Service\n🛠️ Spare Parts & Accessories\n💰 Get Price Quotes\n📍 Location & Timings\n🚨 Emergency Assistance\n\nJust ask! What do you need? 😊"
+    };
+
+    // Open chatbot
+    if (fab && chatWindow && input) {
+        fab.onclick = function() {
+            console.log('🖱️ FAB clicked');
+            chatWindow.classList.add('open');
+            fab.style.display = 'none';
+            input.focus();
+        };
+    }
+
+    // Close chatbot
+    if (closeBtn && chatWindow && fab) {
+        closeBtn.onclick = function() {
+            console.log('🖱️ Close clicked');
+            chatWindow.classList.remove('open');
+            fab.style.display = 'flex';
+        };
+    }
+
+    // Send message function
+    async function sendMessage() {
+        if (!input || !messages) return;
+        const text = input.value.trim();
+        if (!text) return;
+
+        // Remove welcome message
+        const welcome = messages.querySelector('.welcome-message');
+        if (welcome) welcome.remove();
+
+        // Add user message
+        addMessage(text, 'user');
+        input.value = '';
+
+        // Show typing
+        if (typingIndicator) {
+            typingIndicator.classList.add('active');
+        }
+
+        try {
+            // Make API call to backend
+            const response = await fetch('/api/chat', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ message: text })
+            });
+
+            const data = await response.json();
+
+            // Hide typing
+            if (typingIndicator) {
+                typingIndicator.classList.remove('active');
+            }
+
+            if (data.success) {
+                addMessage(data.response, 'bot');
+            } else {
+                addMessage('Sorry, I encountered an error. Please try again.', 'bot');
+            }
+        } catch (error) {
+            console.error('Chat API error:', error);
+            if (typingIndicator) {
+                typingIndicator.classList.remove('active');
+            }
+            addMessage('Sorry, I\'m having trouble connecting. Please try again later.', 'bot');
+        }
+    }
+
+    // Add message to chat with V2 styling
+    function addMessage(text, sender) {
+        if (!messages) return;
+
+        // Hide welcome card if it's the first message
+        const welcomeCard = document.querySelector('.welcome-card-v2');
+        if (welcomeCard) {
+            welcomeCard.style.display = 'none';
+        }
+
+        const msgDiv = document.createElement('div');
+        msgDiv.className = `message-v2 ${sender}`;
+        msgDiv.innerHTML = `
+            <div class="message-avatar-v2">
+                <i class="fas fa-${sender === 'user' ? 'user' : 'robot'}"></i>
+            </div>
+            <div class="message-bubble-v2">${text.replace(/\n/g, '<br>').replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')}</div>
+        `;
+        messages.appendChild(msgDiv);
+        messages.scrollTop = messages.scrollHeight;
+    }
+
+    // Get bot response
+    function getResponse(text) {
+        text = text.toLowerCase();
+        for (let key in responses) {
+            if (text.includes(key)) {
+                return responses[key];
+            }
+        }
+        return responses.default;
+    }
+
+    // Quick reply function
+    window.sendQuickReply = function(msg) {
+        if (input) {
+            input.value = msg;
+            sendMessage();
+        }
+    };
+
+    // Send button click
+    if (sendBtn) {
+        sendBtn.onclick = sendMessage;
+    }
+
+    // Enter key to send
+    if (input) {
+        input.onkeypress = function(e) {
+            if (e.key === 'Enter') {
+                sendMessage();
+            }
+        };
+    }
+
+    console.log('✅ Chatbot initialized and ready!');
+});
+
+// Global function for opening chatbot from other pages
+window.openChatbot = function() {
+    const fab = document.getElementById('chatbot-fab');
+    const chatWindow = document.getElementById('chatbot-window');
+    if (fab && chatWindow) {
+        chatWindow.classList.add('open');
+        fab.style.display = 'none';
+    }
+};
+
+// Call button (upper) visibility toggle
+const callTopBtn = document.getElementById('callTopBtn');
+if (callTopBtn) {
+  // show on mobile immediately and toggle on desktop scroll
+  if (window.innerWidth <= 768) {
+    callTopBtn.classList.add('visible');
+  }
+  window.onscroll = function() {
+    if (window.innerWidth > 768) {
+      if (document.body.scrollTop > 100 || document.documentElement.scrollTop > 100) {
+        callTopBtn.classList.add('visible');
+      } else {
+        callTopBtn.classList.remove('visible');
+      }
+    }
+  };
+  // if the inner arrow is clicked, scroll to top instead of initiating call
+  callTopBtn.addEventListener('click', function(e) {
+    if (e.target.closest && e.target.closest('.call-arrow')) {
+      e.preventDefault();
+      scrollToTop();
+    }
+  });
+}
+// preserve original scrollToTop function for other scroll-top elements
+function scrollToTop() {
+  window.scrollTo({ top: 0, behavior: 'smooth' });
+}
+
+// Navbar scroll effect
+const mainNavbar = document.querySelector('.main-navbar');
+if (mainNavbar) {
+    window.addEventListener('scroll', () => {
+        if (window.scrollY > 50) {
+            mainNavbar.classList.add('scrolled');
+            // Force blue background with inline style
+            mainNavbar.style.setProperty('background', 'linear-gradient(135deg, #0a1628 0%, #0d47a1 50%, #1565c0 100%)', 'important');
+            mainNavbar.style.setProperty('box-shadow', '0 2px 20px rgba(13,71,161,0.4)', 'important');
+        } else {
+            mainNavbar.classList.remove('scrolled');
+            // Keep blue background even when not scrolled
+            mainNavbar.style.setProperty('background', 'linear-gradient(135deg, #0a1628 0%, #0d47a1 50%, #1565c0 100%)', 'important');
+        }
+    });
+}
+
+// Also apply to all navbar elements to ensure they stay blue
+const allNavbars = document.querySelectorAll('.navbar, nav');
+allNavbars.forEach(nav => {
+    nav.style.setProperty('background', 'linear-gradient(135deg, #0a1628 0%, #0d47a1 50%, #1565c0 100%)', 'important');
+});
@@ -0,0 +1,36 @@
+// Hide loader when page loads
+window.addEventListener('load', function() {
+  var loader = document.getElementById('pageLoader');
+  if (loader) {
+    setTimeout(function() {
+      loader.classList.add('hidden');
+      document.body.style.overflow = '';
+    }, 300);
+  }
+});
+// Fallback: force hide after 1 second
+setTimeout(function() {
+  var loader = document.getElementById('pageLoader');
+  if (loader) {
+    loader.classList.add('hidden');
+    loader.style.display = 'none';
+    document.body.style.overflow = '';
+  }
+}, 1000);
+// Immediate fallback on DOMContentLoaded
+document.addEventListener('DOMContentLoaded', function() {
+  setTimeout(function() {
+    var loader = document.getElementById('pageLoader');
+    if (loader) {
+      loader.classList.add('hidden');
+      loader.style.display = 'none';
+      document.body.style.overflow = '';
+    }
+    // Also hide any other loaders that might exist
+    document.querySelectorAll('.page-loader, .loader-spinner-ring').forEach(function(el) {
+      el.style.display = 'none';
+      el.style.opacity = '0';
+      el.style.visibility = 'hidden';
+    });
+  }, 500);
+});
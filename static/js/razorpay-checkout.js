@@ -0,0 +1,27 @@
+// Opens Razorpay Checkout for the order on #razorpay-pay and posts the signed
+// result to the callback form, where the server verifies it
+(function () {
+    var button = document.getElementById('razorpay-pay');
+    var form = document.getElementById('razorpay-callback');
+    if (!button || !form || typeof Razorpay === 'undefined') {
+        return;
+    }
+    var data = button.dataset;
+    var checkout = new Razorpay({
+        key: data.key,
+        order_id: data.orderId,
+        amount: data.amount,
+        currency: data.currency,
+        name: data.name,
+        prefill: {name: data.prefillName, contact: data.prefillContact, email: data.prefillEmail},
+        handler: function (response) {
+            form.elements.razorpay_payment_id.value = response.razorpay_payment_id;
+            form.elements.razorpay_signature.value = response.razorpay_signature;
+            form.submit();
+        }
+    });
+    button.addEventListener('click', function (event) {
+        event.preventDefault();
+        checkout.open();
+    });
+})();
@@ -0,0 +1,274 @@
+"""
+Upload Storage for Gaurav Motors
+Content-addressed (SHA-256) file storage with streaming writes, dedup and
+pluggable backends: local disk and any S3-compatible object store
+"""
+import hashlib
+import hmac
+import http.client
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+from urllib.parse import quote, urlsplit
+
+CHUNK_SIZE = 64 * 1024
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+
+
+class StorageError(Exception):
+    """Raised when a storage backend operation fails"""
+    pass
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    key: str
+    size: int
+    sha256: str
+    deduplicated: bool = False
+
+
+def content_key(sha256: str, extension: str = '') -> str:
+    """Storage key for content: 'ab/abcdef....pdf'"""
+    extension = extension.lower().lstrip('.')
+    return f"{sha256[:2]}/{sha256}{'.' + extension if extension else ''}"
+
+
+def _copy_hashing(stream, out):
+    """Copy stream to out in chunks, returning (size, sha256 hex)"""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        out.write(chunk)
+        size += len(chunk)
+    return size, digest.hexdigest()
+
+
+class StorageBackend(ABC):
+    """Interface every storage backend implements"""
+
+    @abstractmethod
+    def save(self, stream, extension: str = '') -> StoredObject:
+        """Stream a file into storage under its content key"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether an object is stored under key"""
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Size in bytes of the object under key"""
+
+    @abstractmethod
+    def open(self, key: str, start: int = 0, stop: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the bytes of [start, stop) in chunks"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object under key"""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for send_file/X-Sendfile, or None if remote"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Files under a directory, sharded by the first two hash characters"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, '.incoming')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise StorageError(f'Invalid storage key: {key}')
+        return path
+
+    def save(self, stream, extension=''):
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                size, sha256 = _copy_hashing(stream, out)
+            key = content_key(sha256, extension)
+            path = self._path(key)
+            if os.path.exists(path):
+                os.unlink(tmp_path)
+                return StoredObject(key, size, sha256, deduplicated=True)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            return StoredObject(key, size, sha256)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def size(self, key):
+        return os.path.getsize(self._path(key))
+
+    def open(self, key, start=0, stop=None):
+        with open(self._path(key), 'rb') as f:
+            f.seek(start)
+            remaining = None if stop is None else stop - start
+            while remaining is None or remaining > 0:
+                chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.unlink(path)
+
+    def local_path(self, key):
+        return self._path(key)
+
+
+class S3Storage(StorageBackend):
+    """S3-compatible object store (AWS S3, R2, MinIO...) using path-style
+    requests signed with AWS Signature Version 4.
+
+    Uploads are spooled to a temporary file while hashing, so the object
+    key and payload signature are known before the PUT and a HEAD request
+    is enough to skip duplicates.
+    """
+
+    def __init__(self, endpoint: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = 'us-east-1', prefix: str = '', timeout: float = 30):
+        parts = urlsplit(endpoint)
+        self.scheme = parts.scheme or 'https'
+        self.host = parts.netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix.strip('/')
+        self.timeout = timeout
+
+    def _object_path(self, key):
+        key = f'{self.prefix}/{key}' if self.prefix else key
+        return '/' + quote(f'{self.bucket}/{key}', safe='/-_.~')
+
+    def _sign(self, method, path, headers, payload_hash):
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+        date_stamp = now.strftime('%Y%m%d')
+        headers = dict(headers, host=self.host)
+        headers['x-amz-date'] = amz_date
+        headers['x-amz-content-sha256'] = payload_hash
+        signed = sorted(name.lower() for name in headers)
+        lowered = {name.lower(): str(value).strip() for name, value in headers.items()}
+        canonical_headers = ''.join(f'{name}:{lowered[name]}\n' for name in signed)
+        signed_headers = ';'.join(signed)
+        canonical_request = '\n'.join([method, path, '', canonical_headers, signed_headers, payload_hash])
+        scope = f'{date_stamp}/{self.region}/s3/aws4_request'
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256', amz_date, scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+        key = f'AWS4{self.secret_key}'.encode()
+        for part in (date_stamp, self.region, 's3', 'aws4_request'):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        headers['Authorization'] = (
+            f'AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, '
+            f'SignedHeaders={signed_headers}, Signature={signature}'
+        )
+        return headers
+
+    def _request(self, method, key, headers=None, body=None, payload_hash=EMPTY_SHA256):
+        path = self._object_path(key)
+        signed = self._sign(method, path, headers or {}, payload_hash)
+        conn_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        conn = conn_class(self.host, timeout=self.timeout)
+        try:
+            conn.request(method, path, body=body, headers=signed)
+            return conn, conn.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise StorageError(f'{method} {key} failed: {e}') from e
+
+    def _head(self, key):
+        conn, response = self._request('HEAD', key)
+        try:
+            response.read()
+            return response
+        finally:
+            conn.close()
+
+    def save(self, stream, extension=''):
+        with tempfile.TemporaryFile() as spool:
+            size, sha256 = _copy_hashing(stream, spool)
+            key = content_key(sha256, extension)
+            if self.exists(key):
+                return StoredObject(key, size, sha256, deduplicated=True)
+            spool.seek(0)
+            conn, response = self._request('PUT', key, headers={'Content-Length': str(size)},
+                                           body=spool, payload_hash=sha256)
+            try:
+                response.read()
+                if response.status not in (200, 201, 204):
+                    raise StorageError(f'PUT {key} returned {response.status}')
+            finally:
+                conn.close()
+        return StoredObject(key, size, sha256)
+
+    def exists(self, key):
+        return self._head(key).status == 200
+
+    def size(self, key):
+        response = self._head(key)
+        if response.status != 200:
+            raise StorageError(f'HEAD {key} returned {response.status}')
+        return int(response.getheader('Content-Length'))
+
+    def open(self, key, start=0, stop=None):
+        headers = {}
+        if start or stop is not None:
+            headers['Range'] = f"bytes={start}-{'' if stop is None else stop - 1}"
+        conn, response = self._request('GET', key, headers=headers)
+        try:
+            if response.status not in (200, 206):
+                raise StorageError(f'GET {key} returned {response.status}')
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            conn.close()
+
+    def delete(self, key):
+        conn, response = self._request('DELETE', key)
+        try:
+            response.read()
+        finally:
+            conn.close()
+
+
+def create_storage(config) -> StorageBackend:
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    if config.get('STORAGE_BACKEND') == 's3':
+        return S3Storage(
+            endpoint=config['STORAGE_S3_ENDPOINT'],
+            bucket=config['STORAGE_S3_BUCKET'],
+            access_key=config['STORAGE_S3_ACCESS_KEY'],
+            secret_key=config['STORAGE_S3_SECRET_KEY'],
+            region=config.get('STORAGE_S3_REGION') or 'us-east-1',
+            prefix=config.get('STORAGE_S3_PREFIX') or ''
+        )
+    return LocalStorage(config['UPLOAD_FOLDER'])
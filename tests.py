@@ -12,6 +12,7 @@ def client():
     app.config['TESTING'] = True
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     app.config['WTF_CSRF_ENABLED'] = False
+    app.config['RATELIMIT_ENABLED'] = False
     
     with app.test_client() as client:
         with app.app_context():
@@ -182,5 +183,2236 @@ class TestModels:
         assert customer.name == 'Test Customer'
         assert customer.contact == '9876543210'
 
+class TestChatbot:
+    """Test chatbot intent matching and cached catalogue answers"""
+    
+    @staticmethod
+    def load_corpus():
+        import json, os
+        path = os.path.join(os.path.dirname(__file__), 'benchmarks', 'chat_corpus.json')
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def test_regression_corpus(self):
+        """Every sample query maps to its expected intent"""
+        from chatbot import IntentEngine
+        engine = IntentEngine()
+        mismatches = [(case['message'], engine.match(case['message']), case['intent'])
+                      for case in self.load_corpus()
+                      if engine.match(case['message']) != case['intent']]
+        assert mismatches == []
+    
+    def test_whole_word_matching(self):
+        """Triggers do not match inside longer words"""
+        from chatbot import IntentEngine
+        engine = IntentEngine()
+        assert engine.match('which one') is None
+        assert engine.match('service history') == 'services'
+    
+    def test_catalogue_refreshes_on_model_change(self, client):
+        """Service answers are cached and rebuilt when CarService changes"""
+        from app import ServiceCategory, CarService, get_chatbot_response
+        with app.app_context():
+            category = ServiceCategory(name='General')
+            db.session.add(category)
+            db.session.flush()
+            db.session.add(CarService(name='Wheel Alignment', price=800.0,
+                                      duration_minutes=30, category_id=category.id))
+            db.session.commit()
+            assert 'Wheel Alignment' in get_chatbot_response('services')
+            
+            CarService.query.first().name = 'Wheel Balancing'
+            db.session.commit()
+            assert 'Wheel Balancing' in get_chatbot_response('services')
+    
+    def test_chat_api(self, client):
+        """Chat endpoint returns the matched response"""
+        response = client.post('/api/chat', json={'message': 'What is your phone number?'})
+        assert response.status_code == 200
+        assert '9997612579' in response.get_json()['response']
+
+class TestQuotes:
+    """Test the price/ETA quoting engine"""
+    
+    @staticmethod
+    def seed_catalogue():
+        from app import ServiceCategory, CarService, SparePartCategory, SparePart
+        category = ServiceCategory(name='General')
+        part_category = SparePartCategory(name='Brakes')
+        db.session.add_all([category, part_category])
+        db.session.flush()
+        service = CarService(name='General Service', price=2999.0, duration_minutes=120,
+                             category_id=category.id)
+        part = SparePart(name='Brake Pad', category_id=part_category.id, price=999.99,
+                         stock_quantity=10)
+        db.session.add_all([service, part])
+        db.session.commit()
+        return service, part
+    
+    def test_quote_rules(self):
+        """Add-ons, installation and the 50% advance are applied once"""
+        from quotes import QuoteEngine, QuoteError, PriceEntry, PriceTable
+        engine = QuoteEngine(lambda: PriceTable(
+            services=[PriceEntry(1, 'AC Service', 2000.0, 60)],
+            parts=[PriceEntry(7, 'Oil Filter', 333.33)]
+        ))
+        quote = engine.service_quote(1, wash=True, pickup=True)
+        assert (quote.total, quote.advance, quote.remaining) == (2300.0, 1150.0, 1150.0)
+        assert quote.duration_minutes == 60
+        
+        quote = engine.part_quote(7, 3, installation=True)
+        assert quote.subtotal == 999.99
+        assert quote.total == 1499.99
+        assert quote.advance + quote.remaining == quote.total
+        
+        with pytest.raises(QuoteError):
+            engine.service_quote(99)
+    
+    def test_price_table_follows_catalogue(self, client):
+        """Price changes reach quotes and the chatbot price intent"""
+        from app import quote_engine, get_chatbot_response
+        with app.app_context():
+            service, part = self.seed_catalogue()
+            assert quote_engine.service_quote(service.id).total == 2999.0
+            assert '₹2,999' in get_chatbot_response('what is the price')
+            
+            service.price = 3499.0
+            db.session.commit()
+            assert quote_engine.service_quote(service.id).total == 3499.0
+            assert '₹3,499' in get_chatbot_response('what is the price')
+    
+    def test_order_part_uses_catalogue_price(self, client):
+        """Part orders are priced from the catalogue"""
+        from app import PartOrder
+        with app.app_context():
+            _service, part = self.seed_catalogue()
+            part_id = part.id
+        client.post(f'/order-part/{part_id}', data={
+            'customer_name': 'Test', 'customer_phone': '9876543210',
+            'quantity': '2', 'installation': 'yes'
+        })
+        with app.app_context():
+            order = PartOrder.query.first()
+            assert (order.subtotal, order.installation_charges, order.total_price) == (1999.98, 500.0, 2499.98)
+            assert order.advance_amount == 1249.99
+    
+    def test_booking_page_matches_charge(self, client, monkeypatch):
+        """The booking page shows each service's quote and the booking is charged that quote"""
+        import json
+        import re
+        from app import ServiceCategory, CarService, OutboundMessage
+        from messaging import CHANNELS, Messaging
+        monkeypatch.setitem(app.extensions, 'messaging', Messaging(app.extensions['messaging'].templates, CHANNELS))
+        with app.app_context():
+            category = ServiceCategory(name='Engine')
+            db.session.add_all([CarService(name='Engine Repair', price=5000.0, duration_minutes=180, category=category),
+                                CarService(name='Engine Tuning', price=3000.0, duration_minutes=90, category=category)])
+            db.session.commit()
+        html = client.get('/book-service').get_data(as_text=True)
+        cards = {name: (int(service_id), float(price), float(advance)) for service_id, name, price, advance in re.findall(
+            r'data-service-id="(\d+)" data-name="([^"]+)"\s+data-price="([\d.]+)" data-advance="([\d.]+)"', html)}
+        assert cards['Engine Tuning'][1:] == (3000.0, 1500.0) and cards['Engine Repair'][1:] == (5000.0, 2500.0)
+        assert '₹3,000' in html and '₹2,500' not in html
+        
+        service_id, price, advance = cards['Engine Tuning']
+        client.post('/book-service', data={'service_id': service_id, 'service_price': '1',
+                                           'customer_name': 'Test', 'customer_phone': '9876543210',
+                                           'customer_email': 'test@example.com', 'car_make': 'Maruti'})
+        with app.app_context():
+            context = json.loads(OutboundMessage.query.one().context)
+        assert (context['service_name'], context['service_price'], context['advance_amount']) == \
+            ('Engine Tuning', price, advance)
+
+class FakeS3Server:
+    """Minimal local stand-in for an S3-compatible object store"""
+    
+    def __init__(self):
+        import hashlib, threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        objects = self.objects = {}
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def _authorized(self):
+                auth = self.headers.get('Authorization', '')
+                if not auth.startswith('AWS4-HMAC-SHA256 Credential=test-key/'):
+                    self.send_response(403)
+                    self.end_headers()
+                    return False
+                return True
+            
+            def do_PUT(self):
+                if not self._authorized():
+                    return
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                assert hashlib.sha256(body).hexdigest() == self.headers['x-amz-content-sha256']
+                objects[self.path] = body
+                self.send_response(200)
+                self.end_headers()
+            
+            def do_HEAD(self):
+                if not self._authorized():
+                    return
+                body = objects.get(self.path)
+                self.send_response(200 if body is not None else 404)
+                self.send_header('Content-Length', str(len(body or b'')))
+                self.end_headers()
+            
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                body = objects.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                status = 200
+                byte_range = self.headers.get('Range')
+                if byte_range:
+                    start, _, end = byte_range[len('bytes='):].partition('-')
+                    body = body[int(start):int(end) + 1 if end else None]
+                    status = 206
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_DELETE(self):
+                if not self._authorized():
+                    return
+                objects.pop(self.path, None)
+                self.send_response(204)
+                self.end_headers()
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.endpoint = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def fake_s3():
+    server = FakeS3Server()
+    yield server
+    server.close()
+
+class TestStorage:
+    """Test content-addressed upload storage and record downloads"""
+    
+    def test_local_dedup(self, tmp_path):
+        """Identical content is stored once under its SHA-256"""
+        import hashlib
+        from io import BytesIO
+        from storage import LocalStorage
+        backend = LocalStorage(str(tmp_path))
+        data = b'service report' * 10000
+        first = backend.save(BytesIO(data), 'pdf')
+        second = backend.save(BytesIO(data), 'pdf')
+        assert first.sha256 == hashlib.sha256(data).hexdigest()
+        assert first.key == second.key and second.deduplicated
+        assert first.size == len(data)
+        assert b''.join(backend.open(first.key, 5, 15)) == data[5:15]
+        assert not any((tmp_path / '.incoming').iterdir())
+    
+    def test_backend_interface(self):
+        """A backend missing part of the interface cannot be instantiated"""
+        from storage import StorageBackend
+        
+        class SaveOnly(StorageBackend):
+            def save(self, stream, extension=''):
+                return None
+        
+        with pytest.raises(TypeError):
+            SaveOnly()
+    
+    def test_s3_backend(self, fake_s3):
+        """S3 backend stores, dedups and reads byte ranges"""
+        from io import BytesIO
+        from storage import S3Storage
+        backend = S3Storage(fake_s3.endpoint, 'records', 'test-key', 'test-secret')
+        data = bytes(range(256)) * 1000
+        stored = backend.save(BytesIO(data), 'jpg')
+        assert backend.exists(stored.key)
+        assert backend.save(BytesIO(data), 'jpg').deduplicated
+        assert len(fake_s3.objects) == 1
+        assert backend.size(stored.key) == len(data)
+        assert b''.join(backend.open(stored.key, 100, 300)) == data[100:300]
+        backend.delete(stored.key)
+        assert not backend.exists(stored.key)
+    
+    @staticmethod
+    def upload(client, data, title='Invoice', name='invoice.pdf'):
+        from io import BytesIO
+        return client.post('/upload-vehicle-record', data={
+            'file': (BytesIO(data), name), 'title': title
+        }, content_type='multipart/form-data')
+    
+    def test_upload_and_download(self, auth_client, tmp_path, monkeypatch):
+        """Uploads dedup and downloads honour ETag and Range"""
+        import hashlib
+        from storage import LocalStorage
+        from app import VehicleRecord
+        monkeypatch.setitem(app.extensions, 'storage', LocalStorage(str(tmp_path)))
+        data = b'%PDF-1.4 report ' * 500
+        self.upload(auth_client, data)
+        self.upload(auth_client, data, title='Invoice copy')
+        with app.app_context():
+            records = VehicleRecord.query.all()
+            assert len(records) == 2
+            assert records[0].file_path == records[1].file_path
+            assert records[0].file_hash == hashlib.sha256(data).hexdigest()
+            assert records[0].file_size == len(data)
+            record_id, etag = records[0].id, records[0].file_hash
+        
+        response = auth_client.get(f'/vehicle-records/{record_id}/download')
+        assert response.status_code == 200
+        assert response.data == data
+        assert response.headers['ETag'] == f'"{etag}"'
+        
+        response = auth_client.get(f'/vehicle-records/{record_id}/download',
+                                   headers={'If-None-Match': f'"{etag}"'})
+        assert response.status_code == 304
+        
+        response = auth_client.get(f'/vehicle-records/{record_id}/download',
+                                   headers={'Range': 'bytes=10-19'})
+        assert response.status_code == 206
+        assert response.data == data[10:20]
+    
+    def test_upload_non_ascii_name(self, auth_client, tmp_path, monkeypatch):
+        """A name secure_filename() strips to its extension still uploads under that extension"""
+        from storage import LocalStorage
+        from app import VehicleRecord
+        monkeypatch.setitem(app.extensions, 'storage', LocalStorage(str(tmp_path)))
+        response = self.upload(auth_client, b'%PDF-1.4 record', name='दस्तावेज़.pdf')
+        assert response.status_code == 302
+        with app.app_context():
+            assert VehicleRecord.query.one().file_path.endswith('.pdf')
+    
+    def test_download_is_private(self, auth_client, tmp_path, monkeypatch):
+        """Record downloads never carry send_file's public one-year lifetime"""
+        from storage import LocalStorage
+        monkeypatch.setitem(app.extensions, 'storage', LocalStorage(str(tmp_path)))
+        self.upload(auth_client, b'%PDF-1.4 private ' * 100)
+        response = auth_client.get('/vehicle-records/1/download')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'private, no-cache, no-store, must-revalidate'
+        assert response.headers['Pragma'] == 'no-cache'
+        assert len(response.headers.getlist('Cache-Control')) == 1
+    
+    def test_download_from_s3(self, auth_client, fake_s3, monkeypatch):
+        """Remote downloads forward ranges to the object store"""
+        from storage import S3Storage
+        monkeypatch.setitem(app.extensions, 'storage', S3Storage(fake_s3.endpoint, 'records', 'test-key', 'test-secret'))
+        data = b'0123456789' * 100
+        self.upload(auth_client, data)
+        response = auth_client.get('/vehicle-records/1/download', headers={'Range': 'bytes=-5'})
+        assert response.status_code == 206
+        assert response.headers['Content-Range'] == f'bytes 995-999/{len(data)}'
+        assert response.data == data[-5:]
+        response = auth_client.get('/vehicle-records/1/download')
+        assert response.data == data
+
+class TestImages:
+    """Test the image derivative pipeline and srcset helper"""
+    
+    @staticmethod
+    def make_jpeg(width=800, height=400):
+        from io import BytesIO
+        from PIL import Image
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, format='JPEG')
+        return buffer.getvalue()
+    
+    def test_make_derivatives(self, tmp_path):
+        """Widths are capped at the source width and all formats are written"""
+        from PIL import Image
+        from images import FORMATS, make_derivatives
+        source = tmp_path / 'car.jpg'
+        source.write_bytes(self.make_jpeg())
+        written = make_derivatives(str(source), str(tmp_path / 'out'), 'car', widths=(320, 1280))
+        assert sorted({width for width, _fmt, _path in written}) == [320, 800]
+        assert {fmt for _width, fmt, _path in written} == set(FORMATS)
+        with Image.open(tmp_path / 'out' / 'car-320w.webp') as image:
+            assert image.size == (320, 160)
+        # Up-to-date derivatives are not rewritten
+        mtime = (tmp_path / 'out' / 'car-320w.webp').stat().st_mtime_ns
+        make_derivatives(str(source), str(tmp_path / 'out'), 'car', widths=(320,))
+        assert (tmp_path / 'out' / 'car-320w.webp').stat().st_mtime_ns == mtime
+    
+    def test_srcset_helper(self, tmp_path, monkeypatch):
+        """srcset() lists built static derivatives and ignores remote URLs"""
+        from images import ImagePipeline, StaticDerivatives, build_static_derivatives
+        (tmp_path / 'images').mkdir()
+        (tmp_path / 'images' / 'gm1.jpg').write_bytes(self.make_jpeg(1000, 500))
+        build_static_derivatives(str(tmp_path), ImagePipeline(0), widths=(320, 640))
+        monkeypatch.setitem(app.extensions, 'static_derivatives', StaticDerivatives(str(tmp_path)))
+        from flask import render_template_string
+        from app import srcset
+        with app.test_request_context():
+            assert srcset('images/gm1.jpg') == (
+                '/static/images/derived/gm1-320w.webp 320w, /static/images/derived/gm1-640w.webp 640w'
+            )
+            assert srcset('/static/images/gm1.jpg') == srcset('images/gm1.jpg')
+            assert srcset('https://example.com/gm1.jpg') == ''
+            assert srcset('images/missing.jpg') == ''
+            img = '<img {{ srcset_attrs(url, "50vw") }}>'
+            assert render_template_string(img, url='images/gm1.jpg') == (
+                '<img srcset="/static/images/derived/gm1-320w.webp 320w, '
+                '/static/images/derived/gm1-640w.webp 640w" sizes="50vw">'
+            )
+            assert render_template_string(img, url='https://example.com/gm1.jpg') == '<img >'
+        assert not list((tmp_path / 'images' / 'derived').glob('*.avif'))
+    
+    def test_upload_thumbnail(self, auth_client, tmp_path, monkeypatch):
+        """Uploaded photos get resized WebP copies served with ?w="""
+        from io import BytesIO
+        from images import ImagePipeline
+        from storage import LocalStorage
+        monkeypatch.setitem(app.extensions, 'storage', LocalStorage(str(tmp_path)))
+        monkeypatch.setitem(app.extensions, 'image_pipeline', ImagePipeline(0))
+        auth_client.post('/upload-vehicle-record', data={
+            'file': (BytesIO(self.make_jpeg()), 'damage.jpg'), 'title': 'Damage photo'
+        }, content_type='multipart/form-data')
+        
+        response = auth_client.get('/vehicle-records/1/download?w=320')
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+        # Widths without a derivative fall back to the original
+        response = auth_client.get('/vehicle-records/1/download?w=123')
+        assert response.mimetype == 'image/jpeg'
+
+class TestAssets:
+    """Test the static asset build pipeline"""
+    
+    def test_minifiers(self):
+        """Minification keeps strings, regex literals and statement breaks"""
+        from assets import minify_css, minify_js
+        css = 'a :hover , b > c {\n  content: "x ,  y" ; /* note */ margin : 0 auto ;\n}'
+        assert minify_css(css) == 'a :hover,b>c{content:"x ,  y";margin :0 auto}'
+        js = "var a = b / c; // half\nvar r = /['\"]+/g\n    /* block */\nvar s = 'a // b';\n"
+        assert minify_js(js) == "var a = b / c;\nvar r = /['\"]+/g\nvar s = 'a // b';\n"
+    
+    @staticmethod
+    def build(tmp_path):
+        from assets import build_assets
+        (tmp_path / 'css').mkdir()
+        (tmp_path / 'js').mkdir()
+        (tmp_path / 'css' / 'a.css').write_text('body {\n  background: url(../images/bg.png);\n}\n' * 40)
+        (tmp_path / 'js' / 'a.js').write_text('// setup\nwindow.ready = true;\n' * 40)
+        bundles = {'css/site.css': ('css/a.css',), 'js/site.js': ('js/a.js',)}
+        return build_assets(str(tmp_path), bundles=bundles)
+    
+    def test_build_manifest(self, tmp_path):
+        """Bundles are fingerprinted, precompressed and stale builds pruned"""
+        import gzip
+        from assets import build_assets
+        manifest = self.build(tmp_path)
+        hashed = manifest['css/site.css']
+        assert hashed.startswith('css/site.') and hashed != 'css/site.css'
+        built = (tmp_path / 'dist' / hashed).read_text()
+        assert 'url("/static/images/bg.png")' in built
+        assert gzip.decompress((tmp_path / 'dist' / (hashed + '.gz')).read_bytes()).decode() == built
+        assert 'css/a.css' in manifest
+        
+        (tmp_path / 'css' / 'a.css').write_text('p { color: red; }')
+        rebuilt = build_assets(str(tmp_path), bundles={'css/site.css': ('css/a.css',)})
+        assert rebuilt['css/site.css'] != hashed
+        assert not (tmp_path / 'dist' / hashed).exists()
+    
+    def test_asset_serving(self, client, tmp_path, monkeypatch):
+        """Built assets are negotiated by Accept-Encoding and cached forever"""
+        from assets import AssetManifest
+        manifest = self.build(tmp_path)
+        monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+        monkeypatch.setitem(app.extensions, 'asset_manifest', AssetManifest(str(tmp_path)))
+        from app import asset_url
+        with app.test_request_context():
+            url = asset_url('js/site.js')
+        assert url == '/assets/' + manifest['js/site.js']
+        
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        response = client.get(url, headers={'Accept-Encoding': 'identity'})
+        assert 'Content-Encoding' not in response.headers
+        assert response.data.startswith(b'window.ready = true;')
+    
+    def test_unbuilt_fallback(self, client, tmp_path, monkeypatch):
+        """Without a build, bundles are served unminified and static files are revalidated"""
+        from assets import AssetManifest
+        monkeypatch.setitem(app.extensions, 'asset_manifest', AssetManifest(str(tmp_path)))
+        from app import asset_url
+        with app.test_request_context():
+            assert asset_url('css/site.css') == '/assets/css/site.css'
+            assert asset_url('images/logo.png') == '/static/images/logo.png'
+        response = client.get('/assets/css/site.css')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'no-cache'
+        response = client.get('/static/css/clean.css')
+        assert response.headers['Cache-Control'] == 'no-cache' and 'ETag' in response.headers
+
+class TestPageWeight:
+    """HTML size budgets for the pages covered by test_all_pages.py"""
+    
+    # Budgets in KB; the shared layout CSS/JS lives in cached bundles
+    PUBLIC_BUDGETS = {
+        '/': 96, '/login': 56, '/register': 64, '/faq': 64, '/spare-parts': 56,
+        '/services': 80, '/contact': 64, '/about': 80, '/book-car-service': 64,
+    }
+    ADMIN_BUDGETS = {
+        '/admin': 72, '/admin/customers': 48, '/admin/service-bookings': 64, '/admin/analytics': 64,
+        '/admin/parts': 64, '/admin/add_customer': 48, '/admin/add_technician': 48,
+    }
+    
+    @staticmethod
+    def check(client, budgets):
+        for path, budget in budgets.items():
+            response = client.get(path)
+            assert response.status_code in (200, 302), path
+            assert len(response.data) <= budget * 1024, f'{path}: {len(response.data)} bytes'
+    
+    def test_public_pages(self, client):
+        """Public pages stay within budget and link the shared bundles"""
+        self.check(client, self.PUBLIC_BUDGETS)
+        html = client.get('/').get_data(as_text=True)
+        assert '/assets/css/site' in html and '/assets/js/site' in html
+        assert 'random' not in html and '?v=' not in html
+    
+    def test_admin_pages(self, client):
+        """Admin pages stay within budget"""
+        from app import User
+        with app.app_context():
+            admin = User(username='admin', email='admin@example.com', role='admin')
+            admin.set_password('Admin@123456')
+            db.session.add(admin)
+            db.session.commit()
+        client.post('/login', data={'username': 'admin', 'password': 'Admin@123456'})
+        self.check(client, self.ADMIN_BUDGETS)
+
+class TestCompression:
+    """Test the response compression middleware"""
+    
+    def test_negotiation(self):
+        """Client q-values win, server preference breaks ties"""
+        from compression import negotiate
+        assert negotiate('gzip, br', ['br', 'gzip']) == 'br'
+        assert negotiate('gzip;q=1.0, br;q=0.5', ['br', 'gzip']) == 'gzip'
+        assert negotiate('br;q=0, *', ['br', 'gzip']) == 'gzip'
+        assert negotiate('identity', ['br', 'gzip']) is None
+    
+    def test_page_compression(self, client):
+        """Pages are compressed in one piece; small and media responses are not"""
+        import gzip
+        plain = client.get('/', headers={'Accept-Encoding': 'identity'})
+        response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert int(response.headers['Content-Length']) == len(response.data) < len(plain.data) / 4
+        assert gzip.decompress(response.data) == plain.data
+        assert 'Accept-Encoding' in response.headers['Vary']
+        
+        response = client.get('/static/images/logo.png', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        response = client.post('/api/chat', json={'message': 'hi'}, headers={'Accept-Encoding': 'gzip'})
+        assert len(response.data) < 500 and 'Content-Encoding' not in response.headers
+    
+    def test_streamed_export(self, client):
+        """CSV exports are streamed and compressed chunk by chunk"""
+        import gzip
+        from datetime import time as dtime
+        from app import ServiceBooking, User
+        with app.app_context():
+            admin = User(username='admin', email='admin@example.com', role='admin')
+            admin.set_password('Admin@123456')
+            db.session.add(admin)
+            for i in range(50):
+                db.session.add(ServiceBooking(
+                    booking_id=f'GM{i:06d}', customer_name=f'Customer {i}', customer_email=f'c{i}@example.com',
+                    customer_phone='9876543210', vehicle_brand='Maruti', vehicle_model='Swift', service_id=1,
+                    booking_date=date(2024, 1, 1), booking_time=dtime(10, 0), total_amount=1500.0
+                ))
+            db.session.commit()
+        client.post('/login', data={'username': 'admin', 'password': 'Admin@123456'})
+        response = client.get('/admin/export/service-bookings', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        rows = gzip.decompress(response.data).decode().splitlines()
+        assert rows[0].startswith('ID,Customer Name') and len(rows) == 51
+    
+    def test_precompressed_static(self, tmp_path):
+        """Static requests are served from an accepted .br/.gz sibling"""
+        import gzip
+        from flask import Flask
+        from compression import CompressionMiddleware
+        css = b'body { color: red; }\n' * 100
+        (tmp_path / 'site.css').write_bytes(css)
+        (tmp_path / 'site.css.gz').write_bytes(gzip.compress(css))
+        static_app = Flask('static_test', static_folder=str(tmp_path), static_url_path='/static')
+        static_app.wsgi_app = CompressionMiddleware(static_app.wsgi_app, static_folder=str(tmp_path),
+                                                    encodings=['gzip'])
+        static_client = static_app.test_client()
+        response = static_client.get('/static/site.css', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.mimetype == 'text/css'
+        assert gzip.decompress(response.data) == css
+        response = static_client.get('/static/site.css', headers={'Accept-Encoding': 'identity'})
+        assert response.data == css and 'Accept-Encoding' in response.headers['Vary']
+
+class TestFragmentCache:
+    """Test template fragment caching"""
+    
+    def test_cache_tag(self):
+        """{% cache %} reuses output until a tag is invalidated"""
+        from jinja2 import Environment
+        from fragment_cache import FragmentCache, FragmentCacheExtension, NullStore
+        env = Environment(extensions=[FragmentCacheExtension], autoescape=True)
+        env.fragment_cache = FragmentCache()
+        template = env.from_string("{% cache ('box', kind), 60, ['boxes'] %}<b>{{ next() }}</b>{% endcache %}")
+        calls = iter(range(100))
+        render = lambda kind='a': template.render(kind=kind, next=lambda: next(calls))
+        assert render() == '<b>0</b>'
+        assert render() == '<b>0</b>'
+        assert render('b') == '<b>1</b>'
+        env.fragment_cache.invalidate('boxes')
+        assert render() == '<b>2</b>'
+        env.fragment_cache = FragmentCache(NullStore())
+        assert render() == '<b>3</b>' and render() == '<b>4</b>'
+    
+    def test_store_interface(self):
+        """A store missing part of the interface cannot be instantiated"""
+        from fragment_cache import CacheStore
+        
+        class GetOnly(CacheStore):
+            def get(self, key):
+                return None
+        
+        with pytest.raises(TypeError):
+            GetOnly()
+    
+    def test_layout_varies_by_role(self, client):
+        """Cached headers are keyed by the visitor's role"""
+        dashboard_link = 'fa-car me-2"></i>Dashboard'
+        assert dashboard_link not in client.get('/about').get_data(as_text=True)
+        client.post('/register', data={
+            'username': 'testuser', 'email': 'test@example.com', 'password': 'Test123456', 'name': 'Test User'
+        })
+        client.post('/login', data={'username': 'testuser', 'password': 'Test123456'})
+        assert dashboard_link in client.get('/about').get_data(as_text=True)
+        client.get('/logout')
+        assert dashboard_link not in client.get('/about').get_data(as_text=True)
+    
+    def test_schema_memoized(self, client):
+        """Structured data is built once and refreshed when services change"""
+        from blueprints.seo import get_organization_schema, get_service_schema
+        with app.test_request_context():
+            assert get_organization_schema() is get_organization_schema()
+            service, _part = TestQuotes.seed_catalogue()
+            schema = get_service_schema(service)
+            assert get_service_schema(service) is schema
+            service.price = 1800.0
+            db.session.commit()
+            assert get_service_schema(service)['priceRange'] == '1800.0'
+
+class TestSnapshots:
+    """Test pre-rendered public page snapshots"""
+    
+    @staticmethod
+    def snapshot_client(tmp_path, template_folder=None):
+        from werkzeug.test import Client
+        from snapshots import SnapshotMiddleware, SnapshotStore
+        store = SnapshotStore(str(tmp_path / 'snapshots'), template_folder=template_folder, check_interval=0)
+        middleware = SnapshotMiddleware(app.wsgi_app, store)
+        return Client(middleware), middleware, store
+    
+    def test_rendered_once_then_served(self, client, tmp_path):
+        """The first anonymous visit renders the page; later visits skip Flask"""
+        import gzip
+        web, middleware, store = self.snapshot_client(tmp_path)
+        html = client.get('/about').get_data()
+        first = web.get('/about', headers={'Accept-Encoding': 'gzip'})
+        assert first.status_code == 200 and first.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(first.get_data()) == html
+        assert first.headers['X-Frame-Options'] == 'SAMEORIGIN'
+        assert 'Accept-Encoding' in first.headers['Vary']
+        plain = web.get('/about')
+        assert plain.get_data() == html and 'Content-Encoding' not in plain.headers
+        assert (middleware.misses, middleware.hits) == (1, 1)
+        etag = plain.headers['ETag']
+        assert web.get('/about', headers={'If-None-Match': etag}).status_code == 304
+        assert web.head('/about').get_data() == b''
+    
+    def test_personalised_requests_bypass(self, client, tmp_path):
+        """Logged-in visitors, flashed messages and query strings reach Flask"""
+        web, middleware, store = self.snapshot_client(tmp_path)
+        web.get('/contact')
+        web.post('/contact', data={'name': 'A', 'email': 'a@example.com', 'message': 'Hi'})
+        assert 'Thank you for contacting us' in web.get('/contact').get_data(as_text=True)
+        web.delete_cookie('session')
+        assert 'Thank you for contacting us' not in web.get('/contact').get_data(as_text=True)
+        web.get('/faq?ref=ad')
+        web.get('/book-car-service')
+        assert middleware.hits == 1
+        assert [key.rsplit('/', 1)[-1] for key in store._current()['pages']] == ['contact']
+    
+    def test_invalidation(self, client, tmp_path):
+        """Invalidating, or editing a template, drops the snapshots"""
+        import os
+        templates = tmp_path / 'templates'
+        templates.mkdir()
+        (templates / 'page.html').write_text('v1')
+        web, middleware, store = self.snapshot_client(tmp_path, str(templates))
+        web.get('/faq')
+        generation = store.generation
+        assert store.lookup('http://localhost', '/faq') is not None
+        store.invalidate()
+        assert store.lookup('http://localhost', '/faq') is None
+        assert not store.save('http://localhost', '/faq', b'<p>stale</p>', [], generation)
+        web.get('/faq')
+        assert store.lookup('http://localhost', '/faq') is not None
+        stat = os.stat(templates / 'page.html')
+        os.utime(templates / 'page.html', (stat.st_atime, stat.st_mtime + 10))
+        assert store.lookup('http://localhost', '/faq') is None
+        assert [name for name in os.listdir(store.directory) if name.endswith('.html')] == []
+    
+    def test_build_snapshots(self, client, tmp_path):
+        """render_snapshots writes every public page for each site root"""
+        from snapshots import SNAPSHOT_ROUTES, SnapshotStore, render_snapshots
+        store = SnapshotStore(str(tmp_path))
+        count = render_snapshots(app, store, ['http://localhost', 'https://gauravmotors.example'])
+        assert count == 2 * len(SNAPSHOT_ROUTES)
+        snapshot = store.lookup('https://gauravmotors.example', '/services')
+        assert set(snapshot.encodings) >= {'gzip'}
+        assert store.body(snapshot, 'gzip') and store.body(snapshot).startswith(b'<!doctype html>')
+        assert store.lookup('http://localhost', '/accessories') is not None
+
+class TestRuntimeProfile:
+    """Test the gunicorn runtime profile and readiness probe"""
+    
+    @staticmethod
+    def load_profile(monkeypatch, **env):
+        import os
+        import runpy
+        for name in ('GUNICORN_WORKER_CLASS', 'WEB_CONCURRENCY', 'GUNICORN_THREADS', 'GUNICORN_PRELOAD', 'PORT'):
+            monkeypatch.setenv(name, '')  # restored after the test; the profile exports some
+            monkeypatch.delenv(name)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return runpy.run_path(os.path.join(os.path.dirname(__file__), 'gunicorn.conf.py'))
+    
+    def test_profile_sizing(self, monkeypatch):
+        """Workers and threads follow the core count unless overridden"""
+        profile = self.load_profile(monkeypatch, PORT='9000')
+        cores = profile['cpu_count']()
+        assert profile['worker_class'] == 'gthread'
+        assert (profile['workers'], profile['threads']) == (max(cores, 2), 4)
+        assert profile['bind'] == '0.0.0.0:9000' and profile['preload_app']
+        assert 0 < profile['max_requests_jitter'] < profile['max_requests']
+        assert profile['size_workers']('sync', 4) == (9, 1)
+        profile = self.load_profile(monkeypatch, GUNICORN_WORKER_CLASS='sync', WEB_CONCURRENCY='3')
+        assert (profile['worker_class'], profile['workers']) == ('sync', 3)
+        with pytest.raises(ValueError):
+            profile['select_worker_class']('eventlet')
+    
+    def test_post_fork_disposes_engine(self, client, monkeypatch):
+        """post_fork gives each worker an empty connection pool"""
+        profile = self.load_profile(monkeypatch)
+        disposed = []
+        with app.app_context():
+            engine = db.engine
+            monkeypatch.setattr(type(engine), 'dispose', lambda self, close=True: disposed.append(close))
+        profile['post_fork'](None, None)
+        assert disposed == [False]
+    
+    def test_healthz(self, client, monkeypatch):
+        """/healthz answers 200 when the database responds and 503 otherwise"""
+        response = client.get('/healthz')
+        assert response.status_code == 200 and response.get_json()['status'] == 'ok'
+        def broken(*args, **kwargs):
+            raise RuntimeError('database is down')
+        monkeypatch.setattr(db.session, 'execute', broken)
+        response = client.get('/healthz')
+        assert response.status_code == 503 and response.get_json()['database'] == 'error'
+
+class TestEngineConfig:
+    """Test per-dialect database engine options"""
+    
+    def test_postgres_pool_sizing(self):
+        """Pools follow the worker/thread count within the connection budget"""
+        from engine_config import engine_options
+        options = engine_options('postgresql://user:secret@db/gaurav', {
+            'WEB_CONCURRENCY': '4', 'GUNICORN_THREADS': '4', 'DB_MAX_CONNECTIONS': '40'
+        })
+        assert (options['pool_size'], options['max_overflow']) == (4, 6)
+        assert options['pool_pre_ping'] and options['pool_recycle'] > 0
+        assert options['connect_args']['options'] == '-c statement_timeout=30000'
+        options = engine_options('postgresql://db/gaurav', {'WEB_CONCURRENCY': '16', 'GUNICORN_THREADS': '4'})
+        assert (options['pool_size'], options['max_overflow']) == (4, 0)
+        assert engine_options('sqlite://', {}) == {}
+    
+    def test_sqlite_pragmas(self, tmp_path):
+        """File databases switch to WAL with the tuned pragmas on connect"""
+        from sqlalchemy import create_engine
+        from engine_config import configure_engine, engine_options, sqlite_pragmas
+        uri = f"sqlite:///{tmp_path / 'pragmas.db'}"
+        engine = create_engine(uri, **engine_options(uri, {}))
+        configure_engine(engine, {'SQLITE_BUSY_TIMEOUT_MS': '2500'})
+        with engine.connect() as conn:
+            pragma = lambda name: conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1  # NORMAL
+            assert pragma('busy_timeout') == 2500
+            assert pragma('cache_size') == -32768
+        engine.dispose()
+        assert 'journal_mode' not in dict(sqlite_pragmas('sqlite://', {}))
+
+class TestReadReplicas:
+    """Test read-replica routing with two SQLite files"""
+    
+    @staticmethod
+    def replica_app(tmp_path):
+        from flask import Flask, jsonify
+        from flask_sqlalchemy import SQLAlchemy
+        from db_routing import RoutingSession, read_replica, replica_binds
+        replica_app = Flask(__name__)
+        replica_app.config.update(
+            SECRET_KEY='test',
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+            SQLALCHEMY_BINDS=replica_binds([f"sqlite:///{tmp_path / 'replica.db'}"]),
+        )
+        replica_db = SQLAlchemy(replica_app, session_options={'class_': RoutingSession})
+        
+        class Part(replica_db.Model):
+            id = replica_db.Column(replica_db.Integer, primary_key=True)
+            name = replica_db.Column(replica_db.String(50))
+        
+        with replica_app.app_context():
+            replica_db.create_all()
+            Part.__table__.create(replica_db.engines['replica0'])
+            with replica_db.engines[None].begin() as conn:
+                conn.execute(Part.__table__.insert(), {'name': 'on primary'})
+            with replica_db.engines['replica0'].begin() as conn:
+                conn.execute(Part.__table__.insert(), {'name': 'on replica'})
+        
+        names = lambda: jsonify(sorted(part.name for part in Part.query.all()))
+        replica_app.add_url_rule('/parts', 'parts', read_replica(names))
+        replica_app.add_url_rule('/parts/primary', 'parts_primary', names)
+        
+        @replica_app.route('/parts/add', methods=['POST'])
+        @read_replica
+        def add_part():
+            replica_db.session.add(Part(name='new'))
+            replica_db.session.flush()
+            in_transaction = sorted(part.name for part in Part.query.all())
+            replica_db.session.commit()
+            return jsonify(in_transaction=in_transaction, after_commit=sorted(p.name for p in Part.query.all()))
+        
+        @replica_app.route('/parts/locked')
+        @read_replica
+        def locked_parts():
+            return jsonify([part.name for part in Part.query.with_for_update().all()])
+        
+        return replica_app
+    
+    def test_reads_routed_to_replica(self, tmp_path):
+        """Marked views read from the replica; others and locking reads use the primary"""
+        client = self.replica_app(tmp_path).test_client()
+        assert client.get('/parts').get_json() == ['on replica']
+        assert client.get('/parts/primary').get_json() == ['on primary']
+        assert client.get('/parts/locked').get_json() == ['on primary']
+    
+    def test_read_your_writes(self, tmp_path, monkeypatch):
+        """After a write the client reads from the primary until the sticky window ends"""
+        import db_routing
+        replica_app = self.replica_app(tmp_path)
+        client = replica_app.test_client()
+        result = client.post('/parts/add').get_json()
+        assert result['in_transaction'] == ['new', 'on primary']
+        assert result['after_commit'] == ['new', 'on primary']
+        assert client.get('/parts').get_json() == ['new', 'on primary']
+        assert replica_app.test_client().get('/parts').get_json() == ['on replica']
+        later = db_routing.time.time() + db_routing.DEFAULT_STICKY_SECONDS + 1
+        monkeypatch.setattr(db_routing.time, 'time', lambda: later)
+        assert client.get('/parts').get_json() == ['on replica']
+    
+    def test_no_replicas(self, client):
+        """Without DATABASE_REPLICA_URLS every query uses the primary"""
+        from db_routing import replica_binds
+        assert replica_binds(['', ' postgres://replica/db ']) == {'replica0': 'postgresql://replica/db'}
+        assert client.get('/api/services').status_code == 200
+        with app.app_context():
+            assert db.session().replicas() == []
+
+class TestColdStart:
+    """Test the serverless cold-start path"""
+    
+    def test_seed_password_hashes(self):
+        """Precomputed seed hashes match the documented default passwords"""
+        from werkzeug.security import check_password_hash
+        from app import SEED_PASSWORD_HASHES
+        passwords = {'admin': 'Admin@123456', 'drjohn': 'doctor', 'kar': 'kar123'}
+        for username, password in passwords.items():
+            assert check_password_hash(SEED_PASSWORD_HASHES[username], password)
+    
+    def test_schema_checked_once(self, client, monkeypatch):
+        """ensure_schema seeds an empty database, then trusts its stamp"""
+        import db_schema
+        from app import User, ensure_schema
+        with app.app_context():
+            db.drop_all()
+            monkeypatch.setattr(db_schema, '_schema_ready', False)
+            ensure_schema()
+            assert User.query.filter_by(username='admin').one().check_password('Admin@123456')
+            def inspect_again():
+                raise AssertionError('schema inspected again')
+            monkeypatch.setattr(db_schema, 'init_vercel_db', inspect_again)
+            monkeypatch.setattr(db_schema, '_schema_ready', False)
+            ensure_schema()
+            assert db_schema._schema_ready
+    
+    def test_vercel_entry_point(self, monkeypatch):
+        """api/index.py exports the Flask app itself, with no wrapper in front of requests"""
+        import importlib.util
+        import os
+        from werkzeug.test import Client
+        monkeypatch.setenv('VERCEL', '1')
+        path = os.path.join(os.path.dirname(__file__), 'api', 'index.py')
+        spec = importlib.util.spec_from_file_location('vercel_index', path)
+        index = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(index)
+        assert index.app is app
+        assert Client(index.app).get('/robots.txt').status_code == 200
+
+class TestAppFactory:
+    """Test create_app() and selective blueprint registration"""
+    
+    def test_selected_blueprints_only(self):
+        """An API-only app serves the API and none of the HTML pages"""
+        from factory import create_app
+        api_app = create_app('testing', blueprints=['api'])
+        assert api_app.config['TESTING'] and api_app.config['SQLALCHEMY_DATABASE_URI'] == 'sqlite:///:memory:'
+        assert {rule.endpoint.split('.')[0] for rule in api_app.url_map.iter_rules()} == {
+            'static', 'asset', 'healthz', 'metrics', 'api'}
+        with api_app.app_context():
+            db.create_all()
+        client = api_app.test_client()
+        assert client.get('/api/services').get_json()['success'] is True
+        assert client.get('/healthz').status_code == 200
+        assert client.get('/admin').status_code == 404
+    
+    def test_unknown_blueprint(self):
+        """Misspelt blueprint names fail at startup"""
+        from factory import create_app
+        with pytest.raises(ValueError, match='Unknown blueprints: billing'):
+            create_app('testing', blueprints=['api', 'billing'])
+    
+    def test_login_view_is_namespaced(self, client):
+        """Protected pages redirect to the public blueprint's login page"""
+        response = client.get('/admin')
+        assert response.status_code == 302
+        assert response.headers['Location'].startswith('/login')
+    
+    def test_models_import_without_routes(self):
+        """Scripts using the models and a bare app load no route modules and no web stack"""
+        import os
+        import subprocess
+        import sys
+        web = ('blueprints.', 'helpers', 'messaging', 'payments', 'images', 'PIL', 'requests', 'storage',
+               'assets', 'compression', 'snapshots', 'header_policy')
+        code = ("import sys; from factory import create_app; app = create_app(blueprints=()); "
+                f"print(sorted(m for m in sys.modules if m.startswith({web!r})))")
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.stdout.strip() == '[]'
+
+class TestInstrumentation:
+    """Test Server-Timing, query accounting and the /metrics endpoint"""
+    
+    @staticmethod
+    def instrumented_app(**config):
+        from factory import create_app
+        from models import ServiceCategory
+        instrumented = create_app('testing', blueprints=())
+        instrumented.config.update(config)
+        
+        @instrumented.route('/categories/<int:times>')
+        def categories(times):
+            for category_id in range(times):
+                db.session.get(ServiceCategory, category_id + 1)
+            return 'ok'
+        
+        with instrumented.app_context():
+            db.create_all()
+            for number in range(12):
+                db.session.add(ServiceCategory(name=f'Category {number}'))
+            db.session.commit()
+        return instrumented
+    
+    def test_server_timing(self, client):
+        """Responses report database and total time with the query count"""
+        response = client.get('/api/services')
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('db;dur=') and 'queries"' in timing and 'total;dur=' in timing
+    
+    def test_repeated_and_slow_queries(self, caplog):
+        """Identical statements past the threshold are reported as a likely N+1"""
+        instrumented = self.instrumented_app(N_PLUS_ONE_THRESHOLD=10, SLOW_QUERY_MS=0, N_PLUS_ONE_RAISE=False)
+        client = instrumented.test_client()
+        with caplog.at_level('WARNING', logger='instrumentation'):
+            response = client.get('/categories/12')
+        assert '12 queries' in response.headers['Server-Timing']
+        assert 'Possible N+1 in categories: statement run 12 times' in caplog.text
+        caplog.clear()
+        instrumented.config['SLOW_QUERY_MS'] = 0.000001
+        with caplog.at_level('WARNING', logger='instrumentation'):
+            client.get('/categories/2')
+        assert 'Possible N+1' not in caplog.text
+        assert 'Slow query' in caplog.text
+        assert 'parameters' not in caplog.text and '(2,)' not in caplog.text
+    
+    def test_metrics_endpoint(self):
+        """Per-route histograms in Prometheus format, optionally behind a token"""
+        instrumented = self.instrumented_app(N_PLUS_ONE_THRESHOLD=10, N_PLUS_ONE_RAISE=False)
+        client = instrumented.test_client()
+        client.get('/categories/1')
+        client.get('/categories/12')
+        client.get('/no-such-page')
+        body = client.get('/metrics').get_data(as_text=True)
+        assert '# TYPE http_request_duration_seconds histogram' in body
+        assert 'http_request_duration_seconds_count{endpoint="categories",method="GET"} 2' in body
+        assert 'http_request_duration_seconds_bucket{endpoint="categories",method="GET",le="+Inf"} 2' in body
+        assert 'http_requests_total{endpoint="unmatched",method="GET",status="404"} 1' in body
+        assert 'db_queries_per_request_bucket{endpoint="categories",le="1.0"} 1' in body
+        assert 'db_repeated_query_requests_total{endpoint="categories"} 1' in body
+        assert 'endpoint="metrics"' not in body
+        instrumented.config['METRICS_TOKEN'] = 'scrape-secret'
+        assert client.get('/metrics').status_code == 401
+        response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+    
+    def test_metrics_require_token_in_production(self, monkeypatch):
+        """Production only registers /metrics when a scrape token is configured"""
+        from config import ProductionConfig
+        from factory import create_app
+        monkeypatch.setattr(ProductionConfig, 'METRICS_TOKEN', None)
+        assert create_app('production', blueprints=()).test_client().get('/metrics').status_code == 404
+        monkeypatch.setattr(ProductionConfig, 'METRICS_TOKEN', 'scrape-secret')
+        client = create_app('production', blueprints=()).test_client()
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+class TestEagerLoading:
+    """Test that list pages run the same queries for 2 rows as for 14"""
+    
+    PAGES = ['/admin/part-orders', '/admin/parts', '/admin/customers', '/api/services', '/checkout']
+    
+    @staticmethod
+    def seed(start, count, owner_id):
+        from app import (User, CustomerProfile, SparePartCategory, SparePart, PartOrder, CartItem,
+                         AccessoryCategory, CarAccessory, ServiceCategory, CarService)
+        part_category = SparePartCategory.query.first() or SparePartCategory(name='Brakes')
+        accessory_category = AccessoryCategory.query.first() or AccessoryCategory(name='Interior')
+        for number in range(start, start + count):
+            user = User(username=f'customer{number}', email=f'customer{number}@example.com',
+                        password_hash='-', role='customer')
+            part = SparePart(name=f'Part {number}', category=part_category, price=100.0 + number,
+                             stock_quantity=10)
+            accessory = CarAccessory(name=f'Accessory {number}', category=accessory_category,
+                                     price=50.0 + number, stock=10)
+            category = ServiceCategory(name=f'Category {number}')
+            db.session.add_all([
+                user, part, accessory, category,
+                CustomerProfile(user=user, name=f'Customer {number}'),
+                PartOrder(order_number=f'GM-PART-{number:05d}', customer_name=f'Customer {number}',
+                          customer_phone='9876543210', part=part, unit_price=part.price,
+                          subtotal=part.price, advance_amount=part.price / 2,
+                          remaining_amount=part.price / 2, total_price=part.price),
+                CarService(name=f'Service {number}', category=category, price=999.0, duration_minutes=60),
+                CartItem(session_id='admin-cart', user_id=owner_id, part=part),
+                CartItem(session_id='admin-cart', user_id=owner_id, accessory=accessory),
+            ])
+        db.session.commit()
+    
+    @staticmethod
+    def query_count(response):
+        import re
+        assert response.status_code == 200, response.status_code
+        return int(re.search(r'"(\d+) queries"', response.headers['Server-Timing']).group(1))
+    
+    def test_query_count_independent_of_rows(self, client, monkeypatch):
+        """Each page's query count stays flat as its rows grow"""
+        from app import User
+        monkeypatch.setitem(app.config, 'N_PLUS_ONE_RAISE', True)
+        monkeypatch.setitem(app.config, 'SERVER_TIMING', True)
+        with app.app_context():
+            admin = User(username='admin', email='admin@example.com', role='admin')
+            admin.set_password('Admin@123456')
+            db.session.add(admin)
+            db.session.commit()
+            self.seed(0, 2, admin.id)
+        client.post('/login', data={'username': 'admin', 'password': 'Admin@123456'})
+        client.get('/')  # the first request after login loads the user into the identity cache
+        few = {page: self.query_count(client.get(page)) for page in self.PAGES}
+        with app.app_context():
+            self.seed(2, 12, User.query.filter_by(username='admin').first().id)
+        many = {page: self.query_count(client.get(page)) for page in self.PAGES}
+        assert many == few
+    
+    def test_checkout_numbers_orders(self, client, monkeypatch):
+        """Checkout numbers every order from one lookup and keeps their ids for payment"""
+        from app import User, PartOrder, CartItem
+        monkeypatch.setitem(app.config, 'N_PLUS_ONE_RAISE', True)
+        with app.app_context():
+            admin = User(username='admin', email='admin@example.com', role='admin')
+            admin.set_password('Admin@123456')
+            db.session.add(admin)
+            db.session.commit()
+            self.seed(0, 6, admin.id)
+            # Orders are for parts only (part_order.part_id is required)
+            CartItem.query.filter(CartItem.accessory_id.isnot(None)).delete()
+            db.session.commit()
+        client.post('/login', data={'username': 'admin', 'password': 'Admin@123456'})
+        response = client.post('/checkout', data={'customer_name': 'Admin', 'customer_phone': '9876543210',
+                                                  'delivery_address': 'Dehradun'})
+        assert response.status_code == 302
+        with client.session_transaction() as session:
+            order_ids = session['pending_part_orders']
+        with app.app_context():
+            numbers = [order.order_number for order in PartOrder.query.filter(PartOrder.id.in_(order_ids))]
+        assert len(order_ids) == 6 and None not in order_ids
+        assert sorted(numbers) == [f'GM-PART-{number:05d}' for number in range(7, 13)]
+    
+    def test_unknown_profile(self):
+        """Asking for a profile a model does not define is an error"""
+        from app import PartOrder
+        assert PartOrder.loader_options('admin_list')
+        with pytest.raises(ValueError):
+            PartOrder.loader_options('nope')
+
+class TestSeeding:
+    """Test the synthetic data seeder and `flask seed`"""
+    
+    @staticmethod
+    def seeded(scale=0.002, seed=7):
+        from sqlalchemy import create_engine
+        from seeding import seed_database
+        engine = create_engine('sqlite://')
+        counts = seed_database(engine, scale, seed, anchor=date(2025, 1, 15))
+        return engine, counts
+    
+    @staticmethod
+    def dump(engine, table):
+        from sqlalchemy import text
+        with engine.connect() as conn:
+            return conn.execute(text(f'SELECT * FROM {table} ORDER BY id')).fetchall()
+    
+    def test_reproducible(self):
+        """The same seed and scale give the same rows; another seed does not"""
+        first, counts = self.seeded()
+        second, _ = self.seeded()
+        other, _ = self.seeded(seed=8)
+        assert counts['service_booking'] == 200 and counts['notification'] == 2000
+        assert counts['availability'] > 0 and counts['payment'] > 0
+        for table in ('user', 'service_booking', 'payment', 'availability', 'notification'):
+            assert self.dump(first, table) == self.dump(second, table)
+        assert self.dump(first, 'service_booking') != self.dump(other, 'service_booking')
+    
+    def test_consistent_rows(self):
+        """Foreign keys point at generated rows and payments match their bookings"""
+        from sqlalchemy import text
+        engine, counts = self.seeded()
+        with engine.connect() as conn:
+            orphans = conn.execute(text(
+                'SELECT COUNT(*) FROM service_booking b LEFT JOIN car_service s ON s.id = b.service_id '
+                'WHERE s.id IS NULL')).scalar()
+            unpaid = conn.execute(text(
+                "SELECT COUNT(*) FROM service_booking WHERE status = 'Completed' AND id NOT IN "
+                '(SELECT service_booking_id FROM payment WHERE service_booking_id IS NOT NULL)')).scalar()
+            future_done = conn.execute(text(
+                "SELECT COUNT(*) FROM service_booking WHERE booking_date > '2025-01-15' "
+                "AND status = 'Completed'")).scalar()
+        assert orphans == unpaid == future_done == 0
+    
+    def test_refuses_populated_database(self):
+        """Seeding twice needs reset, which starts again from empty tables"""
+        from seeding import SeedError, seed_database
+        engine, counts = self.seeded()
+        with pytest.raises(SeedError):
+            seed_database(engine, 0.002, 7)
+        assert seed_database(engine, 0.002, 7, reset=True) == counts
+    
+    def test_seed_command(self):
+        """`flask seed` fills the app database and reports the accounts"""
+        from factory import create_app
+        from models import ServiceBooking, User
+        seeded_app = create_app('testing', blueprints=())
+        result = seeded_app.test_cli_runner().invoke(args=['seed', '--scale', '0.001', '--seed', '3'])
+        assert result.exit_code == 0, result.output
+        assert 'rows seeded' in result.output
+        with seeded_app.app_context():
+            assert ServiceBooking.query.count() == 100
+            assert User.query.filter_by(username='admin').first().check_password('Bench@12345')
+        result = seeded_app.test_cli_runner().invoke(args=['seed', '--scale', '0.001'])
+        assert result.exit_code == 1 and 'already has users' in result.output
+
+class TestCredentials:
+    """Test configurable password hashing, the verification pool and rehash on login"""
+    
+    @pytest.fixture
+    def credentials(self):
+        from credentials import Credentials
+        original = app.extensions['credentials']
+        def use(*args, **kwargs):
+            app.extensions['credentials'] = Credentials(*args, **kwargs)
+            return app.extensions['credentials']
+        yield use
+        app.extensions['credentials'] = original
+    
+    @staticmethod
+    def add_user(username, password):
+        from models import User
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com', role='admin')
+            user.set_password(password)
+            db.session.add(user)
+            db.session.commit()
+            return user.password_hash
+    
+    def test_methods(self, monkeypatch):
+        """Methods are spelt out in full without hashing; unknown ones fail when the app is built"""
+        import credentials as credentials_module
+        from credentials import Credentials, canonical_method
+        from werkzeug.security import generate_password_hash
+        for method in ('scrypt', 'scrypt:16384:8:1', 'pbkdf2', 'pbkdf2:sha512', 'pbkdf2:sha256:1000'):
+            assert canonical_method(method) == generate_password_hash('', method).split('$', 1)[0]
+        
+        def no_hashing(*args):
+            raise AssertionError('canonical_method() must not hash')
+        
+        monkeypatch.setattr(credentials_module, 'generate_password_hash', no_hashing)
+        assert Credentials().method == 'scrypt:32768:8:1'
+        monkeypatch.undo()
+        credentials = Credentials('pbkdf2:sha256:1000')
+        stored = credentials.hash('Secret123')
+        assert stored.startswith('pbkdf2:sha256:1000$')
+        assert not credentials.needs_rehash(stored)
+        assert credentials.verify(stored, 'Secret123').valid
+        assert not credentials.verify(stored, 'wrong').valid
+        assert not credentials.verify(None, 'Secret123').valid
+        for method in ('md5', 'scrypt:1', 'pbkdf2:nohash', 'pbkdf2:sha256:1:2'):
+            with pytest.raises(ValueError):
+                Credentials(method)
+    
+    def test_pool_verifies_concurrently(self):
+        """Verifications submitted from many threads all get their own answer"""
+        from concurrent.futures import ThreadPoolExecutor
+        from credentials import Credentials
+        credentials = Credentials('pbkdf2:sha256:1000', workers=2, queue_size=16)
+        stored = credentials.hash('Secret123')
+        guesses = ['Secret123', 'wrong'] * 8
+        with ThreadPoolExecutor(8) as clients:
+            results = list(clients.map(lambda guess: credentials.verify(stored, guess).valid, guesses))
+        assert results == [True, False] * 8
+        credentials.shutdown()
+    
+    def test_rehash_on_login(self, client, credentials):
+        """Logging in with a hash from older settings stores one made with the current settings"""
+        from models import User
+        credentials('pbkdf2:sha256:1000')
+        old = self.add_user('rehash', 'Secret123')
+        credentials('pbkdf2:sha256:2000')
+        response = client.post('/login', data={'username': 'rehash', 'password': 'Secret123'})
+        assert response.status_code == 302
+        with app.app_context():
+            user = User.query.filter_by(username='rehash').first()
+            assert user.password_hash != old
+            assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+            assert user.check_password('Secret123')
+    
+    def test_wrong_password_keeps_hash(self, client, credentials):
+        from models import User
+        credentials('pbkdf2:sha256:1000')
+        old = self.add_user('keeper', 'Secret123')
+        credentials('pbkdf2:sha256:2000')
+        response = client.post('/login', data={'username': 'keeper', 'password': 'wrong'})
+        assert response.status_code == 200
+        with app.app_context():
+            assert User.query.filter_by(username='keeper').first().password_hash == old
+    
+    def test_busy_pool_sheds_logins(self, client, credentials):
+        """With every verification slot taken /login answers 503 straight away"""
+        self.add_user('busy', 'Secret123')
+        pool = credentials('pbkdf2:sha256:1000', workers=1, queue_size=0)
+        pool._slots.acquire()
+        try:
+            response = client.post('/login', data={'username': 'busy', 'password': 'Secret123'})
+        finally:
+            pool._slots.release()
+            pool.shutdown()
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+
+class TestIdentityCache:
+    """Test the cached Flask-Login user loader"""
+    
+    @staticmethod
+    def queries(response):
+        return TestEagerLoading.query_count(response)
+    
+    @pytest.fixture
+    def customer(self, auth_client, monkeypatch):
+        monkeypatch.setitem(app.config, 'SERVER_TIMING', True)
+        auth_client.get('/customer')  # loads the identity
+        return auth_client
+    
+    def test_page_views_skip_user_queries(self, customer, monkeypatch):
+        """A cached identity costs no queries; a miss loads user and profile together"""
+        cached = self.queries(customer.get('/customer'))
+        monkeypatch.setattr(app.extensions['identity_cache'], 'ttl', 0)
+        uncached = self.queries(customer.get('/customer'))
+        # Before the cache: one query for the user and a lazy load for the profile
+        assert uncached - cached == 1
+        with app.test_request_context():
+            from flask import g
+            from identity import load_user
+            from instrumentation import QueryStats
+            g.query_stats = QueryStats()
+            user = load_user('1')
+            assert user.customer_profile.name == 'Test User'
+            assert user.technician_profile is None
+            assert g.query_stats.count == 1
+    
+    def test_profile_edit_seen_at_once(self, customer):
+        """Editing the cached profile is saved and the next page shows it"""
+        from models import CustomerProfile
+        response = customer.post('/customer/edit', data={'name': 'Renamed', 'contact': '9876543210'})
+        assert response.status_code == 302
+        with customer.session_transaction() as session:
+            assert session['_identity_version'] == 1
+        assert b'Renamed' in customer.get('/customer').data
+        with app.app_context():
+            assert CustomerProfile.query.filter_by(name='Renamed').count() == 1
+    
+    def test_edits_by_others_invalidate(self, customer):
+        """A profile changed outside the user's session is not served from the cache"""
+        from models import CustomerProfile
+        with app.app_context():
+            CustomerProfile.query.first().name = 'Changed By Admin'
+            db.session.commit()
+        assert b'Changed By Admin' in customer.get('/customer').data
+
+class FakeRedisServer:
+    """Minimal local stand-in for Redis: AUTH, SELECT, PING, INCR, PEXPIRE and GET over RESP"""
+    
+    def __init__(self, password=None):
+        import socketserver, threading, time
+        databases = self.databases = {}
+        self.commands = []
+        commands = self.commands
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def read_command(self):
+                header = self.rfile.readline()
+                if not header:
+                    return None
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(length + 2)[:-2].decode())
+                return args
+            
+            def handle(self):
+                authed, db = password is None, 0
+                while True:
+                    args = self.read_command()
+                    if args is None:
+                        return
+                    name, args = args[0].upper(), args[1:]
+                    commands.append(name)
+                    store = databases.setdefault(db, {}) if name in ('INCR', 'PEXPIRE', 'GET') else {}
+                    entry = store.get(args[0]) if args else None
+                    if entry and entry[1] and entry[1] < time.monotonic():
+                        store.pop(args[0])
+                        entry = None
+                    if name == 'AUTH':
+                        authed = args[-1] == password
+                        reply = b'+OK\r\n' if authed else b'-WRONGPASS invalid password\r\n'
+                    elif not authed:
+                        reply = b'-NOAUTH Authentication required.\r\n'
+                    elif name == 'SELECT':
+                        db, reply = int(args[0]), b'+OK\r\n'
+                    elif name == 'PING':
+                        reply = b'+PONG\r\n'
+                    elif name == 'INCR':
+                        value = int(entry[0] if entry else 0) + 1
+                        store[args[0]] = (str(value), entry[1] if entry else None)
+                        reply = b':%d\r\n' % value
+                    elif name == 'PEXPIRE':
+                        if entry:
+                            store[args[0]] = (entry[0], time.monotonic() + int(args[1]) / 1000)
+                        reply = b':1\r\n' if entry else b':0\r\n'
+                    elif name == 'GET':
+                        reply = b'$%d\r\n%s\r\n' % (len(entry[0]), entry[0].encode()) if entry else b'$-1\r\n'
+                    else:
+                        reply = b'-ERR unknown command\r\n'
+                    self.wfile.write(reply)
+        
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedisServer(password='s3cret')
+    yield server
+    server.close()
+
+class TestRateLimits:
+    """Test the sliding-window rate limiter, its backends and the 429 responses"""
+    
+    @pytest.fixture
+    def limited(self, client, monkeypatch):
+        """Enable limiting on the test app with the given policies"""
+        from ratelimit import MemoryBackend, RateLimiter, parse_limits
+        monkeypatch.setitem(app.config, 'RATELIMIT_ENABLED', True)
+        monkeypatch.setitem(app.config, 'SERVER_TIMING', True)
+        def limit(**policies):
+            limiter = RateLimiter(MemoryBackend(), {endpoint.replace('__', '.'): parse_limits(text)
+                                                    for endpoint, text in policies.items()})
+            monkeypatch.setitem(app.extensions, 'rate_limiter', limiter)
+            return client
+        return limit
+    
+    def test_parse_limits(self):
+        from ratelimit import RateLimit, parse_limits
+        assert parse_limits('10 per minute, 50 per hour') == (RateLimit(10, 60), RateLimit(50, 3600))
+        assert parse_limits('5/second; 2 per 10 minutes') == (RateLimit(5, 1), RateLimit(2, 600))
+        with pytest.raises(ValueError):
+            parse_limits('lots per week')
+    
+    def test_backend_interface(self):
+        """A counter backend without hit() cannot be instantiated"""
+        from ratelimit import CounterBackend
+        
+        class Uncounted(CounterBackend):
+            pass
+        
+        with pytest.raises(TypeError):
+            Uncounted()
+    
+    def test_sliding_window(self):
+        """The previous window counts in proportion to how much of it is still inside the window"""
+        from ratelimit import MemoryBackend, RateLimit, RateLimiter
+        limiter = RateLimiter(MemoryBackend(), {'api.chat': (RateLimit(3, 60),)})
+        assert [limiter.check('api.chat', 'a', now=600 + n).allowed for n in range(4)] == [True, True, True, False]
+        assert limiter.check('api.chat', 'a', now=604).retry_after == 56 + 24
+        assert limiter.check('api.chat', 'b', now=604).allowed
+        # 50 s into the next window the 5 earlier hits weigh 5 * 10/60
+        assert limiter.check('api.chat', 'a', now=710).allowed
+        assert limiter.check('api.chat', 'a', now=711).allowed
+        assert not limiter.check('api.chat', 'a', now=712).allowed
+    
+    def test_login_rejected_before_database(self, limited):
+        """Over the limit /login answers 429 without running a query; the form still loads"""
+        client = limited(public__login='2 per minute')
+        for _ in range(2):
+            assert client.post('/login', data={'username': 'nobody', 'password': 'x'}).status_code == 200
+        response = client.post('/login', data={'username': 'nobody', 'password': 'x'})
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        assert '0 queries' in response.headers['Server-Timing']
+        assert client.get('/login').status_code == 200
+        assert app.extensions['metrics'].rate_limited.value(('public.login',)) >= 1
+        assert 'http_rate_limited_total{endpoint="public.login"}' in app.extensions['metrics'].render()
+    
+    def test_api_rejections_are_json(self, limited):
+        client = limited(api__chat='1 per minute')
+        assert client.post('/api/chat', json={'message': 'hello'}).status_code == 200
+        response = client.post('/api/chat', json={'message': 'hello'})
+        assert response.status_code == 429
+        assert response.get_json()['success'] is False
+        assert client.post('/api/booking/create', json={}).status_code != 429
+    
+    def test_redis_backend_shared_between_workers(self, fake_redis):
+        """Two workers pointed at one Redis-protocol server share the counters"""
+        from ratelimit import RateLimit, RateLimiter, create_backend
+        url = f'redis://:s3cret@127.0.0.1:{fake_redis.port}/2'
+        policies = {'public.login': (RateLimit(3, 60), RateLimit(100, 3600))}
+        workers = [RateLimiter(create_backend(url), policies) for _ in range(2)]
+        decisions = [workers[n % 2].check('public.login', '10.0.0.1', now=1200 + n).allowed for n in range(4)]
+        assert decisions == [True, True, True, False]
+        assert set(fake_redis.databases) == {2}
+        # One connection per worker: AUTH and SELECT once, then one pipelined round trip per check
+        assert fake_redis.commands.count('AUTH') == 2 and fake_redis.commands.count('INCR') == 8
+        for worker in workers:
+            worker.backend.close()
+    
+    def test_redis_errors(self, fake_redis):
+        from ratelimit import RateLimitBackendError, RedisBackend
+        with pytest.raises(RateLimitBackendError, match='WRONGPASS'):
+            RedisBackend(f'redis://:wrong@127.0.0.1:{fake_redis.port}').hit([('a', 'b', 60)])
+        with pytest.raises(RateLimitBackendError):
+            RedisBackend(f'redis://127.0.0.1:{fake_redis.port}').hit([('a', 'b', 60)])
+    
+    def test_unreachable_store_fails_open(self, limited, monkeypatch):
+        """With the counter store down requests are served and the failure is counted"""
+        import socket
+        from ratelimit import RateLimit, RateLimiter, RedisBackend
+        client = limited()
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        monkeypatch.setitem(app.extensions, 'rate_limiter', RateLimiter(
+            RedisBackend(f'redis://127.0.0.1:{port}'), {'api.chat': (RateLimit(1, 60),)}))
+        for _ in range(3):
+            assert client.post('/api/chat', json={'message': 'hello'}).status_code == 200
+        assert app.extensions['metrics'].rate_limit_errors.value(('api.chat',)) >= 3
+
+class TestHeaderPolicy:
+    """Test the per-route-class security and cache headers"""
+    
+    @pytest.fixture
+    def policy_app(self):
+        from flask import render_template_string
+        from factory import create_app
+        policy_app = create_app('testing', blueprints=['seo'])
+        
+        @policy_app.route('/inline')
+        def inline():
+            return render_template_string('<script nonce="{{ csp_nonce() }}">go()</script>')
+        
+        @policy_app.route('/cached')
+        def cached():
+            return 'cached', 200, {'Cache-Control': 'public, max-age=60'}
+        
+        @policy_app.route('/api/ping')
+        def ping():
+            return {'ok': True}
+        return policy_app
+    
+    def test_public_page(self, client):
+        response = client.get('/faq')
+        headers = response.headers
+        assert "script-src 'self' 'unsafe-inline'" in headers['Content-Security-Policy']
+        assert headers['Cache-Control'] == 'no-cache, no-store, must-revalidate'
+        assert headers['X-Frame-Options'] == 'SAMEORIGIN'
+        for name in ('Content-Security-Policy', 'X-Frame-Options', 'Strict-Transport-Security', 'Cache-Control'):
+            assert len(headers.getlist(name)) == 1, name
+    
+    def test_authenticated_page(self, auth_client):
+        assert auth_client.get('/customer').headers['Cache-Control'].startswith('private, ')
+    
+    def test_static_is_revalidated(self, client):
+        """Unhashed static files are revalidated by ETag, never pinned for a year"""
+        response = client.get('/static/css/clean.css')
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert client.get('/static/css/clean.css', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+        assert 'Content-Security-Policy' not in response.headers
+        assert 'Pragma' not in response.headers
+    
+    def test_api_and_view_cache_control(self, policy_app):
+        client = policy_app.test_client()
+        response = client.get('/api/ping')
+        assert response.headers['Cache-Control'] == 'no-store'
+        assert response.headers['Content-Security-Policy'] == "default-src 'none'; frame-ancestors 'none'"
+        assert response.headers['X-Frame-Options'] == 'DENY'
+        assert client.get('/cached').headers['Cache-Control'] == 'public, max-age=60'
+    
+    def test_csp_nonce(self, policy_app):
+        """A page using csp_nonce() gets a fresh nonce in its policy and is never snapshotted"""
+        from snapshots import cacheable
+        client = policy_app.test_client()
+        nonces = []
+        for _ in range(2):
+            response = client.get('/inline')
+            nonce = response.get_data(as_text=True).split('nonce="')[1].split('"')[0]
+            assert f"'nonce-{nonce}'" in response.headers['Content-Security-Policy']
+            assert not cacheable(response.status, list(response.headers.items()))
+            nonces.append(nonce)
+        assert nonces[0] != nonces[1]
+        assert 'nonce-' not in client.get('/cached').headers['Content-Security-Policy']
+
+class FakeRazorpayServer:
+    """Local stand-in for Razorpay's orders API: basic auth, keep-alive, one order per POST"""
+    
+    def __init__(self, key_id='rzp_test_key', key_secret='rzp_test_secret'):
+        import base64, json, threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        self.key_id, self.key_secret = key_id, key_secret
+        self.orders, self.connections, self.fail = [], [], 0
+        expected = 'Basic ' + base64.b64encode(f'{key_id}:{key_secret}'.encode()).decode()
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def setup(self):
+                super().setup()
+                server.connections.append(self.client_address)
+            
+            def reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if self.headers.get('Authorization') != expected:
+                    return self.reply(401, {'error': {'description': 'Authentication failed'}})
+                if self.path != '/v1/orders':
+                    return self.reply(404, {'error': {'description': 'Not found'}})
+                if server.fail:
+                    server.fail -= 1
+                    return self.reply(500, {'error': {'description': 'Gateway unavailable'}})
+                server.orders.append(body)
+                self.reply(200, {'id': f'order_{len(server.orders)}', 'amount': body['amount'],
+                                 'currency': body['currency'], 'receipt': body['receipt'], 'status': 'created'})
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/v1'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestPayments:
+    """Test online part payments end to end against a local Razorpay stand-in"""
+    
+    WEBHOOK_SECRET = 'whsec_test'
+    
+    @pytest.fixture
+    def razorpay(self, client, monkeypatch):
+        from payments import RazorpayGateway
+        server = FakeRazorpayServer()
+        gateway = RazorpayGateway(server.key_id, server.key_secret, server.url, timeout=(1, 2))
+        monkeypatch.setitem(app.extensions, 'payments', gateway)
+        monkeypatch.setitem(app.config, 'RAZORPAY_WEBHOOK_SECRET', self.WEBHOOK_SECRET)
+        yield server
+        gateway.close()
+        server.close()
+    
+    @pytest.fixture
+    def ordered(self, auth_client):
+        """The signed-in customer has checked out two parts and reached the payment page"""
+        from app import User, SparePartCategory, SparePart, CartItem
+        with app.app_context():
+            user = User.query.filter_by(username='testuser').first()
+            category = SparePartCategory(name='Brakes')
+            for number in range(2):
+                part = SparePart(name=f'Brake Pad {number}', category=category, price=1000.0 + number,
+                                 stock_quantity=5)
+                db.session.add(CartItem(session_id='cart', user_id=user.id, part=part))
+            db.session.commit()
+        response = auth_client.post('/checkout', data={'customer_name': 'Test User', 'customer_phone': '9876543210',
+                                                       'delivery_address': 'Lohaghat'})
+        assert response.status_code == 302
+        return auth_client
+    
+    @staticmethod
+    def order_ids(client):
+        with client.session_transaction() as session:
+            return session['pending_part_orders']
+    
+    @staticmethod
+    def webhook(client, payload, secret=WEBHOOK_SECRET):
+        import json
+        from payments import sign
+        body = json.dumps(payload).encode()
+        return client.post('/payments/razorpay/webhook', data=body, content_type='application/json',
+                           headers={'X-Razorpay-Signature': sign(secret, body)})
+    
+    @staticmethod
+    def captured(payment_id, order_id, amount):
+        return {'event': 'payment.captured', 'payload': {'payment': {'entity': {
+            'id': payment_id, 'order_id': order_id, 'amount': amount, 'method': 'upi', 'status': 'captured'}}}}
+    
+    def test_double_submit_creates_one_gateway_order(self, razorpay, ordered):
+        """Submitting the online payment twice reuses one gateway order over one pooled connection"""
+        from app import PartOrder, PaymentOrder
+        response = ordered.post('/orders/confirm-payment', data={'payment_method': 'Online Payment'})
+        assert response.status_code == 302 and response.headers['Location'].endswith('/orders/pay-online')
+        first = ordered.get('/orders/pay-online')
+        second = ordered.get('/orders/pay-online')
+        assert first.status_code == second.status_code == 200
+        assert b'data-order-id="order_1"' in second.data
+        script = second.get_data(as_text=True).split('<script src="/assets/js/checkout')[1].split('"')[0]
+        assert b'Razorpay' in ordered.get('/assets/js/checkout' + script).data
+        assert len(razorpay.orders) == 1 and len(razorpay.connections) == 1
+        with app.app_context():
+            orders = PartOrder.query.filter(PartOrder.id.in_(self.order_ids(ordered))).all()
+            payment_order = PaymentOrder.query.one()
+            assert payment_order.amount_paise == round(sum(order.advance_amount for order in orders) * 100)
+            assert razorpay.orders[0]['amount'] == payment_order.amount_paise
+            assert {order.payment_order_id for order in orders} == {payment_order.id}
+            assert {order.payment_status for order in orders} == {'Pending'}
+    
+    def test_gateway_error_retries_same_order(self, razorpay, ordered):
+        """A failed gateway call leaves the orders pending and the next submit retries it"""
+        from app import PaymentOrder
+        razorpay.fail = 1
+        response = ordered.get('/orders/pay-online')
+        assert response.status_code == 302 and response.headers['Location'].endswith('/orders/payment')
+        assert ordered.get('/orders/pay-online').status_code == 200
+        with app.app_context():
+            assert PaymentOrder.query.one().gateway_order_id == 'order_1'
+    
+    def test_callback_confirms_once(self, razorpay, ordered):
+        """A signed checkout callback confirms the orders; repeating it records nothing more"""
+        from app import PartOrder, Payment, Notification
+        from outbox import Relay
+        from payments import sign
+        ordered.get('/orders/pay-online')
+        order_ids = self.order_ids(ordered)
+        form = {'razorpay_order_id': 'order_1', 'razorpay_payment_id': 'pay_1',
+                'razorpay_signature': sign(razorpay.key_secret, b'order_1|pay_1')}
+        forged = dict(form, razorpay_signature=sign('wrong', b'order_1|pay_1'))
+        assert ordered.post('/payments/razorpay/callback', data=forged).headers['Location'].endswith('/orders/payment')
+        with app.app_context():
+            assert Payment.query.count() == 0
+        for _ in range(2):
+            response = ordered.post('/payments/razorpay/callback', data=form)
+            assert response.status_code == 302 and response.headers['Location'].endswith('/my-orders')
+        with app.app_context():
+            orders = PartOrder.query.filter(PartOrder.id.in_(order_ids)).all()
+            assert {(order.payment_status, order.order_status) for order in orders} == {('Advance Paid', 'Confirmed')}
+            payment = Payment.query.one()
+            assert payment.payment_id == 'pay_1' and payment.payment_order.status == 'Paid'
+            assert Relay().run_batch() == {'published': 1}
+            assert Notification.query.filter_by(title='Order Confirmed').count() == 2
+    
+    def test_webhook_is_idempotent(self, razorpay, ordered):
+        """Webhook deliveries are verified, and a redelivery or a late callback changes nothing"""
+        from app import PaymentOrder, Payment, Notification
+        from outbox import Relay
+        from payments import sign
+        ordered.get('/orders/pay-online')
+        with app.app_context():
+            amount = PaymentOrder.query.one().amount_paise
+        assert self.webhook(ordered, self.captured('pay_1', 'order_1', amount), secret='wrong').status_code == 400
+        assert self.webhook(ordered, self.captured('pay_1', 'order_1', amount - 1)).status_code == 400
+        first = self.webhook(ordered, self.captured('pay_1', 'order_1', amount))
+        again = self.webhook(ordered, self.captured('pay_1', 'order_1', amount))
+        assert first.status_code == again.status_code == 200
+        assert first.get_json()['duplicate'] is False and again.get_json()['duplicate'] is True
+        ordered.post('/payments/razorpay/callback', data={
+            'razorpay_order_id': 'order_1', 'razorpay_payment_id': 'pay_1',
+            'razorpay_signature': sign(razorpay.key_secret, b'order_1|pay_1')})
+        with app.app_context():
+            assert Payment.query.count() == 1
+            assert PaymentOrder.query.one().status == 'Paid'
+            assert Relay().run_batch() == {'published': 1}
+            assert Notification.query.filter_by(title='Order Confirmed').count() == 2
+        unknown = self.webhook(ordered, self.captured('pay_2', 'order_unknown', 100))
+        assert unknown.status_code == 200
+    
+    def test_offline_payment_confirms_once(self, ordered):
+        """Resubmitting cash on delivery does not confirm or notify twice"""
+        from app import Notification
+        from outbox import Relay
+        order_ids = self.order_ids(ordered)
+        for _ in range(2):
+            with ordered.session_transaction() as session:
+                session['pending_part_orders'] = order_ids
+            response = ordered.post('/orders/confirm-payment', data={'payment_method': 'Cash on Delivery'})
+            assert response.status_code == 302
+        with app.app_context():
+            assert Relay().run_batch() == {'published': 1}
+            assert Notification.query.filter_by(title='Order Confirmed').count() == 2
+
+class FakeSmtpServer:
+    """Local stand-in for an SMTP server: records connections and messages, can refuse or drop"""
+    
+    def __init__(self, refuse=(), drop_after=None):
+        import socketserver, threading
+        self.connections, self.messages = 0, []
+        server = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b'\r\n')
+            
+            def handle(self):
+                server.connections += 1
+                self.reply('220 fake ESMTP')
+                recipients = []
+                while True:
+                    line = self.rfile.readline().decode()
+                    if not line:
+                        return
+                    command = line[:4].upper()
+                    if command in ('EHLO', 'HELO'):
+                        self.reply('250 fake')
+                    elif command == 'MAIL':
+                        recipients = []
+                        self.reply('250 OK')
+                    elif command == 'RCPT':
+                        address = line.split(':', 1)[1].strip().strip('<>')
+                        if address in refuse:
+                            self.reply('550 No such user')
+                        else:
+                            recipients.append(address)
+                            self.reply('250 OK')
+                    elif command == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = []
+                        while True:
+                            chunk = self.rfile.readline()
+                            if chunk == b'.\r\n':
+                                break
+                            data.append(chunk)
+                        server.messages.append((recipients, b''.join(data)))
+                        self.reply('250 Queued')
+                        if drop_after and len(server.messages) == drop_after:
+                            return
+                    elif command == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('250 OK')
+        
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class FakeMessagingApi:
+    """Local stand-in for the WhatsApp Cloud and Twilio APIs: records requests, in-flight peak and connections"""
+    
+    def __init__(self, delay=0.0):
+        import threading, time
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        self.requests, self.statuses, self.connections = [], [], 0
+        self.in_flight = self.peak = 0
+        lock = threading.Lock()
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def setup(self):
+                super().setup()
+                with lock:
+                    server.connections += 1
+            
+            def do_POST(self):
+                with lock:
+                    server.in_flight += 1
+                    server.peak = max(server.peak, server.in_flight)
+                time.sleep(delay)
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                with lock:
+                    server.in_flight -= 1
+                    server.requests.append((self.path, self.headers.get('Authorization'), body))
+                    status = server.statuses.pop(0) if server.statuses else 200
+                payload = b'{"messages": [{"id": "wamid.1"}], "sid": "SM1"}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestMessaging:
+    """Test queued outbound messages and the asyncio dispatcher against local SMTP and HTTP stand-ins"""
+    
+    @pytest.fixture
+    def messaging(self, client, monkeypatch):
+        """Every channel can be queued for on the test app"""
+        from messaging import CHANNELS, Messaging
+        monkeypatch.setitem(app.extensions, 'messaging', Messaging(app.extensions['messaging'].templates, CHANNELS))
+        return app.extensions['messaging']
+    
+    @staticmethod
+    def dispatcher(messaging, smtp=None, api=None, concurrency=2, **kwargs):
+        from messaging import Dispatcher, SmsChannel, SmtpChannel, WhatsAppChannel
+        channels = {}
+        if smtp:
+            channels['email'] = SmtpChannel('127.0.0.1', smtp.port, 'noreply@gmmotors.com', timeout=2,
+                                            concurrency=concurrency)
+        if api:
+            channels['whatsapp'] = WhatsAppChannel(api.url, '1234', 'wa-token', concurrency=concurrency,
+                                                   timeout=(1, 2))
+            channels['sms'] = SmsChannel(api.url, 'AC1', 'tw-token', '+15005550006', concurrency=concurrency,
+                                         timeout=(1, 2))
+        return Dispatcher(channels, messaging.templates, **kwargs)
+    
+    @staticmethod
+    def run(dispatcher):
+        import asyncio
+        try:
+            return asyncio.run(dispatcher.run(once=True))
+        finally:
+            dispatcher.close()
+    
+    @staticmethod
+    def order_context(**overrides):
+        context = dict(order_number='GM-PART-00001', customer_name='Asha', customer_phone='9876543210',
+                       part_name='Brake Pad', quantity=2, unit_price=500.0, subtotal=1000.0,
+                       installation_required=False, installation_charges=0, total_price=1000.0,
+                       advance_amount=500.0, remaining_amount=500.0, delivery_address='Lohaghat')
+        context.update(overrides)
+        return context
+    
+    def test_templates(self, messaging):
+        """Message templates are compiled at startup, set their subject and escape HTML bodies only"""
+        from messaging import normalize_phone
+        assert 'order_confirmation.email.html' in messaging.templates.templates
+        context = self.order_context(customer_name='<Asha>')
+        subject, body, html = messaging.templates.render('order_confirmation', 'email', context)
+        assert subject == 'Order Confirmed - GM-PART-00001' and html
+        assert '&lt;Asha&gt;' in body and '<strong>Installation:</strong> No' in body
+        _, text, html = messaging.templates.render('order_confirmation', 'whatsapp', context)
+        assert text.startswith('Hi <Asha>, your order GM-PART-00001') and not html
+        assert normalize_phone('098765 43210') == normalize_phone('+91-98765-43210') == '+919876543210'
+    
+    def test_queue(self, client, monkeypatch):
+        """Unconfigured channels are skipped and unknown templates rejected"""
+        from messaging import Messaging, enabled_channels, queue_message
+        from helpers import send_email
+        from app import OutboundMessage
+        # The server and sender have defaults; e-mail counts as configured only with a login
+        assert 'email' not in enabled_channels(app.config)
+        with app.app_context():
+            assert send_email('a@example.com', 'Hello', '<p>Hi</p>') is False
+        monkeypatch.setitem(app.config, 'MAIL_USERNAME', 'mailer@example.com')
+        assert enabled_channels(app.config) == ('email',)
+        monkeypatch.setitem(app.extensions, 'messaging',
+                            Messaging(app.extensions['messaging'].templates, enabled_channels(app.config)))
+        with app.app_context():
+            assert queue_message('whatsapp', '9876543210', 'order_confirmation', **self.order_context()) is None
+            # send_email queues in the caller's transaction
+            assert send_email('b@example.com', 'Hello', '<p>Hi</p>') is True
+            db.session.rollback()
+            assert OutboundMessage.query.count() == 0
+            with pytest.raises(ValueError):
+                queue_message('email', 'a@example.com', 'no_such_template')
+            message = queue_message('email', 'a@example.com', 'order_confirmation', **self.order_context())
+            db.session.commit()
+            assert OutboundMessage.query.one().id == message.id and message.status == 'Pending'
+    
+    def test_channel_interface(self):
+        """Channels that do not say how to deliver or what to post cannot be instantiated"""
+        from messaging import Channel, HttpChannel
+        
+        class Silent(Channel):
+            name = 'silent'
+        
+        class Unaddressed(HttpChannel):
+            name = 'unaddressed'
+        
+        for channel in (Silent, Unaddressed):
+            with pytest.raises(TypeError):
+                channel()
+    
+    def test_whatsapp_link_from_template(self, client):
+        """The click-to-chat link still carries the booking enquiry text"""
+        from urllib.parse import unquote
+        location = unquote(client.get('/book-car-service').headers['Location'])
+        assert location.startswith('https://wa.me/919997612579?text=')
+        assert 'I want to book a car service.\n\n📋 *My Details:*\n• Name: \n' in location
+    
+    def test_dispatch_reuses_connections(self, messaging):
+        """A batch goes out over persistent SMTP connections and pooled HTTP sessions"""
+        import json
+        from urllib.parse import parse_qs
+        from messaging import queue_message
+        from app import OutboundMessage
+        smtp, api = FakeSmtpServer(), FakeMessagingApi()
+        try:
+            with app.app_context():
+                for number in range(6):
+                    queue_message('email', f'customer{number}@example.com', 'order_confirmation',
+                                  **self.order_context(order_number=f'GM-PART-{number:05d}'))
+                for number in range(4):
+                    queue_message('whatsapp', f'98765432{number:02d}', 'order_confirmation', **self.order_context())
+                queue_message('sms', '9876543210', 'service_confirmation', customer_name='Asha',
+                              service_name='Full Service', vehicle='Swift', booking_date='May 01, 2026',
+                              booking_time='10:00 AM', total_amount=2999)
+                db.session.commit()
+                totals = self.run(self.dispatcher(messaging, smtp, api, concurrency=2))
+                assert totals == {'sent': 11}
+                assert {message.status for message in OutboundMessage.query} == {'Sent'}
+            assert len(smtp.messages) == 6 and smtp.connections <= 2
+            assert b'Subject: Order Confirmed - GM-PART-00000' in b''.join(data for _, data in smtp.messages)
+            assert api.connections <= 4
+            whatsapp = [json.loads(body) for path, auth, body in api.requests if path == '/1234/messages']
+            assert len(whatsapp) == 4 and whatsapp[0]['messaging_product'] == 'whatsapp'
+            assert {message['to'] for message in whatsapp} == {f'9198765432{number:02d}' for number in range(4)}
+            [(path, auth, body)] = [request for request in api.requests if request[0].endswith('Messages.json')]
+            assert path == '/Accounts/AC1/Messages.json' and auth.startswith('Basic ')
+            assert parse_qs(body.decode())['To'] == ['+919876543210']
+        finally:
+            smtp.close()
+            api.close()
+    
+    def test_concurrency_limit(self, messaging):
+        """No more than the channel's concurrency are in flight at once"""
+        from messaging import queue_message
+        api = FakeMessagingApi(delay=0.05)
+        try:
+            with app.app_context():
+                for number in range(8):
+                    queue_message('whatsapp', f'98765432{number:02d}', 'order_confirmation', **self.order_context())
+                db.session.commit()
+                assert self.run(self.dispatcher(messaging, api=api, concurrency=3)) == {'sent': 8}
+            assert api.peak <= 3 and api.connections <= 3
+        finally:
+            api.close()
+    
+    def test_retries_with_backoff(self, messaging):
+        """Transient failures are retried later, permanent ones fail at once"""
+        from datetime import datetime
+        from messaging import queue_message
+        from app import OutboundMessage
+        api = FakeMessagingApi()
+        api.statuses = [503, 400]
+        try:
+            with app.app_context():
+                first = queue_message('whatsapp', '9876543210', 'order_confirmation', **self.order_context())
+                second = queue_message('whatsapp', '9876543211', 'order_confirmation', **self.order_context())
+                db.session.commit()
+                assert self.run(self.dispatcher(messaging, api=api, concurrency=1, retry_base=60)) == \
+                    {'retried': 1, 'failed': 1}
+                first, second = db.session.get(OutboundMessage, first.id), db.session.get(OutboundMessage, second.id)
+                assert (first.status, first.attempts, second.status) == ('Pending', 1, 'Failed')
+                assert '503' in first.last_error and first.next_attempt_at > datetime.utcnow()
+                first.next_attempt_at = datetime.utcnow()
+                db.session.commit()
+                assert self.run(self.dispatcher(messaging, api=api, concurrency=1)) == {'sent': 1}
+                assert db.session.get(OutboundMessage, first.id).status == 'Sent'
+        finally:
+            api.close()
+    
+    def test_smtp_reconnects_and_refusals(self, messaging):
+        """A connection the server dropped is replaced; a refused recipient is not retried"""
+        from messaging import queue_message
+        from app import OutboundMessage
+        smtp = FakeSmtpServer(refuse={'nobody@example.com'}, drop_after=1)
+        try:
+            with app.app_context():
+                for recipient in ('a@example.com', 'b@example.com', 'nobody@example.com'):
+                    queue_message('email', recipient, 'raw', subject='Hello', body='<p>Hi</p>', html=True)
+                db.session.commit()
+                assert self.run(self.dispatcher(messaging, smtp, concurrency=1)) == {'sent': 2, 'failed': 1}
+                failed = OutboundMessage.query.filter_by(status='Failed').one()
+                assert failed.recipient == 'nobody@example.com' and 'refused' in failed.last_error
+            assert len(smtp.messages) == 2 and smtp.connections == 2
+        finally:
+            smtp.close()
+    
+    def test_order_confirmation_is_queued(self, messaging, auth_client):
+        """Confirming a part order queues its e-mail and WhatsApp messages instead of sending inline"""
+        from app import SparePartCategory, SparePart, CartItem, User, OutboundMessage
+        from outbox import Relay
+        with app.app_context():
+            user = User.query.filter_by(username='testuser').first()
+            part = SparePart(name='Brake Pad', category=SparePartCategory(name='Brakes'), price=800.0,
+                             stock_quantity=5)
+            db.session.add(CartItem(session_id='cart', user_id=user.id, part=part))
+            db.session.commit()
+        auth_client.post('/checkout', data={'customer_name': 'Test User', 'customer_phone': '9876543210',
+                                            'customer_email': 'test@example.com', 'delivery_address': 'Lohaghat'})
+        response = auth_client.post('/orders/confirm-payment', data={'payment_method': 'Cash on Delivery'})
+        assert response.status_code == 302
+        with app.app_context():
+            assert OutboundMessage.query.count() == 0
+            Relay().run_batch()
+            queued = {(message.channel, message.recipient, message.template) for message in OutboundMessage.query}
+        assert queued == {('email', 'test@example.com', 'order_confirmation'),
+                          ('whatsapp', '+919876543210', 'order_confirmation')}
+
+class TestOutbox:
+    """Test the transactional outbox, its relay and consumers"""
+    
+    @pytest.fixture
+    def workshop(self, client, monkeypatch):
+        """A service, a technician and a customer account"""
+        from app import User, CustomerProfile, TechnicianProfile, ServiceCategory, CarService
+        from messaging import CHANNELS, Messaging
+        monkeypatch.setitem(app.extensions, 'messaging', Messaging(app.extensions['messaging'].templates, CHANNELS))
+        with app.app_context():
+            technician = User(username='tech', email='tech@example.com', role='technician')
+            customer = User(username='cust', email='cust@example.com', role='customer')
+            for user in (technician, customer):
+                user.set_password('Secret@123')
+            service = CarService(name='Full Service', category=ServiceCategory(name='General'), price=2999.0,
+                                 duration_minutes=120)
+            db.session.add_all([technician, customer, service,
+                                TechnicianProfile(user=technician, name='Tech', specialization='Engine'),
+                                CustomerProfile(user=customer, name='Cust', contact='9876543210')])
+            db.session.commit()
+            return {'service_id': service.id, 'technician_id': technician.technician_profile.id,
+                    'technician_user': technician.id, 'customer_user': customer.id}
+    
+    @staticmethod
+    def book(client, service_id, email='cust@example.com'):
+        response = client.post('/api/booking/create', json={
+            'customer_name': 'Cust', 'customer_phone': '9876543210', 'customer_email': email,
+            'vehicle_brand': 'Maruti', 'vehicle_model': 'Swift', 'service_id': service_id,
+            'booking_date': '2026-12-01', 'booking_time': '10:00'})
+        assert response.status_code == 201
+        return response.get_json()['booking_id']
+    
+    def test_publish_in_business_transaction(self, workshop, client):
+        """A booking writes one event and nothing else; a rolled-back write leaves no event"""
+        from app import OutboxEvent, OutboundMessage, Notification
+        from outbox import publish
+        booking_id = self.book(client, workshop['service_id'])
+        with app.app_context():
+            event = OutboxEvent.query.one()
+            assert (event.topic, event.status, event.payload) == ('booking.created', 'Pending',
+                                                                 f'{{"booking_id": "{booking_id}"}}')
+            assert OutboundMessage.query.count() == Notification.query.count() == 0
+            publish('booking.completed', booking_id=booking_id)
+            db.session.rollback()
+            assert OutboxEvent.query.count() == 1
+            with pytest.raises(ValueError):
+                publish('booking.exploded')
+    
+    def test_relay_runs_consumers(self, workshop, client):
+        """The relay queues the confirmation and counts the booking, once"""
+        from app import OutboxEvent, OutboundMessage, DailyMetric
+        from outbox import Relay
+        self.book(client, workshop['service_id'])
+        with app.app_context():
+            assert Relay().run_batch() == {'published': 1}
+            assert Relay().run_batch() == {}
+            event = OutboxEvent.query.one()
+            assert event.status == 'Published' and event.pending == '[]' and event.published_at
+            assert {(message.channel, message.template) for message in OutboundMessage.query} == \
+                {('email', 'service_confirmation'), ('whatsapp', 'service_confirmation')}
+            metric = DailyMetric.query.one()
+            assert (metric.name, metric.count, metric.total) == ('bookings_created', 1, 2999.0)
+    
+    def test_completion_and_review(self, workshop, client):
+        """Completing a booking and reviewing it notify the customer and the technician"""
+        import json
+        from app import ServiceBooking, OutboxEvent, Notification, DailyMetric
+        from outbox import Relay
+        # A guest booking with the customer's phone is not theirs to be notified about
+        self.book(client, workshop['service_id'], email='guest@example.com')
+        client.post('/login', data={'username': 'cust', 'password': 'Secret@123'})
+        booking_code = self.book(client, workshop['service_id'])
+        client.get('/logout')
+        with app.app_context():
+            booking = ServiceBooking.query.filter_by(booking_id=booking_code).one()
+            assert booking.user_id == workshop['customer_user']
+            booking.technician_id = workshop['technician_id']
+            db.session.commit()
+            booking_id = booking.id
+        client.post('/login', data={'username': 'tech', 'password': 'Secret@123'})
+        response = client.post(f'/booking/{booking_id}', data={'status': 'Completed', 'work_performed': 'Oil change'})
+        assert response.status_code == 302
+        client.get('/logout')
+        client.post('/login', data={'username': 'cust', 'password': 'Secret@123'})
+        response = client.post(f'/booking/{booking_id}/review', data={'rating': '4', 'comment': 'Good'})
+        assert response.status_code == 302
+        with app.app_context():
+            events = OutboxEvent.query.order_by(OutboxEvent.id).all()
+            assert [event.topic for event in events] == \
+                ['booking.created', 'booking.created', 'booking.completed', 'review.submitted']
+            assert json.loads(events[2].payload)['user_id'] == workshop['customer_user']
+            assert Relay().run_batch() == {'published': 4}
+            notifications = {(n.user_id, n.title) for n in Notification.query}
+            assert notifications == {(workshop['customer_user'], 'Service Completed'),
+                                     (workshop['technician_user'], 'New Review')}
+            metrics = {metric.name: (metric.count, metric.total) for metric in DailyMetric.query}
+            assert metrics['bookings_completed'] == (1, 2999.0) and metrics['reviews_submitted'] == (1, 4.0)
+    
+    def test_redelivery_is_applied_once(self, workshop, client):
+        """An event delivered again, as after an expired lease, skips the consumers that handled it"""
+        from app import OutboxEvent, OutboundMessage, DailyMetric, ProcessedEvent
+        from outbox import Relay
+        self.book(client, workshop['service_id'])
+        with app.app_context():
+            relay = Relay()
+            event = OutboxEvent.query.one()
+            assert relay.deliver(event, datetime.utcnow()) == 'published'
+            db.session.commit()
+            # A second relay that claimed the event before the first settled it
+            event.pending = None
+            assert relay.deliver(event, datetime.utcnow()) == 'published'
+            db.session.commit()
+            assert {row.consumer for row in ProcessedEvent.query} == {'messages', 'analytics'}
+            assert DailyMetric.query.one().count == 1 and OutboundMessage.query.count() == 2
+    
+    def test_failing_consumer_is_retried_alone(self, client):
+        """A failed consumer's writes are rolled back and only it runs again"""
+        from app import OutboxEvent, DailyMetric
+        from outbox import Relay, publish
+        calls = {'ok': 0, 'flaky': 0}
+        
+        def ok(event, payload):
+            calls['ok'] += 1
+        
+        def flaky(event, payload):
+            calls['flaky'] += 1
+            db.session.add(DailyMetric(day=date(2026, 1, calls['flaky']), name='flaky', count=1, total=0))
+            if calls['flaky'] == 1:
+                raise RuntimeError('downstream unavailable')
+        
+        relay = Relay({'booking.created': [('ok', ok), ('flaky', flaky)]}, retry_base=60, max_attempts=3)
+        with app.app_context():
+            publish('booking.created', booking_id='GM000001')
+            db.session.commit()
+            assert relay.run_batch() == {'retried': 1}
+            event = OutboxEvent.query.one()
+            assert event.pending == '["flaky"]' and 'downstream unavailable' in event.last_error
+            assert event.next_attempt_at > datetime.utcnow() and DailyMetric.query.count() == 0
+            event.next_attempt_at = datetime.utcnow()
+            db.session.commit()
+            assert relay.run_batch() == {'published': 1}
+            assert calls == {'ok': 1, 'flaky': 2}
+            assert [metric.day for metric in DailyMetric.query] == [date(2026, 1, 2)]
+    
+    def test_gives_up_after_max_attempts(self, client):
+        """An event whose consumer keeps failing is marked Failed with the error"""
+        from app import OutboxEvent
+        from outbox import Relay, publish
+        
+        def broken(event, payload):
+            raise KeyError('booking_id')
+        
+        with app.app_context():
+            publish('review.submitted', booking_id=1, technician_id=1, rating=5)
+            db.session.commit()
+            assert Relay({'review.submitted': [('broken', broken)]}, max_attempts=1).run_batch() == {'failed': 1}
+            event = OutboxEvent.query.one()
+            assert event.status == 'Failed' and event.last_error.startswith("broken: KeyError")
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '--cov=app', '--cov-report=html'])